@@ -4,7 +4,7 @@ import kubeflow.kubeflow.crud_backend as base
 from kubeflow.kubeflow.crud_backend import config, logging
 
 from .routes import bp as routes_bp
-from .sse import sse_bp
+from .sse import configure_namespace_watches, sse_bp
 
 log = logging.getLogger(__name__)
 
@@ -19,4 +19,6 @@ def create_app(name=__name__, static_folder="static", cfg: config.Config = None)
     app.register_blueprint(routes_bp)
     app.register_blueprint(sse_bp)
 
+    configure_namespace_watches(app)
+
     return app
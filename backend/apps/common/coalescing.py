@@ -0,0 +1,249 @@
+"""Coalescing of identical concurrent reads from the Kubernetes API."""
+
+import copy
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+from kubeflow.kubeflow.crud_backend import api, authz
+
+from . import raw
+
+
+class _Flight:
+    """A read in flight and the callers waiting for it."""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.waiters = 0
+        self.result = None
+        self.error: Optional[BaseException] = None
+
+
+class SingleFlight:
+    """
+    Shares one call between the concurrent callers of the same key.
+
+    The first caller of a key runs the call, the callers arriving while it is
+    in flight wait for it and receive its result or exception. Results are
+    deep-copied for every caller when the call was shared, so that a route
+    adding fields to its object does not change the objects of the others.
+    Only reads that do not depend on the caller may be shared: callers have
+    to be authorized before they call.
+    """
+
+    def __init__(self):
+        self._flights: Dict[Hashable, _Flight] = {}
+        self._lock = threading.Lock()
+        self._calls = 0
+        self._shared = 0
+
+    def do(self, key: Hashable, call: Callable[[], Any]) -> Any:
+        """
+        Return the result of the call, shared with the callers of the key.
+
+        Args:
+            key: Identifies the read, equal keys must mean identical reads
+            call: Runs the read
+
+        Returns:
+            The result of the call, a copy if it was shared
+        """
+        with self._lock:
+            self._calls += 1
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[key] = _Flight()
+            else:
+                flight.waiters += 1
+                self._shared += 1
+
+        if leader:
+            try:
+                flight.result = call()
+            except BaseException as e:
+                flight.error = e
+            finally:
+                with self._lock:
+                    del self._flights[key]
+                    # No caller can join once the flight is removed.
+                    shared = flight.waiters > 0
+                flight.done.set()
+        else:
+            flight.done.wait()
+            shared = True
+
+        if flight.error is not None:
+            raise flight.error
+        return copy.deepcopy(flight.result) if shared else flight.result
+
+    def stats(self) -> Dict[str, Any]:
+        """Return the count of calls and of calls served by another's read."""
+        with self._lock:
+            return {
+                "calls": self._calls,
+                "shared": self._shared,
+                "hitRatio": self._shared / self._calls if self._calls else 0.0,
+                "inFlight": len(self._flights),
+            }
+
+
+class MissCache:
+    """
+    Remembers the objects found missing for a while.
+
+    Optional objects, such as the HPA of a component, are looked up on every
+    view of the component. A miss is remembered for the TTL, or until a watch
+    reports the object, instead of being asked to the API server every time.
+    """
+
+    def __init__(self, ttl: float):
+        """
+        Initialize an empty cache.
+
+        Args:
+            ttl: Seconds a miss is remembered
+        """
+        self.ttl = ttl
+        self._expiries: Dict[Tuple[str, str, str], float] = {}
+        self._lock = threading.Lock()
+
+    def missing(self, namespace: str, kind: str, name: str) -> bool:
+        """Return whether the object was recently found missing."""
+        key = (namespace, kind, name)
+        with self._lock:
+            expiry = self._expiries.get(key)
+            if expiry is not None and expiry <= time.monotonic():
+                del self._expiries[key]
+                expiry = None
+            return expiry is not None
+
+    def add(self, namespace: str, kind: str, name: str):
+        """Remember that an object is missing."""
+        now = time.monotonic()
+        with self._lock:
+            if len(self._expiries) >= MAX_MISSES:
+                self._expiries = {
+                    key: expiry
+                    for key, expiry in self._expiries.items()
+                    if expiry > now
+                }
+            self._expiries[(namespace, kind, name)] = now + self.ttl
+
+    def discard(self, namespace: str, kind: str, name: str):
+        """Forget a miss, e.g. once a watch reports the object."""
+        with self._lock:
+            self._expiries.pop((namespace, kind, name), None)
+
+
+# Seconds a missing object is remembered, when no watch reports it earlier.
+MISS_TTL_SECONDS = 30
+MAX_MISSES = 10000
+
+misses = MissCache(MISS_TTL_SECONDS)
+
+_single_flight: Optional[SingleFlight] = None
+_single_flight_lock = threading.Lock()
+
+
+def get_single_flight() -> Optional[SingleFlight]:
+    """
+    Return the read coalescer of the process.
+
+    READ_COALESCING_ENABLED=false disables it.
+    """
+    global _single_flight
+    if os.environ.get("READ_COALESCING_ENABLED", "true").lower() == "false":
+        return None
+    with _single_flight_lock:
+        if _single_flight is None:
+            _single_flight = SingleFlight()
+        return _single_flight
+
+
+def _read(key: Hashable, call: Callable[[], Any]) -> Any:
+    single_flight = get_single_flight()
+    if single_flight is None:
+        return call()
+    return single_flight.do(key, call)
+
+
+def get_custom_rsrc(group, version, kind, namespace, name):
+    """Coalescing api.get_custom_rsrc, authorized for every caller."""
+    authz.ensure_authorized("get", group, version, kind, namespace)
+    return _read(
+        ("get", group, version, kind, namespace, name),
+        lambda: api.custom_api.get_namespaced_custom_object(
+            group, version, namespace, kind, name
+        ),
+    )
+
+
+def find_custom_rsrc(group, version, kind, namespace, name, request_timeout=None):
+    """
+    Return an object like get_custom_rsrc, None if it does not exist.
+
+    Misses are remembered, see MissCache. The read fails after
+    request_timeout seconds if set.
+    """
+    authz.ensure_authorized("get", group, version, kind, namespace)
+    if misses.missing(namespace, kind, name):
+        return None
+    kwargs = {} if request_timeout is None else {"_request_timeout": request_timeout}
+    try:
+        return _read(
+            ("get", group, version, kind, namespace, name),
+            lambda: api.custom_api.get_namespaced_custom_object(
+                group, version, namespace, kind, name, **kwargs
+            ),
+        )
+    except Exception as e:
+        if getattr(e, "status", None) != 404:
+            raise
+        misses.add(namespace, kind, name)
+        return None
+
+
+def list_custom_rsrc(group, version, kind, namespace):
+    """Coalescing api.list_custom_rsrc, authorized for every caller."""
+    authz.ensure_authorized("list", group, version, kind, namespace)
+    return _read(
+        ("list", group, version, kind, namespace),
+        lambda: api.custom_api.list_namespaced_custom_object(
+            group, version, namespace, kind
+        ),
+    )
+
+
+def list_events(namespace, field_selector):
+    """
+    Coalescing api.events.list_events, authorized for every caller.
+
+    Returns:
+        The event list as the API server's JSON
+    """
+    authz.ensure_authorized("list", "", "v1", "events", namespace)
+    return _read(
+        ("list", "", "v1", "events", namespace, field_selector),
+        lambda: raw.read_json(
+            api.v1_core.list_namespaced_event,
+            namespace=namespace,
+            field_selector=field_selector,
+        ),
+    )
+
+
+def list_namespaces():
+    """
+    Coalescing api.list_namespaces, authorized for every caller.
+
+    Returns:
+        The namespace list as the API server's JSON
+    """
+    authz.ensure_authorized("list", "", "v1", "namespaces", "")
+    return _read(
+        ("list", "", "v1", "namespaces"),
+        lambda: raw.read_json(api.v1_core.list_namespace),
+    )
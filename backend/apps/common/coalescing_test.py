@@ -0,0 +1,232 @@
+"""Unit tests for the coalescing of concurrent reads.
+
+Run directly with:
+    python3 backend/apps/common/coalescing_test.py
+"""
+
+import importlib.util
+from pathlib import Path
+import sys
+import threading
+import types
+import unittest
+from unittest.mock import Mock
+
+
+def _load_coalescing_module():
+    """Load coalescing.py with lightweight stubs for external dependencies."""
+    module_names = (
+        "backend",
+        "backend.apps",
+        "backend.apps.common",
+        "backend.apps.common.raw",
+        "kubeflow",
+        "kubeflow.kubeflow",
+        "kubeflow.kubeflow.crud_backend",
+    )
+    original_modules = {name: sys.modules.get(name) for name in module_names}
+
+    backend = types.ModuleType("backend")
+    apps = types.ModuleType("backend.apps")
+    common = types.ModuleType("backend.apps.common")
+    kubeflow = types.ModuleType("kubeflow")
+    kubeflow_kubeflow = types.ModuleType("kubeflow.kubeflow")
+    crud_backend = types.ModuleType("kubeflow.kubeflow.crud_backend")
+    backend.__path__ = []
+    apps.__path__ = []
+    common.__path__ = [str(Path(__file__).parent)]
+    crud_backend.api = types.SimpleNamespace(custom_api=Mock(), v1_core=Mock())
+    crud_backend.authz = types.SimpleNamespace(ensure_authorized=Mock())
+
+    try:
+        sys.modules["backend"] = backend
+        sys.modules["backend.apps"] = apps
+        sys.modules["backend.apps.common"] = common
+        sys.modules["kubeflow"] = kubeflow
+        sys.modules["kubeflow.kubeflow"] = kubeflow_kubeflow
+        sys.modules["kubeflow.kubeflow.crud_backend"] = crud_backend
+
+        module_path = Path(__file__).with_name("coalescing.py")
+        spec = importlib.util.spec_from_file_location(
+            "backend.apps.common.coalescing_under_test", module_path
+        )
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+        return module
+    finally:
+        for name, original_module in original_modules.items():
+            if original_module is None:
+                sys.modules.pop(name, None)
+            else:
+                sys.modules[name] = original_module
+
+
+coalescing = _load_coalescing_module()
+
+
+class SingleFlightTest(unittest.TestCase):
+    def _run_concurrently(self, single_flight, key, call, callers):
+        results = []
+        errors = []
+
+        def caller():
+            try:
+                results.append(single_flight.do(key, call))
+            except Exception as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=caller) for _ in range(callers)]
+        for thread in threads:
+            thread.start()
+        return threads, results, errors
+
+    def test_concurrent_callers_share_one_call_and_receive_copies(self):
+        single_flight = coalescing.SingleFlight()
+        release = threading.Event()
+        calls = []
+
+        def read():
+            calls.append(1)
+            release.wait(5)
+            return {"metadata": {"name": "model-a"}}
+
+        threads, results, errors = self._run_concurrently(
+            single_flight, "model-a", read, 5
+        )
+        while single_flight.stats()["calls"] < 5:
+            threading.Event().wait(0.01)
+        release.set()
+        for thread in threads:
+            thread.join(5)
+
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(errors, [])
+        self.assertEqual(results, [{"metadata": {"name": "model-a"}}] * 5)
+        self.assertEqual(len({id(result) for result in results}), 5)
+        self.assertEqual(
+            single_flight.stats(),
+            {"calls": 5, "shared": 4, "hitRatio": 0.8, "inFlight": 0},
+        )
+
+    def test_errors_are_shared_and_not_remembered(self):
+        single_flight = coalescing.SingleFlight()
+        release = threading.Event()
+
+        def fail():
+            release.wait(5)
+            raise RuntimeError("not found")
+
+        threads, results, errors = self._run_concurrently(
+            single_flight, "model-a", fail, 3
+        )
+        while single_flight.stats()["calls"] < 3:
+            threading.Event().wait(0.01)
+        release.set()
+        for thread in threads:
+            thread.join(5)
+
+        self.assertEqual(results, [])
+        self.assertEqual([str(e) for e in errors], ["not found"] * 3)
+        self.assertEqual(single_flight.do("model-a", lambda: "found"), "found")
+
+    def test_sequential_calls_are_not_shared_or_copied(self):
+        single_flight = coalescing.SingleFlight()
+        result = {"metadata": {"name": "model-a"}}
+
+        self.assertIs(single_flight.do("model-a", lambda: result), result)
+        self.assertIs(single_flight.do("model-a", lambda: result), result)
+        self.assertEqual(single_flight.stats()["shared"], 0)
+
+
+class ApiException(Exception):
+    def __init__(self, status):
+        super().__init__(status)
+        self.status = status
+
+
+class MissCacheTest(unittest.TestCase):
+    def test_misses_expire_and_can_be_discarded(self):
+        misses = coalescing.MissCache(ttl=60)
+
+        misses.add("ns", "horizontalpodautoscalers", "model-predictor")
+        misses.add("ns", "deployments", "model-predictor")
+        misses.discard("ns", "deployments", "model-predictor")
+
+        self.assertTrue(
+            misses.missing("ns", "horizontalpodautoscalers", "model-predictor")
+        )
+        self.assertFalse(misses.missing("ns", "deployments", "model-predictor"))
+
+        misses.ttl = 0
+        misses.add("ns", "services", "model-predictor")
+        self.assertFalse(misses.missing("ns", "services", "model-predictor"))
+
+
+class CoalescedReadTest(unittest.TestCase):
+    def setUp(self):
+        coalescing.authz.ensure_authorized.reset_mock(side_effect=True)
+        self.get_object = coalescing.api.custom_api.get_namespaced_custom_object
+        self.get_object.reset_mock(return_value=True, side_effect=True)
+        original_misses = coalescing.misses
+        coalescing.misses = coalescing.MissCache(ttl=60)
+        self.addCleanup(setattr, coalescing, "misses", original_misses)
+
+    def _find_hpa(self):
+        return coalescing.find_custom_rsrc(
+            "autoscaling", "v2", "horizontalpodautoscalers", "ns", "model-predictor"
+        )
+
+    def test_not_found_objects_are_remembered_as_missing(self):
+        self.get_object.side_effect = ApiException(404)
+
+        self.assertIsNone(self._find_hpa())
+        self.assertIsNone(self._find_hpa())
+
+        self.assertEqual(self.get_object.call_count, 1)
+        self.assertEqual(coalescing.authz.ensure_authorized.call_count, 2)
+
+    def test_other_errors_are_raised_and_not_remembered(self):
+        self.get_object.side_effect = ApiException(500)
+
+        with self.assertRaises(ApiException):
+            self._find_hpa()
+
+        self.get_object.side_effect = None
+        self.get_object.return_value = {"kind": "HorizontalPodAutoscaler"}
+        self.assertEqual(self._find_hpa(), {"kind": "HorizontalPodAutoscaler"})
+
+    def test_lookups_can_bound_the_request(self):
+        self.get_object.return_value = {"kind": "HorizontalPodAutoscaler"}
+
+        coalescing.find_custom_rsrc(
+            "autoscaling",
+            "v2",
+            "horizontalpodautoscalers",
+            "ns",
+            "model-predictor",
+            request_timeout=10,
+        )
+        self._find_hpa()
+
+        first, second = self.get_object.call_args_list
+        self.assertEqual(first.kwargs, {"_request_timeout": 10})
+        self.assertEqual(second.kwargs, {})
+
+    def test_every_caller_is_authorized_before_the_read(self):
+        ensure_authorized = coalescing.authz.ensure_authorized
+        ensure_authorized.side_effect = PermissionError("forbidden")
+        get_object = self.get_object
+
+        with self.assertRaises(PermissionError):
+            coalescing.get_custom_rsrc(
+                "serving.kserve.io", "v1beta1", "inferenceservices", "ns", "model-a"
+            )
+
+        ensure_authorized.assert_called_once_with(
+            "get", "serving.kserve.io", "v1beta1", "inferenceservices", "ns"
+        )
+        get_object.assert_not_called()
+
+
+if __name__ == "__main__":
+    unittest.main()
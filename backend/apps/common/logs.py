@@ -0,0 +1,653 @@
+"""Container logs read from the API server as streams of lines."""
+
+from collections import deque
+from datetime import datetime, timezone
+import heapq
+import itertools
+import json
+import math
+import re
+import tarfile
+import threading
+import time
+from typing import Any, Callable, Deque, Dict, Iterator, List, Mapping, Optional, Tuple
+import zlib
+
+from kubeflow.kubeflow.crud_backend import api, logging
+
+log = logging.getLogger(__name__)
+
+LOG_CHUNK_BYTES = 64 * 1024
+# Entries of a cursor page without tailLines, and at most with them. The
+# page is kept in memory until the cursor is reached.
+LOG_PAGE_LINES = 1000
+LOG_MAX_PAGE_LINES = 10000
+# A cursor page is first read from this long before its cursor. The read is
+# widened eight times over while the page is not full, then the log is read
+# from its start.
+LOG_PAGE_LOOKBACK_SECONDS = 300
+LOG_PAGE_WIDENINGS = 3
+# Bytes of encoded lines written to the response at once.
+LOG_RESPONSE_CHUNK_BYTES = 64 * 1024
+# Bytes of the end of a log an archive holds in memory until the size of
+# its tar member is known. The start of longer logs is left out.
+LOG_ARCHIVE_MAX_BYTES = 16 * 1024 * 1024
+# Time the lines of several logs are held to be merged in timestamp order,
+# and lines held at most before the oldest ones are released early.
+LOG_MERGE_SECONDS = 0.5
+LOG_MERGE_MAX_LINES = 1000
+
+# The timestamp of the oldest line of a page, then after a tilde the lines
+# with that timestamp the page and the following ones hold. Lines can share
+# a timestamp, so the timestamp alone cannot tell where a page starts.
+CURSOR_PATTERN = re.compile(
+    r"^(\d{4}-\d\d-\d\dT\d\d:\d\d:\d\d(?:\.\d{1,9})?Z)(?:~(\d{1,9}))?$"
+)
+
+# A (timestamp, line) pair of a log read with timestamps.
+LogEntry = Tuple[str, str]
+
+# Levels a log can be filtered by, least severe first.
+LOG_LEVELS = ("DEBUG", "INFO", "WARN", "ERROR")
+LEVEL_ALIASES = {
+    "TRACE": "DEBUG",
+    "D": "DEBUG",
+    "I": "INFO",
+    "WARNING": "WARN",
+    "W": "WARN",
+    "ERR": "ERROR",
+    "E": "ERROR",
+    "CRITICAL": "ERROR",
+    "C": "ERROR",
+    "FATAL": "ERROR",
+    "F": "ERROR",
+    "PANIC": "ERROR",
+}
+# Where the model servers print the level of a line, tried in order:
+# JSON loggers, logfmt (Go runtimes), klog and tornado prefixes, then the
+# level names of python logging, uvicorn and most other formats.
+LEVEL_PATTERNS = (
+    re.compile(r'"(?:level|levelname|severity)"\s*:\s*"(\w+)"', re.IGNORECASE),
+    re.compile(r"\b(?:level|lvl|severity)=(\w+)", re.IGNORECASE),
+    re.compile(r"^\[?([DIWECF])(?:\d{4}| \d{6}) "),
+    re.compile(r"\b(TRACE|DEBUG|INFO|WARNING|WARN|ERROR|CRITICAL|FATAL|PANIC)\b"),
+)
+MAX_SEARCH_LENGTH = 256
+
+
+def timestamp_key(timestamp: str) -> Tuple[str, str]:
+    """Return a sortable key of an RFC 3339 timestamp with nanoseconds."""
+    base, _, fraction = timestamp.rstrip("Z").partition(".")
+    return base, fraction.ljust(9, "0")
+
+
+def timestamp_seconds(timestamp: str) -> float:
+    """Return the epoch seconds of an RFC 3339 timestamp, fraction left out."""
+    base = datetime.strptime(timestamp_key(timestamp)[0], "%Y-%m-%dT%H:%M:%S")
+    return base.replace(tzinfo=timezone.utc).timestamp()
+
+
+def seconds_since(timestamp: str) -> float:
+    """Return the age in seconds of an RFC 3339 timestamp."""
+    return time.time() - timestamp_seconds(timestamp)
+
+
+def parse_entry(raw_line: bytes) -> LogEntry:
+    """Split a line read with timestamps into its timestamp and text."""
+    timestamp, _, line = raw_line.decode(errors="replace").partition(" ")
+    return timestamp, line
+
+
+def detect_level(line: str) -> Optional[str]:
+    """Return the level of a log line, None if it has none."""
+    for pattern in LEVEL_PATTERNS:
+        match = pattern.search(line)
+        if match:
+            level = match.group(1).upper()
+            level = LEVEL_ALIASES.get(level, level)
+            if level in LOG_LEVELS:
+                return level
+    return None
+
+
+class LogFilter:
+    """
+    Selects the lines of a log matching a search and a minimum level.
+
+    Lines without a level, e.g. the lines of a traceback, have the level of
+    the line before them, so a filter follows a single log.
+    """
+
+    def __init__(self, search: Optional[str] = None, level=None):
+        """
+        Initialize the filter.
+
+        Args:
+            search: Case-insensitive substring the lines must contain
+            level: Least severe level of the lines, one of LOG_LEVELS
+        """
+        self.search = search
+        self.level = level
+        self._search = None if search is None else search.casefold()
+        self._min_level = LOG_LEVELS.index(level) if level else None
+        self._last_level = None
+
+    def clone(self) -> "LogFilter":
+        """Return the same filter for another log."""
+        return LogFilter(self.search, self.level)
+
+    def matches(self, line: str) -> bool:
+        """Return whether the next line of the log is selected."""
+        if self._min_level is not None:
+            level = detect_level(line)
+            if level is None:
+                level = self._last_level
+            else:
+                self._last_level = level
+            if level is None or LOG_LEVELS.index(level) < self._min_level:
+                return False
+        return self._search is None or self._search in line.casefold()
+
+
+def parse_filter_args(args: Mapping[str, str]) -> Optional[LogFilter]:
+    """
+    Parse the query arguments filtering the lines of a log.
+
+    Args:
+        args: The query arguments, search and level
+
+    Returns:
+        The filter, None if the lines are not filtered
+
+    Raises:
+        ValueError: If an argument is malformed
+    """
+    search = args.get("search") or None
+    level = (args.get("level") or "").upper() or None
+    if search is None and level is None:
+        return None
+    if search is not None and len(search) > MAX_SEARCH_LENGTH:
+        raise ValueError(f"search is longer than {MAX_SEARCH_LENGTH} characters")
+    level = LEVEL_ALIASES.get(level, level)
+    if level is not None and level not in LOG_LEVELS:
+        raise ValueError(f"level must be one of {', '.join(LOG_LEVELS)}")
+    # Client patterns would run against every line of the log, and a
+    # backtracking one would hold the worker and all of its streams.
+    if args.get("regex", "false").lower() == "true":
+        raise ValueError("regex is not supported, search matches a substring")
+    return LogFilter(search, level)
+
+
+def _optional_int(args: Mapping[str, str], name: str, minimum: int = 0):
+    value = args.get(name)
+    if value is None or value == "":
+        return None
+    if not value.isdigit() or int(value) < minimum:
+        raise ValueError(f"{name} must be an integer of at least {minimum}")
+    return int(value)
+
+
+def parse_cursor(cursor: str) -> Tuple[str, Optional[int]]:
+    """
+    Split a cursor into its timestamp and its lines with that timestamp.
+
+    The lines are None for a bare timestamp, every line with it is then
+    after the cursor.
+
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    match = CURSOR_PATTERN.match(cursor)
+    if not match:
+        raise ValueError(
+            "cursor must be an RFC 3339 timestamp, optionally followed by ~"
+            " and a number of lines"
+        )
+    timestamp, lines = match.groups()
+    return timestamp, None if lines is None else int(lines)
+
+
+def parse_window_args(args: Mapping[str, str]) -> Dict[str, Any]:
+    """
+    Parse the query arguments selecting a window of a log.
+
+    Args:
+        args: The query arguments, tailLines, sinceSeconds, limitBytes,
+            cursor, the cursor returned with the following page, and
+            those of parse_filter_args
+
+    Returns:
+        The keyword arguments of read_log_window
+
+    Raises:
+        ValueError: If an argument is malformed
+    """
+    cursor = args.get("cursor") or None
+    if cursor is not None:
+        parse_cursor(cursor)
+    return {
+        "tail_lines": _optional_int(args, "tailLines"),
+        "since_seconds": _optional_int(args, "sinceSeconds", minimum=1),
+        "limit_bytes": _optional_int(args, "limitBytes", minimum=1),
+        "before": cursor,
+        "log_filter": parse_filter_args(args),
+    }
+
+
+class LogWindow:
+    """A window of the log of a pod container, read as it is iterated."""
+
+    def __init__(
+        self,
+        response: Any,
+        tail_lines: Optional[int] = None,
+        before: Optional[str] = None,
+        log_filter: Optional[LogFilter] = None,
+        reread: Optional[Callable[[], Any]] = None,
+    ):
+        """
+        Initialize the window.
+
+        Args:
+            response: The log response, read with timestamps
+            tail_lines: Entries of the window at most, None for all
+            before: Cursor of a page, only entries before it are returned
+            log_filter: Selects the lines returned by matches
+            reread: Function returning the response of a wider read of the
+                log before the cursor, None once the whole log was read
+        """
+        self.tail_lines = tail_lines
+        self.before = before
+        self.log_filter = log_filter
+        # Timestamp of the first entry, entries with that timestamp and
+        # number of entries read.
+        self.oldest: Optional[str] = None
+        self.oldest_count = 0
+        self.count = 0
+        self._response = response
+        self._reread = reread
+        self._closed = False
+
+    def raw_lines(self) -> Iterator[bytes]:
+        """Yield the lines of the response as they are read."""
+        pending = b""
+        for chunk in self._response.stream(LOG_CHUNK_BYTES):
+            *complete, pending = (pending + chunk).split(b"\n")
+            yield from complete
+        if pending:
+            yield pending
+
+    def __iter__(self) -> Iterator[LogEntry]:
+        try:
+            entries = (parse_entry(raw_line) for raw_line in self.raw_lines())
+            if self.before is None:
+                yield from entries
+                return
+
+            # The API server cannot tail a log up to a point in time, keep
+            # the last entries before the cursor and stop reading there.
+            before, after_lines = parse_cursor(self.before)
+            cursor = timestamp_key(before)
+            while True:
+                window: Deque[LogEntry] = deque(maxlen=self.tail_lines)
+                # The entries with the timestamp of the cursor are held back,
+                # the last after_lines of them are after the cursor.
+                held: Deque[LogEntry] = deque()
+                for entry in entries:
+                    key = timestamp_key(entry[0])
+                    if key > cursor or (key == cursor and after_lines is None):
+                        break
+                    if key < cursor:
+                        window.append(entry)
+                        continue
+                    held.append(entry)
+                    if len(held) > after_lines:
+                        window.append(held.popleft())
+                self.close()
+
+                full = self.tail_lines is not None and len(window) >= self.tail_lines
+                response = None if full or not self._reread else self._reread()
+                if response is None:
+                    break
+                self._response, self._closed = response, False
+                entries = (parse_entry(raw_line) for raw_line in self.raw_lines())
+            yield from window
+        finally:
+            self.close()
+
+    def matches(self) -> Iterator[Tuple[int, str]]:
+        """Yield the lines of the window selected by the filter, numbered."""
+        for number, (timestamp, line) in enumerate(self, 1):
+            if self.oldest is None:
+                self.oldest = timestamp
+            if timestamp == self.oldest:
+                self.oldest_count += 1
+            self.count = number
+            if self.log_filter is None or self.log_filter.matches(line):
+                yield number, line
+
+    def cursor(self) -> Optional[str]:
+        """Return the cursor of the page before the entries read, if any."""
+        if self.oldest is None:
+            return None
+        lines = self.oldest_count
+        if self.before is not None:
+            before, after_lines = parse_cursor(self.before)
+            if after_lines and timestamp_key(before) == timestamp_key(self.oldest):
+                lines += after_lines
+        return f"{self.oldest}~{lines}"
+
+    def close(self):
+        """Stop reading the log, the rest of it is not transferred."""
+        if self._closed:
+            return
+        self._closed = True
+        self._response.close()
+        self._response.release_conn()
+
+
+def read_log_window(
+    namespace: str,
+    pod: str,
+    container: str,
+    tail_lines: Optional[int] = None,
+    since_seconds: Optional[int] = None,
+    limit_bytes: Optional[int] = None,
+    before: Optional[str] = None,
+    log_filter: Optional[LogFilter] = None,
+) -> LogWindow:
+    """
+    Request a window of the log of a pod container.
+
+    The log is requested right away, so that API errors are raised before
+    the response starts. Without a cursor the window is the tail of the
+    log. With one, the log is read up to the cursor and only the last
+    tail_lines entries before it are kept, LOG_PAGE_LINES by default and
+    LOG_MAX_PAGE_LINES at most. The log is first read from shortly before
+    the cursor, then from further back while the page is not full.
+
+    Args:
+        namespace: The namespace of the pod
+        pod: The name of the pod
+        container: The container of the log
+        tail_lines: Entries of the window at most, None for all
+        since_seconds: Age of the oldest entry of the window
+        limit_bytes: Bytes of the log read at most
+        before: Cursor of a page, only entries before it are returned
+        log_filter: Selects the lines returned by the matches of the window
+
+    Returns:
+        The window, yielding its (timestamp, line) entries oldest first
+    """
+    kwargs = {}
+    if tail_lines is not None and before is None:
+        kwargs["tail_lines"] = tail_lines
+    if limit_bytes is not None:
+        kwargs["limit_bytes"] = limit_bytes
+
+    def read(since: Optional[int]):
+        since_kwargs = {} if since is None else {"since_seconds": since}
+        return api.v1_core.read_namespaced_pod_log(
+            pod,
+            namespace,
+            container=container,
+            timestamps=True,
+            _preload_content=False,
+            **kwargs,
+            **since_kwargs,
+        )
+
+    if before is None:
+        return LogWindow(read(since_seconds), tail_lines, None, log_filter)
+
+    if tail_lines is None:
+        tail_lines = LOG_PAGE_LINES
+    tail_lines = min(tail_lines, LOG_MAX_PAGE_LINES)
+    sinces = _page_since(parse_cursor(before)[0], since_seconds)
+
+    def reread():
+        for since in sinces:
+            return read(since)
+        return None
+
+    return LogWindow(read(next(sinces)), tail_lines, before, log_filter, reread)
+
+
+def _page_since(before: str, since_seconds: Optional[int]) -> Iterator[Optional[int]]:
+    """Yield the sinceSeconds of the reads of a cursor page, widest last."""
+    age = max(math.ceil(seconds_since(before)), 0)
+    lookback = LOG_PAGE_LOOKBACK_SECONDS
+    for _ in range(LOG_PAGE_WIDENINGS):
+        if since_seconds is not None and age + lookback >= since_seconds:
+            break
+        yield age + lookback
+        lookback *= 8
+    yield since_seconds
+
+
+def json_log_chunks(window: LogWindow) -> Iterator[bytes]:
+    """
+    Encode the lines of a log window as a success response, chunk by chunk.
+
+    The response has the shape of api.success_response, with the lines
+    under "logs" and under "cursor" the cursor of the previous page, null
+    once the start of the log was reached. Filtered windows carry only the
+    matching lines, and under "lineNumbers" their numbers in the window.
+
+    Args:
+        window: The window of the log to encode
+
+    Returns:
+        The chunks of the JSON document
+    """
+    chunk = [b'{"status": 200, "success": true, "logs": [']
+    size = 0
+    count = 0
+    numbers = []
+    for number, line in window.matches():
+        encoded = json.dumps(line).encode()
+        chunk.append(b"," + encoded if count else encoded)
+        count += 1
+        if window.log_filter is not None:
+            numbers.append(number)
+        size += len(encoded) + 1
+        if size >= LOG_RESPONSE_CHUNK_BYTES:
+            yield b"".join(chunk)
+            chunk, size = [], 0
+
+    # A window shorter than requested starts the log.
+    tail_lines = window.tail_lines
+    cursor = None
+    if tail_lines is not None and window.count >= tail_lines:
+        cursor = window.cursor()
+    chunk.append(f'], "cursor": {json.dumps(cursor)}'.encode())
+    if window.log_filter is not None:
+        chunk.append(f', "lineNumbers": {json.dumps(numbers)}'.encode())
+    chunk.append(b"}")
+    yield b"".join(chunk)
+
+
+class LogMerger:
+    """
+    Merges the lines of several logs into one stream ordered by timestamp.
+
+    Every log arrives in order, but the logs arrive independently of each
+    other. Lines are held until they are delay seconds old, so that the
+    older lines of the other logs arrive, then released in timestamp order.
+    """
+
+    def __init__(
+        self, delay: float = LOG_MERGE_SECONDS, max_lines: int = LOG_MERGE_MAX_LINES
+    ):
+        """
+        Initialize the merger.
+
+        Args:
+            delay: Time a line is held for the lines of the other logs
+            max_lines: Lines held at most, the oldest are released early
+        """
+        self.delay = delay
+        self.max_lines = max_lines
+        self._heap: List[Tuple[Tuple[str, str], int, float, Any, str, str]] = []
+        self._sequence = itertools.count()
+        self._lock = threading.Lock()
+
+    def add(self, source: Any, entries: List[LogEntry]):
+        """Hold the (timestamp, line) entries of a log."""
+        now = time.monotonic()
+        with self._lock:
+            for timestamp, line in entries:
+                heapq.heappush(
+                    self._heap,
+                    (
+                        timestamp_key(timestamp),
+                        next(self._sequence),
+                        now,
+                        source,
+                        timestamp,
+                        line,
+                    ),
+                )
+
+    def release(self) -> List[Tuple[Any, str, str]]:
+        """Return the (source, timestamp, line) of the lines held long enough."""
+        released = []
+        deadline = time.monotonic() - self.delay
+        with self._lock:
+            while self._heap and (
+                self._heap[0][2] <= deadline or len(self._heap) > self.max_lines
+            ):
+                _, _, _, source, timestamp, line = heapq.heappop(self._heap)
+                released.append((source, timestamp, line))
+        return released
+
+
+def _tar_header(path: str, size: int) -> bytes:
+    info = tarfile.TarInfo(path)
+    info.size = size
+    info.mode = 0o644
+    info.mtime = int(time.time())
+    return info.tobuf(tarfile.PAX_FORMAT)
+
+
+def _tar_padding(size: int) -> bytes:
+    return tarfile.NUL * (-size % tarfile.BLOCKSIZE)
+
+
+def _archive_logs(pod: Any, previous: bool) -> Iterator[Tuple[str, bool]]:
+    """Yield the containers of a pod, init containers first, to archive."""
+    containers = (pod.spec.init_containers or []) + pod.spec.containers
+    statuses = (pod.status.init_container_statuses or []) + (
+        pod.status.container_statuses or []
+    )
+    restarted = {status.name for status in statuses if status.restart_count}
+    for container in containers:
+        yield container.name, False
+        if previous and container.name in restarted:
+            yield container.name, True
+
+
+def _read_log_end(
+    namespace: str, pod: str, container: str, previous: bool
+) -> Deque[bytes]:
+    """Return the chunks of the last LOG_ARCHIVE_MAX_BYTES of a log."""
+    response = api.v1_core.read_namespaced_pod_log(
+        pod,
+        namespace,
+        container=container,
+        previous=previous,
+        _preload_content=False,
+    )
+    chunks: Deque[bytes] = deque()
+    size = 0
+    left_out = 0
+    # Last byte left out, the kept bytes start a line after a newline.
+    last_left_out = b"\n"
+    try:
+        for chunk in response.stream(LOG_CHUNK_BYTES):
+            chunks.append(chunk)
+            size += len(chunk)
+            while size > LOG_ARCHIVE_MAX_BYTES:
+                excess = min(size - LOG_ARCHIVE_MAX_BYTES, len(chunks[0]))
+                last_left_out = chunks[0][excess - 1 : excess]
+                chunks[0] = chunks[0][excess:]
+                if not chunks[0]:
+                    chunks.popleft()
+                size -= excess
+                left_out += excess
+    finally:
+        response.release_conn()
+
+    if left_out:
+        if last_left_out != b"\n":
+            # The member starts with the first whole line of the kept chunk.
+            newline = chunks[0].find(b"\n") + 1
+            chunks[0] = chunks[0][newline:]
+            left_out += newline
+        chunks.appendleft(f"[{left_out} bytes of the log left out]\n".encode())
+    return chunks
+
+
+def _tar_member(path: str, chunks: Deque[bytes]) -> Iterator[bytes]:
+    size = sum(len(chunk) for chunk in chunks)
+    yield _tar_header(path, size)
+    while chunks:
+        yield chunks.popleft()
+    yield _tar_padding(size)
+
+
+def _tar_logs(
+    root: str, component_pods: Dict[str, List[Any]], previous: bool
+) -> Iterator[bytes]:
+    for component, pods in component_pods.items():
+        for pod in pods:
+            namespace, pod_name = pod.metadata.namespace, pod.metadata.name
+            for container, from_previous in _archive_logs(pod, previous):
+                suffix = ".previous.log" if from_previous else ".log"
+                path = f"{root}/{component}/{pod_name}/{container}{suffix}"
+                try:
+                    chunks = _read_log_end(
+                        namespace, pod_name, container, from_previous
+                    )
+                except Exception as e:
+                    log.warning(f"Could not archive the log {path}: {e}")
+                    chunks = deque([f"{e}\n".encode()])
+                    path = f"{path}.error"
+                yield from _tar_member(path, chunks)
+
+    yield tarfile.NUL * tarfile.BLOCKSIZE * 2
+
+
+def _gzip(chunks: Iterator[bytes]) -> Iterator[bytes]:
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    for chunk in chunks:
+        compressed = compressor.compress(chunk)
+        if compressed:
+            yield compressed
+    yield compressor.flush()
+
+
+def archive_chunks(
+    root: str, component_pods: Dict[str, List[Any]], previous: bool = False
+) -> Iterator[bytes]:
+    """
+    Stream the logs of the containers of pods as a gzip'd tar archive.
+
+    The logs are read one at a time and compressed as they are written.
+    A tar member needs its size before its data, so the end of a log is
+    held in memory until it is read, at most LOG_ARCHIVE_MAX_BYTES of it.
+    The start of a longer log is left out and replaced by a line with the
+    number of bytes left out. A log that cannot be read is replaced by a
+    .error member with the reason.
+
+    Args:
+        root: Directory of the archive members
+        component_pods: The pods of every component
+        previous: Also archive the logs of the previous instance of every
+            restarted container
+
+    Returns:
+        The chunks of the archive, laid out as
+        {root}/{component}/{pod}/{container}[.previous].log
+    """
+    return _gzip(_tar_logs(root, component_pods, previous))
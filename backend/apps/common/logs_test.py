@@ -0,0 +1,419 @@
+"""Unit tests for the container log windows.
+
+Run directly with:
+    python3 backend/apps/common/logs_test.py
+"""
+
+import importlib.util
+import io
+import json
+import logging as python_logging
+from pathlib import Path
+import sys
+import tarfile
+import time
+import types
+import unittest
+from unittest.mock import Mock
+
+
+def _load_logs_module():
+    """Load logs.py with lightweight stubs for external dependencies."""
+    module_names = (
+        "kubeflow",
+        "kubeflow.kubeflow",
+        "kubeflow.kubeflow.crud_backend",
+    )
+    original_modules = {name: sys.modules.get(name) for name in module_names}
+
+    kubeflow = types.ModuleType("kubeflow")
+    kubeflow_kubeflow = types.ModuleType("kubeflow.kubeflow")
+    crud_backend = types.ModuleType("kubeflow.kubeflow.crud_backend")
+    crud_backend.api = types.SimpleNamespace(v1_core=Mock())
+    crud_backend.logging = types.SimpleNamespace(
+        getLogger=lambda name: python_logging.getLogger(name)
+    )
+
+    try:
+        sys.modules["kubeflow"] = kubeflow
+        sys.modules["kubeflow.kubeflow"] = kubeflow_kubeflow
+        sys.modules["kubeflow.kubeflow.crud_backend"] = crud_backend
+
+        module_path = Path(__file__).with_name("logs.py")
+        spec = importlib.util.spec_from_file_location("logs_under_test", module_path)
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+        return module
+    finally:
+        for name, original_module in original_modules.items():
+            if original_module is None:
+                sys.modules.pop(name, None)
+            else:
+                sys.modules[name] = original_module
+
+
+logs = _load_logs_module()
+
+
+class FakeLogResponse:
+    def __init__(self, *chunks):
+        self.chunks = chunks
+        self.read = 0
+        self.closed = False
+
+    def stream(self, amount):
+        for chunk in self.chunks:
+            self.read += 1
+            yield chunk
+
+    def close(self):
+        self.closed = True
+
+    def release_conn(self):
+        pass
+
+
+LOG = (
+    b"2024-01-01T00:00:01Z one\n",
+    b"2024-01-01T00:00:02Z two\n",
+    b"2024-01-01T00:00:03Z three\n",
+    b"2024-01-01T00:00:04Z four\n",
+)
+
+
+class LogWindowTest(unittest.TestCase):
+    def setUp(self):
+        self.read_log = logs.api.v1_core.read_namespaced_pod_log
+        self.read_log.reset_mock(return_value=True, side_effect=True)
+
+    def _body(self, window):
+        return json.loads(b"".join(logs.json_log_chunks(window)))
+
+    def test_tail_window_is_requested_from_the_api_server(self):
+        self.read_log.return_value = FakeLogResponse(*LOG[2:])
+
+        window = logs.read_log_window("ns", "pod", "c", tail_lines=2, limit_bytes=10)
+
+        kwargs = self.read_log.call_args.kwargs
+        self.assertEqual(kwargs["tail_lines"], 2)
+        self.assertEqual(kwargs["limit_bytes"], 10)
+        self.assertTrue(kwargs["timestamps"])
+        self.assertFalse(kwargs["_preload_content"])
+        self.assertEqual(
+            self._body(window),
+            {
+                "status": 200,
+                "success": True,
+                "logs": ["three", "four"],
+                "cursor": "2024-01-01T00:00:03Z~1",
+            },
+        )
+
+    def test_cursor_pages_backwards_and_stops_reading_at_the_cursor(self):
+        response = FakeLogResponse(*LOG)
+        self.read_log.return_value = response
+
+        window = logs.read_log_window(
+            "ns", "pod", "c", tail_lines=1, before="2024-01-01T00:00:03Z"
+        )
+
+        self.assertNotIn("tail_lines", self.read_log.call_args.kwargs)
+        self.assertEqual(self._body(window)["logs"], ["two"])
+        self.assertEqual(response.read, 3)
+        self.assertTrue(response.closed)
+
+    def test_cursor_page_reads_from_shortly_before_the_cursor(self):
+        self.read_log.return_value = FakeLogResponse(*LOG)
+
+        window = logs.read_log_window("ns", "pod", "c", before="2024-01-01T00:00:03Z")
+
+        age = logs.seconds_since("2024-01-01T00:00:03Z")
+        since = self.read_log.call_args.kwargs["since_seconds"]
+        self.assertGreaterEqual(since, age + logs.LOG_PAGE_LOOKBACK_SECONDS)
+        self.assertEqual(window.tail_lines, logs.LOG_PAGE_LINES)
+
+    def test_cursor_page_is_widened_until_it_is_full(self):
+        self.read_log.side_effect = [FakeLogResponse(*LOG[1:])] + [
+            FakeLogResponse(*LOG) for _ in range(logs.LOG_PAGE_WIDENINGS)
+        ]
+
+        window = logs.read_log_window(
+            "ns", "pod", "c", tail_lines=3, before="2024-01-01T00:00:04Z"
+        )
+
+        self.assertEqual(self._body(window)["logs"], ["one", "two", "three"])
+        self.assertEqual(self.read_log.call_count, 2)
+        first, second = [call.kwargs for call in self.read_log.call_args_list]
+        self.assertGreater(second["since_seconds"], first["since_seconds"])
+
+    def test_sparse_cursor_page_reads_the_whole_log_last(self):
+        self.read_log.side_effect = lambda *args, **kwargs: FakeLogResponse(*LOG)
+
+        window = logs.read_log_window(
+            "ns", "pod", "c", tail_lines=10**6, before="2024-01-01T00:00:04Z"
+        )
+
+        self.assertEqual(self._body(window)["logs"], ["one", "two", "three"])
+        self.assertEqual(window.tail_lines, logs.LOG_MAX_PAGE_LINES)
+        self.assertEqual(self.read_log.call_count, logs.LOG_PAGE_WIDENINGS + 1)
+        self.assertNotIn("since_seconds", self.read_log.call_args.kwargs)
+
+    def test_pages_split_between_lines_sharing_a_timestamp_miss_no_line(self):
+        log = (
+            b"2024-01-01T00:00:01Z a\n",
+            b"2024-01-01T00:00:02Z b\n",
+            b"2024-01-01T00:00:02Z c\n",
+            b"2024-01-01T00:00:02Z d\n",
+            b"2024-01-01T00:00:03Z e\n",
+        )
+
+        def read(*args, tail_lines=None, **kwargs):
+            return FakeLogResponse(*(log[-tail_lines:] if tail_lines else log))
+
+        self.read_log.side_effect = read
+
+        pages, cursor = [], None
+        while True:
+            body = self._body(
+                logs.read_log_window("ns", "pod", "c", tail_lines=2, before=cursor)
+            )
+            pages.append((body["logs"], body["cursor"]))
+            cursor = body["cursor"]
+            if cursor is None:
+                break
+
+        self.assertEqual(
+            pages,
+            [
+                (["d", "e"], "2024-01-01T00:00:02Z~1"),
+                (["b", "c"], "2024-01-01T00:00:02Z~3"),
+                (["a"], None),
+            ],
+        )
+
+    def test_window_shorter_than_requested_has_no_cursor(self):
+        self.read_log.return_value = FakeLogResponse(*LOG)
+
+        window = logs.read_log_window("ns", "pod", "c", tail_lines=10)
+
+        self.assertIsNone(self._body(window)["cursor"])
+
+    def test_large_windows_are_encoded_in_several_chunks(self):
+        line = b"2024-01-01T00:00:01Z " + b"x" * 1024 + b"\n"
+        self.read_log.return_value = FakeLogResponse(line * 200)
+
+        chunks = list(logs.json_log_chunks(logs.read_log_window("ns", "pod", "c")))
+
+        self.assertGreater(len(chunks), 1)
+        self.assertEqual(len(json.loads(b"".join(chunks))["logs"]), 200)
+
+    def test_window_arguments_are_validated(self):
+        self.assertEqual(
+            logs.parse_window_args({"tailLines": "1000", "sinceSeconds": "60"}),
+            {
+                "tail_lines": 1000,
+                "since_seconds": 60,
+                "limit_bytes": None,
+                "before": None,
+                "log_filter": None,
+            },
+        )
+        for args in (
+            {"tailLines": "-1"},
+            {"limitBytes": "0"},
+            {"cursor": "yesterday"},
+            {"cursor": "2024-01-01T00:00:03Z~"},
+            {"level": "LOUD"},
+            {"search": "(", "regex": "true"},
+        ):
+            with self.assertRaises(ValueError):
+                logs.parse_window_args(args)
+
+
+class LogFilterTest(unittest.TestCase):
+    def test_levels_are_detected_in_common_runtime_formats(self):
+        lines = {
+            'INFO:     127.0.0.1:5000 - "POST /v1/models/m:predict" 200 OK': "INFO",
+            "2024-01-01 00:00:00,000 kserve WARNING Model is slow": "WARN",
+            '{"level": "error", "msg": "failed to load model"}': "ERROR",
+            'time="2024" level=debug msg="probe"': "DEBUG",
+            "E0101 00:00:00.000000       1 server.go:10] out of memory": "ERROR",
+            "[I 240101 00:00:00 web:2271] 200 GET /": "INFO",
+            "plain output": None,
+        }
+        for line, level in lines.items():
+            self.assertEqual(logs.detect_level(line), level, line)
+
+    def test_lines_without_a_level_follow_the_line_before(self):
+        log_filter = logs.LogFilter(level="ERROR")
+
+        selected = [
+            line
+            for line in (
+                "INFO: loading",
+                "ERROR: inference failed",
+                "Traceback (most recent call last):",
+                "INFO: retrying",
+                "  continuation",
+            )
+            if log_filter.matches(line)
+        ]
+
+        self.assertEqual(
+            selected, ["ERROR: inference failed", "Traceback (most recent call last):"]
+        )
+
+    def test_search_is_a_substring_and_cannot_backtrack(self):
+        log_filter = logs.parse_filter_args({"search": "(A+)+$"})
+        line = "a" * 5000 + "!"
+
+        started = time.monotonic()
+        for _ in range(1000):
+            self.assertFalse(log_filter.matches(line))
+        self.assertLess(time.monotonic() - started, 1)
+        self.assertTrue(log_filter.matches("no match for (a+)+$ here"))
+        with self.assertRaises(ValueError):
+            logs.parse_filter_args({"search": "(a+)+$", "regex": "true"})
+
+    def test_filtered_window_sends_matching_lines_and_their_numbers(self):
+        self.read_log = logs.api.v1_core.read_namespaced_pod_log
+        self.read_log.reset_mock(return_value=True, side_effect=True)
+        self.read_log.return_value = FakeLogResponse(
+            b"2024-01-01T00:00:01Z INFO: ready\n",
+            b"2024-01-01T00:00:02Z ERROR: Timeout talking to storage\n",
+            b"2024-01-01T00:00:03Z WARNING: slow request\n",
+            b"2024-01-01T00:00:04Z ERROR: bad input\n",
+        )
+        log_filter = logs.parse_filter_args({"search": "time", "level": "warning"})
+
+        window = logs.read_log_window("ns", "pod", "c", 4, log_filter=log_filter)
+        body = json.loads(b"".join(logs.json_log_chunks(window)))
+
+        self.assertEqual(body["logs"], ["ERROR: Timeout talking to storage"])
+        self.assertEqual(body["lineNumbers"], [2])
+        self.assertEqual(body["cursor"], "2024-01-01T00:00:01Z~1")
+
+
+class LogMergerTest(unittest.TestCase):
+    def test_lines_of_several_logs_are_released_in_timestamp_order(self):
+        merger = logs.LogMerger(delay=0)
+
+        merger.add(
+            "a", [("2024-01-01T00:00:01Z", "a1"), ("2024-01-01T00:00:03Z", "a3")]
+        )
+        merger.add("b", [("2024-01-01T00:00:02.5Z", "b2")])
+
+        self.assertEqual(
+            merger.release(),
+            [
+                ("a", "2024-01-01T00:00:01Z", "a1"),
+                ("b", "2024-01-01T00:00:02.5Z", "b2"),
+                ("a", "2024-01-01T00:00:03Z", "a3"),
+            ],
+        )
+        self.assertEqual(merger.release(), [])
+
+    def test_recent_lines_are_held_unless_too_many(self):
+        merger = logs.LogMerger(delay=60, max_lines=2)
+
+        merger.add("a", [("2024-01-01T00:00:01Z", "a1")])
+        self.assertEqual(merger.release(), [])
+
+        merger.add(
+            "b", [("2024-01-01T00:00:02Z", "b2"), ("2024-01-01T00:00:03Z", "b3")]
+        )
+        self.assertEqual(merger.release(), [("a", "2024-01-01T00:00:01Z", "a1")])
+
+
+def _pod(name, containers, init_containers=(), restarted=()):
+    def container(name):
+        return types.SimpleNamespace(name=name)
+
+    def status(name):
+        return types.SimpleNamespace(name=name, restart_count=int(name in restarted))
+
+    return types.SimpleNamespace(
+        metadata=types.SimpleNamespace(namespace="ns", name=name),
+        spec=types.SimpleNamespace(
+            init_containers=[container(c) for c in init_containers] or None,
+            containers=[container(c) for c in containers],
+        ),
+        status=types.SimpleNamespace(
+            init_container_statuses=[status(c) for c in init_containers] or None,
+            container_statuses=[status(c) for c in containers],
+        ),
+    )
+
+
+class LogArchiveTest(unittest.TestCase):
+    def setUp(self):
+        self.read_log = logs.api.v1_core.read_namespaced_pod_log
+        self.read_log.reset_mock(return_value=True, side_effect=True)
+
+    def test_archive_holds_every_container_log_and_read_errors(self):
+        def read_log(pod, namespace, container, previous, _preload_content):
+            if container == "queue-proxy":
+                raise RuntimeError("container not found")
+            log = f"{pod}/{container}/{previous}\n".encode() * 100
+            return FakeLogResponse(log[:1000], log[1000:])
+
+        self.read_log.side_effect = read_log
+        pods = {
+            "predictor": [
+                _pod(
+                    "pod-1",
+                    ["kserve-container", "queue-proxy"],
+                    ["storage-initializer"],
+                    restarted=["kserve-container"],
+                )
+            ]
+        }
+
+        archive = b"".join(logs.archive_chunks("model-logs", pods, previous=True))
+
+        with tarfile.open(fileobj=io.BytesIO(archive), mode="r:gz") as tar:
+            members = {
+                member.name: tar.extractfile(member).read()
+                for member in tar.getmembers()
+            }
+        root = "model-logs/predictor/pod-1"
+        self.assertEqual(
+            list(members),
+            [
+                f"{root}/storage-initializer.log",
+                f"{root}/kserve-container.log",
+                f"{root}/kserve-container.previous.log",
+                f"{root}/queue-proxy.log.error",
+            ],
+        )
+        self.assertEqual(
+            members[f"{root}/kserve-container.previous.log"],
+            b"pod-1/kserve-container/True\n" * 100,
+        )
+        self.assertEqual(
+            members[f"{root}/queue-proxy.log.error"], b"container not found\n"
+        )
+
+    def test_archive_keeps_the_end_of_a_long_log(self):
+        original_max_bytes = logs.LOG_ARCHIVE_MAX_BYTES
+        logs.LOG_ARCHIVE_MAX_BYTES = 44
+        self.addCleanup(setattr, logs, "LOG_ARCHIVE_MAX_BYTES", original_max_bytes)
+        lines = [f"line {number}\n".encode() for number in range(100)]
+        self.read_log.side_effect = lambda *args, **kwargs: FakeLogResponse(*lines)
+        pods = {"predictor": [_pod("pod-1", ["kserve-container"], [])]}
+
+        archive = b"".join(logs.archive_chunks("model-logs", pods))
+
+        with tarfile.open(fileobj=io.BytesIO(archive), mode="r:gz") as tar:
+            member = tar.extractfile("model-logs/predictor/pod-1/kserve-container.log")
+            content = member.read()
+        # The partial line before the last five is left out too.
+        kept = b"".join(lines[-5:])
+        left_out = len(b"".join(lines)) - len(kept)
+        self.assertEqual(
+            content, f"[{left_out} bytes of the log left out]\n".encode() + kept
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,76 @@
+"""Concurrent Kubernetes reads on behalf of a request."""
+
+from concurrent.futures import ThreadPoolExecutor, wait
+import threading
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+from flask import copy_current_request_context
+
+# Reads run at the same time by a worker, across its requests. Under the
+# gevent worker class the pool workers are greenlets.
+MAX_PARALLEL_READS = 32
+
+_executor = ThreadPoolExecutor(
+    max_workers=MAX_PARALLEL_READS, thread_name_prefix="parallel-read"
+)
+_worker = threading.local()
+
+
+def _in_worker(read: Callable[[], Any]) -> Callable[[], Any]:
+    def run():
+        _worker.active = True
+        try:
+            return read()
+        finally:
+            _worker.active = False
+
+    return run
+
+
+def read_concurrently(
+    reads: Dict[Hashable, Callable[[], Any]], timeout: Optional[float] = None
+) -> Dict[Hashable, Tuple[Any, Optional[Exception]]]:
+    """
+    Run reads concurrently, each in a copy of the request context.
+
+    The reads keep the credentials and authorization checks of the request.
+    Reads of a read already running in the pool run one after the other in
+    its worker, so that the pool never waits for itself.
+
+    The timeout only bounds the wait: a read still running keeps its pool
+    worker and its copy of the request context until it returns, so reads
+    passed with a timeout should bound their API calls as well, e.g. with
+    the _request_timeout of the Kubernetes client.
+
+    Args:
+        reads: The reads by key
+        timeout: Seconds to wait for all the reads, None to wait until done
+
+    Returns:
+        The result and exception of every read by key. Reads still running
+        after the timeout have a TimeoutError.
+    """
+    results = {}
+    if getattr(_worker, "active", False):
+        for key, read in reads.items():
+            try:
+                results[key] = read(), None
+            except Exception as e:
+                results[key] = None, e
+        return results
+
+    futures = {
+        key: _executor.submit(copy_current_request_context(_in_worker(read)))
+        for key, read in reads.items()
+    }
+    wait(futures.values(), timeout)
+
+    for key, future in futures.items():
+        if not future.done():
+            future.cancel()
+            results[key] = None, TimeoutError(f"Read timed out after {timeout}s")
+        elif future.exception() is not None:
+            results[key] = None, future.exception()
+        else:
+            results[key] = future.result(), None
+    return results
@@ -0,0 +1,88 @@
+"""Unit tests for the concurrent reads of a request.
+
+Run directly with:
+    python3 backend/apps/common/parallel_test.py
+"""
+
+import importlib.util
+from pathlib import Path
+import sys
+import threading
+import types
+import unittest
+
+
+def _load_parallel_module():
+    """Load parallel.py with lightweight stubs for external dependencies."""
+    module_names = ("flask",)
+    original_modules = {name: sys.modules.get(name) for name in module_names}
+
+    flask = types.ModuleType("flask")
+    flask.copy_current_request_context = lambda f: f
+
+    try:
+        sys.modules["flask"] = flask
+
+        module_path = Path(__file__).with_name("parallel.py")
+        spec = importlib.util.spec_from_file_location(
+            "parallel_under_test", module_path
+        )
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+        return module
+    finally:
+        for name, original_module in original_modules.items():
+            if original_module is None:
+                sys.modules.pop(name, None)
+            else:
+                sys.modules[name] = original_module
+
+
+parallel = _load_parallel_module()
+
+
+class ReadConcurrentlyTest(unittest.TestCase):
+    def test_reads_run_concurrently_and_report_their_errors(self):
+        barrier = threading.Barrier(3, timeout=5)
+
+        def read(value):
+            barrier.wait()
+            if value is None:
+                raise RuntimeError("not found")
+            return value
+
+        results = parallel.read_concurrently(
+            {key: (lambda key=key: read(key)) for key in ("a", "b", None)}
+        )
+
+        self.assertEqual(results["a"], ("a", None))
+        self.assertEqual(results["b"], ("b", None))
+        self.assertIsNone(results[None][0])
+        self.assertEqual(str(results[None][1]), "not found")
+
+    def test_reads_share_one_timeout(self):
+        release = threading.Event()
+        self.addCleanup(release.set)
+
+        results = parallel.read_concurrently(
+            {"fast": lambda: "done", "slow": lambda: release.wait(5)}, timeout=0.1
+        )
+
+        self.assertEqual(results["fast"], ("done", None))
+        self.assertIsInstance(results["slow"][1], TimeoutError)
+
+    def test_reads_of_a_read_in_the_pool_run_in_its_worker(self):
+        def outer():
+            inner = parallel.read_concurrently(
+                {"inner": lambda: threading.current_thread()}
+            )
+            return threading.current_thread(), inner["inner"][0]
+
+        results = parallel.read_concurrently({"outer": outer})
+
+        outer_thread, inner_thread = results["outer"][0]
+        self.assertIs(outer_thread, inner_thread)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,46 @@
+"""Reads of the API server's JSON without the kubernetes client's models.
+
+The client decodes every response into its model classes, e.g. CoreV1Event,
+which routes then serialize back into dicts. For large lists the round trip
+costs far more CPU and memory than the request itself, see raw_benchmark.py.
+The functions below hand over the JSON of the API server as dicts instead.
+"""
+
+import json
+from typing import Any, Callable, Dict
+
+
+def read_json(call: Callable, *args, **kwargs) -> Dict[str, Any]:
+    """
+    Return the JSON response of a kubernetes client call as a dict.
+
+    Args:
+        call: A kubernetes client API function, e.g. list_namespaced_event
+        args: The arguments of the call
+        kwargs: The keyword arguments of the call
+    """
+    response = call(*args, _preload_content=False, **kwargs)
+    try:
+        return json.loads(response.data)
+    finally:
+        response.release_conn()
+
+
+def json_lister(list_function: Callable) -> Callable:
+    """
+    Return a list function reading the API server's JSON as dicts.
+
+    The objects of a watch.Watch stream of the returned function are dicts
+    too: the stream only decodes its objects into models when the list
+    function documents its return type.
+
+    Args:
+        list_function: A kubernetes client list function
+    """
+
+    def list_json(*args, **kwargs):
+        if kwargs.get("watch"):
+            return list_function(*args, **kwargs)
+        return read_json(list_function, *args, **kwargs)
+
+    return list_json
@@ -0,0 +1,64 @@
+"""Unit tests for the raw JSON reads.
+
+Run directly with:
+    python3 backend/apps/common/raw_test.py
+"""
+
+import importlib.util
+import json
+from pathlib import Path
+import types
+import unittest
+from unittest.mock import Mock
+
+
+def _load_raw_module():
+    module_path = Path(__file__).with_name("raw.py")
+    spec = importlib.util.spec_from_file_location("raw_under_test", module_path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+raw = _load_raw_module()
+
+
+def _response(body):
+    return types.SimpleNamespace(data=json.dumps(body).encode(), release_conn=Mock())
+
+
+class JsonListerTest(unittest.TestCase):
+    def test_lists_are_read_as_json_and_release_the_connection(self):
+        response = _response({"items": [{"metadata": {"name": "e1"}}]})
+        list_function = Mock(return_value=response)
+
+        events = raw.json_lister(list_function)(namespace="ns", field_selector="x")
+
+        list_function.assert_called_once_with(
+            namespace="ns", field_selector="x", _preload_content=False
+        )
+        self.assertEqual(events, {"items": [{"metadata": {"name": "e1"}}]})
+        response.release_conn.assert_called_once_with()
+
+    def test_watches_receive_the_streamed_response(self):
+        list_function = Mock(return_value="stream")
+
+        result = raw.json_lister(list_function)(
+            namespace="ns", watch=True, _preload_content=False
+        )
+
+        self.assertEqual(result, "stream")
+        list_function.assert_called_once_with(
+            namespace="ns", watch=True, _preload_content=False
+        )
+
+    def test_lister_documents_no_return_type_for_watch_streams(self):
+        # watch.Watch decodes streamed objects into the model named by the
+        # ":return:" line of the list function's docstring.
+        list_function = Mock(__doc__=":return: CoreV1EventList")
+
+        self.assertNotIn(":return:", raw.json_lister(list_function).__doc__ or "")
+
+
+if __name__ == "__main__":
+    unittest.main()
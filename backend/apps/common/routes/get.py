@@ -1,10 +1,11 @@
 """GET request handlers."""
 
-from flask import request
+from flask import Response, request
 
-from kubeflow.kubeflow.crud_backend import api, logging
+from kubeflow.kubeflow.crud_backend import api, authz, logging
 
-from .. import utils, versions
+from .. import coalescing, logs, server_info, utils, versions
+from ..sse import sse_manager
 from . import bp
 
 log = logging.getLogger(__name__)
@@ -12,27 +13,107 @@ log = logging.getLogger(__name__)
 KSERVE_CONTAINER = "kserve-container"
 
 
+def _read_response(data_field, data, cache_hit, resource_version):
+    """Return a success response telling whether a watch cache served it.
+
+    X-Cache is HIT for the responses read from a watch cache, MISS for
+    those read from the API server. X-Resource-Version is the
+    resourceVersion the data is synchronized to.
+    """
+    response = api.success_response(data_field, data)
+    response.headers["X-Cache"] = "HIT" if cache_hit else "MISS"
+    if resource_version:
+        response.headers["X-Resource-Version"] = resource_version
+    return response
+
+
+def _authorize_cache_read(verb, gvk, namespace):
+    # Watch caches are read with the app's credentials, not the user's.
+    authz.ensure_authorized(verb, gvk["group"], gvk["version"], gvk["kind"], namespace)
+
+
+def _read_inference_service(namespace, name):
+    """
+    Return an InferenceService with its deployment mode.
+
+    The object is served from the watch of an SSE client when there is one.
+
+    Returns:
+        The object and whether it was read from a watch cache
+    """
+    gvk = versions.inference_service_gvk()
+    cached = sse_manager.cached_object(namespace, name)
+    if cached is not None:
+        _authorize_cache_read("get", gvk, namespace)
+        # A copy, the cached object is shared with the watch.
+        inference_service = dict(cached[0])
+    else:
+        inference_service = coalescing.get_custom_rsrc(
+            **gvk, namespace=namespace, name=name
+        )
+
+    # deployment mode information to the response
+    inference_service["deploymentMode"] = utils.get_deployment_mode(inference_service)
+    return inference_service, cached is not None
+
+
 @bp.route("/api/namespaces/<namespace>/inferenceservices")
 def get_inference_services(namespace):
-    """Return a list of InferenceService CRs as json objects."""
+    """Return a list of InferenceService CRs as json objects.
+
+    The list is served from the watch of the namespace's SSE clients when
+    there is one.
+    """
     gvk = versions.inference_service_gvk()
-    inference_services = api.list_custom_rsrc(**gvk, namespace=namespace)
+    cached = sse_manager.cached_namespace(namespace)
+    if cached is not None:
+        _authorize_cache_read("list", gvk, namespace)
+        inference_services, resource_version = cached
+        return _read_response(
+            "inferenceServices", inference_services, True, resource_version
+        )
+
+    inference_services = coalescing.list_custom_rsrc(**gvk, namespace=namespace)
 
-    return api.success_response("inferenceServices", inference_services["items"])
+    return _read_response(
+        "inferenceServices",
+        inference_services["items"],
+        False,
+        inference_services.get("metadata", {}).get("resourceVersion"),
+    )
 
 
 @bp.route("/api/namespaces/<namespace>/inferenceservices/<name>")
 def get_inference_service(namespace, name):
-    """Return an InferenceService CR as a json object."""
-    inference_service = api.get_custom_rsrc(
-        **versions.inference_service_gvk(), namespace=namespace, name=name
+    """Return an InferenceService CR as a json object.
+
+    The object is served from the watch of an SSE client when there is one.
+    """
+    inference_service, cache_hit = _read_inference_service(namespace, name)
+    resource_version = inference_service["metadata"].get("resourceVersion")
+
+    return _read_response(
+        "inferenceService", inference_service, cache_hit, resource_version
     )
 
-    # deployment mode information to the response
-    deployment_mode = utils.get_deployment_mode(inference_service)
-    inference_service["deploymentMode"] = deployment_mode
 
-    return api.success_response("inferenceService", inference_service)
+@bp.route("/api/namespaces/<namespace>/inferenceservices/<name>/serverinfo")
+def get_inference_service_server_info(namespace, name):
+    """Return an InferenceService with its owned objects and events.
+
+    The objects the details page of the InferenceService shows are fetched
+    concurrently. Objects that could not be read are null and their errors
+    are reported by part, e.g. "predictor.route".
+    """
+    inference_service, cache_hit = _read_inference_service(namespace, name)
+    resource_version = inference_service["metadata"].get("resourceVersion")
+
+    return _read_response(
+        "serverInfo",
+        server_info.get_server_info(inference_service),
+        cache_hit,
+        resource_version,
+    )
 
 
 @bp.route(
@@ -47,9 +128,7 @@ def get_inference_service_containers(namespace: str, name: str, component: str):
             "containers": ["kserve-container", "container2", ...]
         }
     """
-    inference_service = api.get_custom_rsrc(
-        **versions.inference_service_gvk(), namespace=namespace, name=name
-    )
+    inference_service, _ = _read_inference_service(namespace, name)
 
     latest_pod = utils.get_component_latest_pod(inference_service, component)
 
@@ -83,16 +162,30 @@ def get_container_logs(namespace: str, name: str, component: str, container: str
     """Get logs for a particular container inside the latest pod of
     the given component
 
-    Logs are split on newline and returned as an array of lines
+    The log is streamed to the client as it is read, as an array of lines.
+    The window is selected with the tailLines, sinceSeconds and limitBytes
+    query arguments. The returned cursor pages backwards: passed as the
+    cursor argument, the window ends right before the lines returned and
+    holds tailLines lines, 1000 by default and 10000 at most. The cursor
+    is the timestamp of the oldest line returned and, after a tilde, the
+    lines with that timestamp already returned.
+    The search argument, a case-insensitive substring, and the level
+    argument only return the matching lines of the window, with their
+    numbers in it.
 
     Return:
         {
-            "logs": ["log\n", "text\n", ...]
+            "logs": ["log", "text", ...],
+            "cursor": "2024-01-01T00:00:00.123456789Z~1",
+            "lineNumbers": [1, 2, ...]
         }
     """
-    inference_service = api.get_custom_rsrc(
-        **versions.inference_service_gvk(), namespace=namespace, name=name
-    )
+    try:
+        window_args = logs.parse_window_args(request.args)
+    except ValueError as e:
+        return api.failed_response(str(e), 400)
+
+    inference_service, _ = _read_inference_service(namespace, name)
     namespace = inference_service["metadata"]["namespace"]
 
     latest_pod = utils.get_component_latest_pod(inference_service, component)
@@ -101,16 +194,44 @@ def get_container_logs(namespace: str, name: str, component: str, container: str
             f"couldn't find latest pod for component: {component}", 404
         )
 
-    logs = api.get_pod_logs(namespace, latest_pod.metadata.name, container, auth=False)
-    logs = logs.split("\n")
+    window = logs.read_log_window(
+        namespace, latest_pod.metadata.name, container, **window_args
+    )
+    response = Response(logs.json_log_chunks(window), mimetype="application/json")
+    response.call_on_close(window.close)
+    return response
+
+
+@bp.route("/api/namespaces/<namespace>/inferenceservices/<name>/logs/archive")
+def get_inference_service_logs_archive(namespace: str, name: str):
+    """Download the logs of every container of every pod of the components
+    as a gzip'd tar archive
+
+    The archive is compressed and sent while the logs are read. With the
+    previous=true query argument, it also holds the logs of the previous
+    instance of every restarted container.
+    """
+    previous = request.args.get("previous", "false").lower() == "true"
+    inference_service = coalescing.get_custom_rsrc(
+        **versions.inference_service_gvk(), namespace=namespace, name=name
+    )
+
+    component_pods = {
+        component: [utils.get_pod(namespace, pod) for pod in pods]
+        for component, pods in utils.get_component_pods(inference_service).items()
+    }
 
-    return api.success_response("logs", logs)
+    return Response(
+        logs.archive_chunks(f"{name}-logs", component_pods, previous),
+        mimetype="application/gzip",
+        headers={"Content-Disposition": f'attachment; filename="{name}-logs.tar.gz"'},
+    )
 
 
 @bp.route("/api/namespaces/<namespace>/knativeServices/<name>")
 def get_knative_service(namespace, name):
     """Return a Knative Services object as json."""
-    svc = api.get_custom_rsrc(
+    svc = coalescing.get_custom_rsrc(
         **versions.KNATIVE_SERVICE, namespace=namespace, name=name
     )
 
@@ -120,7 +241,9 @@ def get_knative_service(namespace, name):
 @bp.route("/api/namespaces/<namespace>/configurations/<name>")
 def get_knative_configuration(namespace, name):
     """Return a Knative Configurations object as json."""
-    svc = api.get_custom_rsrc(**versions.KNATIVE_CONF, namespace=namespace, name=name)
+    svc = coalescing.get_custom_rsrc(
+        **versions.KNATIVE_CONF, namespace=namespace, name=name
+    )
 
     return api.success_response("knativeConfiguration", svc)
 
@@ -128,7 +251,7 @@ def get_knative_configuration(namespace, name):
 @bp.route("/api/namespaces/<namespace>/revisions/<name>")
 def get_knative_revision(namespace, name):
     """Return a Knative Revision object as json."""
-    svc = api.get_custom_rsrc(
+    svc = coalescing.get_custom_rsrc(
         **versions.KNATIVE_REVISION, namespace=namespace, name=name
     )
 
@@ -138,41 +261,76 @@ def get_knative_revision(namespace, name):
 @bp.route("/api/namespaces/<namespace>/routes/<name>")
 def get_knative_route(namespace, name):
     """Return a Knative Route object as json."""
-    svc = api.get_custom_rsrc(**versions.KNATIVE_ROUTE, namespace=namespace, name=name)
+    svc = coalescing.get_custom_rsrc(
+        **versions.KNATIVE_ROUTE, namespace=namespace, name=name
+    )
 
     return api.success_response("knativeRoute", svc)
 
 
 @bp.route("/api/namespaces/<namespace>/inferenceservices/<name>/events")
 def get_inference_service_events(namespace, name):
+    """Return events for an InferenceService."""
+    events = utils.get_inference_service_events(namespace, name)
 
-    field_selector = api.events_field_selector("InferenceService", name)
+    return api.success_response("events", events)
 
-    events = api.events.list_events(namespace, field_selector).items
 
-    return api.success_response(
-        "events",
-        api.serialize(events),
-    )
+def _inference_graph_relations(namespace):
+    """Return the relation index of a namespace if it serves InferenceGraphs."""
+    relations = utils.get_namespace_relations(namespace)
+    if relations is None or not relations.available("inferencegraphs"):
+        return None
+    return relations
 
 
 @bp.route("/api/namespaces/<namespace>/inferencegraphs")
 def get_inference_graphs(namespace):
     """Return a list of InferenceGraph CRs as json objects."""
     gvk = versions.inference_graph_gvk()
-    inference_graphs = api.list_custom_rsrc(**gvk, namespace=namespace)
+    relations = _inference_graph_relations(namespace)
+    if relations is not None:
+        _authorize_cache_read("list", gvk, namespace)
+        return _read_response(
+            "inferenceGraphs",
+            relations.select("inferencegraphs", {}),
+            True,
+            relations.resource_version("inferencegraphs"),
+        )
+
+    inference_graphs = coalescing.list_custom_rsrc(**gvk, namespace=namespace)
 
-    return api.success_response("inferenceGraphs", inference_graphs["items"])
+    return _read_response(
+        "inferenceGraphs",
+        inference_graphs["items"],
+        False,
+        inference_graphs.get("metadata", {}).get("resourceVersion"),
+    )
 
 
 @bp.route("/api/namespaces/<namespace>/inferencegraphs/<name>")
 def get_inference_graph(namespace, name):
     """Return an InferenceGraph CR as a json object."""
-    inference_graph = api.get_custom_rsrc(
-        **versions.inference_graph_gvk(), namespace=namespace, name=name
-    )
+    gvk = versions.inference_graph_gvk()
+    relations = _inference_graph_relations(namespace)
+    inference_graph = relations.get("inferencegraphs", name) if relations else None
+    if inference_graph is not None:
+        _authorize_cache_read("get", gvk, namespace)
+        return _read_response(
+            "inferenceGraph",
+            inference_graph,
+            True,
+            relations.resource_version("inferencegraphs"),
+        )
 
-    return api.success_response("inferenceGraph", inference_graph)
+    inference_graph = coalescing.get_custom_rsrc(**gvk, namespace=namespace, name=name)
+
+    return _read_response(
+        "inferenceGraph",
+        inference_graph,
+        False,
+        inference_graph["metadata"].get("resourceVersion"),
+    )
 
 
 @bp.route("/api/namespaces/<namespace>/inferencegraphs/<name>/events")
@@ -180,19 +338,16 @@ def get_inference_graph_events(namespace, name):
     """Return events for an InferenceGraph."""
     field_selector = api.events_field_selector("InferenceGraph", name)
 
-    events = api.events.list_events(namespace, field_selector).items
+    events = coalescing.list_events(namespace, field_selector)["items"]
 
-    return api.success_response(
-        "events",
-        api.serialize(events),
-    )
+    return api.success_response("events", events)
 
 
 # Standard mode endpoints
 @bp.route("/api/namespaces/<namespace>/deployments/<name>")
 def get_kubernetes_deployment(namespace, name):
     """Return a Kubernetes Deployment object as json."""
-    deployment = api.get_custom_rsrc(
+    deployment = coalescing.get_custom_rsrc(
         **versions.K8S_DEPLOYMENT, namespace=namespace, name=name
     )
     return api.success_response("deployment", deployment)
@@ -201,7 +356,7 @@ def get_kubernetes_deployment(namespace, name):
 @bp.route("/api/namespaces/<namespace>/services/<name>")
 def get_kubernetes_service(namespace, name):
     """Return a Kubernetes Service object as json."""
-    service = api.get_custom_rsrc(
+    service = coalescing.get_custom_rsrc(
         **versions.K8S_SERVICE, namespace=namespace, name=name
     )
     return api.success_response("service", service)
@@ -210,7 +365,7 @@ def get_kubernetes_service(namespace, name):
 @bp.route("/api/namespaces/<namespace>/hpas/<name>")
 def get_kubernetes_hpa(namespace, name):
     """Return a Kubernetes HPA object as json."""
-    hpa = api.get_custom_rsrc(**versions.K8S_HPA, namespace=namespace, name=name)
+    hpa = coalescing.get_custom_rsrc(**versions.K8S_HPA, namespace=namespace, name=name)
     return api.success_response("hpa", hpa)
 
 
@@ -220,7 +375,7 @@ def get_kubernetes_hpa(namespace, name):
 def get_standard_deployment_objects(namespace, name, component):
     """Return all Kubernetes native resources for a Standard component."""
 
-    inference_service = api.get_custom_rsrc(
+    inference_service = coalescing.get_custom_rsrc(
         **versions.inference_service_gvk(), namespace=namespace, name=name
     )
 
@@ -237,7 +392,7 @@ def get_standard_deployment_objects(namespace, name, component):
 def get_modelmesh_objects(namespace, name, component):
     """Return all ModelMesh-specific resources for a ModelMesh component."""
 
-    inference_service = api.get_custom_rsrc(
+    inference_service = coalescing.get_custom_rsrc(
         **versions.inference_service_gvk(), namespace=namespace, name=name
     )
 
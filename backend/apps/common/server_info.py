@@ -0,0 +1,127 @@
+"""Concurrent retrieval of the objects shown with an InferenceService."""
+
+from functools import partial
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from kubeflow.kubeflow.crud_backend import logging
+
+from . import coalescing, parallel, utils, versions
+
+log = logging.getLogger(__name__)
+
+# A part is an object of a component, e.g. ("predictor", "route"), or the
+# objects of a component as a whole, e.g. ("predictor", None).
+Part = Tuple[Optional[str], Optional[str]]
+
+
+def _knative_service_name(revision: str) -> str:
+    """Return the Knative Service of a revision, named {service}-{generation}."""
+    return revision.rsplit("-", 1)[0]
+
+
+def _serverless_parts(svc: Dict, component: str) -> Dict[Part, Callable]:
+    status = svc["status"]["components"][component]
+    revision = status.get(utils.LATEST_CREATED_REVISION)
+    if not revision:
+        return {}
+
+    namespace = svc["metadata"]["namespace"]
+    # The Configuration and Route of a Knative Service share its name, so
+    # they can be read together instead of following the owner references.
+    service_name = _knative_service_name(revision)
+    get = partial(coalescing.get_custom_rsrc, namespace=namespace)
+    return {
+        (component, "revision"): partial(
+            get, **versions.KNATIVE_REVISION, name=revision
+        ),
+        (component, "configuration"): partial(
+            get, **versions.KNATIVE_CONF, name=service_name
+        ),
+        (component, "knativeService"): partial(
+            get, **versions.KNATIVE_SERVICE, name=service_name
+        ),
+        (component, "route"): partial(get, **versions.KNATIVE_ROUTE, name=service_name),
+    }
+
+
+def _component_parts(svc: Dict, component: str) -> Dict[Part, Callable]:
+    deployment_mode = utils.get_deployment_mode(svc)
+    if deployment_mode == "ModelMesh":
+        return {(component, None): partial(utils.get_modelmesh_objects, svc, component)}
+    if deployment_mode == "Standard":
+        return {
+            (component, None): partial(
+                utils.get_standard_deployment_objects, svc, component
+            )
+        }
+    return _serverless_parts(svc, component)
+
+
+def _part_name(part: Part) -> str:
+    return ".".join(name for name in part if name)
+
+
+def _part_error(e: Exception) -> Dict[str, Any]:
+    """Return the status and message of an ApiException or HTTPException."""
+    return {
+        "status": getattr(e, "status", None) or getattr(e, "code", None) or 500,
+        "message": getattr(e, "reason", None)
+        or getattr(e, "description", None)
+        or str(e),
+    }
+
+
+def get_server_info(svc: Dict) -> Dict[str, Any]:
+    """
+    Return an InferenceService with its owned objects and events.
+
+    The owned objects of every component in the status of the
+    InferenceService and its events are fetched concurrently.
+
+    Args:
+        svc: The InferenceService, with its deploymentMode
+
+    Returns:
+        The InferenceService, its ownedObjects by component, its events and
+        the errors of the parts that could not be read
+    """
+    namespace = svc["metadata"]["namespace"]
+    components = svc.get("status", {}).get("components", {})
+
+    parts: Dict[Part, Callable] = {
+        (None, "events"): partial(
+            utils.get_inference_service_events, namespace, svc["metadata"]["name"]
+        )
+    }
+    for component in utils.INFERENCE_SERVICE_COMPONENTS:
+        if component in components:
+            parts.update(_component_parts(svc, component))
+
+    results = parallel.read_concurrently(parts)
+
+    owned_objects = {
+        component: {}
+        for component in utils.INFERENCE_SERVICE_COMPONENTS
+        if component in components
+    }
+    server_info = {
+        "inferenceService": svc,
+        "ownedObjects": owned_objects,
+        "events": [],
+        "errors": {},
+    }
+    for (component, name), (result, error) in results.items():
+        if error is not None:
+            log.warning(f"Could not read {_part_name((component, name))}: {error}")
+            server_info["errors"][_part_name((component, name))] = _part_error(error)
+            if component is not None and name is not None:
+                owned_objects[component][name] = None
+            continue
+
+        if component is None:
+            server_info[name] = result
+        elif name is None:
+            owned_objects[component].update(result)
+        else:
+            owned_objects[component][name] = result
+    return server_info
@@ -0,0 +1,196 @@
+"""Unit tests for the server info of an InferenceService.
+
+Run directly with:
+    python3 backend/apps/common/server_info_test.py
+"""
+
+import importlib.util
+import logging as python_logging
+from pathlib import Path
+import sys
+import threading
+import types
+import unittest
+from unittest.mock import Mock
+
+
+def _load_server_info_module():
+    """Load server_info.py with lightweight stubs for external dependencies."""
+    module_names = (
+        "backend",
+        "backend.apps",
+        "backend.apps.common",
+        "backend.apps.common.coalescing",
+        "backend.apps.common.parallel",
+        "backend.apps.common.utils",
+        "backend.apps.common.versions",
+        "flask",
+        "kubeflow",
+        "kubeflow.kubeflow",
+        "kubeflow.kubeflow.crud_backend",
+    )
+    original_modules = {name: sys.modules.get(name) for name in module_names}
+
+    backend = types.ModuleType("backend")
+    apps = types.ModuleType("backend.apps")
+    common = types.ModuleType("backend.apps.common")
+    coalescing = types.ModuleType("backend.apps.common.coalescing")
+    utils = types.ModuleType("backend.apps.common.utils")
+    versions = types.ModuleType("backend.apps.common.versions")
+    flask = types.ModuleType("flask")
+    kubeflow = types.ModuleType("kubeflow")
+    kubeflow_kubeflow = types.ModuleType("kubeflow.kubeflow")
+    crud_backend = types.ModuleType("kubeflow.kubeflow.crud_backend")
+
+    backend.__path__ = []
+    apps.__path__ = []
+    common.__path__ = [str(Path(__file__).parent)]
+    coalescing.get_custom_rsrc = Mock()
+    utils.INFERENCE_SERVICE_COMPONENTS = ["predictor", "transformer", "explainer"]
+    utils.LATEST_CREATED_REVISION = "latestCreatedRevision"
+    utils.get_deployment_mode = Mock(return_value="Serverless")
+    utils.get_inference_service_events = Mock(return_value=[])
+    utils.get_standard_deployment_objects = Mock()
+    utils.get_modelmesh_objects = Mock()
+    for name, kind in (
+        ("KNATIVE_REVISION", "revisions"),
+        ("KNATIVE_CONF", "configurations"),
+        ("KNATIVE_SERVICE", "services"),
+        ("KNATIVE_ROUTE", "routes"),
+    ):
+        setattr(
+            versions,
+            name,
+            {"group": "serving.knative.dev", "version": "v1", "kind": kind},
+        )
+    flask.copy_current_request_context = lambda f: f
+    crud_backend.logging = types.SimpleNamespace(
+        getLogger=lambda name: python_logging.getLogger(name)
+    )
+
+    try:
+        sys.modules["backend"] = backend
+        sys.modules["backend.apps"] = apps
+        sys.modules["backend.apps.common"] = common
+        sys.modules["backend.apps.common.coalescing"] = coalescing
+        sys.modules["backend.apps.common.utils"] = utils
+        sys.modules["backend.apps.common.versions"] = versions
+        sys.modules["flask"] = flask
+        sys.modules["kubeflow"] = kubeflow
+        sys.modules["kubeflow.kubeflow"] = kubeflow_kubeflow
+        sys.modules["kubeflow.kubeflow.crud_backend"] = crud_backend
+
+        module_path = Path(__file__).with_name("server_info.py")
+        spec = importlib.util.spec_from_file_location(
+            "backend.apps.common.server_info_under_test", module_path
+        )
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+        return module
+    finally:
+        for name, original_module in original_modules.items():
+            if original_module is None:
+                sys.modules.pop(name, None)
+            else:
+                sys.modules[name] = original_module
+
+
+server_info = _load_server_info_module()
+
+
+class ApiException(Exception):
+    def __init__(self, status, reason):
+        super().__init__(reason)
+        self.status = status
+        self.reason = reason
+
+
+def _isvc(**components):
+    return {
+        "metadata": {"namespace": "ns", "name": "model"},
+        "status": {"components": components},
+    }
+
+
+class ServerInfoTest(unittest.TestCase):
+    def setUp(self):
+        server_info.utils.get_deployment_mode.return_value = "Serverless"
+        server_info.utils.get_inference_service_events.reset_mock(
+            return_value=True, side_effect=True
+        )
+        server_info.utils.get_inference_service_events.return_value = []
+        self.get_object = server_info.coalescing.get_custom_rsrc
+        self.get_object.reset_mock(return_value=True, side_effect=True)
+
+    def test_knative_objects_are_read_concurrently(self):
+        barrier = threading.Barrier(4, timeout=5)
+
+        def get_object(group, version, kind, namespace, name):
+            barrier.wait()
+            if kind == "routes":
+                raise ApiException(404, "Not Found")
+            return {"kind": kind, "name": name}
+
+        self.get_object.side_effect = get_object
+        server_info.utils.get_inference_service_events.return_value = ["event"]
+
+        info = server_info.get_server_info(
+            _isvc(predictor={"latestCreatedRevision": "model-predictor-00002"})
+        )
+
+        self.assertEqual(
+            info["ownedObjects"],
+            {
+                "predictor": {
+                    "revision": {
+                        "kind": "revisions",
+                        "name": "model-predictor-00002",
+                    },
+                    "configuration": {
+                        "kind": "configurations",
+                        "name": "model-predictor",
+                    },
+                    "knativeService": {"kind": "services", "name": "model-predictor"},
+                    "route": None,
+                }
+            },
+        )
+        self.assertEqual(info["events"], ["event"])
+        self.assertEqual(
+            info["errors"],
+            {"predictor.route": {"status": 404, "message": "Not Found"}},
+        )
+
+    def test_component_without_revision_has_no_objects(self):
+        info = server_info.get_server_info(_isvc(predictor={}))
+
+        self.get_object.assert_not_called()
+        self.assertEqual(info["ownedObjects"], {"predictor": {}})
+        self.assertEqual(info["errors"], {})
+
+    def test_standard_objects_and_events_errors_are_reported_by_part(self):
+        server_info.utils.get_deployment_mode.return_value = "Standard"
+        server_info.utils.get_standard_deployment_objects.side_effect = (
+            lambda svc, component: {"deployment": component, "hpa": None}
+        )
+        server_info.utils.get_inference_service_events.side_effect = RuntimeError(
+            "forbidden"
+        )
+
+        info = server_info.get_server_info(_isvc(predictor={}, transformer={}))
+
+        self.assertEqual(
+            info["ownedObjects"],
+            {
+                "predictor": {"deployment": "predictor", "hpa": None},
+                "transformer": {"deployment": "transformer", "hpa": None},
+            },
+        )
+        self.assertEqual(info["events"], [])
+        self.assertEqual(
+            info["errors"], {"events": {"status": 500, "message": "forbidden"}}
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
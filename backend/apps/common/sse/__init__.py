@@ -1,9 +1,41 @@
 """Server-Sent Events (SSE) module for real-time updates."""
 
-from .manager import SSEConnectionManager
+from . import fanout, hub
+from .manager import DEFAULT_RELEASE_DELAY_SECONDS, SSEConnectionManager
+from .watchers import InferenceServiceWatcher
+
+sse_manager = SSEConnectionManager(release_delay=DEFAULT_RELEASE_DELAY_SECONDS)
+
+# Source of the namespace watches and the hub sharing them between the
+# workers of a pod, set by configure_namespace_watches.
+namespace_watch_source = None
+watch_hub = None
+
+
+def configure_namespace_watches(app):
+    """
+    Configure how namespace watches are shared.
+
+    SSE_FANOUT_REDIS_URL shares a single Kubernetes watch per namespace between
+    the replicas, SSE_WATCH_HUB_SOCKET between the workers of a pod.
+    """
+    global namespace_watch_source, watch_hub
+
+    def kubernetes_source(
+        namespace, callback, resource_version=None, known_objects=None
+    ):
+        watcher = InferenceServiceWatcher(app=app)
+        return watcher.watch_namespace(
+            namespace, callback, resource_version, known_objects
+        )
+
+    fanout_source = fanout.from_environment(kubernetes_source)
+    namespace_watch_source = (
+        fanout_source.watch_namespace if fanout_source else kubernetes_source
+    )
+    watch_hub = hub.from_environment(namespace_watch_source)
 
-sse_manager = SSEConnectionManager()
 
 from .routes import bp as sse_bp
 
-__all__ = ["sse_bp", "sse_manager"]
+__all__ = ["configure_namespace_watches", "sse_bp", "sse_manager"]
@@ -0,0 +1,118 @@
+"""Coalescing per-client buffers for SSE streams."""
+
+from collections import OrderedDict
+import itertools
+import json
+import threading
+import time
+from queue import Empty
+from typing import Any, Dict, Hashable, Optional
+
+DEFAULT_MAX_BYTES = 8 * 1024 * 1024
+
+RESYNC_FRAME = f"data: {json.dumps({'type': 'RESYNC'})}\n\n".encode()
+
+
+class CoalescingBuffer:
+    """
+    Buffer of pending SSE frames for a single client.
+
+    Frames are keyed by object identity and only the latest pending frame of
+    each object is kept, so a lagging client converges to the current state
+    instead of replaying every intermediate one. When the pending frames
+    exceed the byte budget the buffer is cleared and a RESYNC frame tells the
+    client to reload a fresh snapshot.
+    """
+
+    def __init__(self, max_bytes: int = DEFAULT_MAX_BYTES):
+        """
+        Initialize the buffer.
+
+        Args:
+            max_bytes: Byte budget for the pending frames
+        """
+        self._max_bytes = max_bytes
+        self._frames: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._pending_bytes = 0
+        self._unkeyed = itertools.count()
+        self._condition = threading.Condition()
+        self._delivered = 0
+        self._coalesced = 0
+        self._resyncs = 0
+
+    def put(self, frame: bytes, key: Optional[Hashable] = None, reset: bool = False):
+        """
+        Add a frame, replacing the pending frame of the same object.
+
+        Args:
+            frame: The encoded SSE frame
+            key: Identity of the object the frame describes, None if unique
+            reset: Whether the frame supersedes every pending frame (snapshots)
+        """
+        with self._condition:
+            if reset:
+                self._clear()
+
+            if key is None:
+                key = ("unkeyed", next(self._unkeyed))
+
+            previous = self._frames.get(key)
+            if previous is not None:
+                self._pending_bytes -= len(previous[0])
+                self._coalesced += 1
+                self._frames[key] = (frame, previous[1])
+            else:
+                self._frames[key] = (frame, time.monotonic())
+            self._pending_bytes += len(frame)
+
+            if self._pending_bytes > self._max_bytes and len(self._frames) > 1:
+                self._clear()
+                self._resyncs += 1
+                self._frames["resync"] = (RESYNC_FRAME, time.monotonic())
+                self._pending_bytes = len(RESYNC_FRAME)
+
+            self._condition.notify()
+
+    def put_nowait(self, frame: bytes):
+        """Add a frame that does not describe a single object."""
+        self.put(frame)
+
+    def get(self, timeout: Optional[float] = None) -> bytes:
+        """
+        Remove and return the oldest pending frame.
+
+        Args:
+            timeout: Seconds to wait for a frame
+
+        Raises:
+            queue.Empty: If no frame arrived within the timeout
+        """
+        with self._condition:
+            if not self._condition.wait_for(lambda: self._frames, timeout):
+                raise Empty
+
+            _, (frame, _) = self._frames.popitem(last=False)
+            self._pending_bytes -= len(frame)
+            self._delivered += 1
+            return frame
+
+    def get_nowait(self) -> bytes:
+        """Remove and return the oldest pending frame without waiting."""
+        return self.get(timeout=0)
+
+    def stats(self) -> Dict[str, Any]:
+        """Return the lag and coalesce counters of the client."""
+        with self._condition:
+            oldest = next(iter(self._frames.values()), None)
+            return {
+                "pendingFrames": len(self._frames),
+                "pendingBytes": self._pending_bytes,
+                "lagSeconds": time.monotonic() - oldest[1] if oldest else 0.0,
+                "delivered": self._delivered,
+                "coalesced": self._coalesced,
+                "resyncs": self._resyncs,
+            }
+
+    def _clear(self):
+        self._frames.clear()
+        self._pending_bytes = 0
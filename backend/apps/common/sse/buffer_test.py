@@ -0,0 +1,98 @@
+"""Unit tests for the coalescing SSE client buffer.
+
+Run directly with:
+    python3 backend/apps/common/sse/buffer_test.py
+"""
+
+import importlib.util
+import json
+from pathlib import Path
+from queue import Empty
+import unittest
+
+
+def _load_buffer_module():
+    """Load buffer.py, which has no external dependencies."""
+    module_path = Path(__file__).with_name("buffer.py")
+    spec = importlib.util.spec_from_file_location("sse_buffer_under_test", module_path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+buffer_module = _load_buffer_module()
+CoalescingBuffer = buffer_module.CoalescingBuffer
+
+
+def _frame(event_type, name, generation=0):
+    event_data = {
+        "type": event_type,
+        "object": {"metadata": {"name": name}, "generation": generation},
+    }
+    return f"data: {json.dumps(event_data)}\n\n".encode()
+
+
+class CoalescingBufferTest(unittest.TestCase):
+    def test_keeps_only_latest_pending_frame_per_object(self):
+        client_buffer = CoalescingBuffer()
+
+        client_buffer.put(_frame("MODIFIED", "model-a", 1), key="model-a")
+        client_buffer.put(_frame("MODIFIED", "model-b", 1), key="model-b")
+        client_buffer.put(_frame("MODIFIED", "model-a", 2), key="model-a")
+
+        self.assertEqual(client_buffer.get_nowait(), _frame("MODIFIED", "model-a", 2))
+        self.assertEqual(client_buffer.get_nowait(), _frame("MODIFIED", "model-b", 1))
+        self.assertEqual(client_buffer.stats()["coalesced"], 1)
+        self.assertEqual(client_buffer.stats()["delivered"], 2)
+
+    def test_unkeyed_frames_are_never_coalesced(self):
+        client_buffer = CoalescingBuffer()
+
+        client_buffer.put(b"data: first\n\n")
+        client_buffer.put_nowait(b"data: second\n\n")
+
+        self.assertEqual(client_buffer.get_nowait(), b"data: first\n\n")
+        self.assertEqual(client_buffer.get_nowait(), b"data: second\n\n")
+
+    def test_snapshot_supersedes_pending_frames(self):
+        client_buffer = CoalescingBuffer()
+
+        client_buffer.put(_frame("MODIFIED", "model-a"), key="model-a")
+        client_buffer.put(b"data: snapshot\n\n", reset=True)
+
+        self.assertEqual(client_buffer.get_nowait(), b"data: snapshot\n\n")
+        with self.assertRaises(Empty):
+            client_buffer.get_nowait()
+
+    def test_exceeding_byte_budget_replaces_pending_frames_with_resync(self):
+        frame = _frame("MODIFIED", "model-0")
+        client_buffer = CoalescingBuffer(max_bytes=len(frame) * 3)
+
+        for index in range(4):
+            client_buffer.put(_frame("MODIFIED", f"model-{index}"), key=index)
+
+        self.assertEqual(
+            json.loads(client_buffer.get_nowait().removeprefix(b"data: ")),
+            {"type": "RESYNC"},
+        )
+        self.assertEqual(client_buffer.stats()["resyncs"], 1)
+        self.assertEqual(client_buffer.stats()["pendingBytes"], 0)
+
+    def test_get_raises_empty_after_timeout(self):
+        with self.assertRaises(Empty):
+            CoalescingBuffer().get(timeout=0.01)
+
+    def test_stats_report_pending_lag(self):
+        client_buffer = CoalescingBuffer()
+        frame = _frame("ADDED", "model-a")
+
+        client_buffer.put(frame, key="model-a")
+
+        stats = client_buffer.stats()
+        self.assertEqual(stats["pendingFrames"], 1)
+        self.assertEqual(stats["pendingBytes"], len(frame))
+        self.assertGreaterEqual(stats["lagSeconds"], 0.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
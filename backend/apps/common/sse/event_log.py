@@ -0,0 +1,265 @@
+"""Shared, sequenced event logs for resumable SSE streams."""
+
+from collections import deque
+import itertools
+import threading
+import uuid
+from queue import Empty
+from typing import Any, Callable, Deque, Dict, Hashable, List, Optional, Tuple
+
+DEFAULT_MAX_EVENTS = 1024
+DEFAULT_MAX_BYTES = 16 * 1024 * 1024
+
+# (sequence, object key, encoded frame)
+Entry = Tuple[int, Optional[Hashable], bytes]
+
+
+class EventLog:
+    """
+    Bounded ring buffer of sequenced SSE frames shared by the clients of a watch.
+
+    Every frame carries an SSE ``id:`` of the form ``<epoch>-<sequence>``. The
+    epoch changes whenever a log is created, so ids handed out by a previous
+    watch (or another worker) are never mistaken for positions in this one.
+    """
+
+    def __init__(
+        self, max_events: int = DEFAULT_MAX_EVENTS, max_bytes: int = DEFAULT_MAX_BYTES
+    ):
+        """
+        Initialize the log.
+
+        Args:
+            max_events: Maximum number of retained events
+            max_bytes: Maximum number of retained bytes
+        """
+        self.epoch = uuid.uuid4().hex[:12]
+        self._max_events = max_events
+        self._max_bytes = max_bytes
+        self._entries: Deque[Entry] = deque()
+        self._bytes = 0
+        self._head = 0
+        # Cursors positioned before this sequence can no longer be resumed.
+        self._first = 1
+        self._closed = False
+        self._condition = threading.Condition()
+
+    def event_id(self, sequence: int) -> str:
+        """Return the SSE event id of a sequence number."""
+        return f"{self.epoch}-{sequence}"
+
+    def frame(self, sequence: int, body: bytes) -> bytes:
+        """Prefix an encoded ``data:`` frame with the id of a sequence number."""
+        return b"id: " + self.event_id(sequence).encode() + b"\n" + body
+
+    def append(self, body: bytes, key: Optional[Hashable] = None) -> int:
+        """
+        Append an encoded frame and wake up waiting cursors.
+
+        Args:
+            body: The encoded ``data:`` frame
+            key: Identity of the object the frame describes, None if unique
+
+        Returns:
+            The sequence number of the event
+        """
+        with self._condition:
+            self._head += 1
+            frame = self.frame(self._head, body)
+            self._entries.append((self._head, key, frame))
+            self._bytes += len(frame)
+
+            while len(self._entries) > 1 and (
+                len(self._entries) > self._max_events or self._bytes > self._max_bytes
+            ):
+                sequence, _, evicted = self._entries.popleft()
+                self._bytes -= len(evicted)
+                self._first = sequence + 1
+
+            self._condition.notify_all()
+            return self._head
+
+    def reset(self) -> int:
+        """
+        Start over from a new snapshot.
+
+        Every retained event is superseded, so cursors behind the returned
+        sequence have to reload the snapshot.
+
+        Returns:
+            The sequence number of the snapshot
+        """
+        with self._condition:
+            self._head += 1
+            self._entries.clear()
+            self._bytes = 0
+            self._first = self._head + 1
+            self._condition.notify_all()
+            return self._head
+
+    def close(self):
+        """Wake up waiting cursors, no more events will be appended."""
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+
+    def position_for(self, last_event_id: Optional[str]) -> Optional[int]:
+        """
+        Return the resumable position of a client's Last-Event-ID.
+
+        Returns:
+            The sequence to resume after, or None if the client needs a snapshot
+        """
+        epoch, _, sequence = (last_event_id or "").strip().rpartition("-")
+        if epoch != self.epoch or not sequence.isdigit():
+            return None
+
+        with self._condition:
+            sequence = int(sequence)
+            if self._first - 1 <= sequence <= self._head:
+                return sequence
+            return None
+
+    def oldest_position(self) -> int:
+        """Return the oldest position cursors can still resume after."""
+        with self._condition:
+            return self._first - 1
+
+    def read(self, position: int, timeout: Optional[float] = None) -> List[Entry]:
+        """
+        Return the retained events after a position, waiting for new ones.
+
+        Args:
+            position: The last sequence the cursor has seen
+            timeout: Seconds to wait for new events
+
+        Returns:
+            The events after the position, empty if the cursor fell out of the log
+
+        Raises:
+            queue.Empty: If no event arrived within the timeout or the log closed
+        """
+        with self._condition:
+            if not self._condition.wait_for(
+                lambda: self._head > position or self._closed, timeout
+            ):
+                raise Empty
+
+            if self._closed:
+                raise Empty
+
+            if position < self._first - 1:
+                return []
+
+            offset = max(position + 1 - self._entries[0][0], 0)
+            return list(itertools.islice(self._entries, offset, None))
+
+    def stats(self) -> Dict[str, Any]:
+        """Return the size of the log."""
+        with self._condition:
+            return {
+                "epoch": self.epoch,
+                "headSequence": self._head,
+                "retainedEvents": len(self._entries),
+                "retainedBytes": self._bytes,
+            }
+
+
+class EventCursor:
+    """
+    A client's position in a shared event log.
+
+    The cursor only holds references to frames owned by the log. When it
+    catches up after falling behind, superseded frames of the same object are
+    skipped, and when it has fallen out of the log it reloads the snapshot.
+    """
+
+    def __init__(self, last_event_id: Optional[str] = None):
+        """
+        Initialize the cursor.
+
+        Args:
+            last_event_id: The Last-Event-ID sent by a reconnecting client
+        """
+        self._last_event_id = last_event_id
+        self._event_log: Optional[EventLog] = None
+        self._snapshot: Optional[Callable] = None
+        self._position: Optional[int] = None
+        self._pending: Deque[bytes] = deque()
+        self._resumed = False
+        self._delivered = 0
+        self._coalesced = 0
+        self._snapshots = 0
+
+    def attach(
+        self,
+        event_log: EventLog,
+        snapshot: Callable[[], Optional[Tuple[bytes, int]]],
+        has_snapshot: bool = True,
+    ):
+        """
+        Attach the cursor to the log of a watch.
+
+        Args:
+            event_log: The shared log of the watch
+            snapshot: Returns the encoded snapshot frame and its sequence
+            has_snapshot: Whether the watch already has a snapshot to replay
+        """
+        self._event_log = event_log
+        self._snapshot = snapshot
+        self._position = event_log.position_for(self._last_event_id)
+        self._resumed = self._position is not None
+        if self._position is None and not has_snapshot:
+            self._position = event_log.oldest_position()
+
+    def get(self, timeout: Optional[float] = None) -> bytes:
+        """
+        Return the next frame for the client.
+
+        Args:
+            timeout: Seconds to wait for a frame
+
+        Raises:
+            queue.Empty: If no frame arrived within the timeout
+        """
+        while not self._pending:
+            if self._position is None:
+                replay = self._snapshot()
+                if replay is not None:
+                    frame, self._position = replay
+                    self._snapshots += 1
+                    self._delivered += 1
+                    return frame
+                # No snapshot yet, follow the log until the watch sends one.
+                self._position = self._event_log.oldest_position()
+
+            entries = self._event_log.read(self._position, timeout)
+            if not entries:
+                self._position = None
+                continue
+
+            latest: Dict[Hashable, bytes] = {}
+            for sequence, key, frame in entries:
+                key = ("sequence", sequence) if key is None else key
+                latest.pop(key, None)
+                latest[key] = frame
+
+            self._coalesced += len(entries) - len(latest)
+            self._position = entries[-1][0]
+            self._pending.extend(latest.values())
+
+        self._delivered += 1
+        return self._pending.popleft()
+
+    def stats(self) -> Dict[str, Any]:
+        """Return the lag and coalesce counters of the client."""
+        head = self._event_log.stats()["headSequence"] if self._event_log else 0
+        return {
+            "position": self._position,
+            "lagEvents": head - self._position if self._position is not None else 0,
+            "pendingFrames": len(self._pending),
+            "resumed": self._resumed,
+            "delivered": self._delivered,
+            "coalesced": self._coalesced,
+            "snapshots": self._snapshots,
+        }
@@ -0,0 +1,132 @@
+"""Unit tests for the shared SSE event log and its cursors.
+
+Run directly with:
+    python3 backend/apps/common/sse/event_log_test.py
+"""
+
+import importlib.util
+from pathlib import Path
+from queue import Empty
+import unittest
+
+
+def _load_event_log_module():
+    """Load event_log.py, which has no external dependencies."""
+    module_path = Path(__file__).with_name("event_log.py")
+    spec = importlib.util.spec_from_file_location(
+        "sse_event_log_under_test", module_path
+    )
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+event_log_module = _load_event_log_module()
+EventLog = event_log_module.EventLog
+EventCursor = event_log_module.EventCursor
+
+
+def _snapshot(event_log, sequence):
+    return lambda: (event_log.frame(sequence, b"data: snapshot\n\n"), sequence)
+
+
+class EventLogTest(unittest.TestCase):
+    def test_frames_carry_epoch_and_sequence_ids(self):
+        event_log = EventLog()
+
+        sequence = event_log.append(b"data: first\n\n")
+
+        self.assertEqual(sequence, 1)
+        self.assertEqual(
+            event_log.read(0, timeout=0),
+            [(1, None, f"id: {event_log.epoch}-1\n".encode() + b"data: first\n\n")],
+        )
+
+    def test_position_for_accepts_only_retained_ids_of_the_same_epoch(self):
+        event_log = EventLog(max_events=2)
+        for index in range(4):
+            event_log.append(f"data: {index}\n\n".encode())
+
+        self.assertEqual(event_log.position_for(event_log.event_id(3)), 3)
+        self.assertEqual(event_log.position_for(event_log.event_id(2)), 2)
+        self.assertIsNone(event_log.position_for(event_log.event_id(1)))
+        self.assertIsNone(event_log.position_for("other-epoch-3"))
+        self.assertIsNone(event_log.position_for(None))
+
+    def test_reset_makes_previous_positions_fall_out(self):
+        event_log = EventLog()
+        event_log.append(b"data: first\n\n")
+
+        sequence = event_log.reset()
+
+        self.assertEqual(event_log.read(1, timeout=0), [])
+        self.assertEqual(event_log.position_for(event_log.event_id(sequence)), 2)
+
+    def test_byte_budget_evicts_oldest_events(self):
+        event_log = EventLog(max_bytes=100)
+        for index in range(10):
+            event_log.append(f"data: {index:040d}\n\n".encode())
+
+        self.assertLessEqual(event_log.stats()["retainedBytes"], 100)
+        self.assertEqual(event_log.read(0, timeout=0), [])
+
+    def test_read_raises_empty_after_timeout(self):
+        with self.assertRaises(Empty):
+            EventLog().read(0, timeout=0.01)
+
+
+class EventCursorTest(unittest.TestCase):
+    def test_new_cursor_starts_from_snapshot_then_follows_log(self):
+        event_log = EventLog()
+        sequence = event_log.reset()
+        cursor = EventCursor()
+        cursor.attach(event_log, _snapshot(event_log, sequence))
+
+        event_log.append(b"data: next\n\n")
+
+        self.assertTrue(cursor.get(timeout=0).endswith(b"data: snapshot\n\n"))
+        self.assertTrue(cursor.get(timeout=0).endswith(b"data: next\n\n"))
+        self.assertEqual(cursor.stats()["snapshots"], 1)
+
+    def test_resumed_cursor_only_receives_missed_events(self):
+        event_log = EventLog()
+        sequence = event_log.reset()
+        event_log.append(b"data: seen\n\n")
+        event_log.append(b"data: missed\n\n")
+        cursor = EventCursor(event_log.event_id(sequence + 1))
+        cursor.attach(event_log, _snapshot(event_log, sequence))
+
+        self.assertTrue(cursor.get(timeout=0).endswith(b"data: missed\n\n"))
+        self.assertEqual(cursor.stats()["snapshots"], 0)
+        self.assertTrue(cursor.stats()["resumed"])
+
+    def test_cursor_out_of_log_reloads_snapshot(self):
+        event_log = EventLog(max_events=1)
+        sequence = event_log.reset()
+        cursor = EventCursor(event_log.event_id(sequence))
+        cursor.attach(event_log, lambda: (b"data: snapshot\n\n", sequence + 2))
+
+        event_log.append(b"data: first\n\n")
+        event_log.append(b"data: second\n\n")
+
+        self.assertEqual(cursor.get(timeout=0), b"data: snapshot\n\n")
+        self.assertEqual(cursor.stats()["snapshots"], 1)
+        self.assertEqual(cursor.stats()["lagEvents"], 0)
+
+    def test_lagging_cursor_skips_superseded_frames_of_an_object(self):
+        event_log = EventLog()
+        cursor = EventCursor()
+        cursor.attach(event_log, lambda: None, has_snapshot=False)
+
+        event_log.append(b"data: a1\n\n", key="model-a")
+        event_log.append(b"data: b1\n\n", key="model-b")
+        event_log.append(b"data: a2\n\n", key="model-a")
+
+        self.assertTrue(cursor.get(timeout=0).endswith(b"data: b1\n\n"))
+        self.assertTrue(cursor.get(timeout=0).endswith(b"data: a2\n\n"))
+        self.assertEqual(cursor.stats()["coalesced"], 1)
+        self.assertEqual(cursor.stats()["lagEvents"], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,855 @@
+"""Cross-replica fan-out of namespace watches through a pub/sub backend."""
+
+from contextlib import suppress
+import json
+import os
+import queue
+import socket
+import threading
+import time
+import uuid
+from typing import Any, Callable, Dict, List, Optional
+from urllib.parse import urlparse
+
+from kubeflow.kubeflow.crud_backend import logging
+
+log = logging.getLogger(__name__)
+
+KEY_PREFIX = "models-web-app:sse:inferenceservices"
+DEFAULT_LEASE_SECONDS = 15
+RETRY_SECONDS = 1
+# The leader refreshes the state of its namespace with its lease. The state
+# expires when no replica leads the namespace for this many lease periods.
+STATE_TTL_LEASES = 4
+# Objects written to the backend at once when a snapshot is published, so
+# that a large namespace does not block the backend in a single call.
+STATE_CHUNK_OBJECTS = 100
+
+# Stored next to the objects of a namespace: the sequence and resourceVersion
+# of the last published event.
+META_FIELD = "meta"
+OBJECT_FIELD_PREFIX = "object:"
+
+
+class SubscriptionClosed(Exception):
+    """The connection of a subscription to the pub/sub backend was lost."""
+
+
+class InProcessPubSub:
+    """
+    Pub/sub backend shared by the replicas of a single process.
+
+    Stand-in for the Redis backend in development and tests.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._leases: Dict[str, tuple] = {}
+        self._states: Dict[str, Dict[str, bytes]] = {}
+        self._state_expiries: Dict[str, float] = {}
+        self._subscribers: Dict[str, List["_QueueSubscription"]] = {}
+
+    def acquire_lease(
+        self,
+        key: str,
+        owner: str,
+        ttl_ms: int,
+        state_key: Optional[str] = None,
+        state_ttl_ms: int = 0,
+    ) -> bool:
+        """
+        Take or renew the lease of a key, unless another owner holds it.
+
+        Args:
+            key: Key of the lease
+            owner: The replica taking the lease
+            ttl_ms: Time after which the lease expires
+            state_key: Key of a state whose expiry is renewed with the lease
+            state_ttl_ms: Time after which the state expires
+        """
+        now = time.monotonic()
+        with self._lock:
+            holder, expires = self._leases.get(key, (None, 0))
+            if holder not in (None, owner) and expires > now:
+                return False
+            self._leases[key] = (owner, now + ttl_ms / 1000)
+            if state_key and state_ttl_ms:
+                self._expire_state(state_key, state_ttl_ms)
+            return True
+
+    def release_lease(self, key: str, owner: str):
+        """Release the lease of a key if the owner still holds it."""
+        with self._lock:
+            if self._leases.get(key, (None,))[0] == owner:
+                del self._leases[key]
+
+    def stage(
+        self,
+        lease_key: str,
+        owner: str,
+        state_key: str,
+        fields: Dict[str, bytes],
+        reset: bool = False,
+        state_ttl_ms: int = 0,
+    ) -> bool:
+        """
+        Add fields to the staged state of a key, if the owner holds the lease.
+
+        The staged state replaces the state with the next staged publish.
+
+        Args:
+            lease_key: Key of the lease that fences the publisher
+            owner: The publishing replica
+            state_key: Key of the state the fields are staged for
+            fields: Fields to set
+            reset: Whether to clear the staged state first
+            state_ttl_ms: Time after which the staged state expires, 0 for never
+
+        Returns:
+            Whether the fields were staged
+        """
+        staging_key = _staging_key(state_key)
+        with self._lock:
+            if not self._holds(lease_key, owner):
+                return False
+            staged = {} if reset else self._read_state(staging_key)
+            staged.update(fields)
+            self._states[staging_key] = staged
+            if state_ttl_ms:
+                self._expire_state(staging_key, state_ttl_ms)
+            return True
+
+    def publish(
+        self,
+        lease_key: str,
+        owner: str,
+        channel: str,
+        message: bytes,
+        state_key: str,
+        state: Dict[str, Optional[bytes]],
+        staged: bool = False,
+        state_ttl_ms: int = 0,
+    ) -> bool:
+        """
+        Update the state and publish a message, if the owner holds the lease.
+
+        Args:
+            lease_key: Key of the lease that fences the publisher
+            owner: The publishing replica
+            channel: The channel to publish to
+            message: The encoded message
+            state_key: Key of the state updated with the message
+            state: Fields to set, or to delete when the value is None
+            staged: Whether to replace the state with the staged state first
+            state_ttl_ms: Time after which the state expires, 0 for never
+
+        Returns:
+            Whether the message was published
+        """
+        with self._lock:
+            if not self._holds(lease_key, owner):
+                return False
+
+            if staged:
+                fields = self._read_state(_staging_key(state_key))
+                self._states.pop(_staging_key(state_key), None)
+                self._state_expiries.pop(_staging_key(state_key), None)
+            else:
+                fields = self._read_state(state_key)
+            for field, value in state.items():
+                if value is None:
+                    fields.pop(field, None)
+                else:
+                    fields[field] = value
+            self._states[state_key] = fields
+            if state_ttl_ms:
+                self._expire_state(state_key, state_ttl_ms)
+
+            for subscription in self._subscribers.get(channel, []):
+                subscription.messages.put(message)
+            return True
+
+    def read_state(self, state_key: str) -> Dict[str, bytes]:
+        """Return the fields of a state key."""
+        with self._lock:
+            return dict(self._read_state(state_key))
+
+    def _holds(self, lease_key: str, owner: str) -> bool:
+        holder, expires = self._leases.get(lease_key, (None, 0))
+        return holder == owner and expires > time.monotonic()
+
+    def _read_state(self, state_key: str) -> Dict[str, bytes]:
+        """Return the fields of a state key, dropping it once expired (lock held)."""
+        expires = self._state_expiries.get(state_key)
+        if expires is not None and expires <= time.monotonic():
+            self._states.pop(state_key, None)
+            del self._state_expiries[state_key]
+        return self._states.get(state_key, {})
+
+    def _expire_state(self, state_key: str, ttl_ms: int):
+        if state_key in self._states:
+            self._state_expiries[state_key] = time.monotonic() + ttl_ms / 1000
+
+    def subscribe(self, channel: str) -> "_QueueSubscription":
+        """Subscribe to the messages published to a channel."""
+        subscription = _QueueSubscription(
+            lambda: self._unsubscribe(channel, subscription)
+        )
+        with self._lock:
+            self._subscribers.setdefault(channel, []).append(subscription)
+        return subscription
+
+    def _unsubscribe(self, channel: str, subscription: "_QueueSubscription"):
+        with self._lock:
+            subscribers = self._subscribers.get(channel, [])
+            if subscription in subscribers:
+                subscribers.remove(subscription)
+
+
+class _QueueSubscription:
+    """Messages received on a channel, handed over through a queue."""
+
+    def __init__(self, on_close: Callable):
+        self.messages: "queue.Queue" = queue.Queue()
+        self._on_close = on_close
+
+    def get(self, timeout: Optional[float] = None) -> bytes:
+        """
+        Return the next message.
+
+        Raises:
+            queue.Empty: If no message arrived within the timeout
+            SubscriptionClosed: If the connection to the backend was lost
+        """
+        message = self.messages.get(timeout=timeout)
+        if message is None:
+            raise SubscriptionClosed
+        return message
+
+    def close(self):
+        """Stop receiving messages."""
+        self._on_close()
+
+
+# Lease and publish scripts run atomically on the Redis server.
+_ACQUIRE_LEASE_SCRIPT = """
+local holder = redis.call('get', KEYS[1])
+if not holder then
+  redis.call('set', KEYS[1], ARGV[1], 'PX', ARGV[2])
+elseif holder == ARGV[1] then
+  redis.call('pexpire', KEYS[1], ARGV[2])
+else
+  return 0
+end
+if KEYS[2] then
+  redis.call('pexpire', KEYS[2], ARGV[3])
+end
+return 1
+"""
+
+_RELEASE_LEASE_SCRIPT = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+  return redis.call('del', KEYS[1])
+end
+return 0
+"""
+
+_STAGE_SCRIPT = """
+if redis.call('get', KEYS[1]) ~= ARGV[1] then
+  return 0
+end
+if ARGV[2] == '1' then
+  redis.call('del', KEYS[2])
+end
+for i = 4, #ARGV, 2 do
+  redis.call('hset', KEYS[2], ARGV[i], ARGV[i + 1])
+end
+if ARGV[3] ~= '0' then
+  redis.call('pexpire', KEYS[2], ARGV[3])
+end
+return 1
+"""
+
+_PUBLISH_SCRIPT = """
+if redis.call('get', KEYS[1]) ~= ARGV[1] then
+  return 0
+end
+if ARGV[2] == '1' then
+  if redis.call('exists', KEYS[4]) == 1 then
+    redis.call('rename', KEYS[4], KEYS[2])
+  else
+    redis.call('del', KEYS[2])
+  end
+end
+for i = 5, #ARGV, 2 do
+  if ARGV[i + 1] == '' then
+    redis.call('hdel', KEYS[2], ARGV[i])
+  else
+    redis.call('hset', KEYS[2], ARGV[i], ARGV[i + 1])
+  end
+end
+if ARGV[4] ~= '0' then
+  redis.call('pexpire', KEYS[2], ARGV[4])
+end
+redis.call('publish', KEYS[3], ARGV[3])
+return 1
+"""
+
+
+class RedisProtocolError(Exception):
+    """The Redis server returned an error reply."""
+
+
+class _RedisConnection:
+    """A blocking connection speaking the Redis serialization protocol."""
+
+    def __init__(self, host: str, port: int, db: int, password: Optional[str]):
+        self._socket = socket.create_connection((host, port), timeout=10)
+        self._reader = self._socket.makefile("rb")
+        if password:
+            self.command("AUTH", password)
+        if db:
+            self.command("SELECT", db)
+
+    def command(self, *args) -> Any:
+        """Send a command and return its reply."""
+        self.send(*args)
+        return self.read_reply()
+
+    def send(self, *args):
+        self._socket.sendall(encode_command(*args))
+
+    def read_reply(self) -> Any:
+        return read_reply(self._reader)
+
+    def settimeout(self, timeout: Optional[float]):
+        self._socket.settimeout(timeout)
+
+    def close(self):
+        # Shutting down wakes up a thread blocked reading the socket.
+        with suppress(OSError):
+            self._socket.shutdown(socket.SHUT_RDWR)
+        with suppress(OSError):
+            self._socket.close()
+
+
+def encode_command(*args) -> bytes:
+    """Encode a command as a RESP array of bulk strings."""
+    parts = [b"*%d\r\n" % len(args)]
+    for arg in args:
+        if not isinstance(arg, bytes):
+            arg = str(arg).encode()
+        parts.append(b"$%d\r\n%s\r\n" % (len(arg), arg))
+    return b"".join(parts)
+
+
+def read_reply(reader) -> Any:
+    """
+    Read a RESP reply.
+
+    Raises:
+        RedisProtocolError: If the server replied with an error
+        ConnectionError: If the connection was closed
+    """
+    line = reader.readline()
+    if not line.endswith(b"\r\n"):
+        raise ConnectionError("Connection to Redis closed")
+
+    prefix, payload = line[:1], line[1:-2]
+    if prefix == b"+":
+        return payload.decode()
+    if prefix == b"-":
+        raise RedisProtocolError(payload.decode())
+    if prefix == b":":
+        return int(payload)
+    if prefix == b"$":
+        length = int(payload)
+        if length < 0:
+            return None
+        data = reader.read(length + 2)
+        if len(data) != length + 2:
+            raise ConnectionError("Connection to Redis closed")
+        return data[:-2]
+    if prefix == b"*":
+        length = int(payload)
+        if length < 0:
+            return None
+        return [read_reply(reader) for _ in range(length)]
+    raise RedisProtocolError(f"Unexpected reply: {line!r}")
+
+
+class RedisPubSub:
+    """
+    Pub/sub backend on a Redis server, shared by every replica.
+
+    Leases are keys set with NX and PX, and each publish atomically checks the
+    lease, updates the state hash of the namespace and publishes the message,
+    so a replica that lost its lease can no longer publish.
+    """
+
+    def __init__(self, url: str):
+        """
+        Initialize the backend.
+
+        Args:
+            url: redis://[:password@]host[:port][/db]
+        """
+        parsed = urlparse(url)
+        self._host = parsed.hostname or "localhost"
+        self._port = parsed.port or 6379
+        self._db = int((parsed.path or "/0").lstrip("/") or 0)
+        self._password = parsed.password
+        self._connection: Optional[_RedisConnection] = None
+        self._lock = threading.Lock()
+
+    def acquire_lease(
+        self,
+        key: str,
+        owner: str,
+        ttl_ms: int,
+        state_key: Optional[str] = None,
+        state_ttl_ms: int = 0,
+    ) -> bool:
+        """Take or renew the lease of a key, unless another owner holds it."""
+        if state_key and state_ttl_ms:
+            keys = (2, key, state_key)
+        else:
+            keys = (1, key)
+        reply = self._command(
+            "EVAL", _ACQUIRE_LEASE_SCRIPT, *keys, owner, ttl_ms, state_ttl_ms
+        )
+        return reply == 1
+
+    def release_lease(self, key: str, owner: str):
+        """Release the lease of a key if the owner still holds it."""
+        self._command("EVAL", _RELEASE_LEASE_SCRIPT, 1, key, owner)
+
+    def stage(
+        self,
+        lease_key: str,
+        owner: str,
+        state_key: str,
+        fields: Dict[str, bytes],
+        reset: bool = False,
+        state_ttl_ms: int = 0,
+    ) -> bool:
+        """Add fields to the staged state of a key, if the owner holds the lease."""
+        args = [owner, "1" if reset else "0", state_ttl_ms]
+        for field, value in fields.items():
+            args.extend((field, value))
+        reply = self._command(
+            "EVAL", _STAGE_SCRIPT, 2, lease_key, _staging_key(state_key), *args
+        )
+        return reply == 1
+
+    def publish(
+        self,
+        lease_key: str,
+        owner: str,
+        channel: str,
+        message: bytes,
+        state_key: str,
+        state: Dict[str, Optional[bytes]],
+        staged: bool = False,
+        state_ttl_ms: int = 0,
+    ) -> bool:
+        """Update the state and publish a message, if the owner holds the lease."""
+        args = [owner, "1" if staged else "0", message, state_ttl_ms]
+        for field, value in state.items():
+            args.extend((field, b"" if value is None else value))
+        keys = (lease_key, state_key, channel, _staging_key(state_key))
+        reply = self._command("EVAL", _PUBLISH_SCRIPT, 4, *keys, *args)
+        return reply == 1
+
+    def read_state(self, state_key: str) -> Dict[str, bytes]:
+        """Return the fields of a state key."""
+        reply = self._command("HGETALL", state_key) or []
+        return {
+            reply[index].decode(): reply[index + 1] for index in range(0, len(reply), 2)
+        }
+
+    def subscribe(self, channel: str) -> _QueueSubscription:
+        """Subscribe to a channel on a dedicated connection."""
+        connection = self._connect()
+        connection.command("SUBSCRIBE", channel)
+        # Messages arrive whenever they are published.
+        connection.settimeout(None)
+
+        subscription = _QueueSubscription(connection.close)
+        threading.Thread(
+            target=self._receive, args=(connection, subscription), daemon=True
+        ).start()
+        return subscription
+
+    def _receive(self, connection: _RedisConnection, subscription: _QueueSubscription):
+        try:
+            while True:
+                reply = connection.read_reply()
+                if isinstance(reply, list) and reply[:1] == [b"message"]:
+                    subscription.messages.put(reply[2])
+        except (OSError, ConnectionError, RedisProtocolError) as e:
+            log.debug(f"Redis subscription closed: {e}")
+        finally:
+            connection.close()
+            subscription.messages.put(None)
+
+    def _connect(self) -> _RedisConnection:
+        return _RedisConnection(self._host, self._port, self._db, self._password)
+
+    def _command(self, *args) -> Any:
+        with self._lock:
+            try:
+                if self._connection is None:
+                    self._connection = self._connect()
+                return self._connection.command(*args)
+            except (OSError, ConnectionError):
+                if self._connection:
+                    self._connection.close()
+                self._connection = None
+                raise
+
+
+class FanoutWatcher:
+    """
+    Namespace watch shared by every replica through a pub/sub backend.
+
+    The replica holding the lease of the namespace runs the upstream watch and
+    publishes sequenced events, together with the objects and the last
+    resourceVersion, to the backend. Every replica, the leader included,
+    serves its clients from the published feed. A snapshot is written to the
+    state in chunks and published as an INITIAL event without its objects,
+    which every replica reloads from the state. A new leader resumes the
+    watch from the last published resourceVersion and the published objects,
+    and continues the sequence, so the other replicas do not reload the
+    snapshot on failover. The state expires when no leader renews it.
+    """
+
+    def __init__(
+        self,
+        backend,
+        namespace: str,
+        callback: Callable,
+        source_factory: Callable,
+        replica_id: str,
+        lease_seconds: float = DEFAULT_LEASE_SECONDS,
+    ):
+        """
+        Initialize the watcher.
+
+        Args:
+            backend: The pub/sub backend shared by the replicas
+            namespace: The namespace to watch
+            callback: Callback function(event_type, obj) to handle events
+            source_factory: Function(namespace, callback, resource_version,
+                known_objects) starting the upstream watcher
+            replica_id: Identity of this replica in the leases
+            lease_seconds: Time after which the lease of a leader expires
+        """
+        self._backend = backend
+        self._namespace = namespace
+        self._callback = callback
+        self._source_factory = source_factory
+        self._replica_id = replica_id
+        self._lease_ms = int(lease_seconds * 1000)
+        self._state_ttl_ms = self._lease_ms * STATE_TTL_LEASES
+        self._lease_key = f"{KEY_PREFIX}:{namespace}:leader"
+        self._state_key = f"{KEY_PREFIX}:{namespace}:state"
+        self._channel = f"{KEY_PREFIX}:{namespace}:events"
+        self._stop_event = threading.Event()
+        self._source = None
+        self._source_lock = threading.Lock()
+        self._publish_lock = threading.Lock()
+        self._sequence = 0
+        self._resource_version: Optional[str] = None
+        self._threads: List[threading.Thread] = []
+        # Times the feed skipped events and the state was reloaded.
+        self.resyncs = 0
+
+    def start(self):
+        """Start consuming the feed and competing for the lease."""
+        for target in (self._consume, self._lead):
+            thread = threading.Thread(target=target, daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        return self
+
+    def stop(self):
+        """Stop the watcher and hand over the lease."""
+        self._stop_event.set()
+        self._stop_source()
+        with suppress(Exception):
+            self._backend.release_lease(self._lease_key, self._replica_id)
+
+    def is_leader(self) -> bool:
+        """Return whether this replica runs the upstream watch."""
+        return self._source is not None
+
+    def _lead(self):
+        """Renew the lease, starting or stopping the upstream watch."""
+        while not self._stop_event.is_set():
+            try:
+                leader = self._backend.acquire_lease(
+                    self._lease_key,
+                    self._replica_id,
+                    self._lease_ms,
+                    self._state_key,
+                    self._state_ttl_ms,
+                )
+            except Exception as e:
+                log.warning(f"Cannot renew the fan-out lease of {self._namespace}: {e}")
+                leader = False
+
+            if leader and self._source is None:
+                self._start_source()
+            elif not leader and self._source is not None:
+                log.info(f"Lost the fan-out lease of {self._namespace}")
+                self._stop_source()
+
+            self._stop_event.wait(self._lease_ms / 3000)
+
+    def _start_source(self):
+        try:
+            state = self._backend.read_state(self._state_key)
+        except Exception as e:
+            log.warning(f"Cannot read the fan-out state of {self._namespace}: {e}")
+            return
+
+        meta = _decode_meta(state)
+        with self._publish_lock:
+            self._sequence = meta.get("sequence", 0)
+            self._resource_version = meta.get("resourceVersion")
+        # The resumed watch compares a relist with the published objects, so
+        # the objects deleted while nobody led are deleted from the state too.
+        known_objects = _state_objects(state) if self._resource_version else None
+
+        log.info(
+            f"Leading the watch of {self._namespace} from resourceVersion "
+            f"{self._resource_version}"
+        )
+        with self._source_lock:
+            if self._stop_event.is_set():
+                return
+            try:
+                self._source = self._source_factory(
+                    self._namespace,
+                    self._publish,
+                    self._resource_version,
+                    known_objects,
+                )
+            except Exception as e:
+                log.error(f"Cannot watch {self._namespace}, handing over: {e}")
+                with suppress(Exception):
+                    self._backend.release_lease(self._lease_key, self._replica_id)
+
+    def _stop_source(self):
+        with self._source_lock:
+            source, self._source = self._source, None
+        if source and hasattr(source, "stop"):
+            source.stop()
+
+    def _publish(self, event_type: str, obj: Any):
+        """Publish an upstream event with the next sequence number."""
+        if obj is None:
+            return
+
+        with self._publish_lock:
+            sequence = self._sequence + 1
+            resource_version = self._resource_version
+            state: Dict[str, Optional[bytes]] = {}
+
+            if event_type == "INITIAL":
+                metadata = obj.get("metadata") or {}
+                resource_version = metadata.get("resourceVersion")
+                message = {"type": event_type}
+                if not self._stage_snapshot(obj.get("items") or []):
+                    log.warning(f"Dropped a snapshot of {self._namespace}, lease lost")
+                    return
+            else:
+                message = {"type": event_type, "object": obj}
+                field = _object_field(obj)
+                if event_type in ("ADDED", "MODIFIED", "DELETED") and field:
+                    metadata = obj.get("metadata") or {}
+                    resource_version = metadata.get("resourceVersion") or (
+                        resource_version
+                    )
+                    state[field] = (
+                        None if event_type == "DELETED" else json.dumps(obj).encode()
+                    )
+
+            message["sequence"] = sequence
+            state[META_FIELD] = json.dumps(
+                {"sequence": sequence, "resourceVersion": resource_version}
+            ).encode()
+
+            try:
+                published = self._backend.publish(
+                    self._lease_key,
+                    self._replica_id,
+                    self._channel,
+                    json.dumps(message).encode(),
+                    self._state_key,
+                    state,
+                    staged=event_type == "INITIAL",
+                    state_ttl_ms=self._state_ttl_ms,
+                )
+            except Exception as e:
+                log.error(f"Cannot publish the events of {self._namespace}: {e}")
+                published = False
+
+            if published:
+                self._sequence = sequence
+                self._resource_version = resource_version
+            else:
+                log.warning(f"Dropped an event of {self._namespace}, lease lost")
+
+    def _stage_snapshot(self, items: List[Any]) -> bool:
+        """Stage the objects of a snapshot, STATE_CHUNK_OBJECTS at a time."""
+        fields = [
+            (field, json.dumps(item).encode())
+            for item in items
+            for field in (_object_field(item),)
+            if field
+        ]
+        # An empty snapshot still clears the staged state.
+        for start in range(0, len(fields) or 1, STATE_CHUNK_OBJECTS):
+            try:
+                staged = self._backend.stage(
+                    self._lease_key,
+                    self._replica_id,
+                    self._state_key,
+                    dict(fields[start : start + STATE_CHUNK_OBJECTS]),
+                    reset=start == 0,
+                    state_ttl_ms=self._state_ttl_ms,
+                )
+            except Exception as e:
+                log.error(f"Cannot stage the objects of {self._namespace}: {e}")
+                staged = False
+            if not staged:
+                return False
+        return True
+
+    def _consume(self):
+        """Serve the published feed, resyncing from the state on gaps."""
+        while not self._stop_event.is_set():
+            subscription = None
+            try:
+                subscription = self._backend.subscribe(self._channel)
+                self._follow(subscription)
+            except Exception as e:
+                if not self._stop_event.is_set():
+                    log.warning(f"Fan-out feed of {self._namespace} failed: {e}")
+                    self._stop_event.wait(RETRY_SECONDS)
+            finally:
+                if subscription:
+                    subscription.close()
+
+    def _follow(self, subscription):
+        # Subscribed first, so every event newer than the state is received.
+        sequence = self._load_state()
+
+        while not self._stop_event.is_set():
+            try:
+                message = json.loads(subscription.get(timeout=RETRY_SECONDS))
+            except queue.Empty:
+                continue
+
+            message_sequence = message.get("sequence", 0)
+            if sequence is not None and message_sequence <= sequence:
+                continue
+
+            event_type = message.get("type")
+            if event_type != "INITIAL" and (
+                sequence is None or message_sequence != sequence + 1
+            ):
+                self.resyncs += 1
+                log.warning(
+                    f"Fan-out feed of {self._namespace} skipped from {sequence} "
+                    f"to {message_sequence}, resyncing ({self.resyncs} resyncs)"
+                )
+                return
+
+            if event_type == "INITIAL":
+                # The objects of a snapshot are only published in the state.
+                sequence = self._load_state()
+                if sequence is None or sequence < message_sequence:
+                    sequence = message_sequence
+            else:
+                sequence = message_sequence
+                self._callback(event_type, message.get("object"))
+
+    def _load_state(self) -> Optional[int]:
+        """Send the published objects as a snapshot, return their sequence."""
+        state = self._backend.read_state(self._state_key)
+        sequence = _decode_meta(state).get("sequence")
+        if sequence is not None:
+            self._callback("INITIAL", {"items": _state_objects(state)})
+        return sequence
+
+
+class FanoutSource:
+    """Creates fan-out watchers that share a backend and a replica identity."""
+
+    def __init__(self, backend, source_factory: Callable, lease_seconds: float):
+        """
+        Initialize the source.
+
+        Args:
+            backend: The pub/sub backend shared by the replicas
+            source_factory: Function(namespace, callback, resource_version,
+                known_objects) starting the upstream watcher
+            lease_seconds: Time after which the lease of a leader expires
+        """
+        self._backend = backend
+        self._source_factory = source_factory
+        self._lease_seconds = lease_seconds
+        self.replica_id = f"{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:6]}"
+
+    def watch_namespace(self, namespace: str, callback: Callable) -> FanoutWatcher:
+        """Start serving a namespace from the fan-out feed."""
+        return FanoutWatcher(
+            self._backend,
+            namespace,
+            callback,
+            self._source_factory,
+            self.replica_id,
+            self._lease_seconds,
+        ).start()
+
+
+def _object_field(obj: Any) -> Optional[str]:
+    metadata = obj.get("metadata") or {} if isinstance(obj, dict) else {}
+    name = metadata.get("name")
+    return f"{OBJECT_FIELD_PREFIX}{name}" if name else None
+
+
+def _state_objects(state: Dict[str, bytes]) -> List[Any]:
+    """Return the objects of a namespace state, ordered by name."""
+    return [
+        json.loads(value)
+        for field, value in sorted(state.items())
+        if field.startswith(OBJECT_FIELD_PREFIX)
+    ]
+
+
+def _staging_key(state_key: str) -> str:
+    return f"{state_key}:staging"
+
+
+def _decode_meta(state: Dict[str, bytes]) -> Dict[str, Any]:
+    value = state.get(META_FIELD)
+    return json.loads(value) if value else {}
+
+
+def from_environment(source_factory: Callable) -> Optional[FanoutSource]:
+    """Return the fan-out source configured by SSE_FANOUT_REDIS_URL, if any."""
+    url = os.environ.get("SSE_FANOUT_REDIS_URL", "").strip()
+    if not url:
+        return None
+
+    lease_seconds = float(
+        os.environ.get("SSE_FANOUT_LEASE_SECONDS", DEFAULT_LEASE_SECONDS)
+    )
+    log.info(
+        f"Sharing namespace watches between replicas through {urlparse(url).hostname}"
+    )
+    return FanoutSource(RedisPubSub(url), source_factory, lease_seconds)
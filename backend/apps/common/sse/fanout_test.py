@@ -0,0 +1,299 @@
+"""Tests for the cross-replica fan-out of namespace watches.
+
+Run directly with:
+    python3 backend/apps/common/sse/fanout_test.py
+"""
+
+import importlib.util
+import io
+import json
+import logging as python_logging
+from pathlib import Path
+from queue import Queue
+import sys
+import time
+import types
+import unittest
+
+
+def _load_fanout_module():
+    """Load fanout.py with a lightweight stub for the kubeflow logging module."""
+    kubeflow = types.ModuleType("kubeflow")
+    kubeflow_kubeflow = types.ModuleType("kubeflow.kubeflow")
+    crud_backend = types.ModuleType("kubeflow.kubeflow.crud_backend")
+    crud_backend.logging = types.SimpleNamespace(
+        getLogger=lambda name: python_logging.getLogger(name)
+    )
+    sys.modules.setdefault("kubeflow", kubeflow)
+    sys.modules.setdefault("kubeflow.kubeflow", kubeflow_kubeflow)
+    sys.modules.setdefault("kubeflow.kubeflow.crud_backend", crud_backend)
+
+    module_path = Path(__file__).with_name("fanout.py")
+    spec = importlib.util.spec_from_file_location("sse_fanout_under_test", module_path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+fanout = _load_fanout_module()
+
+TIMEOUT = 5
+LEASE_SECONDS = 0.3
+
+
+def _isvc(name, resource_version):
+    return {
+        "metadata": {
+            "namespace": "ns",
+            "name": name,
+            "resourceVersion": resource_version,
+        }
+    }
+
+
+class FakeSource:
+    """An upstream watch whose events are emitted by the test."""
+
+    def __init__(self, namespace, callback, resource_version, known_objects):
+        self.namespace = namespace
+        self.callback = callback
+        self.resource_version = resource_version
+        self.known_objects = known_objects
+        self.stopped = False
+
+    def stop(self):
+        self.stopped = True
+
+
+class FakeSourceFactory:
+    def __init__(self):
+        self.sources = []
+
+    def __call__(self, namespace, callback, resource_version=None, known_objects=None):
+        source = FakeSource(namespace, callback, resource_version, known_objects)
+        self.sources.append(source)
+        return source
+
+    def wait_for_sources(self, count):
+        deadline = time.monotonic() + TIMEOUT
+        while len(self.sources) < count:
+            if time.monotonic() > deadline:
+                raise AssertionError(f"Expected {count} upstream watches")
+            time.sleep(0.01)
+        return self.sources[count - 1]
+
+
+class Replica:
+    """The fan-out watcher of a replica and the events it delivered."""
+
+    def __init__(self, backend, factory, replica_id):
+        self.events = Queue()
+        self.watcher = fanout.FanoutWatcher(
+            backend,
+            "ns",
+            lambda event_type, obj: self.events.put((event_type, obj)),
+            factory,
+            replica_id,
+            lease_seconds=LEASE_SECONDS,
+        ).start()
+
+    def next_event(self):
+        return self.events.get(timeout=TIMEOUT)
+
+
+class FanoutWatcherTest(unittest.TestCase):
+    def setUp(self):
+        self.backend = fanout.InProcessPubSub()
+        self.factory = FakeSourceFactory()
+        self.replicas = []
+
+    def tearDown(self):
+        for replica in self.replicas:
+            replica.watcher.stop()
+
+    def _replica(self, replica_id):
+        replica = Replica(self.backend, self.factory, replica_id)
+        self.replicas.append(replica)
+        return replica
+
+    def _emit_initial(self, source, resource_version, *items):
+        source.callback(
+            "INITIAL",
+            {"items": list(items), "metadata": {"resourceVersion": resource_version}},
+        )
+
+    def test_replicas_share_a_single_upstream_watch(self):
+        first, second = self._replica("a"), self._replica("b")
+        source = self.factory.wait_for_sources(1)
+        time.sleep(LEASE_SECONDS)
+
+        self._emit_initial(source, "10", _isvc("x", "9"))
+        for replica in (first, second):
+            self.assertEqual(
+                replica.next_event(), ("INITIAL", {"items": [_isvc("x", "9")]})
+            )
+        source.callback("MODIFIED", _isvc("x", "11"))
+
+        for replica in (first, second):
+            self.assertEqual(replica.next_event(), ("MODIFIED", _isvc("x", "11")))
+        self.assertEqual(len(self.factory.sources), 1)
+        self.assertIsNone(source.resource_version)
+
+    def test_failover_resumes_from_the_last_published_resource_version(self):
+        first = self._replica("a")
+        source = self.factory.wait_for_sources(1)
+        second = self._replica("b")
+        self._emit_initial(source, "10", _isvc("x", "9"))
+        self.assertEqual(second.next_event()[0], "INITIAL")
+        source.callback("MODIFIED", _isvc("x", "11"))
+        self.assertEqual(second.next_event()[0], "MODIFIED")
+
+        first.watcher.stop()
+        self.replicas.remove(first)
+
+        resumed = self.factory.wait_for_sources(2)
+        self.assertTrue(source.stopped)
+        self.assertEqual(resumed.resource_version, "11")
+        self.assertEqual(resumed.known_objects, [_isvc("x", "11")])
+        resumed.callback("ADDED", _isvc("y", "12"))
+        self.assertEqual(second.next_event(), ("ADDED", _isvc("y", "12")))
+
+    def test_replicas_follow_a_failover_without_resyncing(self):
+        leader = self._replica("a")
+        source = self.factory.wait_for_sources(1)
+        followers = [self._replica("b"), self._replica("c")]
+        self._emit_initial(source, "10", _isvc("x", "9"))
+        for replica in [leader] + followers:
+            self.assertEqual(replica.next_event()[0], "INITIAL")
+
+        leader.watcher.stop()
+        self.replicas.remove(leader)
+        resumed = self.factory.wait_for_sources(2)
+        resumed.callback("ADDED", _isvc("y", "12"))
+        resumed.callback("DELETED", _isvc("x", "13"))
+
+        for replica in followers:
+            self.assertEqual(replica.next_event(), ("ADDED", _isvc("y", "12")))
+            self.assertEqual(replica.next_event(), ("DELETED", _isvc("x", "13")))
+            self.assertEqual(replica.watcher.resyncs, 0)
+        self.assertEqual(len(self.factory.sources), 2)
+
+    def test_snapshot_is_staged_in_chunks_and_reloaded_from_the_state(self):
+        original_chunk_objects = fanout.STATE_CHUNK_OBJECTS
+        fanout.STATE_CHUNK_OBJECTS = 2
+        self.addCleanup(setattr, fanout, "STATE_CHUNK_OBJECTS", original_chunk_objects)
+        stage = self.backend.stage
+        staged_chunks = []
+
+        def record_stage(lease_key, owner, state_key, fields, **kwargs):
+            staged_chunks.append(sorted(fields))
+            return stage(lease_key, owner, state_key, fields, **kwargs)
+
+        self.backend.stage = record_stage
+        replica = self._replica("a")
+        source = self.factory.wait_for_sources(1)
+        feed = self.backend.subscribe(f"{fanout.KEY_PREFIX}:ns:events")
+        self.addCleanup(feed.close)
+        items = [_isvc(name, "9") for name in "abcde"]
+
+        self._emit_initial(source, "10", *items)
+
+        self.assertEqual(replica.next_event(), ("INITIAL", {"items": items}))
+        self.assertEqual([len(chunk) for chunk in staged_chunks], [2, 2, 1])
+        self.assertEqual(
+            json.loads(feed.get(timeout=TIMEOUT)), {"type": "INITIAL", "sequence": 1}
+        )
+
+    def test_state_expires_when_no_leader_renews_it(self):
+        first = self._replica("a")
+        source = self.factory.wait_for_sources(1)
+        self._emit_initial(source, "10", _isvc("x", "9"))
+        first.next_event()
+        state_key = f"{fanout.KEY_PREFIX}:ns:state"
+        time.sleep(LEASE_SECONDS * fanout.STATE_TTL_LEASES)
+        self.assertNotEqual(self.backend.read_state(state_key), {})
+
+        first.watcher.stop()
+        self.replicas.remove(first)
+        time.sleep(LEASE_SECONDS * fanout.STATE_TTL_LEASES + 0.1)
+
+        self.assertEqual(self.backend.read_state(state_key), {})
+
+    def test_late_replica_loads_the_published_state(self):
+        first = self._replica("a")
+        source = self.factory.wait_for_sources(1)
+        self._emit_initial(source, "10", _isvc("x", "9"), _isvc("y", "9"))
+        first.next_event()
+        source.callback("DELETED", _isvc("x", "11"))
+        source.callback("MODIFIED", _isvc("y", "12"))
+        for _ in range(2):
+            first.next_event()
+
+        late = self._replica("b")
+
+        self.assertEqual(late.next_event(), ("INITIAL", {"items": [_isvc("y", "12")]}))
+        source.callback("ADDED", _isvc("z", "13"))
+        self.assertEqual(late.next_event(), ("ADDED", _isvc("z", "13")))
+
+    def test_sequence_gap_reloads_the_state(self):
+        replica = self._replica("a")
+        source = self.factory.wait_for_sources(1)
+        self._emit_initial(source, "10", _isvc("x", "9"))
+        replica.next_event()
+
+        # A message lost by the subscription, followed by one that is not.
+        self.backend.publish(
+            f"{fanout.KEY_PREFIX}:ns:leader",
+            "a",
+            f"{fanout.KEY_PREFIX}:ns:events",
+            json.dumps({"sequence": 5, "type": "MODIFIED"}).encode(),
+            f"{fanout.KEY_PREFIX}:ns:state",
+            {fanout.META_FIELD: json.dumps({"sequence": 5}).encode()},
+        )
+
+        self.assertEqual(
+            replica.next_event(), ("INITIAL", {"items": [_isvc("x", "9")]})
+        )
+
+    def test_replica_without_the_lease_cannot_publish(self):
+        self._replica("a")
+        self.factory.wait_for_sources(1)
+
+        published = self.backend.publish(
+            f"{fanout.KEY_PREFIX}:ns:leader",
+            "b",
+            f"{fanout.KEY_PREFIX}:ns:events",
+            b"{}",
+            f"{fanout.KEY_PREFIX}:ns:state",
+            {},
+        )
+
+        self.assertFalse(published)
+
+
+class RedisProtocolTest(unittest.TestCase):
+    def test_encode_command(self):
+        self.assertEqual(
+            fanout.encode_command("SET", "key", b"value", 10),
+            b"*4\r\n$3\r\nSET\r\n$3\r\nkey\r\n$5\r\nvalue\r\n$2\r\n10\r\n",
+        )
+
+    def test_read_replies(self):
+        reader = io.BytesIO(
+            b"+OK\r\n:1\r\n$-1\r\n*3\r\n$7\r\nmessage\r\n$2\r\nch\r\n$4\r\na\r\nb\r\n"
+        )
+
+        self.assertEqual(fanout.read_reply(reader), "OK")
+        self.assertEqual(fanout.read_reply(reader), 1)
+        self.assertIsNone(fanout.read_reply(reader))
+        self.assertEqual(fanout.read_reply(reader), [b"message", b"ch", b"a\r\nb"])
+
+    def test_error_reply_and_closed_connection(self):
+        with self.assertRaises(fanout.RedisProtocolError):
+            fanout.read_reply(io.BytesIO(b"-NOSCRIPT missing\r\n"))
+        with self.assertRaises(ConnectionError):
+            fanout.read_reply(io.BytesIO(b""))
+
+
+if __name__ == "__main__":
+    unittest.main()
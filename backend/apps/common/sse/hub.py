@@ -0,0 +1,415 @@
+"""Process-wide namespace watches shared by the gunicorn workers of a pod."""
+
+from contextlib import suppress
+import fcntl
+import json
+import os
+from queue import Full, Queue
+import socket
+import threading
+from typing import Any, Callable, Dict, Optional, Set, Tuple
+
+from kubeflow.kubeflow.crud_backend import logging
+
+log = logging.getLogger(__name__)
+
+RECONNECT_SECONDS = 1
+# Lines queued for a worker before it is disconnected as too slow. It
+# reconnects and reloads the snapshot.
+MAX_PENDING_LINES = 1024
+
+
+class _Subscriber:
+    """
+    A worker connection subscribed to the events of a namespace.
+
+    Lines are queued and written by the subscriber's own thread, so a slow or
+    stuck worker never blocks the hub or the other workers.
+    """
+
+    def __init__(self, connection: socket.socket):
+        self.connection = connection
+        self._lines: Queue = Queue(MAX_PENDING_LINES)
+        self._closed = False
+        threading.Thread(target=self._write, daemon=True).start()
+
+    def send(self, line: bytes) -> bool:
+        """
+        Queue a line for the worker.
+
+        Returns:
+            False if the worker disconnected or fell too far behind
+        """
+        if self._closed:
+            return False
+        try:
+            self._lines.put_nowait(line)
+            return True
+        except Full:
+            log.warning("Disconnecting a watch hub subscriber that fell behind")
+            self.close()
+            return False
+
+    def close(self):
+        """Disconnect the worker, which ends its subscription."""
+        self._closed = True
+        with suppress(OSError):
+            self.connection.shutdown(socket.SHUT_RDWR)
+        with suppress(Full):
+            self._lines.put_nowait(None)
+
+    def _write(self):
+        while True:
+            line = self._lines.get()
+            if line is None or self._closed:
+                return
+            try:
+                self.connection.sendall(line)
+            except OSError:
+                self.close()
+                return
+
+
+class _HubWatch:
+    """
+    The upstream watch of a namespace and the workers subscribed to it.
+
+    The workers keep the decoded objects, the snapshot of the hub only holds
+    the JSON of every object to send it to the workers that subscribe later.
+    """
+
+    def __init__(self):
+        self.watcher: Any = None
+        self.subscribers: Set[_Subscriber] = set()
+        self.snapshot: Optional[Dict[Tuple, bytes]] = None
+        self.resource_version: Optional[str] = None
+
+
+class WatchHub:
+    """
+    Single owner of the upstream namespace watches of a pod.
+
+    The first worker that takes the file lock next to the socket becomes the
+    owner: it runs the watchers and publishes every event, encoded once, to
+    the workers connected to the Unix domain socket. When the owner exits its
+    lock is released and the next worker that fails to connect takes over.
+    """
+
+    def __init__(self, socket_path: str, source_factory: Callable):
+        """
+        Initialize the hub.
+
+        Args:
+            socket_path: Path of the Unix domain socket shared by the workers
+            source_factory: Function(namespace, callback) starting a watcher
+        """
+        self.socket_path = socket_path
+        self._source_factory = source_factory
+        self._lock_file = None
+        self._server: Optional[socket.socket] = None
+        self._watches: Dict[str, _HubWatch] = {}
+        self._lock = threading.Lock()
+
+    def is_owner(self) -> bool:
+        """Return whether this process runs the upstream watches."""
+        return self._server is not None
+
+    def try_acquire(self) -> bool:
+        """
+        Become the watch owner of the pod unless another process already is.
+
+        Returns:
+            Whether this process is the owner
+        """
+        with self._lock:
+            if self._server is not None:
+                return True
+
+            lock_file = open(f"{self.socket_path}.lock", "a+")
+            try:
+                fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except OSError:
+                lock_file.close()
+                return False
+
+            # The socket of a previous owner is stale once its lock is free.
+            with suppress(FileNotFoundError):
+                os.unlink(self.socket_path)
+
+            server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            server.bind(self.socket_path)
+            server.listen()
+            self._lock_file, self._server = lock_file, server
+
+        log.info(f"Process {os.getpid()} owns the watch hub at {self.socket_path}")
+        threading.Thread(target=self._accept, args=(server,), daemon=True).start()
+        return True
+
+    def close(self):
+        """Stop serving the workers and release the ownership."""
+        with self._lock:
+            server, self._server = self._server, None
+            lock_file, self._lock_file = self._lock_file, None
+            watches, self._watches = self._watches, {}
+
+        for hub_watch in watches.values():
+            for subscriber in hub_watch.subscribers:
+                subscriber.close()
+            if hub_watch.watcher and hasattr(hub_watch.watcher, "stop"):
+                hub_watch.watcher.stop()
+
+        if server:
+            server.close()
+            with suppress(FileNotFoundError):
+                os.unlink(self.socket_path)
+        if lock_file:
+            lock_file.close()
+
+    def _accept(self, server: socket.socket):
+        while True:
+            try:
+                connection, _ = server.accept()
+            except OSError:
+                return
+            threading.Thread(
+                target=self._serve, args=(connection,), daemon=True
+            ).start()
+
+    def _serve(self, connection: socket.socket):
+        """Serve the subscription of one worker until it disconnects."""
+        subscriber = _Subscriber(connection)
+        namespace = None
+        try:
+            reader = connection.makefile("rb")
+            request = json.loads(reader.readline() or b"null")
+            namespace = request.get("namespace") if isinstance(request, dict) else None
+            if not namespace:
+                return
+
+            self._subscribe(namespace, subscriber)
+            # Nothing else is sent by the worker, EOF ends the subscription.
+            while reader.readline():
+                pass
+        except (OSError, ValueError) as e:
+            log.debug(f"Watch hub subscriber disconnected: {e}")
+        except Exception as e:
+            # The worker reconnects and subscribes again.
+            log.error(f"Watch hub cannot watch {namespace}: {e}")
+        finally:
+            if namespace:
+                self._unsubscribe(namespace, subscriber)
+            subscriber.close()
+            with suppress(OSError):
+                connection.close()
+
+    def _subscribe(self, namespace: str, subscriber: _Subscriber):
+        with self._lock:
+            hub_watch = self._watches.get(namespace)
+            start_watcher = hub_watch is None
+            if start_watcher:
+                hub_watch = self._watches[namespace] = _HubWatch()
+
+            hub_watch.subscribers.add(subscriber)
+            if hub_watch.snapshot is not None:
+                subscriber.send(_snapshot_line(hub_watch))
+
+        if not start_watcher:
+            return
+
+        watcher = self._source_factory(
+            namespace,
+            lambda event_type, obj: self._publish(
+                namespace, hub_watch, event_type, obj
+            ),
+        )
+        with self._lock:
+            if self._watches.get(namespace) is hub_watch:
+                hub_watch.watcher = watcher
+                return
+
+        if hasattr(watcher, "stop"):
+            watcher.stop()
+
+    def _unsubscribe(self, namespace: str, subscriber: _Subscriber):
+        watcher_to_stop = None
+        with self._lock:
+            hub_watch = self._watches.get(namespace)
+            if hub_watch is None:
+                return
+
+            hub_watch.subscribers.discard(subscriber)
+            if not hub_watch.subscribers:
+                del self._watches[namespace]
+                watcher_to_stop = hub_watch.watcher
+
+        if watcher_to_stop and hasattr(watcher_to_stop, "stop"):
+            watcher_to_stop.stop()
+
+    def _publish(self, namespace: str, hub_watch: _HubWatch, event_type: str, obj):
+        """Apply an upstream event to the snapshot and send it to every worker."""
+        if obj is None:
+            return
+
+        if event_type == "INITIAL" and isinstance(obj, dict) and "items" in obj:
+            items = {
+                _object_key(item) or (None, index): json.dumps(item).encode()
+                for index, item in enumerate(obj["items"] or [])
+            }
+            resource_version = (obj.get("metadata") or {}).get("resourceVersion")
+            line = _initial_line(items.values(), resource_version)
+        else:
+            items, resource_version = None, None
+            object_json = json.dumps(obj).encode()
+            line = _event_line(event_type, object_json)
+
+        # Sending only queues the line, the hub lock keeps the lines in order.
+        with self._lock:
+            if self._watches.get(namespace) is not hub_watch:
+                return
+
+            if items is not None:
+                hub_watch.snapshot = items
+                hub_watch.resource_version = resource_version
+            else:
+                _apply_event(hub_watch, event_type, obj, object_json)
+            for subscriber in list(hub_watch.subscribers):
+                if not subscriber.send(line):
+                    hub_watch.subscribers.discard(subscriber)
+
+
+class RemoteWatcher:
+    """
+    Receives the events of a namespace watch from the pod's watch hub.
+
+    Takes over the ownership of the hub when no owner is listening.
+    """
+
+    def __init__(self, hub: WatchHub, namespace: str, callback: Callable):
+        """
+        Initialize the remote watcher.
+
+        Args:
+            hub: The watch hub of the pod
+            namespace: The namespace to watch
+            callback: Callback function(event_type, obj) to handle events
+        """
+        self._hub = hub
+        self._namespace = namespace
+        self._callback = callback
+        self._stop_event = threading.Event()
+        self._connection: Optional[socket.socket] = None
+        self._thread = None
+
+    def start(self):
+        """Start receiving events in a background thread."""
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """Stop receiving events."""
+        self._stop_event.set()
+        connection = self._connection
+        if connection:
+            with suppress(OSError):
+                connection.shutdown(socket.SHUT_RDWR)
+        if self._thread and self._thread is not threading.current_thread():
+            self._thread.join(timeout=5)
+
+    def _run(self):
+        while not self._stop_event.is_set():
+            connection = self._connect()
+            if connection is None:
+                self._stop_event.wait(RECONNECT_SECONDS)
+                continue
+
+            self._connection = connection
+            try:
+                request = json.dumps({"namespace": self._namespace}) + "\n"
+                connection.sendall(request.encode())
+                for line in connection.makefile("rb"):
+                    if self._stop_event.is_set():
+                        break
+                    event = json.loads(line)
+                    obj = (
+                        {"items": event["items"], "metadata": event.get("metadata")}
+                        if "items" in event
+                        else event.get("object")
+                    )
+                    self._callback(event["type"], obj)
+            except (OSError, ValueError) as e:
+                log.warning(f"Watch hub connection for {self._namespace} failed: {e}")
+            finally:
+                self._connection = None
+                with suppress(OSError):
+                    connection.close()
+
+            if not self._stop_event.is_set():
+                log.info(f"Reconnecting to the watch hub for {self._namespace}")
+                self._stop_event.wait(RECONNECT_SECONDS)
+
+    def _connect(self) -> Optional[socket.socket]:
+        """Connect to the hub, taking over the ownership if nobody listens."""
+        for attempt in range(2):
+            connection = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            try:
+                connection.connect(self._hub.socket_path)
+                return connection
+            except OSError:
+                connection.close()
+
+            if attempt == 0 and not self._hub.try_acquire():
+                return None
+        return None
+
+
+def _event_line(event_type: str, object_json: bytes) -> bytes:
+    return b'{"type": %s, "object": %s}\n' % (
+        json.dumps(event_type).encode(),
+        object_json,
+    )
+
+
+def _initial_line(items, resource_version: Optional[str]) -> bytes:
+    """Encode a snapshot from the JSON of its objects."""
+    metadata = json.dumps({"resourceVersion": resource_version}).encode()
+    return b'{"type": "INITIAL", "items": [%s], "metadata": %s}\n' % (
+        b", ".join(items),
+        metadata,
+    )
+
+
+def _snapshot_line(hub_watch: _HubWatch) -> bytes:
+    return _initial_line(hub_watch.snapshot.values(), hub_watch.resource_version)
+
+
+def _object_key(obj: Any):
+    metadata = obj.get("metadata") or {} if isinstance(obj, dict) else {}
+    if not metadata.get("name"):
+        return None
+    return metadata.get("namespace"), metadata["name"]
+
+
+def _apply_event(hub_watch: _HubWatch, event_type: str, obj: Any, object_json: bytes):
+    """Apply an object event to the replay snapshot of a hub watch (lock held)."""
+    object_key = _object_key(obj)
+    if hub_watch.snapshot is None or object_key is None:
+        return
+
+    if event_type == "DELETED":
+        hub_watch.snapshot.pop(object_key, None)
+    elif event_type in ("ADDED", "MODIFIED"):
+        hub_watch.snapshot[object_key] = object_json
+    else:
+        return
+    hub_watch.resource_version = obj["metadata"].get("resourceVersion") or (
+        hub_watch.resource_version
+    )
+
+
+def from_environment(source_factory: Callable) -> Optional[WatchHub]:
+    """Return the watch hub configured by SSE_WATCH_HUB_SOCKET, if any."""
+    socket_path = os.environ.get("SSE_WATCH_HUB_SOCKET", "").strip()
+    if not socket_path:
+        return None
+    return WatchHub(socket_path, source_factory)
@@ -0,0 +1,247 @@
+"""Tests for the watch hub shared by the workers of a pod.
+
+Run directly with:
+    python3 backend/apps/common/sse/hub_test.py
+"""
+
+import importlib.util
+import logging as python_logging
+import json
+import multiprocessing
+import os
+from pathlib import Path
+from queue import Empty
+import socket
+import sys
+import tempfile
+import threading
+import time
+import types
+import unittest
+
+
+def _load_hub_module():
+    """Load hub.py with a lightweight stub for the kubeflow logging module."""
+    kubeflow = types.ModuleType("kubeflow")
+    kubeflow_kubeflow = types.ModuleType("kubeflow.kubeflow")
+    crud_backend = types.ModuleType("kubeflow.kubeflow.crud_backend")
+    crud_backend.logging = types.SimpleNamespace(
+        getLogger=lambda name: python_logging.getLogger(name)
+    )
+    sys.modules.setdefault("kubeflow", kubeflow)
+    sys.modules.setdefault("kubeflow.kubeflow", kubeflow_kubeflow)
+    sys.modules.setdefault("kubeflow.kubeflow.crud_backend", crud_backend)
+
+    module_path = Path(__file__).with_name("hub.py")
+    spec = importlib.util.spec_from_file_location("sse_hub_under_test", module_path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+hub_module = _load_hub_module()
+WatchHub = hub_module.WatchHub
+RemoteWatcher = hub_module.RemoteWatcher
+
+TIMEOUT = 10
+
+
+def _isvc(name, generation=1):
+    return {"metadata": {"namespace": "ns", "name": name, "generation": generation}}
+
+
+class FakeSource:
+    """Emits a snapshot and then a MODIFIED event every few milliseconds."""
+
+    def __init__(self, namespace, callback, started):
+        started.put(os.getpid())
+        self._callback = callback
+        self._stop_event = threading.Event()
+        threading.Thread(target=self._run, daemon=True).start()
+
+    def _run(self):
+        self._callback("INITIAL", {"items": [_isvc("a"), _isvc("b")]})
+        generation = 1
+        while not self._stop_event.wait(0.05):
+            generation += 1
+            self._callback("MODIFIED", _isvc("a", generation))
+
+    def stop(self):
+        self._stop_event.set()
+
+
+def _worker(socket_path, started, received, stop_event):
+    """A gunicorn worker streaming the namespace through the hub."""
+
+    def source_factory(namespace, callback):
+        return FakeSource(namespace, callback, started)
+
+    def callback(event_type, obj):
+        received.put((os.getpid(), event_type, obj))
+
+    hub = WatchHub(socket_path, source_factory)
+    watcher = RemoteWatcher(hub, "ns", callback).start()
+    stop_event.wait()
+    watcher.stop()
+    hub.close()
+
+
+class WatchHubTest(unittest.TestCase):
+    def setUp(self):
+        self.context = multiprocessing.get_context("fork")
+        self.directory = tempfile.TemporaryDirectory()
+        self.socket_path = os.path.join(self.directory.name, "watch-hub.sock")
+        self.started = self.context.Queue()
+        # Killing a worker may leave the queues and events it used locked, so
+        # every worker gets its own.
+        self.received = {}
+        self.stop_events = []
+        self.workers = []
+
+    def tearDown(self):
+        for worker, stop_event in zip(self.workers, self.stop_events):
+            if worker.is_alive():
+                stop_event.set()
+            worker.join(TIMEOUT)
+            if worker.is_alive():
+                worker.kill()
+        self.directory.cleanup()
+
+    def _start_workers(self, count):
+        for _ in range(count):
+            received = self.context.Queue()
+            stop_event = self.context.Event()
+            worker = self.context.Process(
+                target=_worker,
+                args=(self.socket_path, self.started, received, stop_event),
+                daemon=True,
+            )
+            worker.start()
+            self.workers.append(worker)
+            self.stop_events.append(stop_event)
+            self.received[worker.pid] = received
+
+    def _wait_for_events(self, pids, predicate):
+        """Wait until every worker received an event matching the predicate."""
+        deadline = time.monotonic() + TIMEOUT
+        for pid in pids:
+            while True:
+                remaining = deadline - time.monotonic()
+                try:
+                    _, event_type, obj = self.received[pid].get(
+                        timeout=max(remaining, 0)
+                    )
+                except Empty:
+                    self.fail(f"Worker {pid} did not receive the expected event")
+                if predicate(event_type, obj):
+                    break
+
+    def test_workers_share_a_single_upstream_watch(self):
+        self._start_workers(3)
+        pids = {worker.pid for worker in self.workers}
+
+        owner = self.started.get(timeout=TIMEOUT)
+
+        self.assertIn(owner, pids)
+        self._wait_for_events(
+            pids,
+            lambda event_type, obj: event_type == "INITIAL"
+            and [item["metadata"]["name"] for item in obj["items"]] == ["a", "b"],
+        )
+        self._wait_for_events(pids, lambda event_type, obj: event_type == "MODIFIED")
+        with self.assertRaises(Empty):
+            self.started.get(timeout=0.5)
+
+    def test_late_worker_receives_the_current_snapshot(self):
+        self._start_workers(1)
+        self._wait_for_events(
+            {self.workers[0].pid},
+            lambda event_type, obj: event_type == "MODIFIED"
+            and obj["metadata"]["generation"] >= 3,
+        )
+
+        self._start_workers(1)
+
+        self._wait_for_events(
+            {self.workers[1].pid},
+            lambda event_type, obj: event_type == "INITIAL"
+            and obj["items"][0]["metadata"]["generation"] >= 3,
+        )
+        self.assertEqual(self.started.qsize(), 1)
+
+    def test_surviving_worker_takes_over_when_the_owner_dies(self):
+        self._start_workers(3)
+        owner = self.started.get(timeout=TIMEOUT)
+        survivors = {worker.pid for worker in self.workers} - {owner}
+        self._wait_for_events(
+            survivors, lambda event_type, obj: event_type == "MODIFIED"
+        )
+
+        next(worker for worker in self.workers if worker.pid == owner).kill()
+
+        new_owner = self.started.get(timeout=TIMEOUT)
+        self.assertIn(new_owner, survivors)
+        self._wait_for_events(
+            survivors, lambda event_type, obj: event_type == "INITIAL"
+        )
+        with self.assertRaises(Empty):
+            self.started.get(timeout=0.5)
+
+
+class HubPublishTest(unittest.TestCase):
+    def setUp(self):
+        self.callbacks = []
+        self.hub = WatchHub("unused.sock", self._source_factory)
+        self.connections = []
+
+    def tearDown(self):
+        for connection in self.connections:
+            connection.close()
+
+    def _source_factory(self, namespace, callback):
+        self.callbacks.append(callback)
+
+    def _subscribe(self):
+        hub_side, worker_side = socket.socketpair()
+        self.connections += [hub_side, worker_side]
+        subscriber = hub_module._Subscriber(hub_side)
+        self.hub._subscribe("ns", subscriber)
+        return subscriber, worker_side
+
+    def test_snapshot_keeps_the_resource_version(self):
+        self._subscribe()
+        modified = _isvc("b")
+        modified["metadata"]["resourceVersion"] = "8"
+        self.callbacks[0](
+            "INITIAL", {"items": [_isvc("a")], "metadata": {"resourceVersion": "7"}}
+        )
+        self.callbacks[0]("MODIFIED", modified)
+
+        _, worker_side = self._subscribe()
+        event = json.loads(worker_side.makefile("rb").readline())
+
+        self.assertEqual(event["metadata"], {"resourceVersion": "8"})
+        self.assertEqual(
+            [item["metadata"]["name"] for item in event["items"]], ["a", "b"]
+        )
+
+    def test_stuck_worker_does_not_block_the_others(self):
+        original_max_pending = hub_module.MAX_PENDING_LINES
+        hub_module.MAX_PENDING_LINES = 4
+        self.addCleanup(setattr, hub_module, "MAX_PENDING_LINES", original_max_pending)
+        stuck, _ = self._subscribe()
+        _, reading_side = self._subscribe()
+        reader = reading_side.makefile("rb")
+        large = {"metadata": {"namespace": "ns", "name": "a"}, "spec": "x" * 2**20}
+
+        start = time.monotonic()
+        for _ in range(8):
+            self.callbacks[0]("MODIFIED", large)
+            self.assertEqual(json.loads(reader.readline())["type"], "MODIFIED")
+
+        self.assertLess(time.monotonic() - start, TIMEOUT)
+        self.assertNotIn(stuck, self.hub._watches["ns"].subscribers)
+
+
+if __name__ == "__main__":
+    unittest.main()
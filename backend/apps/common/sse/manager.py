@@ -1,69 +1,131 @@
 """SSE Connection Manager for managing watch streams and client connections."""
 
-from copy import deepcopy
 import json
 import threading
-from typing import Dict, Set, Callable, Any, Tuple
-from queue import Queue, Full
+import time
+from typing import Dict, List, Set, Callable, Any, Optional, Tuple
 
 from kubeflow.kubeflow.crud_backend import logging
 
+from .event_log import EventCursor, EventLog
+
 log = logging.getLogger(__name__)
 
+# Marks a single watch served by the namespace watch of its namespace.
+_DERIVED = object()
+# Recent Kubernetes events kept in memory per involved object for replay.
+MAX_EVENTS_PER_OBJECT = 100
+# Time a watch and its event log outlive their last client. Browsers retry a
+# dropped EventSource after about 3 seconds, so a lone client reconnecting
+# with its Last-Event-ID still finds the log to resume from.
+DEFAULT_RELEASE_DELAY_SECONDS = 10
+
 
 class SSEConnectionManager:
     """Manages SSE connections and Kubernetes watch streams."""
 
-    def __init__(self):
-        """Initialize the SSE connection manager."""
+    def __init__(self, release_delay: float = 0):
+        """
+        Initialize the SSE connection manager.
+
+        Args:
+            release_delay: Seconds a watch is kept after its last client left
+        """
+        self._release_delay = release_delay
+        # Latest pending release of every watch key without clients.
+        self._pending_releases: Dict[str, Any] = {}
         self._namespace_watchers: Dict[str, Any] = {}
         self._single_watchers: Dict[str, Any] = {}
-        self._namespace_clients: Dict[str, Set[Queue]] = {}
-        self._single_clients: Dict[str, Set[Queue]] = {}
-        self._namespace_initial_events: Dict[str, Tuple[str, Any]] = {}
+        self._namespace_clients: Dict[str, Set[EventCursor]] = {}
+        self._single_clients: Dict[str, Set[EventCursor]] = {}
+        # Sequenced frames of every watch key, read by the clients' cursors.
+        self._event_logs: Dict[str, EventLog] = {}
+        # Replay snapshots of namespace watches, indexed by (namespace, name)
+        # in insertion order so that updates and deletes cost O(1).
+        self._namespace_snapshots: Dict[str, Dict[Tuple, Any]] = {}
         self._single_initial_events: Dict[str, Tuple[str, Any]] = {}
+        # Namespace, name and watcher factory of every single watch key.
+        self._single_factories: Dict[str, Tuple[str, str, Callable]] = {}
+        # Single watch keys derived from a namespace watch, by namespace watch
+        # key and (namespace, name).
+        self._derived_singles: Dict[str, Dict[Tuple, str]] = {}
+        # Namespace-wide Kubernetes event watches, their recent events indexed
+        # by involved (kind, name), and the per-object views clients read.
+        self._event_watchers: Dict[str, Any] = {}
+        self._event_indexes: Dict[str, Dict[Tuple, Dict[Tuple, Any]]] = {}
+        self._event_views: Dict[str, Dict[Tuple, str]] = {}
+        self._event_view_keys: Dict[str, Tuple[str, Tuple]] = {}
+        self._event_clients: Dict[str, Set[EventCursor]] = {}
+        # Sequence of the last event that changed the snapshot of a watch key.
+        self._snapshot_sequences: Dict[str, int] = {}
+        # resourceVersion the snapshot of a watch key is synchronized to.
+        self._snapshot_resource_versions: Dict[str, str] = {}
+        # Encoded INITIAL replay frames, cached until the next snapshot change.
+        self._replay_frames: Dict[str, Tuple[bytes, int]] = {}
         self._lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self._encode_stats = {
+            "framesEncoded": 0,
+            "bytesEncoded": 0,
+            "encodeSeconds": 0.0,
+            "lastFrameBytes": 0,
+            "lastEncodeSeconds": 0.0,
+            "replayFramesReused": 0,
+            "relistsReconciled": 0,
+            "relistChanges": 0,
+        }
 
     def register_namespace_watch(
-        self, namespace: str, client_queue: Queue, watcher_factory: Callable
+        self, namespace: str, client_cursor: EventCursor, watcher_factory: Callable
     ):
         """
         Register a client for namespace-scoped watch updates.
 
         Args:
             namespace: The namespace to watch
-            client_queue: Queue for sending events to the client
+            client_cursor: Cursor the client reads the shared event log with
             watcher_factory: Factory function to create a watcher if needed
         """
         watch_key = f"ns:{namespace}"
         start_watcher = False
         watcher_token = None
         callback = None
-        event_to_replay = None
+        dedicated_watchers = []
 
         with self._lock:
             if watch_key not in self._namespace_clients:
                 self._namespace_clients[watch_key] = set()
 
-            self._namespace_clients[watch_key].add(client_queue)
-            event_to_replay = self._namespace_initial_events.get(watch_key)
+            self._namespace_clients[watch_key].add(client_cursor)
+            self._attach_cursor(watch_key, client_cursor, self._namespace_replay_event)
 
             if watch_key not in self._namespace_watchers:
                 watcher_token = object()
                 self._namespace_watchers[watch_key] = watcher_token
                 start_watcher = True
+                dedicated_watchers = self._derive_namespace_singles(namespace)
 
                 def callback(event_type, obj):
-                    self._record_namespace_event(watch_key, event_type, obj)
-                    self._broadcast_to_clients(
-                        self._namespace_clients, watch_key, event_type, obj
+                    self._publish(
+                        watch_key, event_type, obj, self._record_namespace_event
                     )
+                    self._publish_derived(watch_key, event_type, obj)
 
-        if event_to_replay:
-            self._broadcast_to_client(client_queue, *event_to_replay)
+        for dedicated_watcher in dedicated_watchers:
+            if hasattr(dedicated_watcher, "stop"):
+                dedicated_watcher.stop()
 
         if start_watcher:
-            watcher = watcher_factory(namespace, callback)
+            try:
+                watcher = watcher_factory(namespace, callback)
+            except Exception:
+                with self._lock:
+                    singles_to_start = []
+                    if self._namespace_watchers.get(watch_key) is watcher_token:
+                        del self._namespace_watchers[watch_key]
+                        singles_to_start = self._undo_derived_singles(watch_key)
+                self._start_single_watchers(singles_to_start)
+                raise
             watcher_to_stop = None
 
             with self._lock:
@@ -79,168 +141,737 @@ class SSEConnectionManager:
                 watcher_to_stop.stop()
 
     def register_single_watch(
-        self, namespace: str, name: str, client_queue: Queue, watcher_factory: Callable
+        self,
+        namespace: str,
+        name: str,
+        client_cursor: EventCursor,
+        watcher_factory: Callable,
     ):
         """
         Register a client for single resource watch updates.
 
+        The watch is derived from the namespace watch of the namespace when
+        there is one, and only falls back to a dedicated watcher otherwise.
+
         Args:
             namespace: The namespace of the resource
             name: The name of the resource
-            client_queue: Queue for sending events to the client
+            client_cursor: Cursor the client reads the shared event log with
             watcher_factory: Factory function to create a watcher if needed
         """
         watch_key = f"single:{namespace}:{name}"
-        start_watcher = False
         watcher_token = None
-        callback = None
-        event_to_replay = None
 
         with self._lock:
             if watch_key not in self._single_clients:
                 self._single_clients[watch_key] = set()
+                self._single_factories[watch_key] = (namespace, name, watcher_factory)
 
-            self._single_clients[watch_key].add(client_queue)
-            event_to_replay = self._single_initial_events.get(watch_key)
+            self._single_clients[watch_key].add(client_cursor)
 
             if watch_key not in self._single_watchers:
-                watcher_token = object()
-                self._single_watchers[watch_key] = watcher_token
-                start_watcher = True
+                namespace_key = f"ns:{namespace}"
+                if namespace_key in self._namespace_watchers:
+                    self._derive_single(namespace_key, watch_key)
+                else:
+                    watcher_token = object()
+                    self._single_watchers[watch_key] = watcher_token
 
-                def callback(event_type, obj):
-                    self._record_single_event(watch_key, event_type, obj)
-                    self._broadcast_to_clients(
-                        self._single_clients, watch_key, event_type, obj
-                    )
+            self._attach_cursor(
+                watch_key, client_cursor, self._single_initial_events.get
+            )
 
-        if event_to_replay:
-            self._broadcast_to_client(client_queue, *event_to_replay)
+        if watcher_token:
+            self._start_single_watcher(watch_key, watcher_token)
 
-        if start_watcher:
+    def _start_single_watcher(self, watch_key: str, watcher_token: Any):
+        """Start the dedicated watcher of a single watch key."""
+        with self._lock:
+            if watch_key not in self._single_factories:
+                return
+            namespace, name, watcher_factory = self._single_factories[watch_key]
+
+        def callback(event_type, obj):
+            self._publish(watch_key, event_type, obj, self._record_single_event)
+
+        try:
             watcher = watcher_factory(namespace, name, callback)
-            watcher_to_stop = None
+        except Exception:
+            with self._lock:
+                if self._single_watchers.get(watch_key) is watcher_token:
+                    del self._single_watchers[watch_key]
+            raise
+        watcher_to_stop = None
+
+        with self._lock:
+            if (
+                self._single_watchers.get(watch_key) is watcher_token
+                and watch_key in self._single_clients
+            ):
+                self._single_watchers[watch_key] = watcher
+            else:
+                watcher_to_stop = watcher
 
+        if watcher_to_stop and hasattr(watcher_to_stop, "stop"):
+            watcher_to_stop.stop()
+
+    def _derive_single(self, namespace_key: str, watch_key: str):
+        """
+        Serve a single watch key from a namespace watch (lock held).
+
+        A new single watch key is seeded with the object from the namespace
+        snapshot, or told that the object does not exist, so that its clients
+        do not wait for the next event of the namespace.
+        """
+        namespace, name, _ = self._single_factories[watch_key]
+        object_key = (namespace, name)
+        self._single_watchers[watch_key] = _DERIVED
+        self._derived_singles.setdefault(namespace_key, {})[object_key] = watch_key
+
+        snapshot = self._namespace_snapshots.get(namespace_key)
+        if snapshot is None or watch_key in self._single_initial_events:
+            return
+
+        if watch_key not in self._event_logs:
+            self._event_logs[watch_key] = EventLog()
+        event_log = self._event_logs[watch_key]
+        item = snapshot.get(object_key)
+        if item is None:
+            message = {"message": f"Resource not found: {namespace}/{name}"}
+            event_log.append(self._encode_event("ERROR", message))
+            return
+
+        self._single_initial_events[watch_key] = ("INITIAL", item)
+        self._snapshot_sequences[watch_key] = event_log.reset()
+        self._replay_frames.pop(watch_key, None)
+
+    def _derive_namespace_singles(self, namespace: str) -> List[Any]:
+        """
+        Derive the single watches of a namespace from its new namespace watch.
+
+        Called with the lock held.
+
+        Returns:
+            The dedicated watchers the derived watches no longer need
+        """
+        namespace_key = f"ns:{namespace}"
+        dedicated_watchers = []
+        for watch_key, (single_namespace, _, _) in self._single_factories.items():
+            watcher = self._single_watchers.get(watch_key)
+            if single_namespace != namespace or watcher is _DERIVED:
+                continue
+            self._derive_single(namespace_key, watch_key)
+            if watcher is not None:
+                dedicated_watchers.append(watcher)
+        return dedicated_watchers
+
+    def _publish_derived(self, namespace_key: str, event_type: str, obj: Any):
+        """
+        Forward a namespace watch event to the single watches derived from it.
+
+        Args:
+            namespace_key: The namespace watch key that received the event
+            event_type: The type of event (INITIAL, ADDED, MODIFIED, etc.)
+            obj: The Kubernetes object or the namespace snapshot
+        """
+        if event_type not in ("INITIAL", "ERROR"):
             with self._lock:
-                if (
-                    self._single_watchers.get(watch_key) is watcher_token
-                    and watch_key in self._single_clients
-                ):
-                    self._single_watchers[watch_key] = watcher
-                else:
-                    watcher_to_stop = watcher
+                derived = self._derived_singles.get(namespace_key)
+                watch_key = derived.get(self._object_key(obj)) if derived else None
+            if watch_key:
+                self._publish(watch_key, event_type, obj, self._record_single_event)
+            return
 
-            if watcher_to_stop and hasattr(watcher_to_stop, "stop"):
-                watcher_to_stop.stop()
+        # Only snapshots and errors concern every derived single watch.
+        with self._lock:
+            derived = dict(self._derived_singles.get(namespace_key) or {})
+            if not derived:
+                return
+            snapshot = self._namespace_snapshots.get(namespace_key) or {}
+            items = {object_key: snapshot.get(object_key) for object_key in derived}
+            previous_events = {
+                watch_key: self._single_initial_events.get(watch_key)
+                for watch_key in derived.values()
+            }
+
+        if event_type == "INITIAL":
+            # Relisted snapshots are reconciled per single watch key.
+            for object_key, watch_key in derived.items():
+                item = items[object_key]
+                previous = previous_events[watch_key]
+                if item is not None:
+                    self._publish(watch_key, "INITIAL", item, self._record_single_event)
+                elif previous is None:
+                    namespace, name = object_key
+                    message = {"message": f"Resource not found: {namespace}/{name}"}
+                    self._publish(
+                        watch_key, "ERROR", message, self._record_single_event
+                    )
+                elif previous[0] == "INITIAL":
+                    self._publish(
+                        watch_key, "DELETED", previous[1], self._record_single_event
+                    )
+        else:
+            for watch_key in derived.values():
+                self._publish(watch_key, event_type, obj, self._record_single_event)
 
-    def unregister_namespace_watch(self, namespace: str, client_queue: Queue):
+    def unregister_namespace_watch(self, namespace: str, client_cursor: EventCursor):
         """
         Unregister a client from namespace-scoped watch updates.
 
         Args:
             namespace: The namespace being watched
-            client_queue: The client's queue to remove
+            client_cursor: The client's cursor to remove
         """
         watch_key = f"ns:{namespace}"
-        watcher_to_stop = None
-
         with self._lock:
-            if watch_key in self._namespace_clients:
-                self._namespace_clients[watch_key].discard(client_queue)
+            if not self._remove_client(
+                self._namespace_clients, watch_key, client_cursor
+            ):
+                return
+        self._release_when_idle(
+            watch_key, lambda: self._release_namespace_watch(namespace)
+        )
 
-                if not self._namespace_clients[watch_key]:
-                    del self._namespace_clients[watch_key]
-                    self._namespace_initial_events.pop(watch_key, None)
-                    watcher_to_stop = self._namespace_watchers.pop(watch_key, None)
+    def _release_namespace_watch(self, namespace: str):
+        """Stop the namespace watch of a namespace unless clients came back."""
+        watch_key = f"ns:{namespace}"
+        with self._lock:
+            if self._namespace_clients.get(watch_key) != set():
+                return
+            del self._namespace_clients[watch_key]
+            self._namespace_snapshots.pop(watch_key, None)
+            self._release_event_log(watch_key)
+            watcher_to_stop = self._namespace_watchers.pop(watch_key, None)
+            singles_to_start = self._undo_derived_singles(watch_key)
 
         if watcher_to_stop and hasattr(watcher_to_stop, "stop"):
             watcher_to_stop.stop()
 
-    def unregister_single_watch(self, namespace: str, name: str, client_queue: Queue):
+        self._start_single_watchers(singles_to_start)
+
+    def _undo_derived_singles(self, namespace_key: str) -> List[Tuple[str, Any]]:
+        """
+        Detach the single watches derived from a namespace watch (lock held).
+
+        Returns:
+            The single watch keys with clients and the tokens of the dedicated
+            watchers to start for them
+        """
+        singles_to_start = []
+        for single_key in self._derived_singles.pop(namespace_key, {}).values():
+            if self._single_clients.get(single_key):
+                watcher_token = object()
+                self._single_watchers[single_key] = watcher_token
+                singles_to_start.append((single_key, watcher_token))
+            else:
+                # Started again if a client comes back before its release.
+                self._single_watchers.pop(single_key, None)
+        return singles_to_start
+
+    def _start_single_watchers(self, singles_to_start: List[Tuple[str, Any]]):
+        """Start dedicated watchers, reporting those that cannot start."""
+        for single_key, watcher_token in singles_to_start:
+            try:
+                self._start_single_watcher(single_key, watcher_token)
+            except Exception as e:
+                log.error(f"Cannot start the watch of {single_key}: {e}")
+                self._publish(
+                    single_key, "ERROR", {"message": str(e)}, self._record_single_event
+                )
+
+    def unregister_single_watch(
+        self, namespace: str, name: str, client_cursor: EventCursor
+    ):
         """
         Unregister a client from single resource watch updates.
 
         Args:
             namespace: The namespace of the resource
             name: The name of the resource
-            client_queue: The client's queue to remove
+            client_cursor: The client's cursor to remove
         """
         watch_key = f"single:{namespace}:{name}"
-        watcher_to_stop = None
-
         with self._lock:
-            if watch_key in self._single_clients:
-                self._single_clients[watch_key].discard(client_queue)
+            if not self._remove_client(self._single_clients, watch_key, client_cursor):
+                return
+        self._release_when_idle(
+            watch_key, lambda: self._release_single_watch(namespace, name)
+        )
 
-                if not self._single_clients[watch_key]:
-                    del self._single_clients[watch_key]
-                    self._single_initial_events.pop(watch_key, None)
-                    watcher_to_stop = self._single_watchers.pop(watch_key, None)
+    def _release_single_watch(self, namespace: str, name: str):
+        """Stop the watch of a single resource unless clients came back."""
+        watch_key = f"single:{namespace}:{name}"
+        with self._lock:
+            if self._single_clients.get(watch_key) != set():
+                return
+            del self._single_clients[watch_key]
+            del self._single_factories[watch_key]
+            self._single_initial_events.pop(watch_key, None)
+            self._release_event_log(watch_key)
+            watcher_to_stop = self._single_watchers.pop(watch_key, None)
+            derived = self._derived_singles.get(f"ns:{namespace}")
+            if derived is not None:
+                derived.pop((namespace, name), None)
 
         if watcher_to_stop and hasattr(watcher_to_stop, "stop"):
             watcher_to_stop.stop()
 
-    def _broadcast_to_clients(
+    def register_event_watch(
         self,
-        clients_by_key: Dict[str, Set[Queue]],
-        watch_key: str,
-        event_type: str,
-        obj: Any,
+        namespace: str,
+        kind: str,
+        name: str,
+        client_cursor: EventCursor,
+        watcher_factory: Callable,
     ):
         """
-        Broadcast an event to all clients registered for a watch key.
+        Register a client for the Kubernetes events of an object.
+
+        Every namespace has a single event watch. Its events are indexed by
+        involved object and each client reads the view of its object.
 
         Args:
-            clients_by_key: Mapping of watch keys to client queues
-            watch_key: The watch key that received an event
-            event_type: The type of event (ADDED, MODIFIED, DELETED, etc.)
-            obj: The Kubernetes object
+            namespace: The namespace of the object
+            kind: The kind of the involved object
+            name: The name of the involved object
+            client_cursor: Cursor the client reads the shared event log with
+            watcher_factory: Factory function(namespace, callback) to create
+                the namespace event watcher if needed
         """
+        namespace_key = f"events:{namespace}"
+        watch_key = f"events:{namespace}:{kind}:{name}"
+        start_watcher = False
+        watcher_token = None
+        callback = None
+
         with self._lock:
-            client_queues = list(clients_by_key.get(watch_key, set()))
+            if watch_key not in self._event_clients:
+                self._event_clients[watch_key] = set()
+                self._event_view_keys[watch_key] = (namespace_key, (kind, name))
+                views = self._event_views.setdefault(namespace_key, {})
+                views[(kind, name)] = watch_key
+                if namespace_key in self._event_indexes:
+                    # Served from memory until the next event of the object.
+                    event_log = self._event_logs.setdefault(watch_key, EventLog())
+                    self._snapshot_sequences[watch_key] = event_log.reset()
+
+            self._event_clients[watch_key].add(client_cursor)
+            self._attach_cursor(watch_key, client_cursor, self._event_replay_event)
+
+            if namespace_key not in self._event_watchers:
+                watcher_token = object()
+                self._event_watchers[namespace_key] = watcher_token
+                start_watcher = True
 
-        for client_queue in client_queues:
-            self._broadcast_to_client(client_queue, event_type, obj)
+                def callback(event_type, obj):
+                    self._publish_namespace_events(namespace_key, event_type, obj)
 
-    def _record_namespace_event(self, watch_key: str, event_type: str, obj: Any):
+        if start_watcher:
+            try:
+                watcher = watcher_factory(namespace, callback)
+            except Exception:
+                with self._lock:
+                    if self._event_watchers.get(namespace_key) is watcher_token:
+                        del self._event_watchers[namespace_key]
+                raise
+            watcher_to_stop = None
+
+            with self._lock:
+                if self._event_watchers.get(
+                    namespace_key
+                ) is watcher_token and self._event_views.get(namespace_key):
+                    self._event_watchers[namespace_key] = watcher
+                else:
+                    watcher_to_stop = watcher
+
+            if watcher_to_stop and hasattr(watcher_to_stop, "stop"):
+                watcher_to_stop.stop()
+
+    def unregister_event_watch(
+        self, namespace: str, kind: str, name: str, client_cursor: EventCursor
+    ):
+        """
+        Unregister a client from the Kubernetes events of an object.
+
+        Args:
+            namespace: The namespace of the object
+            kind: The kind of the involved object
+            name: The name of the involved object
+            client_cursor: The client's cursor to remove
+        """
+        watch_key = f"events:{namespace}:{kind}:{name}"
         with self._lock:
-            if event_type == "INITIAL":
-                self._namespace_initial_events[watch_key] = (event_type, deepcopy(obj))
+            if not self._remove_client(self._event_clients, watch_key, client_cursor):
                 return
+        self._release_when_idle(
+            watch_key, lambda: self._release_event_view(namespace, kind, name)
+        )
+
+    def _release_event_view(self, namespace: str, kind: str, name: str):
+        """Drop the event view of an object unless clients came back."""
+        namespace_key = f"events:{namespace}"
+        watch_key = f"events:{namespace}:{kind}:{name}"
+        watcher_to_stop = None
 
-            cached_event = self._namespace_initial_events.get(watch_key)
-            if not cached_event or not isinstance(obj, dict):
+        with self._lock:
+            if self._event_clients.get(watch_key) != set():
                 return
+            del self._event_clients[watch_key]
+            del self._event_view_keys[watch_key]
+            self._release_event_log(watch_key)
+            views = self._event_views.get(namespace_key, {})
+            views.pop((kind, name), None)
 
-            _, snapshot = cached_event
-            if not isinstance(snapshot, dict) or "items" not in snapshot:
-                return
+            if not views:
+                self._event_views.pop(namespace_key, None)
+                self._event_indexes.pop(namespace_key, None)
+                watcher_to_stop = self._event_watchers.pop(namespace_key, None)
+
+        if watcher_to_stop and hasattr(watcher_to_stop, "stop"):
+            watcher_to_stop.stop()
+
+    def _publish_namespace_events(self, namespace_key: str, event_type: str, obj: Any):
+        """
+        Index an event of a namespace event watch and publish it to its view.
 
-            object_key = self._object_key(obj)
-            if not object_key:
+        Args:
+            namespace_key: The namespace event watch key that received it
+            event_type: The type of watch event (INITIAL, ADDED, etc.)
+            obj: The Kubernetes event, or the list of events for INITIAL
+        """
+        if obj is None:
+            return
+
+        with self._lock:
+            if namespace_key not in self._event_watchers:
                 return
+            views = self._event_views.get(namespace_key) or {}
 
-            items = list(snapshot.get("items", []))
-            if event_type in ("ADDED", "MODIFIED"):
-                next_obj = deepcopy(obj)
-                for index, item in enumerate(items):
-                    if self._object_key(item) == object_key:
-                        items[index] = next_obj
-                        break
+            if event_type == "INITIAL":
+                index = {}
+                for item in obj.get("items") or []:
+                    self._index_event(index, item)
+                self._event_indexes[namespace_key] = index
+                targets = [
+                    (watch_key, {"items": list(index.get(involved, {}).values())})
+                    for involved, watch_key in views.items()
+                ]
+            elif event_type == "ERROR":
+                targets = [(watch_key, obj) for watch_key in views.values()]
+            elif event_type in ("ADDED", "MODIFIED", "DELETED"):
+                index = self._event_indexes.get(namespace_key)
+                involved = self._involved_key(obj)
+                if index is None or involved is None:
+                    return
+                if event_type == "DELETED":
+                    index.get(involved, {}).pop(self._object_key(obj), None)
                 else:
-                    items.append(next_obj)
-            elif event_type == "DELETED":
-                items = [item for item in items if self._object_key(item) != object_key]
+                    self._index_event(index, obj)
+                watch_key = views.get(involved)
+                targets = [(watch_key, obj)] if watch_key else []
+            else:
+                return
+
+        for watch_key, event_obj in targets:
+            self._publish(watch_key, event_type, event_obj, self._record_event_view)
+
+    def _index_event(self, index: Dict[Tuple, Dict[Tuple, Any]], event: Any):
+        """Add an event to the index of its involved object (lock held)."""
+        involved = self._involved_key(event)
+        object_key = self._object_key(event)
+        if involved is None or object_key is None:
+            return
+
+        events = index.setdefault(involved, {})
+        events.pop(object_key, None)
+        events[object_key] = event
+        while len(events) > MAX_EVENTS_PER_OBJECT:
+            del events[next(iter(events))]
+
+    def _involved_key(self, event: Any) -> Optional[Tuple[str, str]]:
+        if not isinstance(event, dict):
+            return None
+        involved = event.get("involvedObject") or {}
+        if not involved.get("name"):
+            return None
+        return involved.get("kind"), involved["name"]
+
+    def _record_event_view(self, watch_key: str, event_type: str, obj: Any) -> bool:
+        """Events of a view change its replay, which is read from the index."""
+        return event_type != "ERROR"
+
+    def _event_replay_event(self, watch_key: str) -> Optional[Tuple[str, Any]]:
+        """Build the INITIAL replay event of a view from the index (lock held)."""
+        namespace_key, involved = self._event_view_keys.get(watch_key, (None, None))
+        index = self._event_indexes.get(namespace_key)
+        if index is None:
+            return None
+        return "INITIAL", {"items": list(index.get(involved, {}).values())}
+
+    def _attach_cursor(
+        self, watch_key: str, client_cursor: EventCursor, build_replay_event: Callable
+    ):
+        """Attach a client's cursor to the event log of a watch key (lock held)."""
+        if watch_key not in self._event_logs:
+            self._event_logs[watch_key] = EventLog()
+
+        client_cursor.attach(
+            self._event_logs[watch_key],
+            lambda: self._replay(watch_key, build_replay_event),
+            has_snapshot=watch_key in self._snapshot_sequences,
+        )
+
+    def _remove_client(
+        self, clients: Dict[str, Set[EventCursor]], watch_key: str, client_cursor
+    ) -> bool:
+        """
+        Remove a client's cursor from a watch key (lock held).
+
+        The emptied set of clients is kept until the watch key is released.
+
+        Returns:
+            Whether it was the last client of the watch key
+        """
+        client_cursors = clients.get(watch_key)
+        if not client_cursors:
+            return False
+        client_cursors.discard(client_cursor)
+        return not client_cursors
+
+    def _release_when_idle(self, watch_key: str, release: Callable):
+        """
+        Release a watch key without clients after the release delay.
+
+        The release of a watch key is superseded when its clients leave again,
+        and does nothing if clients came back in the meantime.
+        """
+        if self._release_delay <= 0:
+            release()
+            return
+
+        release_token = object()
+        with self._lock:
+            self._pending_releases[watch_key] = release_token
+
+        def release_if_latest():
+            with self._lock:
+                if self._pending_releases.get(watch_key) is not release_token:
+                    return
+                del self._pending_releases[watch_key]
+            release()
+
+        timer = threading.Timer(self._release_delay, release_if_latest)
+        timer.daemon = True
+        timer.start()
+
+    def _release_event_log(self, watch_key: str):
+        """Drop the event log and replay state of a watch key (lock held)."""
+        event_log = self._event_logs.pop(watch_key, None)
+        if event_log:
+            event_log.close()
+        self._snapshot_sequences.pop(watch_key, None)
+        self._snapshot_resource_versions.pop(watch_key, None)
+        self._replay_frames.pop(watch_key, None)
+
+    def cached_namespace(self, namespace: str) -> Optional[Tuple[List[Any], str]]:
+        """
+        Return the InferenceServices of a namespace from its watch snapshot.
+
+        Returns:
+            The objects and the resourceVersion of the snapshot, None if the
+            namespace is not watched or not listed yet
+        """
+        watch_key = f"ns:{namespace}"
+        with self._lock:
+            snapshot = self._namespace_snapshots.get(watch_key)
+            if snapshot is None:
+                return None
+            items = list(snapshot.values())
+            return items, self._snapshot_resource_versions.get(watch_key)
+
+    def cached_object(self, namespace: str, name: str) -> Optional[Tuple[Any, str]]:
+        """
+        Return an InferenceService from the snapshot of a watch.
+
+        Returns:
+            The object and the resourceVersion of the snapshot, None if no
+            watch knows the object
+        """
+        namespace_key = f"ns:{namespace}"
+        single_key = f"single:{namespace}:{name}"
+        with self._lock:
+            snapshot = self._namespace_snapshots.get(namespace_key)
+            if snapshot is not None:
+                obj = snapshot.get((namespace, name))
+                watch_key = namespace_key
             else:
+                replay_type, obj = self._single_initial_events.get(
+                    single_key, (None, None)
+                )
+                obj = obj if replay_type == "INITIAL" else None
+                watch_key = single_key
+            if not isinstance(obj, dict):
+                return None
+            return obj, self._snapshot_resource_versions.get(watch_key)
+
+    def _publish(
+        self, watch_key: str, event_type: str, obj: Any, record_event: Callable
+    ):
+        """
+        Record a watch event and append it to the event log of its watch key.
+
+        Args:
+            watch_key: The watch key that received an event
+            event_type: The type of event (ADDED, MODIFIED, DELETED, etc.)
+            obj: The Kubernetes object
+            record_event: Applies the event to the snapshot of the watch key
+        """
+        if obj is None:
+            return
+
+        if event_type == "INITIAL":
+            with self._lock:
+                changes = self._relist_changes(watch_key, obj)
+            if changes is not None:
+                for change_type, changed_obj in changes:
+                    self._publish(watch_key, change_type, changed_obj, record_event)
+                with self._lock:
+                    self._record_resource_version(watch_key, obj)
+                with self._stats_lock:
+                    self._encode_stats["relistsReconciled"] += 1
+                    self._encode_stats["relistChanges"] += len(changes)
                 return
 
-            self._namespace_initial_events[watch_key] = ("INITIAL", {"items": items})
+        # Snapshots are not logged: cursors behind one reload the replay.
+        body = None if event_type == "INITIAL" else self._encode_event(event_type, obj)
 
-    def _record_single_event(self, watch_key: str, event_type: str, obj: Any):
         with self._lock:
-            if event_type in ("INITIAL", "ADDED", "MODIFIED", "DELETED"):
-                replay_type = "INITIAL" if event_type != "DELETED" else "DELETED"
-                self._single_initial_events[watch_key] = (replay_type, deepcopy(obj))
+            event_log = self._event_logs.get(watch_key)
+            if event_log is None:
+                return
+
+            changed = record_event(watch_key, event_type, obj)
+            if changed:
+                self._record_resource_version(watch_key, obj)
+            if body is None:
+                sequence = event_log.reset()
+            else:
+                object_key = self._object_key(obj) if event_type != "ERROR" else None
+                sequence = event_log.append(body, object_key)
+
+            if changed:
+                self._snapshot_sequences[watch_key] = sequence
+                self._replay_frames.pop(watch_key, None)
+
+    def _record_resource_version(self, watch_key: str, obj: Any):
+        """Keep the resourceVersion of a list or object event (lock held)."""
+        if watch_key not in self._event_logs or not isinstance(obj, dict):
+            return
+        resource_version = (obj.get("metadata") or {}).get("resourceVersion")
+        if resource_version:
+            self._snapshot_resource_versions[watch_key] = resource_version
+
+    def _record_namespace_event(
+        self, watch_key: str, event_type: str, obj: Any
+    ) -> bool:
+        """
+        Apply a watch event to the indexed replay snapshot of a namespace.
+
+        Objects are stored by reference: watchers hand over a freshly decoded
+        object for every event and never mutate it afterwards. Called with the
+        lock held.
+
+        Returns:
+            Whether the snapshot changed
+        """
+        if event_type == "INITIAL":
+            snapshot = {}
+            if isinstance(obj, dict):
+                for index, item in enumerate(obj.get("items") or []):
+                    snapshot[self._object_key(item) or (None, index)] = item
+            self._namespace_snapshots[watch_key] = snapshot
+            return True
+
+        if event_type not in ("ADDED", "MODIFIED", "DELETED"):
+            return False
+
+        object_key = self._object_key(obj)
+        snapshot = self._namespace_snapshots.get(watch_key)
+        if not object_key or snapshot is None:
+            return False
+
+        if event_type == "DELETED":
+            snapshot.pop(object_key, None)
+        else:
+            snapshot[object_key] = obj
+        return True
+
+    def _namespace_replay_event(self, watch_key: str) -> Optional[Tuple[str, Any]]:
+        """Build the INITIAL replay event from the snapshot index (lock held)."""
+        snapshot = self._namespace_snapshots.get(watch_key)
+        if snapshot is None:
+            return None
+        return "INITIAL", {"items": list(snapshot.values())}
+
+    def _record_single_event(self, watch_key: str, event_type: str, obj: Any) -> bool:
+        """Keep the latest state of a single resource for replay (lock held)."""
+        if event_type not in ("INITIAL", "ADDED", "MODIFIED", "DELETED"):
+            return False
+
+        replay_type = "INITIAL" if event_type != "DELETED" else "DELETED"
+        self._single_initial_events[watch_key] = (replay_type, obj)
+        return True
+
+    def _relist_changes(
+        self, watch_key: str, obj: Any
+    ) -> Optional[List[Tuple[str, Any]]]:
+        """
+        Compare a relisted snapshot with the current one (lock held).
+
+        Objects are matched by uid and resourceVersion, so a watch restart
+        sends the objects that changed instead of the whole list again.
+
+        Returns:
+            The ADDED, MODIFIED and DELETED events turning the current snapshot
+            into the relisted one, or None if the relist has to be sent as is
+        """
+        snapshot = self._namespace_snapshots.get(watch_key)
+        if snapshot is not None:
+            if not isinstance(obj, dict) or not isinstance(obj.get("items"), list):
+                return None
+
+            remaining = dict(snapshot)
+            changes = []
+            for item in obj["items"]:
+                object_key = self._object_key(item)
+                if object_key is None:
+                    return None
+                change_type = self._change_type(remaining.pop(object_key, None), item)
+                if change_type:
+                    changes.append((change_type, item))
+            changes.extend(("DELETED", previous) for previous in remaining.values())
+            return changes
+
+        initial_event = self._single_initial_events.get(watch_key)
+        if initial_event is None or not isinstance(obj, dict):
+            return None
+        previous = initial_event[1] if initial_event[0] == "INITIAL" else None
+        change_type = self._change_type(previous, obj)
+        return [(change_type, obj)] if change_type else []
+
+    def _change_type(self, previous: Any, current: Any) -> Optional[str]:
+        if not isinstance(previous, dict):
+            return "ADDED"
+        previous_metadata = previous.get("metadata") or {}
+        metadata = current.get("metadata") or {}
+        if previous_metadata.get("uid") != metadata.get("uid"):
+            return "ADDED"
+        if previous_metadata.get("resourceVersion") != metadata.get(
+            "resourceVersion"
+        ) or not metadata.get("resourceVersion"):
+            return "MODIFIED"
+        return None
 
     def _object_key(self, obj: Any):
         if not isinstance(obj, dict):
@@ -251,18 +882,53 @@ class SSEConnectionManager:
             return None
         return metadata.get("namespace"), name
 
-    def _broadcast_to_client(self, client_queue: Queue, event_type: str, obj: Any):
+    def _replay(
+        self, watch_key: str, build_replay_event: Callable
+    ) -> Optional[Tuple[bytes, int]]:
         """
-        Broadcast an event to a single client.
+        Return the encoded snapshot of a watch key, encoding it once per change.
+
+        Args:
+            watch_key: The watch key to replay
+            build_replay_event: Builds the replay event of the watch key (lock held)
+
+        Returns:
+            The snapshot frame and the sequence it is current at, if any
+        """
+        with self._lock:
+            cached = self._replay_frames.get(watch_key)
+            if cached is not None:
+                with self._stats_lock:
+                    self._encode_stats["replayFramesReused"] += 1
+                return cached
+
+            event = build_replay_event(watch_key)
+            sequence = self._snapshot_sequences.get(watch_key)
+            event_log = self._event_logs.get(watch_key)
+
+        if not event or event[1] is None or sequence is None or event_log is None:
+            return None
+
+        replay = event_log.frame(sequence, self._encode_event(*event)), sequence
+        with self._lock:
+            if (
+                self._snapshot_sequences.get(watch_key) == sequence
+                and self._event_logs.get(watch_key) is event_log
+            ):
+                self._replay_frames[watch_key] = replay
+        return replay
+
+    def _encode_event(self, event_type: str, obj: Any) -> bytes:
+        """
+        Serialize an event into an SSE frame and account for the encode cost.
 
         Args:
-            client_queue: The client's queue
             event_type: The type of event (ADDED, MODIFIED, DELETED, etc.)
             obj: The Kubernetes object
-        """
-        if obj is None:
-            return
 
+        Returns:
+            The encoded SSE frame
+        """
         if event_type == "INITIAL" and isinstance(obj, dict) and "items" in obj:
             event_data = {
                 "type": event_type,
@@ -274,10 +940,47 @@ class SSEConnectionManager:
                 "object": obj,
             }
 
-        try:
-            message = f"data: {json.dumps(event_data)}\n\n"
-            client_queue.put_nowait(message)
-        except Full:
-            log.warning(f"Client queue full, dropping event type={event_type}")
-        except Exception as e:
-            log.error(f"Error sending event to client: {e}")
+        start = time.perf_counter()
+        frame = f"data: {json.dumps(event_data)}\n\n".encode()
+        elapsed = time.perf_counter() - start
+
+        with self._stats_lock:
+            self._encode_stats["framesEncoded"] += 1
+            self._encode_stats["bytesEncoded"] += len(frame)
+            self._encode_stats["encodeSeconds"] += elapsed
+            self._encode_stats["lastFrameBytes"] = len(frame)
+            self._encode_stats["lastEncodeSeconds"] = elapsed
+
+        return frame
+
+    def stats(self) -> Dict[str, Any]:
+        """Return the encode counters, the event logs and the per-client lag."""
+        with self._stats_lock:
+            stats = dict(self._encode_stats)
+
+        frames = stats["framesEncoded"]
+        stats["meanFrameBytes"] = stats["bytesEncoded"] / frames if frames else 0
+        stats["meanEncodeSeconds"] = stats["encodeSeconds"] / frames if frames else 0
+
+        with self._lock:
+            event_logs = dict(self._event_logs)
+            clients_by_key = {
+                watch_key: list(client_cursors)
+                for clients in (
+                    self._namespace_clients,
+                    self._single_clients,
+                    self._event_clients,
+                )
+                for watch_key, client_cursors in clients.items()
+            }
+            derived_watches = sum(len(keys) for keys in self._derived_singles.values())
+
+        stats["derivedSingleWatches"] = derived_watches
+        stats["eventLogs"] = {
+            watch_key: event_log.stats() for watch_key, event_log in event_logs.items()
+        }
+        stats["clients"] = {
+            watch_key: [client_cursor.stats() for client_cursor in client_cursors]
+            for watch_key, client_cursors in clients_by_key.items()
+        }
+        return stats
@@ -0,0 +1,65 @@
+"""Benchmark for the namespace snapshot index of the SSE connection manager.
+
+Measures the cost of applying one MODIFIED event to the replay snapshot for
+growing namespace sizes. The per-event cost should stay flat.
+
+Run directly with:
+    python3 backend/apps/common/sse/manager_benchmark.py
+"""
+
+import random
+import time
+
+from manager_test import SSEConnectionManager
+
+NAMESPACE = "kubeflow-user"
+NAMESPACE_SIZES = (100, 1000, 2000, 5000, 10000)
+EVENTS_PER_SIZE = 20000
+
+
+def _inference_service(name, generation=0):
+    return {
+        "metadata": {
+            "namespace": NAMESPACE,
+            "name": name,
+            "resourceVersion": str(generation),
+        },
+        "status": {"conditions": [{"type": "Ready", "status": "True"}]},
+    }
+
+
+def benchmark_namespace_size(namespace_size):
+    """Return the mean microseconds spent per MODIFIED event."""
+    manager = SSEConnectionManager()
+    watch_key = f"ns:{NAMESPACE}"
+
+    names = [f"model-{index}" for index in range(namespace_size)]
+    manager._record_namespace_event(
+        watch_key,
+        "INITIAL",
+        {"items": [_inference_service(name) for name in names]},
+    )
+
+    events = [
+        _inference_service(random.choice(names), generation)
+        for generation in range(EVENTS_PER_SIZE)
+    ]
+
+    start = time.perf_counter()
+    for event in events:
+        manager._record_namespace_event(watch_key, "MODIFIED", event)
+    elapsed = time.perf_counter() - start
+
+    return elapsed / EVENTS_PER_SIZE * 1e6
+
+
+def main():
+    """Print the per-event cost for every namespace size."""
+    print(f"{'InferenceServices':>18} {'us/event':>10}")
+    for namespace_size in NAMESPACE_SIZES:
+        per_event = benchmark_namespace_size(namespace_size)
+        print(f"{namespace_size:>18} {per_event:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -8,8 +8,9 @@ import importlib.util
 import json
 import logging as python_logging
 from pathlib import Path
-from queue import Queue
+from queue import Empty
 import sys
+import time
 import types
 import unittest
 
@@ -30,14 +31,18 @@ def _load_manager_module():
         getLogger=lambda name: python_logging.getLogger(name)
     )
 
+    package = types.ModuleType("sse_under_test")
+    package.__path__ = [str(Path(__file__).parent)]
+
     try:
         sys.modules.setdefault("kubeflow", kubeflow)
         sys.modules.setdefault("kubeflow.kubeflow", kubeflow_kubeflow)
         sys.modules["kubeflow.kubeflow.crud_backend"] = crud_backend
+        sys.modules["sse_under_test"] = package
 
         module_path = Path(__file__).with_name("manager.py")
         spec = importlib.util.spec_from_file_location(
-            "sse_manager_under_test", module_path
+            "sse_under_test.manager", module_path
         )
         module = importlib.util.module_from_spec(spec)
         spec.loader.exec_module(module)
@@ -52,6 +57,18 @@ def _load_manager_module():
 
 manager_module = _load_manager_module()
 SSEConnectionManager = manager_module.SSEConnectionManager
+EventCursor = sys.modules["sse_under_test.event_log"].EventCursor
+
+
+def _isvc(name, resource_version):
+    return {
+        "metadata": {
+            "namespace": "kubeflow-user",
+            "name": name,
+            "uid": f"uid-{name}",
+            "resourceVersion": resource_version,
+        }
+    }
 
 
 class DummyWatcher:
@@ -64,14 +81,20 @@ class DummyWatcher:
 
 class SSEConnectionManagerTest(unittest.TestCase):
     def _message(self, queue):
-        raw = queue.get_nowait()
-        self.assertTrue(raw.startswith("data: "))
-        return json.loads(raw.removeprefix("data: ").strip())
+        raw = queue.get(timeout=0)
+        self.assertTrue(raw.startswith(b"id: "))
+        _, data = raw.split(b"\n", 1)
+        self.assertTrue(data.startswith(b"data: "))
+        return json.loads(data.removeprefix(b"data: ").strip())
+
+    def _events(self, queue):
+        message = self._message(queue)
+        return message["type"], message["object"]
 
     def test_namespace_watch_is_shared_and_broadcast_to_all_clients(self):
         manager = SSEConnectionManager()
-        first_queue = Queue()
-        second_queue = Queue()
+        first_queue = EventCursor()
+        second_queue = EventCursor()
         watcher = DummyWatcher()
         callbacks = []
 
@@ -104,8 +127,8 @@ class SSEConnectionManagerTest(unittest.TestCase):
 
     def test_namespace_watch_replays_initial_snapshot_to_late_client(self):
         manager = SSEConnectionManager()
-        first_queue = Queue()
-        second_queue = Queue()
+        first_queue = EventCursor()
+        second_queue = EventCursor()
         callbacks = []
 
         def watcher_factory(namespace, callback):
@@ -125,8 +148,8 @@ class SSEConnectionManagerTest(unittest.TestCase):
 
     def test_namespace_watch_replays_current_snapshot_to_late_client(self):
         manager = SSEConnectionManager()
-        first_queue = Queue()
-        second_queue = Queue()
+        first_queue = EventCursor()
+        second_queue = EventCursor()
         callbacks = []
 
         def watcher_factory(namespace, callback):
@@ -150,10 +173,376 @@ class SSEConnectionManagerTest(unittest.TestCase):
             },
         )
 
+    def test_namespace_snapshot_index_applies_updates_in_place_and_deletes(self):
+        manager = SSEConnectionManager()
+        first_queue = EventCursor()
+        second_queue = EventCursor()
+        callbacks = []
+
+        def watcher_factory(namespace, callback):
+            callbacks.append((namespace, callback))
+            return DummyWatcher()
+
+        manager.register_namespace_watch("kubeflow-user", first_queue, watcher_factory)
+        callbacks[0][1](
+            "INITIAL",
+            {
+                "items": [
+                    {"metadata": {"namespace": "kubeflow-user", "name": "model-a"}},
+                    {"metadata": {"namespace": "kubeflow-user", "name": "model-b"}},
+                    {"metadata": {"namespace": "kubeflow-user", "name": "model-c"}},
+                ]
+            },
+        )
+        callbacks[0][1](
+            "MODIFIED",
+            {
+                "metadata": {"namespace": "kubeflow-user", "name": "model-a"},
+                "status": {"ready": True},
+            },
+        )
+        callbacks[0][1](
+            "DELETED", {"metadata": {"namespace": "kubeflow-user", "name": "model-b"}}
+        )
+
+        manager.register_namespace_watch("kubeflow-user", second_queue, watcher_factory)
+
+        self.assertEqual(
+            self._message(second_queue),
+            {
+                "type": "INITIAL",
+                "items": [
+                    {
+                        "metadata": {"namespace": "kubeflow-user", "name": "model-a"},
+                        "status": {"ready": True},
+                    },
+                    {"metadata": {"namespace": "kubeflow-user", "name": "model-c"}},
+                ],
+            },
+        )
+
+    def test_watch_snapshots_serve_reads_until_the_last_client_leaves(self):
+        manager = SSEConnectionManager()
+        namespace_cursor = EventCursor()
+        single_cursor = EventCursor()
+        callbacks = []
+
+        def watcher_factory(namespace, callback):
+            callbacks.append(callback)
+            return DummyWatcher()
+
+        self.assertIsNone(manager.cached_namespace("kubeflow-user"))
+        manager.register_namespace_watch(
+            "kubeflow-user", namespace_cursor, watcher_factory
+        )
+        self.assertIsNone(manager.cached_namespace("kubeflow-user"))
+
+        callbacks[0](
+            "INITIAL",
+            {"metadata": {"resourceVersion": "5"}, "items": [_isvc("model-a", "4")]},
+        )
+        callbacks[0]("ADDED", _isvc("model-b", "6"))
+
+        self.assertEqual(
+            manager.cached_namespace("kubeflow-user"),
+            ([_isvc("model-a", "4"), _isvc("model-b", "6")], "6"),
+        )
+        self.assertEqual(
+            manager.cached_object("kubeflow-user", "model-a"),
+            (_isvc("model-a", "4"), "6"),
+        )
+        self.assertIsNone(manager.cached_object("kubeflow-user", "model-c"))
+
+        manager.unregister_namespace_watch("kubeflow-user", namespace_cursor)
+        self.assertIsNone(manager.cached_namespace("kubeflow-user"))
+
+        manager.register_single_watch(
+            "kubeflow-user",
+            "model-a",
+            single_cursor,
+            lambda namespace, name, callback: watcher_factory(namespace, callback),
+        )
+        callbacks[1]("INITIAL", _isvc("model-a", "7"))
+        self.assertEqual(
+            manager.cached_object("kubeflow-user", "model-a"),
+            (_isvc("model-a", "7"), "7"),
+        )
+        manager.unregister_single_watch("kubeflow-user", "model-a", single_cursor)
+        self.assertIsNone(manager.cached_object("kubeflow-user", "model-a"))
+
+    def test_namespace_event_is_encoded_once_for_all_clients(self):
+        manager = SSEConnectionManager()
+        queues = [EventCursor() for _ in range(3)]
+        callbacks = []
+
+        def watcher_factory(namespace, callback):
+            callbacks.append(callback)
+            return DummyWatcher()
+
+        for queue in queues:
+            manager.register_namespace_watch("kubeflow-user", queue, watcher_factory)
+
+        callbacks[0]("ADDED", {"metadata": {"name": "model-a"}})
+
+        frames = [queue.get(timeout=0) for queue in queues]
+        self.assertTrue(all(frame is frames[0] for frame in frames))
+        self.assertEqual(manager.stats()["framesEncoded"], 1)
+        self.assertEqual(
+            manager.stats()["bytesEncoded"], len(frames[0].split(b"\n", 1)[1])
+        )
+
+    def test_namespace_replay_frame_is_cached_until_next_change(self):
+        manager = SSEConnectionManager()
+        queues = [EventCursor() for _ in range(4)]
+        callbacks = []
+
+        def watcher_factory(namespace, callback):
+            callbacks.append(callback)
+            return DummyWatcher()
+
+        manager.register_namespace_watch("kubeflow-user", queues[0], watcher_factory)
+        callbacks[0]("INITIAL", {"items": [{"metadata": {"name": "model-a"}}]})
+        manager.register_namespace_watch("kubeflow-user", queues[1], watcher_factory)
+        manager.register_namespace_watch("kubeflow-user", queues[2], watcher_factory)
+
+        first_replay = queues[1].get(timeout=0)
+        self.assertIs(queues[2].get(timeout=0), first_replay)
+        self.assertEqual(manager.stats()["replayFramesReused"], 1)
+
+        callbacks[0]("ADDED", {"metadata": {"name": "model-b"}})
+        manager.register_namespace_watch("kubeflow-user", queues[3], watcher_factory)
+
+        self.assertEqual(
+            self._message(queues[3]),
+            {
+                "type": "INITIAL",
+                "items": [
+                    {"metadata": {"name": "model-a"}},
+                    {"metadata": {"name": "model-b"}},
+                ],
+            },
+        )
+
+    def test_lagging_client_receives_latest_state_of_each_object(self):
+        manager = SSEConnectionManager()
+        client_cursor = EventCursor()
+        callbacks = []
+
+        def watcher_factory(namespace, callback):
+            callbacks.append(callback)
+            return DummyWatcher()
+
+        manager.register_namespace_watch(
+            "kubeflow-user", client_cursor, watcher_factory
+        )
+        for generation in range(3):
+            callbacks[0](
+                "MODIFIED",
+                {"metadata": {"name": "model-a"}, "generation": generation},
+            )
+
+        self.assertEqual(
+            self._message(client_cursor),
+            {
+                "type": "MODIFIED",
+                "object": {"metadata": {"name": "model-a"}, "generation": 2},
+            },
+        )
+        client_stats = manager.stats()["clients"]["ns:kubeflow-user"][0]
+        self.assertEqual(client_stats["coalesced"], 2)
+        self.assertEqual(client_stats["pendingFrames"], 0)
+
+    def test_reconnecting_client_resumes_from_last_event_id(self):
+        manager = SSEConnectionManager()
+        steady_cursor = EventCursor()
+        first_cursor = EventCursor()
+        callbacks = []
+
+        def watcher_factory(namespace, callback):
+            callbacks.append(callback)
+            return DummyWatcher()
+
+        manager.register_namespace_watch(
+            "kubeflow-user", steady_cursor, watcher_factory
+        )
+        manager.register_namespace_watch("kubeflow-user", first_cursor, watcher_factory)
+        callbacks[0]("INITIAL", {"items": [{"metadata": {"name": "model-a"}}]})
+
+        initial_frame = first_cursor.get(timeout=0)
+        last_event_id = initial_frame.split(b"\n", 1)[0].removeprefix(b"id: ")
+        manager.unregister_namespace_watch("kubeflow-user", first_cursor)
+
+        callbacks[0]("ADDED", {"metadata": {"name": "model-b"}})
+
+        resumed_cursor = EventCursor(last_event_id.decode())
+        manager.register_namespace_watch(
+            "kubeflow-user", resumed_cursor, watcher_factory
+        )
+
+        self.assertEqual(
+            self._message(resumed_cursor),
+            {"type": "ADDED", "object": {"metadata": {"name": "model-b"}}},
+        )
+        self.assertEqual(resumed_cursor.stats()["snapshots"], 0)
+
+    def test_lone_client_resumes_within_the_release_delay(self):
+        manager = SSEConnectionManager(release_delay=0.2)
+        first_cursor = EventCursor()
+        watcher = DummyWatcher()
+        callbacks = []
+
+        def watcher_factory(namespace, callback):
+            callbacks.append(callback)
+            return watcher
+
+        manager.register_namespace_watch("kubeflow-user", first_cursor, watcher_factory)
+        callbacks[0]("INITIAL", {"items": [{"metadata": {"name": "model-a"}}]})
+        initial_frame = first_cursor.get(timeout=0)
+        last_event_id = initial_frame.split(b"\n", 1)[0].removeprefix(b"id: ")
+        manager.unregister_namespace_watch("kubeflow-user", first_cursor)
+
+        callbacks[0]("ADDED", {"metadata": {"name": "model-b"}})
+        resumed_cursor = EventCursor(last_event_id.decode())
+        manager.register_namespace_watch(
+            "kubeflow-user", resumed_cursor, watcher_factory
+        )
+
+        self.assertEqual(len(callbacks), 1)
+        self.assertEqual(
+            self._message(resumed_cursor),
+            {"type": "ADDED", "object": {"metadata": {"name": "model-b"}}},
+        )
+        self.assertTrue(resumed_cursor.stats()["resumed"])
+
+        manager.unregister_namespace_watch("kubeflow-user", resumed_cursor)
+        self.assertEqual(watcher.stop_calls, 0)
+        time.sleep(0.4)
+        self.assertEqual(watcher.stop_calls, 1)
+        self.assertEqual(manager.stats()["eventLogs"], {})
+
+    def test_client_with_unknown_last_event_id_receives_snapshot(self):
+        manager = SSEConnectionManager()
+        first_cursor = EventCursor()
+        callbacks = []
+
+        def watcher_factory(namespace, callback):
+            callbacks.append(callback)
+            return DummyWatcher()
+
+        manager.register_namespace_watch("kubeflow-user", first_cursor, watcher_factory)
+        callbacks[0]("INITIAL", {"items": [{"metadata": {"name": "model-a"}}]})
+
+        second_cursor = EventCursor("expired-epoch-42")
+        manager.register_namespace_watch(
+            "kubeflow-user", second_cursor, watcher_factory
+        )
+
+        self.assertEqual(
+            self._message(second_cursor),
+            {"type": "INITIAL", "items": [{"metadata": {"name": "model-a"}}]},
+        )
+
+    def test_namespace_relist_sends_only_changed_objects(self):
+        manager = SSEConnectionManager()
+        client_cursor = EventCursor()
+        callbacks = []
+
+        def watcher_factory(namespace, callback):
+            callbacks.append(callback)
+            return DummyWatcher()
+
+        def isvc(name, resource_version, uid=None):
+            return {
+                "metadata": {
+                    "namespace": "kubeflow-user",
+                    "name": name,
+                    "uid": uid or f"uid-{name}",
+                    "resourceVersion": resource_version,
+                }
+            }
+
+        manager.register_namespace_watch(
+            "kubeflow-user", client_cursor, watcher_factory
+        )
+        callbacks[0](
+            "INITIAL",
+            {
+                "items": [
+                    isvc("model-a", "1"),
+                    isvc("model-b", "2"),
+                    isvc("model-c", "3"),
+                ]
+            },
+        )
+        self.assertEqual(self._message(client_cursor)["type"], "INITIAL")
+
+        callbacks[0](
+            "INITIAL",
+            {
+                "items": [
+                    isvc("model-a", "1"),
+                    isvc("model-b", "12"),
+                    isvc("model-c", "13", uid="recreated"),
+                    isvc("model-d", "14"),
+                ]
+            },
+        )
+        self.assertEqual(
+            [self._events(client_cursor) for _ in range(3)],
+            [
+                ("MODIFIED", isvc("model-b", "12")),
+                ("ADDED", isvc("model-c", "13", uid="recreated")),
+                ("ADDED", isvc("model-d", "14")),
+            ],
+        )
+
+        callbacks[0]("INITIAL", {"items": [isvc("model-a", "1")]})
+
+        self.assertEqual(
+            [self._events(client_cursor) for _ in range(3)],
+            [
+                ("DELETED", isvc("model-b", "12")),
+                ("DELETED", isvc("model-c", "13", uid="recreated")),
+                ("DELETED", isvc("model-d", "14")),
+            ],
+        )
+        with self.assertRaises(Empty):
+            client_cursor.get(timeout=0)
+        self.assertEqual(manager.stats()["relistsReconciled"], 2)
+        self.assertEqual(manager.stats()["relistChanges"], 6)
+
+        late_cursor = EventCursor()
+        manager.register_namespace_watch("kubeflow-user", late_cursor, watcher_factory)
+        self.assertEqual(
+            self._message(late_cursor),
+            {"type": "INITIAL", "items": [isvc("model-a", "1")]},
+        )
+
+    def test_single_relist_of_unchanged_object_sends_nothing(self):
+        manager = SSEConnectionManager()
+        client_cursor = EventCursor()
+        callbacks = []
+
+        def watcher_factory(namespace, name, callback):
+            callbacks.append(callback)
+            return DummyWatcher()
+
+        model = {"metadata": {"name": "model-a", "uid": "a", "resourceVersion": "1"}}
+        manager.register_single_watch(
+            "kubeflow-user", "model-a", client_cursor, watcher_factory
+        )
+        callbacks[0]("INITIAL", model)
+        self.assertEqual(self._message(client_cursor)["type"], "INITIAL")
+
+        callbacks[0]("INITIAL", dict(model))
+
+        with self.assertRaises(Empty):
+            client_cursor.get(timeout=0)
+
     def test_namespace_reconnect_does_not_replace_new_watcher_with_old_watcher(self):
         manager = SSEConnectionManager()
-        first_queue = Queue()
-        second_queue = Queue()
+        first_queue = EventCursor()
+        second_queue = EventCursor()
         old_watcher = DummyWatcher()
         new_watcher = DummyWatcher()
 
@@ -173,10 +562,38 @@ class SSEConnectionManagerTest(unittest.TestCase):
         manager.unregister_namespace_watch("kubeflow-user", second_queue)
         self.assertEqual(new_watcher.stop_calls, 1)
 
+    def test_namespace_watch_that_cannot_start_is_started_by_the_next_client(self):
+        manager = SSEConnectionManager()
+        watcher = DummyWatcher()
+        factories = []
+
+        def watcher_factory(namespace, callback):
+            factories.append(callback)
+            if len(factories) == 1:
+                raise RuntimeError("reactor full")
+            return watcher
+
+        first_cursor = EventCursor()
+        with self.assertRaises(RuntimeError):
+            manager.register_namespace_watch(
+                "kubeflow-user", first_cursor, watcher_factory
+            )
+        manager.unregister_namespace_watch("kubeflow-user", first_cursor)
+
+        second_cursor = EventCursor()
+        manager.register_namespace_watch(
+            "kubeflow-user", second_cursor, watcher_factory
+        )
+        factories[1]("ADDED", {"metadata": {"name": "model-a"}})
+
+        self.assertEqual(self._message(second_cursor)["type"], "ADDED")
+        manager.unregister_namespace_watch("kubeflow-user", second_cursor)
+        self.assertEqual(watcher.stop_calls, 1)
+
     def test_single_watch_is_shared_and_stops_after_last_client_disconnects(self):
         manager = SSEConnectionManager()
-        first_queue = Queue()
-        second_queue = Queue()
+        first_queue = EventCursor()
+        second_queue = EventCursor()
         watcher = DummyWatcher()
         callbacks = []
 
@@ -213,8 +630,8 @@ class SSEConnectionManagerTest(unittest.TestCase):
 
     def test_single_watch_replays_initial_snapshot_to_late_client(self):
         manager = SSEConnectionManager()
-        first_queue = Queue()
-        second_queue = Queue()
+        first_queue = EventCursor()
+        second_queue = EventCursor()
         callbacks = []
 
         def watcher_factory(namespace, name, callback):
@@ -238,8 +655,8 @@ class SSEConnectionManagerTest(unittest.TestCase):
 
     def test_single_watch_replays_current_object_to_late_client(self):
         manager = SSEConnectionManager()
-        first_queue = Queue()
-        second_queue = Queue()
+        first_queue = EventCursor()
+        second_queue = EventCursor()
         callbacks = []
 
         def watcher_factory(namespace, name, callback):
@@ -275,8 +692,8 @@ class SSEConnectionManagerTest(unittest.TestCase):
 
     def test_single_reconnect_does_not_replace_new_watcher_with_old_watcher(self):
         manager = SSEConnectionManager()
-        first_queue = Queue()
-        second_queue = Queue()
+        first_queue = EventCursor()
+        second_queue = EventCursor()
         old_watcher = DummyWatcher()
         new_watcher = DummyWatcher()
 
@@ -298,6 +715,190 @@ class SSEConnectionManagerTest(unittest.TestCase):
         manager.unregister_single_watch("kubeflow-user", "model-a", second_queue)
         self.assertEqual(new_watcher.stop_calls, 1)
 
+    def test_single_watch_is_derived_from_the_namespace_watch(self):
+        manager = SSEConnectionManager()
+        namespace_cursor = EventCursor()
+        single_cursor = EventCursor()
+        namespace_callbacks = []
+        single_factory_calls = []
+
+        def namespace_factory(namespace, callback):
+            namespace_callbacks.append(callback)
+            return DummyWatcher()
+
+        def single_factory(namespace, name, callback):
+            single_factory_calls.append(name)
+            return DummyWatcher()
+
+        manager.register_namespace_watch(
+            "kubeflow-user", namespace_cursor, namespace_factory
+        )
+        namespace_callbacks[0](
+            "INITIAL", {"items": [_isvc("model-a", "1"), _isvc("model-b", "1")]}
+        )
+
+        manager.register_single_watch(
+            "kubeflow-user", "model-a", single_cursor, single_factory
+        )
+
+        self.assertEqual(single_factory_calls, [])
+        self.assertEqual(
+            self._message(single_cursor),
+            {"type": "INITIAL", "object": _isvc("model-a", "1")},
+        )
+
+        namespace_callbacks[0]("MODIFIED", _isvc("model-b", "2"))
+        namespace_callbacks[0]("MODIFIED", _isvc("model-a", "3"))
+
+        self.assertEqual(
+            self._events(single_cursor), ("MODIFIED", _isvc("model-a", "3"))
+        )
+        with self.assertRaises(Empty):
+            single_cursor.get(timeout=0)
+
+    def test_derived_single_watch_of_missing_object_reports_not_found(self):
+        manager = SSEConnectionManager()
+        callbacks = []
+
+        def namespace_factory(namespace, callback):
+            callbacks.append(callback)
+            return DummyWatcher()
+
+        manager.register_namespace_watch(
+            "kubeflow-user", EventCursor(), namespace_factory
+        )
+        callbacks[0]("INITIAL", {"items": []})
+        single_cursor = EventCursor()
+        manager.register_single_watch(
+            "kubeflow-user", "model-a", single_cursor, lambda *args: DummyWatcher()
+        )
+
+        self.assertEqual(
+            self._message(single_cursor),
+            {
+                "type": "ERROR",
+                "object": {"message": "Resource not found: kubeflow-user/model-a"},
+            },
+        )
+
+    def test_single_watch_moves_between_dedicated_and_namespace_watches(self):
+        manager = SSEConnectionManager()
+        namespace_cursor = EventCursor()
+        single_cursor = EventCursor()
+        namespace_callbacks = []
+        single_watchers = []
+
+        def namespace_factory(namespace, callback):
+            namespace_callbacks.append(callback)
+            return DummyWatcher()
+
+        def single_factory(namespace, name, callback):
+            single_watchers.append((DummyWatcher(), callback))
+            return single_watchers[-1][0]
+
+        manager.register_single_watch(
+            "kubeflow-user", "model-a", single_cursor, single_factory
+        )
+        single_watchers[0][1]("INITIAL", _isvc("model-a", "1"))
+        self.assertEqual(self._message(single_cursor)["type"], "INITIAL")
+
+        # A namespace watch takes over and its snapshot is reconciled.
+        manager.register_namespace_watch(
+            "kubeflow-user", namespace_cursor, namespace_factory
+        )
+        self.assertEqual(single_watchers[0][0].stop_calls, 1)
+        namespace_callbacks[0]("INITIAL", {"items": [_isvc("model-a", "2")]})
+        self.assertEqual(
+            self._events(single_cursor), ("MODIFIED", _isvc("model-a", "2"))
+        )
+        namespace_callbacks[0]("DELETED", _isvc("model-a", "3"))
+        self.assertEqual(
+            self._events(single_cursor), ("DELETED", _isvc("model-a", "3"))
+        )
+
+        # The single watch falls back to a dedicated watcher.
+        manager.unregister_namespace_watch("kubeflow-user", namespace_cursor)
+        self.assertEqual(len(single_watchers), 2)
+        single_watchers[1][1]("INITIAL", _isvc("model-a", "4"))
+
+        self.assertEqual(self._events(single_cursor), ("ADDED", _isvc("model-a", "4")))
+
+        manager.unregister_single_watch("kubeflow-user", "model-a", single_cursor)
+        self.assertEqual(single_watchers[1][0].stop_calls, 1)
+
+    def test_event_views_share_one_namespace_event_watch(self):
+        manager = SSEConnectionManager()
+        first_cursor = EventCursor()
+        second_cursor = EventCursor()
+        watcher = DummyWatcher()
+        callbacks = []
+
+        def watcher_factory(namespace, callback):
+            callbacks.append(callback)
+            return watcher
+
+        def event(name, involved_name):
+            return {
+                "metadata": {"namespace": "kubeflow-user", "name": name},
+                "involvedObject": {"kind": "InferenceService", "name": involved_name},
+            }
+
+        manager.register_event_watch(
+            "kubeflow-user",
+            "InferenceService",
+            "model-a",
+            first_cursor,
+            watcher_factory,
+        )
+        manager.register_event_watch(
+            "kubeflow-user",
+            "InferenceService",
+            "model-b",
+            second_cursor,
+            watcher_factory,
+        )
+        self.assertEqual(len(callbacks), 1)
+
+        callbacks[0](
+            "INITIAL", {"items": [event("a1", "model-a"), event("b1", "model-b")]}
+        )
+        self.assertEqual(
+            self._message(first_cursor),
+            {"type": "INITIAL", "items": [event("a1", "model-a")]},
+        )
+        callbacks[0]("ADDED", event("a2", "model-a"))
+        self.assertEqual(self._events(first_cursor), ("ADDED", event("a2", "model-a")))
+        self.assertEqual(
+            self._message(second_cursor),
+            {"type": "INITIAL", "items": [event("b1", "model-b")]},
+        )
+        with self.assertRaises(Empty):
+            second_cursor.get(timeout=0)
+
+        # A late client is served from the in-memory index.
+        late_cursor = EventCursor()
+        manager.register_event_watch(
+            "kubeflow-user", "InferenceService", "model-a", late_cursor, watcher_factory
+        )
+        self.assertEqual(
+            self._message(late_cursor),
+            {
+                "type": "INITIAL",
+                "items": [event("a1", "model-a"), event("a2", "model-a")],
+            },
+        )
+        self.assertEqual(len(callbacks), 1)
+
+        for cursor, name in (
+            (first_cursor, "model-a"),
+            (late_cursor, "model-a"),
+            (second_cursor, "model-b"),
+        ):
+            manager.unregister_event_watch(
+                "kubeflow-user", "InferenceService", name, cursor
+            )
+        self.assertEqual(watcher.stop_calls, 1)
+
 
 if __name__ == "__main__":
     unittest.main()
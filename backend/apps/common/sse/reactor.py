@@ -0,0 +1,292 @@
+"""Shared pool driving the upstream watch streams of the SSE watchers."""
+
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import suppress
+from functools import wraps
+import os
+import random
+import socket
+import threading
+from typing import Any, Callable, Dict, Optional
+
+from kubeflow.kubeflow.crud_backend import logging
+
+log = logging.getLogger(__name__)
+
+RETRY_SECONDS = 5
+MAX_RETRY_SECONDS = 60
+# Blocking streams hold a pool worker each: greenlets are cheap, OS threads
+# are not.
+DEFAULT_MAX_STREAMS_GEVENT = 1024
+DEFAULT_MAX_STREAMS_THREADS = 64
+
+
+class WatchReactorFull(Exception):
+    """The reactor already drives as many streams as it may."""
+
+
+def retry_delay(failures: int) -> float:
+    """Return the jittered exponential backoff after consecutive failures."""
+    delay = min(RETRY_SECONDS * 2 ** max(failures - 1, 0), MAX_RETRY_SECONDS)
+    return random.uniform(delay / 2, delay)
+
+
+def gevent_patched() -> bool:
+    """Return whether gevent monkey-patched threading (gevent worker class)."""
+    try:
+        from gevent import monkey
+    except ImportError:
+        return False
+    return monkey.is_module_patched("threading")
+
+
+def _os_thread_count() -> int:
+    if gevent_patched():
+        from gevent import monkey
+
+        return monkey.get_original("threading", "active_count")()
+    return threading.active_count()
+
+
+def close_response(response: Any):
+    """
+    Close an HTTP response that another worker may be reading.
+
+    The socket is shut down first, so that a read blocked on it returns.
+    """
+    connection = getattr(response, "connection", None)
+    sock = getattr(connection, "sock", None)
+    if sock is not None:
+        with suppress(OSError):
+            sock.shutdown(socket.SHUT_RDWR)
+    with suppress(Exception):
+        response.close()
+
+
+class ClosingWatch:
+    """
+    A kubernetes Watch whose stop also closes the response it streams.
+
+    Watch.stop only sets a flag that the stream checks between events, so a
+    stopped watch would keep its stream, and the reactor worker reading it,
+    until the next event or the watch timeout.
+    """
+
+    def __init__(self, watch: Any):
+        """
+        Initialize the watch.
+
+        Args:
+            watch: The kubernetes watch.Watch to stream with
+        """
+        self._watch = watch
+        self._response = None
+        self._stopped = False
+        self._lock = threading.Lock()
+
+    def stream(self, func: Callable, *args, **kwargs):
+        """Stream the events of a list function, like Watch.stream."""
+
+        # The docstring of the list function tells the watch how to decode.
+        @wraps(func)
+        def request(*request_args, **request_kwargs):
+            response = func(*request_args, **request_kwargs)
+            with self._lock:
+                self._response = response
+                stopped = self._stopped
+            if stopped:
+                close_response(response)
+            return response
+
+        return self._watch.stream(request, *args, **kwargs)
+
+    def stop(self):
+        """Stop the watch and close its response."""
+        self._watch.stop()
+        with self._lock:
+            self._stopped = True
+            response = self._response
+        if response is not None:
+            close_response(response)
+
+
+class WatchTask:
+    """A watch registered with the reactor."""
+
+    def __init__(
+        self,
+        name: str,
+        step: Callable,
+        on_error: Optional[Callable],
+        stop_event: threading.Event,
+    ):
+        self.name = name
+        self.state = "queued"
+        self.failures = 0
+        self._step = step
+        self._on_error = on_error
+        self._stop_event = stop_event
+        self._done = threading.Event()
+        self._worker = None
+
+    def stopped(self) -> bool:
+        """Return whether the owner of the watch stopped it."""
+        return self._stop_event.is_set()
+
+    def join(self, timeout: Optional[float] = None):
+        """Wait until the reactor stopped driving the watch."""
+        if self._worker is not threading.current_thread():
+            self._done.wait(timeout)
+
+    def run(self):
+        """Run the steps of the watch until it is stopped."""
+        self._worker = threading.current_thread()
+        try:
+            while not self.stopped():
+                try:
+                    self.state = "streaming"
+                    self._step()
+                    self.failures = 0
+                except Exception as e:
+                    if self.stopped():
+                        break
+                    self.failures += 1
+                    self.state = "backoff"
+                    if self._on_error:
+                        self._on_error(e)
+                    else:
+                        log.error(f"Error in watch {self.name}: {e}")
+                    self._stop_event.wait(retry_delay(self.failures))
+        finally:
+            self.state = "stopped"
+
+    def finish(self):
+        """Mark the watch as no longer driven by the reactor."""
+        self._done.set()
+
+
+class WatchReactor:
+    """
+    Drives the upstream watch streams of every watcher from one bounded pool.
+
+    A watch is a step, typically one watch stream until its timeout, that the
+    reactor repeats until the watch is stopped, backing off after failures.
+    Under the gevent worker class the pool workers are greenlets, so the
+    streams share a single OS thread. The reactor bounds the streams rather
+    than multiplexing them: every watch holds a pool worker for its whole
+    life, and watches registered while all workers are taken are rejected
+    with WatchReactorFull instead of waiting for a long-lived watch to end.
+    The SSE routes answer them with a 503 and the frontend polls instead.
+    Watchers stop their streams with a ClosingWatch, so the worker of a
+    watch is free as soon as its last client disconnects.
+    """
+
+    def __init__(self, max_streams: Optional[int] = None):
+        """
+        Initialize the reactor.
+
+        Args:
+            max_streams: Maximum number of streams driven at the same time
+        """
+        self.mode = "gevent" if gevent_patched() else "threads"
+        if max_streams is None:
+            max_streams = (
+                DEFAULT_MAX_STREAMS_GEVENT
+                if self.mode == "gevent"
+                else DEFAULT_MAX_STREAMS_THREADS
+            )
+        self.max_streams = max_streams
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_streams, thread_name_prefix="watch-reactor"
+        )
+        self._tasks: Dict[int, WatchTask] = {}
+        self._running = 0
+        self._rejected = 0
+        self._lock = threading.Lock()
+
+    def register(
+        self,
+        name: str,
+        step: Callable,
+        on_error: Optional[Callable] = None,
+        stop_event: Optional[threading.Event] = None,
+    ) -> WatchTask:
+        """
+        Register a watch and start driving it.
+
+        Args:
+            name: Name of the watch in the stats
+            step: Runs the watch until its stream ends, raises on failures
+            on_error: Called with the exception after a failed step
+            stop_event: Stops the watch when set
+
+        Returns:
+            The registered watch
+
+        Raises:
+            WatchReactorFull: If max_streams watches are driven already
+        """
+        task = WatchTask(name, step, on_error, stop_event or threading.Event())
+        with self._lock:
+            full = len(self._tasks) >= self.max_streams
+            if full:
+                self._rejected += 1
+            else:
+                self._tasks[id(task)] = task
+
+        if full:
+            log.warning(f"Watch reactor is full ({self.max_streams} streams): {name}")
+            raise WatchReactorFull(
+                f"Too many watches, at most {self.max_streams} streams are served"
+            )
+        self._executor.submit(self._run, task)
+        return task
+
+    def _run(self, task: WatchTask):
+        with self._lock:
+            self._running += 1
+        try:
+            task.run()
+        finally:
+            with self._lock:
+                self._tasks.pop(id(task), None)
+                self._running -= 1
+            task.finish()
+
+    def stats(self) -> Dict[str, Any]:
+        """Return the live count of streams and threads."""
+        with self._lock:
+            tasks = list(self._tasks.values())
+            running = self._running
+            rejected = self._rejected
+
+        states = [task.state for task in tasks]
+        return {
+            "mode": self.mode,
+            "maxStreams": self.max_streams,
+            "streams": len(tasks),
+            "streaming": states.count("streaming"),
+            "backingOff": states.count("backoff"),
+            "queued": states.count("queued"),
+            "rejected": rejected,
+            "poolWorkers": running,
+            "osThreads": _os_thread_count(),
+            "watches": [
+                {"name": task.name, "state": task.state, "failures": task.failures}
+                for task in tasks
+            ],
+        }
+
+
+_reactor: Optional[WatchReactor] = None
+_reactor_lock = threading.Lock()
+
+
+def get_reactor() -> WatchReactor:
+    """Return the reactor of the process, sized by SSE_REACTOR_MAX_STREAMS."""
+    global _reactor
+    with _reactor_lock:
+        if _reactor is None:
+            max_streams = os.environ.get("SSE_REACTOR_MAX_STREAMS", "").strip()
+            _reactor = WatchReactor(int(max_streams) if max_streams else None)
+        return _reactor
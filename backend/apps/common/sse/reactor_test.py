@@ -0,0 +1,212 @@
+"""Unit tests for the watch reactor.
+
+Run directly with:
+    python3 backend/apps/common/sse/reactor_test.py
+"""
+
+import importlib.util
+import logging as python_logging
+from pathlib import Path
+import socket
+import sys
+import threading
+import types
+import unittest
+
+
+def _load_reactor_module():
+    """Load reactor.py with a lightweight stub for the kubeflow logging module."""
+    kubeflow = types.ModuleType("kubeflow")
+    kubeflow_kubeflow = types.ModuleType("kubeflow.kubeflow")
+    crud_backend = types.ModuleType("kubeflow.kubeflow.crud_backend")
+    crud_backend.logging = types.SimpleNamespace(
+        getLogger=lambda name: python_logging.getLogger(name)
+    )
+    sys.modules.setdefault("kubeflow", kubeflow)
+    sys.modules.setdefault("kubeflow.kubeflow", kubeflow_kubeflow)
+    sys.modules.setdefault("kubeflow.kubeflow.crud_backend", crud_backend)
+
+    module_path = Path(__file__).with_name("reactor.py")
+    spec = importlib.util.spec_from_file_location("sse_reactor_under_test", module_path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+reactor_module = _load_reactor_module()
+WatchReactor = reactor_module.WatchReactor
+
+TIMEOUT = 5
+
+
+class BlockingStream:
+    """A watch step that blocks like a stream until it is stopped."""
+
+    def __init__(self):
+        self.stop_event = threading.Event()
+        self.started = threading.Event()
+
+    def step(self):
+        self.started.set()
+        self.stop_event.wait()
+
+
+class FakeWatch:
+    """A kubernetes Watch that only checks its stop flag between events."""
+
+    def __init__(self):
+        self._stop = False
+
+    def stream(self, func, **kwargs):
+        response = func(**kwargs)
+        while not self._stop:
+            data = response.read()
+            if not data:
+                return
+            yield data
+
+    def stop(self):
+        self._stop = True
+
+
+class SocketResponse:
+    """An HTTP response whose reads block on a socket nobody writes to."""
+
+    def __init__(self):
+        self.sock, self.peer = socket.socketpair()
+        self.connection = types.SimpleNamespace(sock=self.sock)
+
+    def read(self):
+        return self.sock.recv(1)
+
+    def close(self):
+        self.sock.close()
+        self.peer.close()
+
+
+class ClosingWatchStream:
+    """A watch step streaming a response until the watch is stopped."""
+
+    def __init__(self):
+        self.stop_event = threading.Event()
+        self.started = threading.Event()
+        self.watch = reactor_module.ClosingWatch(FakeWatch())
+
+    def step(self):
+        def list_function():
+            self.started.set()
+            return SocketResponse()
+
+        for _ in self.watch.stream(list_function):
+            pass
+
+    def stop(self):
+        self.stop_event.set()
+        self.watch.stop()
+
+
+class WatchReactorTest(unittest.TestCase):
+    def test_streams_are_counted_while_they_run(self):
+        reactor = WatchReactor(max_streams=4)
+        streams = [BlockingStream() for _ in range(3)]
+
+        tasks = [
+            reactor.register(f"watch-{index}", stream.step, None, stream.stop_event)
+            for index, stream in enumerate(streams)
+        ]
+        for stream in streams:
+            self.assertTrue(stream.started.wait(TIMEOUT))
+
+        stats = reactor.stats()
+        self.assertEqual(stats["streams"], 3)
+        self.assertEqual(stats["streaming"], 3)
+        self.assertEqual(stats["poolWorkers"], 3)
+        self.assertEqual(stats["mode"], "threads")
+
+        for stream, task in zip(streams, tasks):
+            stream.stop_event.set()
+            task.join(TIMEOUT)
+        self.assertEqual(reactor.stats()["streams"], 0)
+
+    def test_watches_beyond_the_pool_size_are_rejected(self):
+        reactor = WatchReactor(max_streams=1)
+        first, second = BlockingStream(), BlockingStream()
+
+        first_task = reactor.register("first", first.step, None, first.stop_event)
+        self.assertTrue(first.started.wait(TIMEOUT))
+        with self.assertRaises(reactor_module.WatchReactorFull):
+            reactor.register("second", second.step, None, second.stop_event)
+
+        self.assertFalse(second.started.wait(0.1))
+        self.assertEqual(reactor.stats()["rejected"], 1)
+        self.assertEqual(reactor.stats()["streams"], 1)
+
+        first.stop_event.set()
+        first_task.join(TIMEOUT)
+
+        second_task = reactor.register("second", second.step, None, second.stop_event)
+        self.assertTrue(second.started.wait(TIMEOUT))
+        second.stop_event.set()
+        second_task.join(TIMEOUT)
+
+    def test_stopped_watches_free_their_streams_for_new_clients(self):
+        reactor = WatchReactor(max_streams=2)
+
+        for _ in range(5):
+            streams = [ClosingWatchStream() for _ in range(2)]
+            tasks = [
+                reactor.register("watch", stream.step, None, stream.stop_event)
+                for stream in streams
+            ]
+            for stream in streams:
+                self.assertTrue(stream.started.wait(TIMEOUT))
+            with self.assertRaises(reactor_module.WatchReactorFull):
+                reactor.register("rejected", lambda: None)
+
+            # The clients disconnect while their streams wait for an event.
+            for stream, task in zip(streams, tasks):
+                stream.stop()
+                task.join(TIMEOUT)
+
+            self.assertEqual(reactor.stats()["streams"], 0)
+        self.assertEqual(reactor.stats()["rejected"], 5)
+
+    def test_failed_steps_are_reported_and_retried_with_backoff(self):
+        reactor = WatchReactor(max_streams=1)
+        stop_event = threading.Event()
+        errors = []
+        delays = []
+        original_retry_delay = reactor_module.retry_delay
+
+        def step():
+            if len(errors) < 3:
+                raise RuntimeError(f"failure {len(errors)}")
+            stop_event.set()
+
+        def retry_delay(failures):
+            delays.append(failures)
+            return 0
+
+        reactor_module.retry_delay = retry_delay
+        try:
+            task = reactor.register("failing", step, errors.append, stop_event)
+            task.join(TIMEOUT)
+        finally:
+            reactor_module.retry_delay = original_retry_delay
+
+        self.assertEqual(
+            [str(error) for error in errors], ["failure 0", "failure 1", "failure 2"]
+        )
+        self.assertEqual(delays, [1, 2, 3])
+        self.assertEqual(task.failures, 0)
+        self.assertEqual(task.state, "stopped")
+
+    def test_retry_delay_grows_and_is_capped(self):
+        for failures in range(1, 10):
+            delay = reactor_module.retry_delay(failures)
+            expected = min(5 * 2 ** (failures - 1), 60)
+            self.assertTrue(expected / 2 <= delay <= expected)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,503 @@
+"""In-memory index of the objects related to InferenceServices."""
+
+from functools import partial
+import os
+import random
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+
+from kubernetes import client, watch
+
+from kubeflow.kubeflow.crud_backend import api, logging
+
+from .. import coalescing, raw, versions
+from .reactor import ClosingWatch, WatchReactor, WatchReactorFull, get_reactor
+
+log = logging.getLogger(__name__)
+
+WATCH_TIMEOUT_SECONDS = 300
+# Seconds a lookup waits for a cold namespace before querying the API.
+DEFAULT_WARM_SECONDS = 2
+# Namespaces not looked up for this long stop being watched.
+DEFAULT_IDLE_SECONDS = 600
+# Share of the reactor's streams the relation index may hold by default.
+# Every indexed namespace holds one watch per kind, the lookups of further
+# namespaces query the API.
+REACTOR_STREAM_SHARE = 0.25
+# Kinds whose API is not served, e.g. Knative in a Standard-only cluster, are
+# looked up again after this long.
+UNAVAILABLE_RETRY_SECONDS = 300
+
+
+def _custom_lister(gvk: Dict[str, str]) -> Callable:
+    return partial(
+        api.custom_api.list_namespaced_custom_object,
+        group=gvk["group"],
+        version=gvk["version"],
+        plural=gvk["kind"],
+    )
+
+
+# The namespaced list functions of the indexed kinds. Owner references link
+# InferenceServices to Knative Services, Configurations, Revisions,
+# Deployments, ReplicaSets, Pods, Services and HPAs; events are linked through
+# their involved object. InferenceGraphs are indexed for the read routes.
+KINDS: Dict[str, Callable[[], Callable]] = {
+    "pods": lambda: client.CoreV1Api().list_namespaced_pod,
+    "services": lambda: client.CoreV1Api().list_namespaced_service,
+    # Events are only forwarded to clients, so they are kept as JSON.
+    "events": lambda: raw.json_lister(client.CoreV1Api().list_namespaced_event),
+    "deployments": lambda: client.AppsV1Api().list_namespaced_deployment,
+    "replicasets": lambda: client.AppsV1Api().list_namespaced_replica_set,
+    "horizontalpodautoscalers": lambda: (
+        client.AutoscalingV2Api().list_namespaced_horizontal_pod_autoscaler
+    ),
+    "knativeservices": lambda: _custom_lister(versions.KNATIVE_SERVICE),
+    "configurations": lambda: _custom_lister(versions.KNATIVE_CONF),
+    "revisions": lambda: _custom_lister(versions.KNATIVE_REVISION),
+    "inferencegraphs": lambda: _custom_lister(versions.inference_graph_gvk()),
+}
+
+
+def _metadata(obj: Any) -> Tuple[str, str, Dict[str, str], List[str]]:
+    """Return the name, uid, labels and owner uids of a dict or client model."""
+    if isinstance(obj, dict):
+        metadata = obj.get("metadata") or {}
+        owners = [ref.get("uid") for ref in metadata.get("ownerReferences") or []]
+        return (
+            metadata.get("name"),
+            metadata.get("uid"),
+            metadata.get("labels") or {},
+            owners,
+        )
+
+    metadata = obj.metadata
+    owners = [ref.uid for ref in metadata.owner_references or []]
+    return metadata.name, metadata.uid, metadata.labels or {}, owners
+
+
+def _resource_version(obj: Any) -> Optional[str]:
+    if isinstance(obj, dict):
+        return (obj.get("metadata") or {}).get("resourceVersion")
+    return obj.metadata.resource_version
+
+
+def _involved_object(event: Any) -> Optional[Tuple[str, str]]:
+    if isinstance(event, dict):
+        involved = event.get("involvedObject") or {}
+        kind, name = involved.get("kind"), involved.get("name")
+    elif event.involved_object is not None:
+        kind, name = event.involved_object.kind, event.involved_object.name
+    else:
+        return None
+    return (kind, name) if name else None
+
+
+def _list_items(result: Any) -> Tuple[List[Any], Optional[str]]:
+    if isinstance(result, dict):
+        return result.get("items") or [], _resource_version(result)
+    return result.items or [], result.metadata.resource_version
+
+
+class _Informer:
+    """Watch state of one kind in one namespace."""
+
+    def __init__(self):
+        self.resource_version = None
+        self.synced = threading.Event()
+        self.unavailable = False
+        self.active_watch = None
+
+    def desync(self):
+        """Relist on the next step, lookups query the API until then."""
+        self.resource_version = None
+        self.synced.clear()
+
+
+class NamespaceRelations:
+    """The indexed objects of a namespace and the links between them."""
+
+    def __init__(self, namespace: str):
+        """
+        Initialize an empty index.
+
+        Args:
+            namespace: The indexed namespace
+        """
+        self.namespace = namespace
+        self.last_used = time.monotonic()
+        self._lock = threading.Lock()
+        self._objects: Dict[str, Dict[str, Any]] = {kind: {} for kind in KINDS}
+        # (kind, name) of the objects each owner uid owns.
+        self._children: Dict[str, Set[Tuple[str, str]]] = {}
+        # Names of the objects of a kind by (kind, label, value).
+        self._labels: Dict[Tuple[str, str, str], Set[str]] = {}
+        # Event names by involved (kind, name).
+        self._events: Dict[Tuple[str, str], Set[str]] = {}
+        self._informers = {kind: _Informer() for kind in KINDS}
+        self._stop_event = threading.Event()
+        self._tasks = []
+
+    def synced(self, timeout: Optional[float] = None) -> bool:
+        """Wait until every kind is listed, return whether it is."""
+        deadline = time.monotonic() + (timeout or 0)
+        for informer in self._informers.values():
+            if not informer.synced.wait(max(deadline - time.monotonic(), 0)):
+                return False
+        return True
+
+    def available(self, kind: str) -> bool:
+        """Return whether the API of a kind is served."""
+        return not self._informers[kind].unavailable
+
+    def resource_version(self, kind: str) -> Optional[str]:
+        """Return the resourceVersion the objects of a kind are synced to."""
+        return self._informers[kind].resource_version
+
+    def get(self, kind: str, name: str) -> Optional[Any]:
+        """Return an object by kind and name."""
+        with self._lock:
+            return self._objects[kind].get(name)
+
+    def select(self, kind: str, labels: Dict[str, str]) -> List[Any]:
+        """Return the objects of a kind that have all the given labels."""
+        with self._lock:
+            names = None
+            for label, value in labels.items():
+                matching = self._labels.get((kind, label, value), set())
+                names = matching if names is None else names & matching
+            objects = self._objects[kind]
+            if names is None:
+                return list(objects.values())
+            return [objects[name] for name in sorted(names)]
+
+    def descendants(self, uid: str, kind: Optional[str] = None) -> List[Any]:
+        """
+        Return the objects owned by an object, directly or transitively.
+
+        Args:
+            uid: The uid of the owner, e.g. of an InferenceService
+            kind: Only return the objects of this kind if set
+        """
+        with self._lock:
+            found = []
+            seen = {uid}
+            pending = [uid]
+            while pending:
+                for child_kind, name in self._children.get(pending.pop(), ()):
+                    child = self._objects[child_kind].get(name)
+                    child_uid = _metadata(child)[1] if child is not None else None
+                    if child is None or child_uid in seen:
+                        continue
+                    seen.add(child_uid)
+                    pending.append(child_uid)
+                    if kind is None or child_kind == kind:
+                        found.append(child)
+            return found
+
+    def events_for(self, kind: str, name: str) -> List[Any]:
+        """Return the events whose involved object is the given object."""
+        with self._lock:
+            events = self._objects["events"]
+            return [
+                events[event_name]
+                for event_name in sorted(self._events.get((kind, name), ()))
+            ]
+
+    def replace(self, kind: str, items: List[Any]):
+        """Replace every object of a kind with a relisted snapshot."""
+        with self._lock:
+            for name in list(self._objects[kind]):
+                self._remove(kind, name)
+            for item in items:
+                self._add(kind, item)
+
+    def apply(self, kind: str, event_type: str, obj: Any):
+        """Apply an ADDED, MODIFIED or DELETED watch event."""
+        name = _metadata(obj)[0]
+        if not name:
+            return
+        with self._lock:
+            self._remove(kind, name)
+            if event_type != "DELETED":
+                self._add(kind, obj)
+
+    def _add(self, kind: str, obj: Any):
+        name, _, labels, owners = _metadata(obj)
+        if not name:
+            return
+        self._objects[kind][name] = obj
+        # The plural of the indexed kinds is their name, e.g. "deployments".
+        coalescing.misses.discard(self.namespace, kind, name)
+        for owner in owners:
+            self._children.setdefault(owner, set()).add((kind, name))
+        for label, value in labels.items():
+            self._labels.setdefault((kind, label, value), set()).add(name)
+        if kind == "events":
+            involved = _involved_object(obj)
+            if involved:
+                self._events.setdefault(involved, set()).add(name)
+
+    def _remove(self, kind: str, name: str):
+        obj = self._objects[kind].pop(name, None)
+        if obj is None:
+            return
+        _, _, labels, owners = _metadata(obj)
+        for owner in owners:
+            _discard(self._children, owner, (kind, name))
+        for label, value in labels.items():
+            _discard(self._labels, (kind, label, value), name)
+        if kind == "events":
+            involved = _involved_object(obj)
+            if involved:
+                _discard(self._events, involved, name)
+
+    def start(self, reactor: WatchReactor):
+        """
+        Start the watches of every kind.
+
+        Raises:
+            WatchReactorFull: If the reactor cannot drive all of them, the
+                watches already started are stopped
+        """
+        for kind in KINDS:
+            try:
+                task = reactor.register(
+                    f"relations/{self.namespace}/{kind}",
+                    partial(self._step, kind),
+                    partial(self._on_error, kind),
+                    self._stop_event,
+                )
+            except WatchReactorFull:
+                self._stop_event.set()
+                raise
+            self._tasks.append(task)
+
+    def stop(self):
+        """Stop the watches of every kind."""
+        self._stop_event.set()
+        for informer in self._informers.values():
+            if informer.active_watch:
+                informer.active_watch.stop()
+        for task in self._tasks:
+            task.join(timeout=5)
+
+    def _step(self, kind: str):
+        """List a kind if needed, then apply its watch events until a timeout."""
+        informer = self._informers[kind]
+        list_function = KINDS[kind]()
+
+        if informer.resource_version is None:
+            try:
+                result = list_function(namespace=self.namespace)
+            except Exception as e:
+                if getattr(e, "status", None) not in (403, 404):
+                    raise
+                # Served as an empty kind until it can be listed.
+                informer.unavailable = True
+                self.replace(kind, [])
+                informer.synced.set()
+                self._stop_event.wait(UNAVAILABLE_RETRY_SECONDS)
+                return
+
+            items, informer.resource_version = _list_items(result)
+            informer.unavailable = False
+            self.replace(kind, items)
+            informer.synced.set()
+
+        w = ClosingWatch(watch.Watch())
+        informer.active_watch = w
+        try:
+            for event in w.stream(
+                list_function,
+                namespace=self.namespace,
+                resource_version=informer.resource_version,
+                allow_watch_bookmarks=True,
+                timeout_seconds=int(WATCH_TIMEOUT_SECONDS * random.uniform(0.8, 1.2)),
+            ):
+                if self._stop_event.is_set():
+                    break
+
+                event_type = event.get("type")
+                obj = event.get("object")
+                if event_type == "ERROR":
+                    if isinstance(obj, dict) and obj.get("code") == 410:
+                        informer.desync()
+                        return
+                    raise RuntimeError(str(obj))
+                if obj is None:
+                    continue
+
+                informer.resource_version = (
+                    _resource_version(obj) or informer.resource_version
+                )
+                if event_type in ("ADDED", "MODIFIED", "DELETED"):
+                    self.apply(kind, event_type, obj)
+        except Exception as e:
+            if getattr(e, "status", None) != 410:
+                raise
+            informer.desync()
+        finally:
+            w.stop()
+            informer.active_watch = None
+
+    def _on_error(self, kind: str, error):
+        log.error(f"Error indexing {kind} in {self.namespace}: {error}")
+        self._informers[kind].desync()
+
+    def stats(self) -> Dict[str, Any]:
+        """Return the number of indexed objects and the state of every kind."""
+        with self._lock:
+            counts = {kind: len(objects) for kind, objects in self._objects.items()}
+        return {
+            "objects": counts,
+            "synced": [k for k, i in self._informers.items() if i.synced.is_set()],
+            "unavailable": [k for k, i in self._informers.items() if i.unavailable],
+            "idleSeconds": time.monotonic() - self.last_used,
+        }
+
+
+def _discard(index: Dict[Any, Set], key: Any, value: Any):
+    values = index.get(key)
+    if values is not None:
+        values.discard(value)
+        if not values:
+            del index[key]
+
+
+class RelationIndex:
+    """
+    Indexes the objects related to InferenceServices, one namespace at a time.
+
+    A namespace is watched from its first lookup on and stops being watched
+    once it was not looked up for the idle period. Lookups of a namespace that
+    is still being listed, or relisted after its watch failed, return None so
+    that callers query the API instead, as do the lookups of the namespaces
+    past max_namespaces.
+    """
+
+    def __init__(
+        self,
+        reactor: Optional[WatchReactor] = None,
+        warm_seconds: float = DEFAULT_WARM_SECONDS,
+        idle_seconds: float = DEFAULT_IDLE_SECONDS,
+        max_namespaces: Optional[int] = None,
+    ):
+        """
+        Initialize the index.
+
+        Args:
+            reactor: Reactor driving the watches, the process one if None
+            warm_seconds: Seconds a lookup waits for a cold namespace
+            idle_seconds: Seconds after which an unused namespace is dropped
+            max_namespaces: Maximum number of namespaces indexed at once, by
+                default as many as REACTOR_STREAM_SHARE of the reactor's
+                streams can watch
+        """
+        self._reactor = reactor
+        self.warm_seconds = warm_seconds
+        self.idle_seconds = idle_seconds
+        self.max_namespaces = max_namespaces
+        self._namespaces: Dict[str, NamespaceRelations] = {}
+        self._lock = threading.Lock()
+
+    def namespace(self, namespace: str) -> Optional[NamespaceRelations]:
+        """
+        Return the index of a namespace, warming it up on first use.
+
+        Returns:
+            The index, or None if the namespace is not fully listed yet or
+            cannot be indexed
+        """
+        now = time.monotonic()
+        with self._lock:
+            idle = [
+                relations
+                for name, relations in self._namespaces.items()
+                if name != namespace and now - relations.last_used > self.idle_seconds
+            ]
+            for relations in idle:
+                del self._namespaces[relations.namespace]
+
+            relations = self._namespaces.get(namespace)
+            created = relations is None
+            reactor = self._reactor or get_reactor()
+            max_namespaces = self._max_namespaces(reactor)
+            if created and len(self._namespaces) >= max_namespaces:
+                # Looked up from the API server until a namespace goes idle.
+                log.debug(
+                    f"Not indexing {namespace}, {max_namespaces} namespaces"
+                    " are indexed already"
+                )
+            elif created:
+                relations = NamespaceRelations(namespace)
+                try:
+                    relations.start(reactor)
+                except WatchReactorFull as e:
+                    # Looked up from the API server until the reactor has room.
+                    log.warning(f"Cannot index the relations of {namespace}: {e}")
+                    relations = None
+                else:
+                    self._namespaces[namespace] = relations
+            if relations is not None:
+                relations.last_used = now
+
+        # Stopping waits for the watches, the lookup does not.
+        for idle_relations in idle:
+            threading.Thread(target=idle_relations.stop, daemon=True).start()
+
+        if relations is None:
+            return None
+        # Only the first lookup waits, the others query the API meanwhile.
+        warm_seconds = self.warm_seconds if created else 0
+        return relations if relations.synced(warm_seconds) else None
+
+    def _max_namespaces(self, reactor: WatchReactor) -> int:
+        if self.max_namespaces is not None:
+            return self.max_namespaces
+        streams = int(reactor.max_streams * REACTOR_STREAM_SHARE)
+        return max(streams // len(KINDS), 1)
+
+    def close(self):
+        """Stop watching every namespace."""
+        with self._lock:
+            namespaces = list(self._namespaces.values())
+            self._namespaces.clear()
+        for relations in namespaces:
+            relations.stop()
+
+    def stats(self) -> Dict[str, Any]:
+        """Return the stats of every indexed namespace."""
+        with self._lock:
+            namespaces = dict(self._namespaces)
+        return {name: relations.stats() for name, relations in namespaces.items()}
+
+
+_relation_index: Optional[RelationIndex] = None
+_relation_index_lock = threading.Lock()
+
+
+def get_relation_index() -> Optional[RelationIndex]:
+    """
+    Return the relation index of the process.
+
+    RELATION_INDEX_ENABLED=false disables it, RELATION_INDEX_WARM_SECONDS,
+    RELATION_INDEX_IDLE_SECONDS and RELATION_INDEX_MAX_NAMESPACES tune it.
+    """
+    global _relation_index
+    if os.environ.get("RELATION_INDEX_ENABLED", "true").lower() == "false":
+        return None
+    with _relation_index_lock:
+        if _relation_index is None:
+            max_namespaces = os.environ.get("RELATION_INDEX_MAX_NAMESPACES", "").strip()
+            _relation_index = RelationIndex(
+                warm_seconds=float(
+                    os.environ.get("RELATION_INDEX_WARM_SECONDS", DEFAULT_WARM_SECONDS)
+                ),
+                idle_seconds=float(
+                    os.environ.get("RELATION_INDEX_IDLE_SECONDS", DEFAULT_IDLE_SECONDS)
+                ),
+                max_namespaces=int(max_namespaces) if max_namespaces else None,
+            )
+        return _relation_index
@@ -0,0 +1,310 @@
+"""Unit tests for the relation index.
+
+Run directly with:
+    python3 backend/apps/common/sse/relations_test.py
+"""
+
+import importlib.util
+import logging as python_logging
+from pathlib import Path
+import sys
+import types
+import unittest
+from unittest.mock import Mock
+
+
+def _load_relations_module():
+    """Load relations.py with lightweight stubs for external dependencies."""
+    module_names = (
+        "backend",
+        "backend.apps",
+        "backend.apps.common",
+        "backend.apps.common.coalescing",
+        "backend.apps.common.raw",
+        "backend.apps.common.sse",
+        "backend.apps.common.sse.reactor",
+        "backend.apps.common.versions",
+        "kubernetes",
+        "kubernetes.client",
+        "kubernetes.watch",
+        "kubeflow",
+        "kubeflow.kubeflow",
+        "kubeflow.kubeflow.crud_backend",
+    )
+    original_modules = {name: sys.modules.get(name) for name in module_names}
+
+    backend = types.ModuleType("backend")
+    apps = types.ModuleType("backend.apps")
+    common = types.ModuleType("backend.apps.common")
+    coalescing = types.ModuleType("backend.apps.common.coalescing")
+    raw = types.ModuleType("backend.apps.common.raw")
+    sse = types.ModuleType("backend.apps.common.sse")
+    versions = types.ModuleType("backend.apps.common.versions")
+    kubernetes = types.ModuleType("kubernetes")
+    client = types.ModuleType("kubernetes.client")
+    watch = types.ModuleType("kubernetes.watch")
+    kubeflow = types.ModuleType("kubeflow")
+    kubeflow_kubeflow = types.ModuleType("kubeflow.kubeflow")
+    crud_backend = types.ModuleType("kubeflow.kubeflow.crud_backend")
+
+    backend.__path__ = []
+    apps.__path__ = []
+    common.__path__ = []
+    sse.__path__ = [str(Path(__file__).parent)]
+    coalescing.misses = Mock()
+    raw.json_lister = lambda list_function: list_function
+    for name in ("KNATIVE_SERVICE", "KNATIVE_CONF", "KNATIVE_REVISION"):
+        setattr(versions, name, {"group": "g", "version": "v1", "kind": name})
+    versions.inference_graph_gvk = lambda: {
+        "group": "g",
+        "version": "v1",
+        "kind": "inferencegraphs",
+    }
+    kubernetes.client = client
+    kubernetes.watch = watch
+    watch.Watch = Mock()
+    crud_backend.api = types.SimpleNamespace(custom_api=Mock())
+    crud_backend.logging = types.SimpleNamespace(
+        getLogger=lambda name: python_logging.getLogger(name)
+    )
+
+    try:
+        sys.modules["backend"] = backend
+        sys.modules["backend.apps"] = apps
+        sys.modules["backend.apps.common"] = common
+        sys.modules["backend.apps.common.coalescing"] = coalescing
+        sys.modules["backend.apps.common.raw"] = raw
+        sys.modules["backend.apps.common.sse"] = sse
+        sys.modules["backend.apps.common.versions"] = versions
+        sys.modules["kubernetes"] = kubernetes
+        sys.modules["kubernetes.client"] = client
+        sys.modules["kubernetes.watch"] = watch
+        sys.modules["kubeflow"] = kubeflow
+        sys.modules["kubeflow.kubeflow"] = kubeflow_kubeflow
+        sys.modules["kubeflow.kubeflow.crud_backend"] = crud_backend
+
+        module_path = Path(__file__).with_name("relations.py")
+        spec = importlib.util.spec_from_file_location(
+            "backend.apps.common.sse.relations_under_test", module_path
+        )
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+        return module
+    finally:
+        for name, original_module in original_modules.items():
+            if original_module is None:
+                sys.modules.pop(name, None)
+            else:
+                sys.modules[name] = original_module
+
+
+relations_module = _load_relations_module()
+NamespaceRelations = relations_module.NamespaceRelations
+
+
+def _obj(name, uid=None, owner=None, labels=None, resource_version="1"):
+    metadata = {
+        "name": name,
+        "uid": uid or f"uid-{name}",
+        "labels": labels or {},
+        "resourceVersion": resource_version,
+    }
+    if owner:
+        metadata["ownerReferences"] = [{"uid": owner}]
+    return {"metadata": metadata}
+
+
+def _event(name, kind, involved_name):
+    event = _obj(name)
+    event["involvedObject"] = {"kind": kind, "name": involved_name}
+    return event
+
+
+class NamespaceRelationsTest(unittest.TestCase):
+    def setUp(self):
+        self.relations = NamespaceRelations("ns")
+        self.relations.replace(
+            "deployments", [_obj("model-predictor", owner="uid-model")]
+        )
+        self.relations.replace(
+            "replicasets", [_obj("model-predictor-abc", owner="uid-model-predictor")]
+        )
+        self.relations.replace(
+            "pods",
+            [
+                _obj(
+                    "model-predictor-abc-1",
+                    owner="uid-model-predictor-abc",
+                    labels={"component": "predictor", "rev": "model-00001"},
+                ),
+                _obj("other", labels={"rev": "other-00001"}),
+            ],
+        )
+
+    def _replace_kind(self, kind, lister):
+        kinds = relations_module.KINDS
+        self.addCleanup(kinds.__setitem__, kind, kinds[kind])
+        kinds[kind] = lister
+
+    def _names(self, objects):
+        return sorted(obj["metadata"]["name"] for obj in objects)
+
+    def test_descendants_follow_owner_references(self):
+        self.assertEqual(
+            self._names(self.relations.descendants("uid-model", "pods")),
+            ["model-predictor-abc-1"],
+        )
+        self.assertEqual(
+            self._names(self.relations.descendants("uid-model")),
+            ["model-predictor", "model-predictor-abc", "model-predictor-abc-1"],
+        )
+
+    def test_labels_are_indexed_and_updated(self):
+        self.assertEqual(
+            self._names(self.relations.select("pods", {"rev": "model-00001"})),
+            ["model-predictor-abc-1"],
+        )
+
+        self.relations.apply(
+            "pods",
+            "MODIFIED",
+            _obj("model-predictor-abc-1", labels={"rev": "model-00002"}),
+        )
+        self.relations.apply("pods", "DELETED", _obj("other"))
+
+        self.assertEqual(self.relations.select("pods", {"rev": "model-00001"}), [])
+        self.assertEqual(
+            self._names(self.relations.select("pods", {"rev": "model-00002"})),
+            ["model-predictor-abc-1"],
+        )
+        self.assertEqual(self.relations.descendants("uid-model", "pods"), [])
+        self.assertIsNone(self.relations.get("pods", "other"))
+
+    def test_events_are_indexed_by_involved_object(self):
+        self.relations.replace(
+            "events",
+            [
+                _event("e1", "InferenceService", "model"),
+                _event("e2", "Pod", "model-predictor-abc-1"),
+            ],
+        )
+        self.relations.apply(
+            "events", "ADDED", _event("e3", "InferenceService", "model")
+        )
+
+        self.assertEqual(
+            self._names(self.relations.events_for("InferenceService", "model")),
+            ["e1", "e3"],
+        )
+
+    def test_added_objects_are_no_longer_remembered_as_missing(self):
+        misses = relations_module.coalescing.misses
+        misses.reset_mock()
+
+        self.relations.apply(
+            "horizontalpodautoscalers", "ADDED", _obj("model-predictor")
+        )
+
+        misses.discard.assert_called_once_with(
+            "ns", "horizontalpodautoscalers", "model-predictor"
+        )
+
+    def test_step_lists_then_applies_watch_events(self):
+        relations = NamespaceRelations("ns")
+        list_function = Mock(
+            return_value={"items": [_obj("a")], "metadata": {"resourceVersion": "5"}}
+        )
+        self._replace_kind("pods", lambda: list_function)
+        stream = relations_module.watch.Watch.return_value.stream
+        stream.return_value = iter(
+            [
+                {"type": "ADDED", "object": _obj("b", resource_version="6")},
+                {"type": "BOOKMARK", "object": {"metadata": {"resourceVersion": "7"}}},
+                {"type": "ERROR", "object": {"code": 410}},
+            ]
+        )
+
+        relations._step("pods")
+
+        self.assertEqual(self._names(relations.select("pods", {})), ["a", "b"])
+        self.assertEqual(stream.call_args.kwargs["resource_version"], "5")
+        self.assertTrue(stream.call_args.kwargs["allow_watch_bookmarks"])
+        # The expired watch relists on the next step, lookups query the API
+        # meanwhile.
+        self.assertIsNone(relations._informers["pods"].resource_version)
+        self.assertFalse(relations._informers["pods"].synced.is_set())
+
+    def test_failed_watch_is_no_longer_synced(self):
+        relations = NamespaceRelations("ns")
+        for informer in relations._informers.values():
+            informer.resource_version = "5"
+            informer.synced.set()
+        self.assertTrue(relations.synced())
+
+        relations._on_error("pods", RuntimeError("connection reset"))
+
+        self.assertFalse(relations.synced())
+        self.assertIsNone(relations._informers["pods"].resource_version)
+
+    def test_forbidden_kind_is_served_empty(self):
+        relations = NamespaceRelations("ns")
+        error = Exception("forbidden")
+        error.status = 403
+        self._replace_kind("horizontalpodautoscalers", lambda: Mock(side_effect=error))
+        relations._stop_event.set()
+
+        relations._step("horizontalpodautoscalers")
+
+        informer = relations._informers["horizontalpodautoscalers"]
+        self.assertTrue(informer.synced.is_set())
+        self.assertTrue(informer.unavailable)
+
+
+class RelationIndexTest(unittest.TestCase):
+    def test_namespaces_past_the_limit_are_not_indexed(self):
+        reactor = Mock()
+        index = relations_module.RelationIndex(
+            reactor, warm_seconds=0, max_namespaces=1
+        )
+        self.addCleanup(index.close)
+
+        index.namespace("first")
+        self.assertIsNone(index.namespace("second"))
+
+        self.assertEqual(list(index.stats()), ["first"])
+        self.assertEqual(reactor.register.call_count, len(relations_module.KINDS))
+
+    def test_idle_namespaces_are_stopped_off_the_lookup(self):
+        index = relations_module.RelationIndex(Mock(max_streams=1024), warm_seconds=0)
+        self.addCleanup(index.close)
+        index.namespace("idle")
+        idle = index._namespaces["idle"]
+        stopped = relations_module.threading.Event()
+        release = relations_module.threading.Event()
+        self.addCleanup(release.set)
+
+        def slow_stop():
+            stopped.set()
+            release.wait(5)
+
+        idle.stop = slow_stop
+        index.idle_seconds = 0
+
+        index.namespace("used")
+
+        self.assertTrue(stopped.wait(5))
+        self.assertEqual(list(index.stats()), ["used"])
+
+    def test_namespaces_are_bounded_by_the_reactor_streams(self):
+        reactor = Mock(max_streams=64)
+        index = relations_module.RelationIndex(reactor, warm_seconds=0)
+        self.addCleanup(index.close)
+
+        index.namespace("first")
+
+        self.assertIsNone(index.namespace("second"))
+        self.assertEqual(reactor.register.call_count, len(relations_module.KINDS))
+
+
+if __name__ == "__main__":
+    unittest.main()
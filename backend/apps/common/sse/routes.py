@@ -1,11 +1,18 @@
 """SSE route handlers for real-time updates."""
 
 import json
-from queue import Queue, Empty, Full
+from queue import Empty
 from flask import Blueprint, Response, request
 
-from kubeflow.kubeflow.crud_backend import authz, logging
-from .. import versions
+from kubeflow.kubeflow.crud_backend import api, authz, logging
+from .. import logs, versions
+from ..coalescing import get_single_flight
+from .buffer import CoalescingBuffer
+from .event_log import EventCursor
+from .hub import RemoteWatcher
+from .reactor import WatchReactorFull, get_reactor
+from .relations import get_relation_index
+from .tailers import LOG_TAIL_LINES, get_log_tailers
 from .watchers import InferenceServiceWatcher, EventWatcher, LogWatcher
 
 log = logging.getLogger(__name__)
@@ -25,30 +32,89 @@ def _authorize_inference_service_stream(namespace, *verbs):
         )
 
 
+def _authorize_stats():
+    """
+    Allow the stats only to users listing InferenceServices cluster-wide.
+
+    The stats name the watched namespaces and resources of every user.
+    """
+    gvk = versions.inference_service_gvk()
+    authz.ensure_authorized("list", gvk["group"], gvk["version"], gvk["kind"], "")
+
+
 def _authorize_events_stream(namespace):
     for verb in ("list", "watch"):
         authz.ensure_authorized(verb, "", "v1", "events", namespace)
 
 
-def event_stream(client_queue, timeout=5):
+def _optional_int_arg(name, default=None):
+    """Return a non-negative integer query argument, the default if absent."""
+    value = request.args.get(name)
+    if value is None or value == "":
+        return default
+    if not value.isdigit():
+        raise ValueError(f"{name} must be a non-negative integer")
+    return int(value)
+
+
+def _log_containers(values):
+    """
+    Return the containers requested per component by container arguments.
+
+    A value is either a container name, followed in every component, or
+    component:container. The containers of every component are under None.
+    """
+    containers = {}
+    for value in values:
+        component, _, container = value.rpartition(":")
+        if not container:
+            raise ValueError(f"Invalid container argument: {value}")
+        containers.setdefault(component or None, []).append(container)
+    return containers
+
+
+def _watch_unavailable(error):
+    """Return the response to a stream the watch reactor has no room for."""
+    return Response(
+        json.dumps({"error": str(error)}), status=503, mimetype="application/json"
+    )
+
+
+def event_stream(client_buffer, timeout=5):
     """
     Generator function for SSE event stream.
 
     Args:
-        client_queue: Queue to receive events from
-        timeout: Timeout for queue polling (seconds)
+        client_buffer: Buffer or event log cursor to receive events from
+        timeout: Timeout for buffer polling (seconds)
     """
     try:
         while True:
             try:
-                message = client_queue.get(timeout=timeout)
+                message = client_buffer.get(timeout=timeout)
                 yield message
             except Empty:
-                yield ": heartbeat\n\n"
+                yield b": heartbeat\n\n"
     except GeneratorExit:
         pass
 
 
+@bp.route("/api/sse/stats")
+def get_sse_stats():
+    """Return the counters of the SSE manager, watches, log tailers and reads."""
+    from . import sse_manager
+
+    _authorize_stats()
+    stats = sse_manager.stats()
+    stats["reactor"] = get_reactor().stats()
+    stats["logTailers"] = get_log_tailers().stats()
+    relation_index = get_relation_index()
+    stats["relations"] = relation_index.stats() if relation_index else None
+    single_flight = get_single_flight()
+    stats["readCoalescing"] = single_flight.stats() if single_flight else None
+    return api.success_response("stats", stats)
+
+
 @bp.route("/api/sse/namespaces/<namespace>/inferenceservices")
 def stream_inference_services(namespace):
     """
@@ -57,24 +123,32 @@ def stream_inference_services(namespace):
     Args:
         namespace: The namespace to watch
     """
-    from . import sse_manager
+    from . import namespace_watch_source, sse_manager, watch_hub
     from flask import current_app
 
     _authorize_inference_service_stream(namespace, "list", "watch")
-    client_queue = Queue(maxsize=500)
+    client_cursor = EventCursor(request.headers.get("Last-Event-ID"))
 
     def watcher_factory(ns, callback):
+        if watch_hub is not None:
+            return RemoteWatcher(watch_hub, ns, callback).start()
+        if namespace_watch_source is not None:
+            return namespace_watch_source(ns, callback)
         watcher = InferenceServiceWatcher(app=current_app._get_current_object())
         return watcher.watch_namespace(ns, callback)
 
-    sse_manager.register_namespace_watch(namespace, client_queue, watcher_factory)
+    try:
+        sse_manager.register_namespace_watch(namespace, client_cursor, watcher_factory)
+    except WatchReactorFull as e:
+        sse_manager.unregister_namespace_watch(namespace, client_cursor)
+        return _watch_unavailable(e)
 
     def generate():
         try:
-            for event in event_stream(client_queue):
+            for event in event_stream(client_cursor):
                 yield event
         finally:
-            sse_manager.unregister_namespace_watch(namespace, client_queue)
+            sse_manager.unregister_namespace_watch(namespace, client_cursor)
 
     return Response(
         generate(),
@@ -100,20 +174,26 @@ def stream_inference_service(namespace, name):
     from flask import current_app
 
     _authorize_inference_service_stream(namespace, "get", "watch")
-    client_queue = Queue(maxsize=500)
+    client_cursor = EventCursor(request.headers.get("Last-Event-ID"))
 
     def watcher_factory(ns, nm, callback):
         watcher = InferenceServiceWatcher(app=current_app._get_current_object())
         return watcher.watch_single(ns, nm, callback)
 
-    sse_manager.register_single_watch(namespace, name, client_queue, watcher_factory)
+    try:
+        sse_manager.register_single_watch(
+            namespace, name, client_cursor, watcher_factory
+        )
+    except WatchReactorFull as e:
+        sse_manager.unregister_single_watch(namespace, name, client_cursor)
+        return _watch_unavailable(e)
 
     def generate():
         try:
-            for event in event_stream(client_queue):
+            for event in event_stream(client_cursor):
                 yield event
         finally:
-            sse_manager.unregister_single_watch(namespace, name, client_queue)
+            sse_manager.unregister_single_watch(namespace, name, client_cursor)
 
     return Response(
         generate(),
@@ -135,34 +215,34 @@ def stream_events(namespace, name):
         namespace: The namespace of the resource
         name: The name of the resource
     """
+    from . import sse_manager
     from flask import current_app
 
     _authorize_events_stream(namespace)
-    client_queue = Queue(maxsize=500)
+    client_cursor = EventCursor(request.headers.get("Last-Event-ID"))
 
-    def callback(event_type, obj):
-        try:
-            event_data = {
-                "type": event_type,
-                "object": obj if "items" not in obj else None,
-                "items": obj.get("items") if "items" in obj else None,
-            }
-            message = f"data: {json.dumps(event_data)}\n\n"
-            client_queue.put_nowait(message)
-        except Full:
-            log.warning(f"Client queue full, dropping event type={event_type}")
-        except Exception as e:
-            log.error(f"Error sending event: {e}")
+    def watcher_factory(ns, callback):
+        watcher = EventWatcher(app=current_app._get_current_object())
+        return watcher.watch_namespace_events(ns, callback)
 
-    watcher = EventWatcher(app=current_app._get_current_object())
-    watcher.watch_events(namespace, name, callback)
+    try:
+        sse_manager.register_event_watch(
+            namespace, "InferenceService", name, client_cursor, watcher_factory
+        )
+    except WatchReactorFull as e:
+        sse_manager.unregister_event_watch(
+            namespace, "InferenceService", name, client_cursor
+        )
+        return _watch_unavailable(e)
 
     def generate():
         try:
-            for event in event_stream(client_queue):
+            for event in event_stream(client_cursor):
                 yield event
         finally:
-            watcher.stop()
+            sse_manager.unregister_event_watch(
+                namespace, "InferenceService", name, client_cursor
+            )
 
     return Response(
         generate(),
@@ -180,6 +260,16 @@ def stream_logs(namespace, name):
     """
     Stream logs for an InferenceService.
 
+    The client receives a PODS event with the pods of every component, then
+    APPEND events with the new lines of the pods, merged in timestamp order
+    and tagged with their component, pod and container. The component,
+    tailLines and sinceSeconds query arguments select the components and
+    bound the first window of every container, tailLines to
+    LOG_MAX_PAGE_LINES at most. The container arguments,
+    either a name or component:name, select the containers followed, the
+    kserve-container by default. The search argument, a case-insensitive
+    substring, and the level argument only send the matching lines.
+
     Args:
         namespace: The namespace of the resource
         name: The name of the resource
@@ -187,8 +277,9 @@ def stream_logs(namespace, name):
     from flask import current_app
 
     _authorize_inference_service_stream(namespace, "get")
-    client_queue = Queue(maxsize=500)
+    client_buffer = CoalescingBuffer()
     components = request.args.getlist("component")
+    container_args = request.args.getlist("container")
 
     # Validate component list to prevent abuse
     if len(components) > 10:
@@ -197,27 +288,51 @@ def stream_logs(namespace, name):
             status=400,
             mimetype="application/json",
         )
+    if len(container_args) > 10:
+        return Response(
+            json.dumps({"error": "Too many containers requested (max 10)"}),
+            status=400,
+            mimetype="application/json",
+        )
+
+    try:
+        tail_lines = _optional_int_arg("tailLines", LOG_TAIL_LINES)
+        since_seconds = _optional_int_arg("sinceSeconds")
+        log_filter = logs.parse_filter_args(request.args)
+        containers = _log_containers(container_args)
+    except ValueError as e:
+        return Response(
+            json.dumps({"error": str(e)}), status=400, mimetype="application/json"
+        )
 
     def callback(event_type, obj):
         try:
-            event_data = {
-                "type": event_type,
-                "logs": obj.get("logs") if "logs" in obj else None,
-                "message": obj.get("message") if "message" in obj else None,
-            }
-            message = f"data: {json.dumps(event_data)}\n\n"
-            client_queue.put_nowait(message)
-        except Full:
-            log.warning(f"Client queue full, dropping log event type={event_type}")
+            event_data = {"type": event_type, **obj}
+            message = f"data: {json.dumps(event_data)}\n\n".encode()
+            # APPEND frames carry new lines and are never coalesced, only the
+            # latest set of pods matters.
+            client_buffer.put(message, key="pods" if event_type == "PODS" else None)
         except Exception as e:
             log.error(f"Error sending log event: {e}")
 
     watcher = LogWatcher(app=current_app._get_current_object())
-    watcher.watch_logs(namespace, name, components, callback)
+    try:
+        watcher.watch_logs(
+            namespace,
+            name,
+            components,
+            callback,
+            tail_lines,
+            since_seconds,
+            log_filter,
+            containers,
+        )
+    except WatchReactorFull as e:
+        return _watch_unavailable(e)
 
     def generate():
         try:
-            for event in event_stream(client_queue):
+            for event in event_stream(client_buffer):
                 yield event
         finally:
             watcher.stop()
@@ -19,13 +19,24 @@ def _load_routes_module():
         "backend",
         "backend.apps",
         "backend.apps.common",
+        "backend.apps.common.coalescing",
+        "backend.apps.common.logs",
+        "backend.apps.common.raw",
         "backend.apps.common.sse",
+        "backend.apps.common.sse.buffer",
+        "backend.apps.common.sse.event_log",
+        "backend.apps.common.sse.hub",
+        "backend.apps.common.sse.reactor",
+        "backend.apps.common.sse.relations",
+        "backend.apps.common.sse.tailers",
         "backend.apps.common.sse.watchers",
         "backend.apps.common.versions",
         "flask",
         "kubeflow",
         "kubeflow.kubeflow",
         "kubeflow.kubeflow.crud_backend",
+        "urllib3",
+        "urllib3.exceptions",
     )
     original_modules = {name: sys.modules.get(name) for name in module_names}
 
@@ -33,17 +44,22 @@ def _load_routes_module():
     apps = types.ModuleType("backend.apps")
     common = types.ModuleType("backend.apps.common")
     sse = types.ModuleType("backend.apps.common.sse")
+    relations = types.ModuleType("backend.apps.common.sse.relations")
     watchers = types.ModuleType("backend.apps.common.sse.watchers")
     versions = types.ModuleType("backend.apps.common.versions")
     flask = types.ModuleType("flask")
     kubeflow = types.ModuleType("kubeflow")
     kubeflow_kubeflow = types.ModuleType("kubeflow.kubeflow")
     crud_backend = types.ModuleType("kubeflow.kubeflow.crud_backend")
+    urllib3 = types.ModuleType("urllib3")
+    urllib3_exceptions = types.ModuleType("urllib3.exceptions")
+    urllib3_exceptions.ReadTimeoutError = type("ReadTimeoutError", (Exception,), {})
 
     backend.__path__ = []
     apps.__path__ = []
-    common.__path__ = []
-    sse.__path__ = []
+    common.__path__ = [str(Path(__file__).parent.parent)]
+    sse.__path__ = [str(Path(__file__).parent)]
+    relations.get_relation_index = Mock(return_value=None)
     watchers.InferenceServiceWatcher = Mock()
     watchers.EventWatcher = Mock()
     watchers.LogWatcher = Mock()
@@ -57,6 +73,7 @@ def _load_routes_module():
     flask.Blueprint = Mock()
     flask.Response = Mock()
     flask.request = types.SimpleNamespace(args=types.SimpleNamespace(getlist=Mock()))
+    crud_backend.api = types.SimpleNamespace(success_response=Mock())
     crud_backend.authz = types.SimpleNamespace()
     crud_backend.authz.ensure_authorized = Mock()
     crud_backend.logging = types.SimpleNamespace(
@@ -68,12 +85,15 @@ def _load_routes_module():
         sys.modules["backend.apps"] = apps
         sys.modules["backend.apps.common"] = common
         sys.modules["backend.apps.common.sse"] = sse
+        sys.modules["backend.apps.common.sse.relations"] = relations
         sys.modules["backend.apps.common.sse.watchers"] = watchers
         sys.modules["backend.apps.common.versions"] = versions
         sys.modules["flask"] = flask
         sys.modules["kubeflow"] = kubeflow
         sys.modules["kubeflow.kubeflow"] = kubeflow_kubeflow
         sys.modules["kubeflow.kubeflow.crud_backend"] = crud_backend
+        sys.modules["urllib3"] = urllib3
+        sys.modules["urllib3.exceptions"] = urllib3_exceptions
 
         module_path = Path(__file__).with_name("routes.py")
         spec = importlib.util.spec_from_file_location(
@@ -139,6 +159,15 @@ class SseRouteAuthorizationTest(unittest.TestCase):
             ]
         )
 
+    def test_authorizes_stats_with_cluster_wide_list_access(self):
+        routes = _load_routes_module()
+
+        routes._authorize_stats()
+
+        routes.authz.ensure_authorized.assert_called_once_with(
+            "list", "serving.kserve.io", "v1beta1", "inferenceservices", ""
+        )
+
     def test_authorizes_event_stream_with_event_list_and_watch_access(self):
         routes = _load_routes_module()
 
@@ -152,5 +181,25 @@ class SseRouteAuthorizationTest(unittest.TestCase):
         )
 
 
+class LogContainerArgumentsTest(unittest.TestCase):
+    def test_containers_are_grouped_by_component(self):
+        routes = _load_routes_module()
+
+        containers = routes._log_containers(
+            ["kserve-container", "predictor:queue-proxy", "transformer:agent"]
+        )
+
+        self.assertEqual(
+            containers,
+            {
+                None: ["kserve-container"],
+                "predictor": ["queue-proxy"],
+                "transformer": ["agent"],
+            },
+        )
+        with self.assertRaises(ValueError):
+            routes._log_containers(["predictor:"])
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,654 @@
+"""Log tailers shared by every client following the log of a pod container."""
+
+from collections import deque
+import math
+import os
+import threading
+import time
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
+
+from kubeflow.kubeflow.crud_backend import api, logging
+from urllib3.exceptions import ReadTimeoutError
+
+from ..logs import (
+    LOG_CHUNK_BYTES,
+    LOG_MAX_PAGE_LINES,
+    LogEntry,
+    parse_entry,
+    seconds_since,
+    timestamp_key,
+    timestamp_seconds,
+)
+from .reactor import WatchReactor, WatchReactorFull, close_response, get_reactor
+
+log = logging.getLogger(__name__)
+
+# Lines sent when a client attaches to the log of a pod, also the capacity of
+# the ring buffer of a tailer unless a subscriber asked for more.
+LOG_TAIL_LINES = 1000
+# Bytes of log lines a tailer keeps at most for new subscribers.
+LOG_BUFFER_BYTES = 1024 * 1024
+LOG_REATTACH_SECONDS = 1
+# Log streams being opened at the same time at most, the kubelet reads the
+# first window of each from disk before it answers.
+DEFAULT_LOG_MAX_PARALLEL = 8
+LOG_CONNECT_TIMEOUT_SECONDS = 10
+# A stream without a new line for this long is reopened, so that a kubelet
+# that stopped answering does not hold a stream forever.
+LOG_READ_TIMEOUT_SECONDS = 300
+
+
+class PodLogFollower:
+    """
+    Follows the log of a pod container and sends the lines as they arrive.
+
+    The first window, bounded by tail_lines and since_cutoff, is read
+    without following and sent on its own, then the log is followed from
+    its last line. A refresh reads the window again with wider bounds. When
+    the stream ends, e.g. on a container restart, the follower reattaches
+    from the timestamp of the last line it sent and skips the lines it
+    already sent.
+    """
+
+    def __init__(
+        self,
+        namespace: str,
+        pod: str,
+        container: str,
+        callback: Callable[[List[Tuple[str, str]]], None],
+        reactor: Optional[WatchReactor] = None,
+        tail_lines: Optional[int] = LOG_TAIL_LINES,
+        since_cutoff: Optional[float] = None,
+        open_slots: Optional[threading.Semaphore] = None,
+        on_window: Optional[Callable[..., None]] = None,
+    ):
+        """Initialize the follower.
+
+        Args:
+            namespace: The namespace of the pod
+            pod: The name of the pod
+            container: The container to follow
+            callback: Called with the (timestamp, line) pairs of new lines
+            reactor: Reactor driving the stream, the process one if None
+            tail_lines: Lines of the first window, None for the whole log
+            since_cutoff: Epoch seconds of the oldest line of the first window
+            open_slots: Bounds the streams being opened at the same time
+            on_window: Called with the (timestamp, line) pairs of a window,
+                its tail_lines and the epoch seconds of its oldest line
+                allowed, the callback gets the window if None
+        """
+        self.namespace = namespace
+        self.pod = pod
+        self.container = container
+        self._callback = callback
+        self._on_window = on_window
+        self._reactor = reactor or get_reactor()
+        self._tail_lines = tail_lines
+        self._since_cutoff = since_cutoff
+        self._open_slots = open_slots
+        self._stop_event = threading.Event()
+        self._task = None
+        self._response = None
+        self._reading_window = False
+        self._window_pending = True
+        self._lock = threading.Lock()
+        self._last_timestamp: Optional[str] = None
+
+    def start(self):
+        """Start following the log."""
+        self._task = self._reactor.register(
+            f"logs/{self.namespace}/{self.pod}/{self.container}",
+            self._follow_step,
+            self._on_error,
+            self._stop_event,
+        )
+        return self
+
+    def refresh(self, tail_lines: Optional[int], since_cutoff: Optional[float]):
+        """
+        Read the window again, widened to cover the given bounds.
+
+        Args:
+            tail_lines: Lines the window should hold, None for the whole log
+            since_cutoff: Epoch seconds of the oldest line it should hold
+        """
+        with self._lock:
+            widened = False
+            if self._tail_lines is not None and (
+                tail_lines is None or tail_lines > self._tail_lines
+            ):
+                self._tail_lines = tail_lines
+                widened = True
+            if self._since_cutoff is not None and (
+                since_cutoff is None or since_cutoff < self._since_cutoff
+            ):
+                self._since_cutoff = since_cutoff
+                widened = True
+            if self._window_pending or (self._reading_window and not widened):
+                return
+            self._window_pending = True
+            response = None if self._reading_window else self._response
+
+        # The follow step ends with its stream and reads the window next.
+        if response:
+            close_response(response)
+
+    def _follow_step(self):
+        """Read the window if due, then stream the log until it ends."""
+        with self._lock:
+            read_window = self._window_pending
+            self._window_pending = False
+            self._reading_window = read_window
+            window_kwargs = self._window_kwargs()
+            window_bounds = (self._tail_lines, self._since_cutoff)
+
+        if read_window:
+            window = None
+            try:
+                window = self._read_window(window_kwargs)
+            finally:
+                with self._lock:
+                    self._reading_window = False
+                    # A failed read is retried by the next step.
+                    self._window_pending = self._window_pending or window is None
+            if window is None:
+                return
+            if window:
+                self._last_timestamp = window[-1][0]
+            if self._on_window:
+                self._on_window(window, *window_bounds)
+            elif window:
+                self._callback(window)
+
+        kwargs = {"follow": True, "timestamps": True, "_preload_content": False}
+        if self._last_timestamp is None:
+            # Nothing was logged in the window, lines logged since it was read
+            # are the only ones within its bounds.
+            kwargs.update(window_kwargs)
+        else:
+            since = int(seconds_since(self._last_timestamp)) + 1
+            kwargs["since_seconds"] = max(since, 1)
+
+        response = self._open(kwargs)
+        if response is None:
+            return
+        with self._lock:
+            self._response = response
+        if self._stop_event.is_set() or self._window_pending:
+            close_response(response)
+
+        try:
+            pending = b""
+            for chunk in response.stream(LOG_CHUNK_BYTES):
+                if self._stop_event.is_set() or self._window_pending:
+                    break
+                *complete, pending = (pending + chunk).split(b"\n")
+                self._send(complete)
+            if pending and not (self._stop_event.is_set() or self._window_pending):
+                self._send([pending])
+        except ReadTimeoutError:
+            # A quiet container, reattach right away from the last line sent.
+            return
+        except Exception:
+            # A stream closed by a refresh, the window is read right away.
+            if not self._window_pending:
+                raise
+            return
+        finally:
+            with self._lock:
+                self._response = None
+            response.release_conn()
+
+        if self._window_pending:
+            return
+        # A terminated container ends the stream, wait before reattaching.
+        self._stop_event.wait(LOG_REATTACH_SECONDS)
+
+    def _window_kwargs(self) -> Dict[str, Any]:
+        kwargs = {}
+        if self._tail_lines is not None:
+            kwargs["tail_lines"] = self._tail_lines
+        if self._since_cutoff is not None:
+            since = math.ceil(time.time() - self._since_cutoff)
+            kwargs["since_seconds"] = max(since, 1)
+        return kwargs
+
+    def _read_window(self, window_kwargs: Dict[str, Any]) -> Optional[List[LogEntry]]:
+        """Return the entries of the window, None if stopped first."""
+        response = self._open(
+            {"timestamps": True, "_preload_content": False, **window_kwargs}
+        )
+        if response is None:
+            return None
+        with self._lock:
+            self._response = response
+        if self._stop_event.is_set():
+            close_response(response)
+
+        try:
+            window = []
+            pending = b""
+            for chunk in response.stream(LOG_CHUNK_BYTES):
+                *complete, pending = (pending + chunk).split(b"\n")
+                window.extend(parse_entry(raw_line) for raw_line in complete)
+            if pending:
+                window.append(parse_entry(pending))
+        finally:
+            with self._lock:
+                self._response = None
+            response.release_conn()
+        return None if self._stop_event.is_set() else window
+
+    def _open(self, kwargs: Dict[str, Any]) -> Any:
+        """Open the log stream once a slot is free, None if stopped first."""
+        if self._open_slots:
+            while not self._open_slots.acquire(timeout=1):
+                if self._stop_event.is_set():
+                    return None
+        try:
+            return api.v1_core.read_namespaced_pod_log(
+                self.pod,
+                self.namespace,
+                container=self.container,
+                _request_timeout=(
+                    LOG_CONNECT_TIMEOUT_SECONDS,
+                    LOG_READ_TIMEOUT_SECONDS,
+                ),
+                **kwargs,
+            )
+        finally:
+            if self._open_slots:
+                self._open_slots.release()
+
+    def _send(self, raw_lines: List[bytes]):
+        entries = []
+        for raw_line in raw_lines:
+            timestamp, line = parse_entry(raw_line)
+            if self._last_timestamp and timestamp_key(timestamp) <= timestamp_key(
+                self._last_timestamp
+            ):
+                continue
+            self._last_timestamp = timestamp
+            entries.append((timestamp, line))
+        if entries:
+            self._callback(entries)
+
+    def _on_error(self, error):
+        log.warning(
+            f"Error following logs of {self.namespace}/{self.pod}/"
+            f"{self.container}: {error}"
+        )
+
+    def stop(self):
+        """Stop following the log."""
+        self._stop_event.set()
+        with self._lock:
+            response = self._response
+        if response:
+            close_response(response)
+        if self._task:
+            self._task.join(timeout=5)
+
+
+def _window_of(
+    entries: List[LogEntry],
+    complete: bool,
+    bounds: Optional[Tuple[Optional[int], Optional[float]]],
+    tail_lines: Optional[int],
+    since_cutoff: Optional[float],
+) -> Optional[List[LogEntry]]:
+    """
+    Return the window of a subscriber out of the last lines of a log.
+
+    Args:
+        entries: The last lines of the log, oldest first
+        complete: Whether entries hold every line within bounds
+        bounds: The tail_lines and since cutoff entries were read with, None
+            if no window was read yet
+        tail_lines: Lines of the window of the subscriber, None for all
+        since_cutoff: Epoch seconds of the oldest line of the window
+
+    Returns:
+        The window, None if entries do not hold all of it
+    """
+    if bounds is None:
+        return None
+    recent = entries
+    if since_cutoff is not None:
+        recent = [
+            entry for entry in entries if timestamp_seconds(entry[0]) >= since_cutoff
+        ]
+    window = recent
+    if tail_lines is not None:
+        window = recent[-tail_lines:] if tail_lines else []
+
+    read_tail, read_cutoff = bounds
+    within_bounds = (
+        read_tail is None or (tail_lines is not None and tail_lines <= read_tail)
+    ) and (
+        read_cutoff is None
+        or (since_cutoff is not None and since_cutoff >= read_cutoff)
+    )
+    if (
+        (complete and within_bounds)
+        or (tail_lines is not None and len(recent) >= tail_lines)
+        or len(recent) < len(entries)
+    ):
+        return window
+    return None
+
+
+class LogTailer:
+    """
+    The shared follower of a pod container and a ring buffer of its lines.
+
+    New subscribers receive their window out of the buffered lines right
+    away, or out of the next window read by the follower when the buffer
+    does not hold all of it. Appended lines are fanned out to every
+    attached subscriber.
+    """
+
+    def __init__(self, namespace: str, pod: str, container: str):
+        """
+        Initialize the tailer.
+
+        Args:
+            namespace: The namespace of the pod
+            pod: The name of the pod
+            container: The container to follow
+        """
+        self.namespace = namespace
+        self.pod = pod
+        self.container = container
+        self.follower: Optional[PodLogFollower] = None
+        self.subscribers: Dict[Any, Callable] = {}
+        self.waiting: Dict[Any, Tuple[Callable, Optional[int], Optional[float]]] = {}
+        self.buffered_bytes = 0
+        self._buffer: Deque[Tuple[str, str, int]] = deque()
+        self._max_lines = LOG_TAIL_LINES
+        # The bounds of the last window read, and whether no line of it was
+        # dropped from the buffer since.
+        self._bounds: Optional[Tuple[Optional[int], Optional[float]]] = None
+        self._complete = False
+        self._lock = threading.Lock()
+
+    def subscribe(
+        self,
+        subscription: Any,
+        callback: Callable[[List[Tuple[str, str]]], None],
+        tail_lines: Optional[int] = LOG_TAIL_LINES,
+        since_cutoff: Optional[float] = None,
+    ) -> bool:
+        """
+        Replay the window of a subscriber out of the buffer and attach it.
+
+        Args:
+            subscription: The key of the subscriber
+            callback: Called with the (timestamp, line) pairs of the window,
+                then with those of new lines
+            tail_lines: Lines of the window, None for all
+            since_cutoff: Epoch seconds of the oldest line of the window
+
+        Returns:
+            False if the buffer does not hold the window, the subscriber
+            then waits for the next window read by the follower
+        """
+        with self._lock:
+            entries = [(timestamp, line) for timestamp, line, _ in self._buffer]
+            window = _window_of(
+                entries, self._complete, self._bounds, tail_lines, since_cutoff
+            )
+            if window is None:
+                self.waiting[subscription] = (callback, tail_lines, since_cutoff)
+                return False
+            # Replayed under the lock, so that no appended line is missed.
+            if window:
+                callback(window)
+            self.subscribers[subscription] = callback
+            return True
+
+    def unsubscribe(self, subscription: Any) -> bool:
+        """Detach a subscriber, return whether subscribers remain."""
+        with self._lock:
+            self.subscribers.pop(subscription, None)
+            self.waiting.pop(subscription, None)
+            return bool(self.subscribers or self.waiting)
+
+    def load_window(
+        self,
+        entries: List[Tuple[str, str]],
+        tail_lines: Optional[int],
+        since_cutoff: Optional[float],
+    ):
+        """
+        Replace the buffer with a window read by the follower.
+
+        Attached subscribers get the lines newer than the ones they have,
+        waiting subscribers their own window out of it.
+
+        Args:
+            entries: The (timestamp, line) pairs of the window
+            tail_lines: Lines the window was read with, None for all
+            since_cutoff: Epoch seconds of the oldest line it was read with
+        """
+        with self._lock:
+            new = entries
+            if self._buffer:
+                last = timestamp_key(self._buffer[-1][0])
+                new = [entry for entry in entries if timestamp_key(entry[0]) > last]
+
+            self._buffer = deque(
+                (timestamp, line, len(line)) for timestamp, line in entries
+            )
+            self.buffered_bytes = sum(size for _, _, size in self._buffer)
+            self._max_lines = max(LOG_TAIL_LINES, tail_lines or 0)
+            self._bounds = (tail_lines, since_cutoff)
+            self._complete = True
+            self._trim()
+
+            if new:
+                self._fan_out(new)
+            for subscription, (callback, tail, cutoff) in list(self.waiting.items()):
+                window = _window_of(entries, True, self._bounds, tail, cutoff)
+                if window is None:
+                    continue
+                del self.waiting[subscription]
+                if window:
+                    self._send(callback, window)
+                self.subscribers[subscription] = callback
+
+    def append(self, entries: List[Tuple[str, str]]):
+        """Buffer new (timestamp, line) entries and fan them out."""
+        with self._lock:
+            for timestamp, line in entries:
+                size = len(line)
+                self._buffer.append((timestamp, line, size))
+                self.buffered_bytes += size
+            self._trim()
+            self._fan_out(entries)
+
+    def _trim(self):
+        while self._buffer and (
+            len(self._buffer) > self._max_lines
+            or self.buffered_bytes > LOG_BUFFER_BYTES
+        ):
+            self.buffered_bytes -= self._buffer.popleft()[2]
+            self._complete = False
+
+    def _fan_out(self, entries: List[Tuple[str, str]]):
+        for callback in list(self.subscribers.values()):
+            self._send(callback, entries)
+
+    def _send(self, callback: Callable, entries: List[Tuple[str, str]]):
+        try:
+            callback(entries)
+        except Exception as e:
+            log.error(f"Error sending log lines of {self.pod}: {e}")
+
+    def buffered_lines(self) -> int:
+        """Return the number of buffered lines."""
+        with self._lock:
+            return len(self._buffer)
+
+
+class LogTailerRegistry:
+    """
+    Runs one log tailer per (namespace, pod, container) for all its clients.
+
+    Subscribing starts the tailer of a container if needed, the last
+    unsubscribe stops it, like the watches of SSEConnectionManager. The
+    follower is started with the first window of the first subscriber and
+    refreshed with a wider one when a later subscriber asks for lines the
+    buffer does not hold.
+    """
+
+    def __init__(
+        self,
+        reactor: Optional[WatchReactor] = None,
+        max_parallel: int = DEFAULT_LOG_MAX_PARALLEL,
+    ):
+        """
+        Initialize the registry.
+
+        Args:
+            reactor: Reactor driving the followers, the process one if None
+            max_parallel: Log streams being opened at the same time at most
+        """
+        self._reactor = reactor
+        self.max_parallel = max_parallel
+        self._open_slots = threading.BoundedSemaphore(max_parallel)
+        self._tailers: Dict[Tuple[str, str, str], LogTailer] = {}
+        self._lock = threading.Lock()
+
+    def subscribe(
+        self,
+        namespace: str,
+        pod: str,
+        container: str,
+        callback: Callable[[List[Tuple[str, str]]], None],
+        tail_lines: Optional[int] = LOG_TAIL_LINES,
+        since_seconds: Optional[int] = None,
+    ) -> Any:
+        """
+        Subscribe to the lines of a pod container.
+
+        Args:
+            namespace: The namespace of the pod
+            pod: The name of the pod
+            container: The container to follow
+            callback: Called with the (timestamp, line) pairs of the buffered
+                window, then with those of new lines
+            tail_lines: Lines of the first window of the subscriber, at most
+                LOG_MAX_PAGE_LINES, None for the whole log
+            since_seconds: Age of the oldest line of the first window
+
+        Returns:
+            The subscription to unsubscribe with
+
+        Raises:
+            WatchReactorFull: If the log of the container cannot be followed
+        """
+        key = (namespace, pod, container)
+        subscription = object()
+        follower = None
+        if tail_lines is not None:
+            tail_lines = min(tail_lines, LOG_MAX_PAGE_LINES)
+        since_cutoff = None if since_seconds is None else time.time() - since_seconds
+
+        with self._lock:
+            tailer = self._tailers.get(key)
+            if tailer is None:
+                tailer = LogTailer(namespace, pod, container)
+                self._tailers[key] = tailer
+                follower = PodLogFollower(
+                    namespace,
+                    pod,
+                    container,
+                    tailer.append,
+                    self._reactor or get_reactor(),
+                    tail_lines=tail_lines,
+                    since_cutoff=since_cutoff,
+                    open_slots=self._open_slots,
+                    on_window=tailer.load_window,
+                )
+                tailer.follower = follower
+            attached = tailer.subscribe(
+                subscription, callback, tail_lines, since_cutoff
+            )
+
+        if not follower and not attached:
+            tailer.follower.refresh(tail_lines, since_cutoff)
+        if follower:
+            try:
+                follower.start()
+            except WatchReactorFull:
+                with self._lock:
+                    if self._tailers.get(key) is tailer:
+                        del self._tailers[key]
+                raise
+        return subscription
+
+    def unsubscribe(self, namespace: str, pod: str, container: str, subscription):
+        """
+        Unsubscribe from the lines of a pod container.
+
+        Args:
+            namespace: The namespace of the pod
+            pod: The name of the pod
+            container: The container followed
+            subscription: The subscription returned by subscribe
+        """
+        key = (namespace, pod, container)
+        follower = None
+
+        with self._lock:
+            tailer = self._tailers.get(key)
+            if tailer and not tailer.unsubscribe(subscription):
+                del self._tailers[key]
+                follower = tailer.follower
+
+        if follower:
+            follower.stop()
+
+    def stats(self) -> Dict[str, Any]:
+        """Return the number of tailers, subscribers and buffered bytes."""
+        with self._lock:
+            tailers = list(self._tailers.values())
+
+        return {
+            "activeTailers": len(tailers),
+            "maxParallelOpens": self.max_parallel,
+            "subscribers": sum(
+                len(tailer.subscribers) + len(tailer.waiting) for tailer in tailers
+            ),
+            "bufferedBytes": sum(tailer.buffered_bytes for tailer in tailers),
+            "bufferedLines": sum(tailer.buffered_lines() for tailer in tailers),
+            "tailers": [
+                {
+                    "namespace": tailer.namespace,
+                    "pod": tailer.pod,
+                    "container": tailer.container,
+                    "subscribers": len(tailer.subscribers) + len(tailer.waiting),
+                    "bufferedBytes": tailer.buffered_bytes,
+                }
+                for tailer in tailers
+            ],
+        }
+
+
+_log_tailers: Optional[LogTailerRegistry] = None
+_log_tailers_lock = threading.Lock()
+
+
+def get_log_tailers() -> LogTailerRegistry:
+    """Return the log tailer registry of the process, see SSE_LOG_MAX_PARALLEL."""
+    global _log_tailers
+    with _log_tailers_lock:
+        if _log_tailers is None:
+            max_parallel = os.environ.get("SSE_LOG_MAX_PARALLEL", "").strip()
+            _log_tailers = LogTailerRegistry(
+                max_parallel=(
+                    int(max_parallel) if max_parallel else DEFAULT_LOG_MAX_PARALLEL
+                )
+            )
+        return _log_tailers
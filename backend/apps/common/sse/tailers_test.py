@@ -0,0 +1,376 @@
+"""Unit tests for the shared log tailers.
+
+Run directly with:
+    python3 backend/apps/common/sse/tailers_test.py
+"""
+
+from datetime import datetime, timedelta, timezone
+import importlib.util
+import logging as python_logging
+from pathlib import Path
+import sys
+import threading
+import time
+import types
+import unittest
+from unittest.mock import Mock
+
+
+def _load_tailers_module():
+    """Load tailers.py with lightweight stubs for external dependencies."""
+    module_names = (
+        "backend",
+        "backend.apps",
+        "backend.apps.common",
+        "backend.apps.common.logs",
+        "backend.apps.common.sse",
+        "backend.apps.common.sse.reactor",
+        "kubeflow",
+        "kubeflow.kubeflow",
+        "kubeflow.kubeflow.crud_backend",
+        "urllib3",
+        "urllib3.exceptions",
+    )
+    original_modules = {name: sys.modules.get(name) for name in module_names}
+
+    backend = types.ModuleType("backend")
+    apps = types.ModuleType("backend.apps")
+    common = types.ModuleType("backend.apps.common")
+    sse = types.ModuleType("backend.apps.common.sse")
+    kubeflow = types.ModuleType("kubeflow")
+    kubeflow_kubeflow = types.ModuleType("kubeflow.kubeflow")
+    crud_backend = types.ModuleType("kubeflow.kubeflow.crud_backend")
+    urllib3 = types.ModuleType("urllib3")
+    urllib3_exceptions = types.ModuleType("urllib3.exceptions")
+    urllib3_exceptions.ReadTimeoutError = type("ReadTimeoutError", (Exception,), {})
+
+    backend.__path__ = []
+    apps.__path__ = []
+    common.__path__ = [str(Path(__file__).parent.parent)]
+    sse.__path__ = [str(Path(__file__).parent)]
+    crud_backend.api = types.SimpleNamespace(v1_core=Mock())
+    crud_backend.logging = types.SimpleNamespace(
+        getLogger=lambda name: python_logging.getLogger(name)
+    )
+
+    try:
+        sys.modules["backend"] = backend
+        sys.modules["backend.apps"] = apps
+        sys.modules["backend.apps.common"] = common
+        sys.modules["backend.apps.common.sse"] = sse
+        sys.modules["kubeflow"] = kubeflow
+        sys.modules["kubeflow.kubeflow"] = kubeflow_kubeflow
+        sys.modules["kubeflow.kubeflow.crud_backend"] = crud_backend
+        sys.modules["urllib3"] = urllib3
+        sys.modules["urllib3.exceptions"] = urllib3_exceptions
+
+        module_path = Path(__file__).with_name("tailers.py")
+        spec = importlib.util.spec_from_file_location(
+            "backend.apps.common.sse.tailers_under_test", module_path
+        )
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+        return module
+    finally:
+        for name, original_module in original_modules.items():
+            if original_module is None:
+                sys.modules.pop(name, None)
+            else:
+                sys.modules[name] = original_module
+
+
+tailers = _load_tailers_module()
+tailers.LOG_REATTACH_SECONDS = 0
+
+TIMEOUT = 5
+
+
+class FakeLogResponse:
+    def __init__(self, *chunks):
+        self.chunks = chunks
+
+    def stream(self, amount):
+        yield from self.chunks
+
+    def close(self):
+        pass
+
+    def release_conn(self):
+        pass
+
+
+class PodLogFollowerTest(unittest.TestCase):
+    def setUp(self):
+        self.read_log = tailers.api.v1_core.read_namespaced_pod_log
+        self.read_log.reset_mock(return_value=True, side_effect=True)
+        self.entries = []
+
+    def _follower(self, **kwargs):
+        return tailers.PodLogFollower(
+            "ns", "pod-a", "kserve-container", self.entries.extend, Mock(), **kwargs
+        )
+
+    def _lines(self):
+        return [line for _, line in self.entries]
+
+    def test_follower_sends_complete_lines_without_timestamps(self):
+        self.read_log.side_effect = [
+            FakeLogResponse(
+                b"2024-01-01T00:00:00.1Z first\n2024-01-01T00:00:00.2Z sec",
+                b"ond\n",
+            ),
+            FakeLogResponse(
+                b"2024-01-01T00:00:00.2Z second\n2024-01-01T00:00:00.3Z third"
+            ),
+        ]
+
+        self._follower(tail_lines=100)._follow_step()
+
+        self.assertEqual(self._lines(), ["first", "second", "third"])
+        window_kwargs, follow_kwargs = (
+            call.kwargs for call in self.read_log.call_args_list
+        )
+        self.assertNotIn("follow", window_kwargs)
+        self.assertTrue(window_kwargs["timestamps"])
+        self.assertEqual(window_kwargs["tail_lines"], 100)
+        self.assertTrue(follow_kwargs["follow"])
+        self.assertNotIn("tail_lines", follow_kwargs)
+        self.assertGreater(follow_kwargs["since_seconds"], 0)
+
+    def test_follower_sends_the_window_on_its_own_and_reads_it_again(self):
+        windows = []
+        follower = self._follower(
+            tail_lines=10,
+            since_cutoff=None,
+            on_window=lambda *window: windows.append(window),
+        )
+        self.read_log.side_effect = [
+            FakeLogResponse(b"2024-01-01T00:00:00.1Z first\n"),
+            FakeLogResponse(b"2024-01-01T00:00:00.2Z second\n"),
+            FakeLogResponse(
+                b"2024-01-01T00:00:00.05Z older\n"
+                b"2024-01-01T00:00:00.1Z first\n"
+                b"2024-01-01T00:00:00.2Z second\n"
+            ),
+            FakeLogResponse(b"2024-01-01T00:00:00.3Z third\n"),
+        ]
+
+        follower._follow_step()
+        follower.refresh(5, None)
+        follower.refresh(None, 0)
+        follower._follow_step()
+
+        self.assertEqual(
+            windows,
+            [
+                ([("2024-01-01T00:00:00.1Z", "first")], 10, None),
+                (
+                    [
+                        ("2024-01-01T00:00:00.05Z", "older"),
+                        ("2024-01-01T00:00:00.1Z", "first"),
+                        ("2024-01-01T00:00:00.2Z", "second"),
+                    ],
+                    None,
+                    None,
+                ),
+            ],
+        )
+        self.assertEqual(self._lines(), ["second", "third"])
+        self.assertNotIn("tail_lines", self.read_log.call_args_list[2].kwargs)
+
+    def test_follower_reattaches_after_the_last_sent_line(self):
+        follower = self._follower()
+        self.read_log.side_effect = [
+            FakeLogResponse(),
+            FakeLogResponse(b"2024-01-01T00:00:00.5Z first\n"),
+            FakeLogResponse(
+                b"2024-01-01T00:00:00.123Z older\n"
+                b"2024-01-01T00:00:00.5Z first\n"
+                b"2024-01-01T00:00:01Z after restart\n"
+            ),
+        ]
+
+        follower._follow_step()
+        follower._follow_step()
+
+        self.assertEqual(self._lines(), ["first", "after restart"])
+        kwargs = self.read_log.call_args.kwargs
+        self.assertNotIn("tail_lines", kwargs)
+        self.assertGreater(kwargs["since_seconds"], 0)
+
+    def test_follower_reads_with_timeouts_and_reattaches_quiet_streams(self):
+        response = FakeLogResponse(b"2024-01-01T00:00:00.1Z first\n")
+        response.stream = Mock(
+            side_effect=tailers.ReadTimeoutError("read timed out"),
+        )
+        self.read_log.side_effect = [FakeLogResponse(), response]
+
+        self._follower()._follow_step()
+
+        self.assertEqual(
+            self.read_log.call_args.kwargs["_request_timeout"],
+            (tailers.LOG_CONNECT_TIMEOUT_SECONDS, tailers.LOG_READ_TIMEOUT_SECONDS),
+        )
+
+    def test_follower_waits_for_a_free_slot_to_open_the_stream(self):
+        slots = threading.BoundedSemaphore(1)
+        slots.acquire()
+        follower = tailers.PodLogFollower(
+            "ns", "pod-a", "kserve-container", Mock(), Mock(), open_slots=slots
+        )
+        self.read_log.return_value = FakeLogResponse()
+        opened = threading.Thread(target=follower._follow_step)
+        opened.start()
+
+        opened.join(0.2)
+        self.assertTrue(opened.is_alive())
+        self.read_log.assert_not_called()
+
+        slots.release()
+        opened.join(TIMEOUT)
+        # The window, then the log followed.
+        self.assertEqual(self.read_log.call_count, 2)
+        # The slot is freed once the stream is open.
+        self.assertTrue(slots.acquire(blocking=False))
+
+
+class FakeFollower:
+    instances = []
+
+    def __init__(self, namespace, pod, container, callback, reactor, **kwargs):
+        self.append = callback
+        self.load_window = kwargs["on_window"]
+        self.kwargs = kwargs
+        self.refreshes = []
+        self.started = False
+        self.stopped = False
+        FakeFollower.instances.append(self)
+
+    def start(self):
+        self.started = True
+
+    def refresh(self, tail_lines, since_cutoff):
+        self.refreshes.append((tail_lines, since_cutoff))
+
+    def stop(self):
+        self.stopped = True
+
+
+def _timestamp(age_seconds):
+    moment = datetime.now(timezone.utc) - timedelta(seconds=age_seconds)
+    return moment.strftime("%Y-%m-%dT%H:%M:%S.%fZ")
+
+
+class LogTailerRegistryTest(unittest.TestCase):
+    def setUp(self):
+        FakeFollower.instances = []
+        original_follower = tailers.PodLogFollower
+        tailers.PodLogFollower = FakeFollower
+        self.addCleanup(setattr, tailers, "PodLogFollower", original_follower)
+        self.registry = tailers.LogTailerRegistry(reactor=Mock())
+
+    def test_subscribers_share_one_follower_and_get_the_buffered_lines(self):
+        first, second = [], []
+        first_subscription = self.registry.subscribe(
+            "ns", "pod-a", "kserve-container", first.append
+        )
+        follower = FakeFollower.instances[0]
+        a, b, c = (
+            ("2024-01-01T00:00:01Z", "a"),
+            ("2024-01-01T00:00:02Z", "b"),
+            ("2024-01-01T00:00:03Z", "c"),
+        )
+        follower.load_window([a, b], tailers.LOG_TAIL_LINES, None)
+
+        second_subscription = self.registry.subscribe(
+            "ns", "pod-a", "kserve-container", second.append, tail_lines=1
+        )
+        follower.append([c])
+
+        self.assertEqual(len(FakeFollower.instances), 1)
+        self.assertTrue(follower.started)
+        self.assertEqual(follower.refreshes, [])
+        self.assertEqual(first, [[a, b], [c]])
+        self.assertEqual(second, [[b], [c]])
+        stats = self.registry.stats()
+        self.assertEqual(stats["activeTailers"], 1)
+        self.assertEqual(stats["subscribers"], 2)
+        self.assertEqual(stats["bufferedBytes"], 3)
+
+        self.registry.unsubscribe("ns", "pod-a", "kserve-container", first_subscription)
+        self.assertFalse(follower.stopped)
+        self.registry.unsubscribe(
+            "ns", "pod-a", "kserve-container", second_subscription
+        )
+        self.assertTrue(follower.stopped)
+        self.assertEqual(self.registry.stats()["activeTailers"], 0)
+
+    def test_first_window_is_trimmed_to_the_tail_lines_of_each_subscriber(self):
+        first, second = [], []
+        self.registry.subscribe(
+            "ns", "pod-a", "kserve-container", first.append, tail_lines=10
+        )
+        follower = FakeFollower.instances[0]
+        self.assertEqual(follower.kwargs["tail_lines"], 10)
+
+        # Above the default tail, the follower is refreshed with a wider window.
+        self.registry.subscribe(
+            "ns", "pod-a", "kserve-container", second.append, tail_lines=1500
+        )
+        self.assertEqual(follower.refreshes, [(1500, None)])
+
+        entries = [("2024-01-01T00:00:00Z", str(index)) for index in range(1500)]
+        follower.load_window(entries, 1500, None)
+        follower.append([("2024-01-01T00:00:01Z", "new")])
+
+        self.assertEqual(first[0], entries[-10:])
+        self.assertEqual(second[0], entries)
+        self.assertEqual(first[1:], second[1:])
+        self.assertEqual(first[1], [("2024-01-01T00:00:01Z", "new")])
+
+    def test_first_window_is_trimmed_to_the_since_seconds_of_each_subscriber(self):
+        first, second = [], []
+        self.registry.subscribe(
+            "ns", "pod-a", "kserve-container", first.append, since_seconds=60
+        )
+        follower = FakeFollower.instances[0]
+        self.assertAlmostEqual(
+            follower.kwargs["since_cutoff"], time.time() - 60, delta=5
+        )
+
+        self.registry.subscribe("ns", "pod-a", "kserve-container", second.append)
+        self.assertEqual(follower.refreshes, [(tailers.LOG_TAIL_LINES, None)])
+
+        old, recent = (_timestamp(3600), "old"), (_timestamp(1), "recent")
+        follower.load_window([old, recent], tailers.LOG_TAIL_LINES, None)
+
+        self.assertEqual(first, [[recent]])
+        self.assertEqual(second, [[old, recent]])
+
+    def test_ring_buffer_is_bounded(self):
+        self.registry.subscribe("ns", "pod-a", "kserve-container", Mock())
+        follower = FakeFollower.instances[0]
+        follower.load_window([], tailers.LOG_TAIL_LINES, None)
+
+        entries = [("2024-01-01T00:00:00Z", str(index)) for index in range(1500)]
+        follower.append(entries)
+
+        late, whole = [], []
+        self.registry.subscribe("ns", "pod-a", "kserve-container", late.append)
+        self.assertEqual(len(late[0]), tailers.LOG_TAIL_LINES)
+        self.assertEqual(late[0][-1], ("2024-01-01T00:00:00Z", "1499"))
+        self.assertEqual(self.registry.stats()["bufferedLines"], tailers.LOG_TAIL_LINES)
+
+        # The start of the log is no longer buffered, it is read again.
+        self.registry.subscribe(
+            "ns", "pod-a", "kserve-container", whole.append, tail_lines=None
+        )
+        self.assertEqual(whole, [])
+        self.assertEqual(follower.refreshes, [(None, None)])
+        follower.load_window(entries, None, None)
+        self.assertEqual(whole, [entries])
+        self.assertEqual(len(late), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
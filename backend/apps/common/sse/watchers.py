@@ -1,46 +1,123 @@
 """Kubernetes resource watchers for real-time updates."""
 
+import random
 import threading
-import time
-from typing import Callable, Optional, List
+from typing import Any, Callable, Dict, List, Optional, Tuple
 
 from kubernetes import client, watch
 from kubeflow.kubeflow.crud_backend import api, logging
-from .. import utils, versions
+from .. import raw, utils, versions
+from ..logs import LogFilter, LogMerger
+from .reactor import (
+    ClosingWatch,
+    WatchReactor,
+    WatchReactorFull,
+    get_reactor,
+    retry_delay,
+)
+from .tailers import LOG_TAIL_LINES, LogTailerRegistry, get_log_tailers
 
 log = logging.getLogger(__name__)
 
+WATCH_TIMEOUT_SECONDS = 300
+WATCH_TIMEOUT_JITTER = 0.2
+LOG_CONTAINER = "kserve-container"
+# Seconds between the lookups of the pods of a component.
+LOG_RESOLVE_SECONDS = 5
+
+
+class ResourceVersionExpired(Exception):
+    """The resourceVersion a watch resumes from is no longer available."""
+
+
+def _watch_timeout() -> int:
+    """Return a jittered watch timeout, so that watches renew at different times."""
+    jitter = WATCH_TIMEOUT_SECONDS * WATCH_TIMEOUT_JITTER
+    return int(
+        random.uniform(WATCH_TIMEOUT_SECONDS - jitter, WATCH_TIMEOUT_SECONDS + jitter)
+    )
+
+
+def _is_expired(error: Exception) -> bool:
+    return (
+        isinstance(error, ResourceVersionExpired)
+        or getattr(error, "status", None) == 410
+    )
+
+
+def _in_app_context(app, step: Callable, *args):
+    if app:
+        with app.app_context():
+            return step(*args)
+    return step(*args)
+
+
+def _with_deployment_mode(obj):
+    try:
+        obj["deploymentMode"] = utils.get_deployment_mode(obj)
+    except Exception:
+        pass
+    return obj
+
 
 class InferenceServiceWatcher:
-    """Watches InferenceService resources for changes."""
+    """
+    Watches InferenceService resources for changes.
 
-    def __init__(self, app=None):
+    Watches request bookmarks, so the resume point stays current while
+    nothing changes. When the resume point expired anyway (410 Gone), the
+    watcher relists and only sends the objects that changed since the last
+    event it saw.
+    """
+
+    def __init__(self, app=None, reactor: Optional[WatchReactor] = None):
         """Initialize the watcher.
 
         Args:
-            app: Flask application instance (for app context in threads)
+            app: Flask application instance (for app context in the streams)
+            reactor: Reactor driving the watch stream, the process one if None
         """
         self._stop_event = threading.Event()
-        self._thread = None
+        self._task = None
         self._app = app
+        self._reactor = reactor or get_reactor()
         self._active_watch = None
         self._watch_lock = threading.Lock()
+        self._initial_sent = False
+        self._resource_version: Optional[str] = None
+        # uid and resourceVersion of the objects sent so far, by object key.
+        self._known: Dict[Tuple[str, str], Tuple[str, str]] = {}
 
-    def watch_namespace(self, namespace: str, callback: Callable):
+    def watch_namespace(
+        self,
+        namespace: str,
+        callback: Callable,
+        resource_version: Optional[str] = None,
+        known_objects: Optional[List[dict]] = None,
+    ):
         """
         Watch all InferenceServices in a namespace.
 
         Args:
             namespace: The namespace to watch
             callback: Callback function(event_type, obj) to handle events
+            resource_version: Resume after this resourceVersion instead of
+                sending an INITIAL list
+            known_objects: The objects the receiver has when resuming, a
+                relist after 410 Gone sends the deletions among them
         """
         self._stop_event.clear()
-        self._thread = threading.Thread(
-            target=self._watch_namespace_thread,
-            args=(namespace, callback),
-            daemon=True,
+        self._initial_sent = resource_version is not None
+        self._resource_version = resource_version
+        self._remember_all(known_objects or [])
+        self._task = self._reactor.register(
+            f"inferenceservices/{namespace}",
+            lambda: _in_app_context(
+                self._app, self._namespace_step, namespace, callback
+            ),
+            lambda e: self._on_error(f"namespace watch for {namespace}", callback, e),
+            self._stop_event,
         )
-        self._thread.start()
         return self
 
     def watch_single(self, namespace: str, name: str, callback: Callable):
@@ -53,44 +130,33 @@ class InferenceServiceWatcher:
             callback: Callback function(event_type, obj) to handle events
         """
         self._stop_event.clear()
-        self._thread = threading.Thread(
-            target=self._watch_single_thread,
-            args=(namespace, name, callback),
-            daemon=True,
+        self._initial_sent = False
+        self._resource_version = None
+        self._task = self._reactor.register(
+            f"inferenceservices/{namespace}/{name}",
+            lambda: _in_app_context(
+                self._app, self._single_step, namespace, name, callback
+            ),
+            lambda e: self._on_error(
+                f"single watch for {namespace}/{name}", callback, e
+            ),
+            self._stop_event,
         )
-        self._thread.start()
         return self
 
-    def _watch_namespace_thread(self, namespace: str, callback: Callable):
-        """Thread function for watching a namespace."""
-        initial_sent = False
-        resource_version = None
-
-        while not self._stop_event.is_set():
-            try:
-                if self._app:
-                    with self._app.app_context():
-                        gvk = versions.inference_service_gvk()
-                        initial_sent, resource_version = self._do_namespace_watch(
-                            gvk, namespace, callback, initial_sent, resource_version
-                        )
-                else:
-                    gvk = versions.inference_service_gvk()
-                    initial_sent, resource_version = self._do_namespace_watch(
-                        gvk, namespace, callback, initial_sent, resource_version
-                    )
-
-                if self._stop_event.is_set():
-                    break
+    def _namespace_step(self, namespace: str, callback: Callable):
+        """Run the namespace watch until its stream ends."""
+        gvk = versions.inference_service_gvk()
+        self._initial_sent, self._resource_version = self._do_namespace_watch(
+            gvk, namespace, callback, self._initial_sent, self._resource_version
+        )
 
-            except Exception as e:
-                if self._stop_event.is_set():
-                    break
-                log.error(f"Error in namespace watch for {namespace}: {e}")
-                callback("ERROR", {"message": str(e)})
-                initial_sent = False
-                resource_version = None
-                time.sleep(5)
+    def _on_error(self, description: str, callback: Callable, error: Exception):
+        """Report a failed stream, the reactor retries it with a full list."""
+        log.error(f"Error in {description}: {error}")
+        callback("ERROR", {"message": str(error)})
+        self._initial_sent = False
+        self._resource_version = None
 
     def _do_namespace_watch(
         self,
@@ -101,106 +167,35 @@ class InferenceServiceWatcher:
         resource_version: Optional[str],
     ) -> tuple:
         """Perform one iteration of the namespace watch within app context."""
-        w = watch.Watch()
-        self._set_active_watch(w)
-
         if not initial_sent:
-            try:
-                initial_list = api.custom_api.list_namespaced_custom_object(
-                    group=gvk["group"],
-                    version=gvk["version"],
-                    namespace=namespace,
-                    plural=gvk["kind"],
-                )
-                items = initial_list.get("items", [])
-                for item in items:
-                    try:
-                        deployment_mode = utils.get_deployment_mode(item)
-                        item["deploymentMode"] = deployment_mode
-                    except Exception:
-                        pass
-                resource_version = initial_list.get("metadata", {}).get(
-                    "resourceVersion"
-                )
-                callback("INITIAL", {"items": items})
-                initial_sent = True
-            except Exception as e:
-                log.error(f"Error fetching initial list for {namespace}: {e}")
-                callback("ERROR", {"message": str(e)})
-                time.sleep(5)
-                return initial_sent, resource_version
+            items, resource_version = self._list(gvk, namespace)
+            self._remember_all(items)
+            callback(
+                "INITIAL",
+                {"items": items, "metadata": {"resourceVersion": resource_version}},
+            )
+            initial_sent = True
 
         try:
-            for event in w.stream(
-                api.custom_api.list_namespaced_custom_object,
-                group=gvk["group"],
-                version=gvk["version"],
-                namespace=namespace,
-                plural=gvk["kind"],
-                resource_version=resource_version,
-                timeout_seconds=60,
-            ):
-                if self._stop_event.is_set():
-                    break
-
-                event_type = event.get("type")
-                obj = event.get("object")
-
-                if not event_type or not obj:
-                    continue
-
-                if isinstance(obj, dict):
-                    rv = obj.get("metadata", {}).get("resourceVersion")
-                    if rv:
-                        resource_version = rv
-                    try:
-                        deployment_mode = utils.get_deployment_mode(obj)
-                        obj["deploymentMode"] = deployment_mode
-                    except Exception:
-                        pass
-
-                callback(event_type, obj)
-        finally:
-            w.stop()
-            self._clear_active_watch(w)
+            resource_version = self._stream(gvk, namespace, callback, resource_version)
+        except Exception as e:
+            if not _is_expired(e):
+                raise
+            log.info(
+                f"Watch of {namespace} expired at resourceVersion "
+                f"{resource_version}, relisting"
+            )
+            items, resource_version = self._list(gvk, namespace)
+            self._send_changes(items, callback)
 
         return initial_sent, resource_version
 
-    def _watch_single_thread(self, namespace: str, name: str, callback: Callable):
-        """Thread function for watching a single resource."""
-        initial_sent = False
-        resource_version = None
-
-        while not self._stop_event.is_set():
-            try:
-                if self._app:
-                    with self._app.app_context():
-                        gvk = versions.inference_service_gvk()
-                        initial_sent, resource_version = self._do_single_watch(
-                            gvk,
-                            namespace,
-                            name,
-                            callback,
-                            initial_sent,
-                            resource_version,
-                        )
-                else:
-                    gvk = versions.inference_service_gvk()
-                    initial_sent, resource_version = self._do_single_watch(
-                        gvk, namespace, name, callback, initial_sent, resource_version
-                    )
-
-                if self._stop_event.is_set():
-                    break
-
-            except Exception as e:
-                if self._stop_event.is_set():
-                    break
-                log.error(f"Error in single watch for {namespace}/{name}: {e}")
-                callback("ERROR", {"message": str(e)})
-                initial_sent = False
-                resource_version = None
-                time.sleep(5)
+    def _single_step(self, namespace: str, name: str, callback: Callable):
+        """Run the single-resource watch until its stream ends."""
+        gvk = versions.inference_service_gvk()
+        self._initial_sent, self._resource_version = self._do_single_watch(
+            gvk, namespace, name, callback, self._initial_sent, self._resource_version
+        )
 
     def _do_single_watch(
         self,
@@ -212,9 +207,6 @@ class InferenceServiceWatcher:
         resource_version: Optional[str],
     ) -> tuple:
         """Perform one iteration of the single-resource watch within app context."""
-        w = watch.Watch()
-        self._set_active_watch(w)
-
         if not initial_sent:
             try:
                 initial_obj = api.custom_api.get_namespaced_custom_object(
@@ -227,27 +219,76 @@ class InferenceServiceWatcher:
                 resource_version = initial_obj.get("metadata", {}).get(
                     "resourceVersion"
                 )
-                deployment_mode = utils.get_deployment_mode(initial_obj)
-                initial_obj["deploymentMode"] = deployment_mode
+                _with_deployment_mode(initial_obj)
+                self._remember_all([initial_obj])
                 callback("INITIAL", initial_obj)
                 initial_sent = True
             except Exception as e:
                 log.warning(f"Resource {namespace}/{name} not found: {e}")
                 callback("ERROR", {"message": f"Resource not found: {str(e)}"})
-                time.sleep(5)
+                self._stop_event.wait(retry_delay(1))
                 return initial_sent, resource_version
 
+        field_selector = f"metadata.name={name}"
+        try:
+            resource_version = self._stream(
+                gvk, namespace, callback, resource_version, field_selector
+            )
+        except Exception as e:
+            if not _is_expired(e):
+                raise
+            log.info(f"Watch of {namespace}/{name} expired, relisting")
+            items, resource_version = self._list(gvk, namespace, field_selector)
+            self._send_changes(items, callback)
+
+        return initial_sent, resource_version
+
+    def _list(
+        self, gvk: dict, namespace: str, field_selector: Optional[str] = None
+    ) -> Tuple[List[dict], Optional[str]]:
+        """List the InferenceServices and the resourceVersion of the list."""
+        kwargs = {"field_selector": field_selector} if field_selector else {}
+        resource_list = api.custom_api.list_namespaced_custom_object(
+            group=gvk["group"],
+            version=gvk["version"],
+            namespace=namespace,
+            plural=gvk["kind"],
+            **kwargs,
+        )
+        items = [_with_deployment_mode(item) for item in resource_list.get("items", [])]
+        return items, resource_list.get("metadata", {}).get("resourceVersion")
+
+    def _stream(
+        self,
+        gvk: dict,
+        namespace: str,
+        callback: Callable,
+        resource_version: Optional[str],
+        field_selector: Optional[str] = None,
+    ) -> Optional[str]:
+        """
+        Stream watch events until the watch times out.
+
+        Returns:
+            The resourceVersion to resume the watch from
+
+        Raises:
+            ResourceVersionExpired: If the resourceVersion is too old
+        """
+        kwargs = {"field_selector": field_selector} if field_selector else {}
+        w = ClosingWatch(watch.Watch())
+        self._set_active_watch(w)
         try:
-            field_selector = f"metadata.name={name}"
             for event in w.stream(
                 api.custom_api.list_namespaced_custom_object,
                 group=gvk["group"],
                 version=gvk["version"],
                 namespace=namespace,
                 plural=gvk["kind"],
-                field_selector=field_selector,
                 resource_version=resource_version,
-                timeout_seconds=60,
+                allow_watch_bookmarks=True,
+                timeout_seconds=_watch_timeout(),
+                **kwargs,
             ):
                 if self._stop_event.is_set():
                     break
@@ -258,22 +299,71 @@ class InferenceServiceWatcher:
                 if not event_type or not obj:
                     continue
 
+                if event_type == "ERROR":
+                    if isinstance(obj, dict) and obj.get("code") == 410:
+                        raise ResourceVersionExpired(obj.get("message"))
+                    continue
+
                 if isinstance(obj, dict):
                     rv = obj.get("metadata", {}).get("resourceVersion")
                     if rv:
                         resource_version = rv
-                    try:
-                        deployment_mode = utils.get_deployment_mode(obj)
-                        obj["deploymentMode"] = deployment_mode
-                    except Exception:
-                        pass
+                    if event_type == "BOOKMARK":
+                        continue
+                    _with_deployment_mode(obj)
 
+                self._remember(event_type, obj)
                 callback(event_type, obj)
         finally:
             w.stop()
             self._clear_active_watch(w)
 
-        return initial_sent, resource_version
+        return resource_version
+
+    def _remember_all(self, items: List[dict]):
+        self._known = {}
+        for item in items:
+            self._remember("ADDED", item)
+
+    def _remember(self, event_type: str, obj: Any):
+        metadata = obj.get("metadata") or {} if isinstance(obj, dict) else {}
+        key = (metadata.get("namespace"), metadata.get("name"))
+        if event_type == "DELETED":
+            self._known.pop(key, None)
+        elif event_type in ("ADDED", "MODIFIED"):
+            self._known[key] = (metadata.get("uid"), metadata.get("resourceVersion"))
+
+    def _send_changes(self, items: List[dict], callback: Callable):
+        """Send the differences between a relist and the objects sent so far."""
+        known, self._known = self._known, {}
+        changes = 0
+        for item in items:
+            metadata = item.get("metadata") or {}
+            key = (metadata.get("namespace"), metadata.get("name"))
+            seen = known.pop(key, None)
+            self._remember("ADDED", item)
+            if seen is None or seen[0] != metadata.get("uid"):
+                callback("ADDED", item)
+            elif seen[1] != metadata.get("resourceVersion"):
+                callback("MODIFIED", item)
+            else:
+                continue
+            changes += 1
+
+        for (namespace, name), (uid, resource_version) in known.items():
+            callback(
+                "DELETED",
+                {
+                    "metadata": {
+                        "namespace": namespace,
+                        "name": name,
+                        "uid": uid,
+                        "resourceVersion": resource_version,
+                    }
+                },
+            )
+            changes += 1
+        log.info(f"Relist found {changes} changed InferenceServices")
 
     def stop(self):
         """Stop the watcher."""
@@ -282,8 +372,8 @@ class InferenceServiceWatcher:
             active_watch = self._active_watch
         if active_watch:
             active_watch.stop()
-        if self._thread and self._thread is not threading.current_thread():
-            self._thread.join(timeout=5)
+        if self._task:
+            self._task.join(timeout=5)
 
     def _set_active_watch(self, active_watch):
         with self._watch_lock:
@@ -298,17 +388,21 @@ class InferenceServiceWatcher:
 class EventWatcher:
     """Watches Kubernetes events for InferenceServices."""
 
-    def __init__(self, app=None):
+    def __init__(self, app=None, reactor: Optional[WatchReactor] = None):
         """Initialize the event watcher.
 
         Args:
-            app: Flask application instance (for app context in threads)
+            app: Flask application instance (for app context in the streams)
+            reactor: Reactor driving the watch stream, the process one if None
         """
         self._stop_event = threading.Event()
-        self._thread = None
+        self._task = None
         self._app = app
+        self._reactor = reactor or get_reactor()
         self._active_watch = None
         self._watch_lock = threading.Lock()
+        self._initial_sent = False
+        self._resource_version = None
 
     def watch_events(self, namespace: str, name: str, callback: Callable):
         """
@@ -319,70 +413,89 @@ class EventWatcher:
             name: The name of the resource
             callback: Callback function(event_type, obj) to handle events
         """
+        field_selector = api.events_field_selector("InferenceService", name)
+        return self._watch(f"{namespace}/{name}", namespace, field_selector, callback)
+
+    def watch_namespace_events(self, namespace: str, callback: Callable):
+        """
+        Watch the events of every object in a namespace.
+
+        Args:
+            namespace: The namespace to watch
+            callback: Callback function(event_type, obj) to handle events
+        """
+        return self._watch(namespace, namespace, None, callback)
+
+    def _watch(
+        self,
+        description: str,
+        namespace: str,
+        field_selector: Optional[str],
+        callback: Callable,
+    ):
         self._stop_event.clear()
-        self._thread = threading.Thread(
-            target=self._watch_events_thread,
-            args=(namespace, name, callback),
-            daemon=True,
+        self._initial_sent = False
+        self._resource_version = None
+        self._task = self._reactor.register(
+            f"events/{description}",
+            lambda: self._events_step(namespace, field_selector, callback),
+            lambda e: self._on_error(description, callback, e),
+            self._stop_event,
         )
-        self._thread.start()
         return self
 
-    def _watch_events_thread(self, namespace: str, name: str, callback: Callable):
-        """Thread function for watching events."""
-        v1 = client.CoreV1Api()
-        field_selector = api.events_field_selector("InferenceService", name)
-        initial_sent = False
-        resource_version = None
+    def _events_step(
+        self, namespace: str, field_selector: Optional[str], callback: Callable
+    ):
+        """Stream the events of a namespace until the watch ends."""
+        # The events are read and streamed as the API server's JSON.
+        list_events = raw.json_lister(client.CoreV1Api().list_namespaced_event)
+        selector = {"field_selector": field_selector} if field_selector else {}
+        w = ClosingWatch(watch.Watch())
+        self._set_active_watch(w)
+        try:
+            if not self._initial_sent:
+                initial_events = list_events(namespace, **selector)
+                events_list = [
+                    self._serialize_event(event)
+                    for event in initial_events.get("items") or []
+                ]
+                self._resource_version = initial_events.get("metadata", {}).get(
+                    "resourceVersion"
+                )
+                callback("INITIAL", {"items": events_list})
+                self._initial_sent = True
 
-        while not self._stop_event.is_set():
-            w = watch.Watch()
-            self._set_active_watch(w)
-            try:
-                if not initial_sent:
-                    initial_events = v1.list_namespaced_event(
-                        namespace, field_selector=field_selector
-                    )
-                    events_list = [
-                        self._serialize_event(event) for event in initial_events.items
-                    ]
-                    resource_version = initial_events.metadata.resource_version
-                    callback("INITIAL", {"items": events_list})
-                    initial_sent = True
-
-                for event in w.stream(
-                    v1.list_namespaced_event,
-                    namespace=namespace,
-                    field_selector=field_selector,
-                    resource_version=resource_version,
-                    timeout_seconds=60,
-                ):
-                    if self._stop_event.is_set():
-                        break
+            for event in w.stream(
+                list_events,
+                namespace=namespace,
+                resource_version=self._resource_version,
+                timeout_seconds=_watch_timeout(),
+                **selector,
+            ):
+                if self._stop_event.is_set():
+                    break
 
-                    event_type = event.get("type")
-                    obj = event.get("object")
+                event_type = event.get("type")
+                obj = event.get("object")
 
-                    if not event_type or not obj:
-                        continue
+                if not event_type or not obj:
+                    continue
 
-                    obj_dict = self._serialize_event(obj)
-                    resource_version = obj_dict.get("metadata", {}).get(
-                        "resourceVersion", resource_version
-                    )
-                    callback(event_type, obj_dict)
+                obj_dict = self._serialize_event(obj)
+                self._resource_version = obj_dict.get("metadata", {}).get(
+                    "resourceVersion", self._resource_version
+                )
+                callback(event_type, obj_dict)
+        finally:
+            w.stop()
+            self._clear_active_watch(w)
 
-            except Exception as e:
-                if self._stop_event.is_set():
-                    break
-                log.error(f"Error watching events for {namespace}/{name}: {e}")
-                callback("ERROR", {"message": str(e)})
-                initial_sent = False
-                resource_version = None
-                time.sleep(5)
-            finally:
-                w.stop()
-                self._clear_active_watch(w)
+    def _on_error(self, description: str, callback: Callable, error):
+        log.error(f"Error watching events for {description}: {error}")
+        callback("ERROR", {"message": str(error)})
+        self._initial_sent = False
+        self._resource_version = None
 
     def stop(self):
         """Stop the event watcher."""
@@ -391,8 +504,8 @@ class EventWatcher:
             active_watch = self._active_watch
         if active_watch:
             active_watch.stop()
-        if self._thread and self._thread is not threading.current_thread():
-            self._thread.join(timeout=5)
+        if self._task:
+            self._task.join(timeout=5)
 
     def _set_active_watch(self, active_watch):
         with self._watch_lock:
@@ -404,21 +517,46 @@ class EventWatcher:
                 self._active_watch = None
 
     def _serialize_event(self, event):
-        return api.serialize(event)
+        return event if isinstance(event, dict) else api.serialize(event)
 
 
 class LogWatcher:
-    """Watches pod logs for InferenceServices."""
+    """
+    Follows the pod logs of InferenceServices.
+
+    The pods of the requested components are resolved periodically, so that
+    the watcher attaches to new pods and detaches from removed ones when a
+    component rolls out. The lines of the requested containers of every pod
+    are read from the log tailers shared by every client of a pod, merged in
+    timestamp order and sent as APPEND events.
+    """
 
-    def __init__(self, app=None):
+    def __init__(
+        self,
+        app=None,
+        reactor: Optional[WatchReactor] = None,
+        tailers: Optional[LogTailerRegistry] = None,
+    ):
         """Initialize the log watcher.
 
         Args:
-            app: Flask application instance (for app context in threads)
+            app: Flask application instance (for app context in the polls)
+            reactor: Reactor driving the polls, the process one if None
+            tailers: Registry of the shared log tailers, the process one if None
         """
         self._stop_event = threading.Event()
-        self._thread = None
+        self._task = None
+        self._merge_task = None
         self._app = app
+        self._reactor = reactor or get_reactor()
+        self._tailers = tailers or get_log_tailers()
+        self._namespace = None
+        self._subscriptions: Dict[Tuple[str, str, str], Any] = {}
+        self._pods: Optional[Dict[str, List[str]]] = None
+        self._containers: Dict[Optional[str], List[str]] = {}
+        self._log_filter: Optional[LogFilter] = None
+        self._merger = LogMerger()
+        self._lock = threading.Lock()
 
     def watch_logs(
         self,
@@ -426,6 +564,10 @@ class LogWatcher:
         name: str,
         components: Optional[List[str]] = None,
         callback: Optional[Callable] = None,
+        tail_lines: Optional[int] = LOG_TAIL_LINES,
+        since_seconds: Optional[int] = None,
+        log_filter: Optional[LogFilter] = None,
+        containers: Optional[Dict[Optional[str], List[str]]] = None,
     ):
         """
         Watch logs for an InferenceService.
@@ -433,51 +575,64 @@ class LogWatcher:
         Args:
             namespace: The namespace of the resource
             name: The name of the resource
-            components: Optional list of components to watch
+            components: Components to watch, those of the spec if empty
             callback: Callback function(event_type, obj) to handle log updates
+            tail_lines: Lines of the first window of each container
+            since_seconds: Age of the oldest line of the first window
+            log_filter: Selects the lines sent, applied to each container's log
+            containers: The containers to follow per component, those under
+                None for every component, the kserve-container if none
         """
         self._stop_event.clear()
-        self._thread = threading.Thread(
-            target=self._watch_logs_thread,
-            args=(namespace, name, components, callback),
-            daemon=True,
+        self._namespace = namespace
+        self._log_filter = log_filter
+        self._containers = containers or {}
+        self._task = self._reactor.register(
+            f"logs/{namespace}/{name}",
+            lambda: _in_app_context(
+                self._app,
+                self._resolve_step,
+                namespace,
+                name,
+                components or None,
+                callback,
+                (tail_lines, since_seconds),
+            ),
+            lambda e: self._on_error(namespace, name, callback, e),
+            self._stop_event,
         )
-        self._thread.start()
+        try:
+            self._merge_task = self._reactor.register(
+                f"logs/{namespace}/{name}/merge",
+                lambda: self._merge_step(callback),
+                lambda e: self._on_error(namespace, name, callback, e),
+                self._stop_event,
+            )
+        except WatchReactorFull:
+            self.stop()
+            raise
         return self
 
-    def _watch_logs_thread(
-        self,
-        namespace: str,
-        name: str,
-        components: Optional[List[str]],
-        callback: Optional[Callable],
-    ):
-        """Thread function for watching logs."""
-        components = components or []
+    def _on_error(self, namespace: str, name: str, callback: Callable, error):
+        log.error(f"Error watching logs for {namespace}/{name}: {error}")
+        if callback:
+            callback("ERROR", {"message": str(error)})
 
-        while not self._stop_event.is_set():
-            try:
-                # Use Flask app context if available to call API functions.
-                if self._app:
-                    with self._app.app_context():
-                        self._fetch_and_stream_logs(
-                            namespace, name, components, callback
-                        )
-                else:
-                    self._fetch_and_stream_logs(namespace, name, components, callback)
+    def _component_pods(
+        self, namespace: str, name: str, components: Optional[List[str]]
+    ) -> Dict[str, List[str]]:
+        """
+        Return the pod names of every requested component.
 
-            except Exception as e:
-                if self._stop_event.is_set():
-                    break
-                log.error(f"Error watching logs for {namespace}/{name}: {e}")
-                if callback:
-                    callback("ERROR", {"message": str(e)})
-                time.sleep(5)
+        The InferenceService is read from the watch of an SSE client when
+        there is one, from the API server otherwise.
+        """
+        from . import sse_manager
+
+        cached = sse_manager.cached_object(namespace, name)
+        if cached is not None:
+            return utils.get_component_pods(cached[0], components)
 
-    def _fetch_and_stream_logs(
-        self, namespace: str, name: str, components: List[str], callback: Callable
-    ):
-        """Helper method to fetch and stream logs within app context."""
         gvk = versions.inference_service_gvk()
         svc = api.custom_api.get_namespaced_custom_object(
             group=gvk["group"],
@@ -487,46 +642,102 @@ class LogWatcher:
             name=name,
         )
 
-        deployment_mode = utils.get_deployment_mode(svc)
+        return utils.get_component_pods(svc, components)
 
-        if deployment_mode == "ModelMesh":
-            component_pods_dict = utils.get_modelmesh_pods(svc, components)
-        elif deployment_mode == "Standard":
-            component_pods_dict = utils.get_standard_inference_service_pods(
-                svc, components
-            )
-        else:
-            component_pods_dict = utils.get_inference_service_pods(svc, components)
-
-        if not component_pods_dict:
-            if callback:
-                callback("UPDATE", {"logs": {}})
-            time.sleep(5)
-            return
-
-        logs_response = {}
-        for component, pods in component_pods_dict.items():
-            if component not in logs_response:
-                logs_response[component] = []
-
-            for pod in pods:
-                try:
-                    logs = api.get_pod_logs(
-                        namespace, pod, "kserve-container", auth=False
-                    )
-                    logs_response[component].append(
-                        {"podName": pod, "logs": logs.split("\n")}
-                    )
-                except Exception as e:
-                    log.warning(f"Error getting logs for pod {pod}: {e}")
-
-        if callback:
-            callback("UPDATE", {"logs": logs_response})
+    def _component_containers(self, component: str) -> List[str]:
+        containers = self._containers.get(component, []) + self._containers.get(
+            None, []
+        )
+        return list(dict.fromkeys(containers)) or [LOG_CONTAINER]
 
-        time.sleep(3)
+    def _resolve_step(
+        self,
+        namespace: str,
+        name: str,
+        components: Optional[List[str]],
+        callback: Callable,
+        first_window: Tuple[Optional[int], Optional[int]],
+    ):
+        """Attach to the current pods of the components, detach from old ones."""
+        component_pods = self._component_pods(namespace, name, components)
+        wanted = {
+            (component, pod, container)
+            for component, pods in component_pods.items()
+            for pod in pods
+            for container in self._component_containers(component)
+        }
+
+        with self._lock:
+            if self._stop_event.is_set():
+                return
+            removed = {
+                key: self._subscriptions.pop(key)
+                for key in set(self._subscriptions) - wanted
+            }
+            added = wanted - set(self._subscriptions)
+            changed = component_pods != self._pods
+            self._pods = component_pods
+
+        if changed and callback:
+            callback("PODS", {"pods": component_pods})
+        for (_, pod, container), subscription in removed.items():
+            self._tailers.unsubscribe(namespace, pod, container, subscription)
+        for key in sorted(added):
+            _, pod, container = key
+            subscription = self._tailers.subscribe(
+                namespace,
+                pod,
+                container,
+                self._append_callback(key),
+                *first_window,
+            )
+            with self._lock:
+                stopped = self._stop_event.is_set()
+                if not stopped:
+                    self._subscriptions[key] = subscription
+            if stopped:
+                self._tailers.unsubscribe(namespace, pod, container, subscription)
+
+        self._stop_event.wait(LOG_RESOLVE_SECONDS)
+
+    def _append_callback(self, source: Tuple[str, str, str]):
+        log_filter = self._log_filter.clone() if self._log_filter else None
+
+        def append(entries: List[Tuple[str, str]]):
+            if log_filter:
+                entries = [entry for entry in entries if log_filter.matches(entry[1])]
+            if entries:
+                self._merger.add(source, entries)
+
+        return append
+
+    def _merge_step(self, callback: Callable):
+        """Send the merged lines of the containers held long enough."""
+        self._stop_event.wait(self._merger.delay / 2)
+        self._send_merged(callback)
+
+    def _send_merged(self, callback: Callable):
+        lines = [
+            {
+                "component": component,
+                "podName": pod,
+                "container": container,
+                "timestamp": timestamp,
+                "line": line,
+            }
+            for (component, pod, container), timestamp, line in self._merger.release()
+        ]
+        if lines and callback:
+            callback("APPEND", {"lines": lines})
 
     def stop(self):
         """Stop the log watcher."""
         self._stop_event.set()
-        if self._thread:
-            self._thread.join(timeout=5)
+        with self._lock:
+            subscriptions = dict(self._subscriptions)
+            self._subscriptions.clear()
+        for (_, pod, container), subscription in subscriptions.items():
+            self._tailers.unsubscribe(self._namespace, pod, container, subscription)
+        for task in (self._task, self._merge_task):
+            if task:
+                task.join(timeout=5)
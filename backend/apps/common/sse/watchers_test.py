@@ -5,12 +5,14 @@ Run directly with:
 """
 
 import importlib.util
+import json
 import logging as python_logging
 from pathlib import Path
 import sys
+import threading
 import types
 import unittest
-from unittest.mock import Mock
+from unittest.mock import Mock, patch
 
 
 def _load_watchers_module():
@@ -19,7 +21,11 @@ def _load_watchers_module():
         "backend",
         "backend.apps",
         "backend.apps.common",
+        "backend.apps.common.logs",
+        "backend.apps.common.raw",
         "backend.apps.common.sse",
+        "backend.apps.common.sse.reactor",
+        "backend.apps.common.sse.tailers",
         "backend.apps.common.utils",
         "backend.apps.common.versions",
         "kubernetes",
@@ -28,6 +34,8 @@ def _load_watchers_module():
         "kubeflow",
         "kubeflow.kubeflow",
         "kubeflow.kubeflow.crud_backend",
+        "urllib3",
+        "urllib3.exceptions",
     )
     original_modules = {name: sys.modules.get(name) for name in module_names}
 
@@ -43,11 +51,14 @@ def _load_watchers_module():
     kubeflow = types.ModuleType("kubeflow")
     kubeflow_kubeflow = types.ModuleType("kubeflow.kubeflow")
     crud_backend = types.ModuleType("kubeflow.kubeflow.crud_backend")
+    urllib3 = types.ModuleType("urllib3")
+    urllib3_exceptions = types.ModuleType("urllib3.exceptions")
+    urllib3_exceptions.ReadTimeoutError = type("ReadTimeoutError", (Exception,), {})
 
     backend.__path__ = []
     apps.__path__ = []
-    common.__path__ = []
-    sse.__path__ = []
+    common.__path__ = [str(Path(__file__).parent.parent)]
+    sse.__path__ = [str(Path(__file__).parent)]
     utils.get_deployment_mode = Mock(return_value="Serverless")
     versions.inference_service_gvk = Mock(
         return_value={
@@ -75,6 +86,8 @@ def _load_watchers_module():
         sys.modules["kubeflow"] = kubeflow
         sys.modules["kubeflow.kubeflow"] = kubeflow_kubeflow
         sys.modules["kubeflow.kubeflow.crud_backend"] = crud_backend
+        sys.modules["urllib3"] = urllib3
+        sys.modules["urllib3.exceptions"] = urllib3_exceptions
 
         module_path = Path(__file__).with_name("watchers.py")
         spec = importlib.util.spec_from_file_location(
@@ -104,6 +117,319 @@ class EventWatcherTest(unittest.TestCase):
         self.assertEqual(serialized, {"metadata": {"resourceVersion": "123"}})
         watchers.api.serialize.assert_called_once_with(event_obj)
 
+    def test_namespace_event_watch_lists_every_event_of_the_namespace(self):
+        watchers = _load_watchers_module()
+        v1 = Mock()
+        v1.list_namespaced_event.return_value = types.SimpleNamespace(
+            data=json.dumps(
+                {
+                    "items": [{"metadata": {"name": "e1"}}],
+                    "metadata": {"resourceVersion": "10"},
+                }
+            ).encode(),
+            release_conn=Mock(),
+        )
+        watchers.client.CoreV1Api = Mock(return_value=v1)
+        stream = watchers.watch.Watch.return_value.stream
+        stream.return_value = iter(
+            [{"type": "ADDED", "object": {"metadata": {"name": "e2"}}}]
+        )
+        events = []
+
+        watchers.EventWatcher()._events_step(
+            "ns", None, lambda event_type, obj: events.append((event_type, obj))
+        )
+
+        # The events are read as JSON, not decoded into client models.
+        v1.list_namespaced_event.assert_called_once_with("ns", _preload_content=False)
+        self.assertNotIn("field_selector", stream.call_args.kwargs)
+        self.assertEqual(stream.call_args.kwargs["resource_version"], "10")
+        self.assertEqual(
+            events,
+            [
+                ("INITIAL", {"items": [{"metadata": {"name": "e1"}}]}),
+                ("ADDED", {"metadata": {"name": "e2"}}),
+            ],
+        )
+
+
+def _isvc(name, resource_version):
+    return {
+        "metadata": {
+            "namespace": "ns",
+            "name": name,
+            "uid": f"uid-{name}",
+            "resourceVersion": resource_version,
+        }
+    }
+
+
+class ExpiredError(Exception):
+    status = 410
+
+
+class InferenceServiceWatcherTest(unittest.TestCase):
+    def setUp(self):
+        self.watchers = _load_watchers_module()
+        self.watchers.api.custom_api = Mock()
+        self.stream = self.watchers.watch.Watch.return_value.stream
+        self.gvk = self.watchers.versions.inference_service_gvk()
+        self.events = []
+        self.watcher = self.watchers.InferenceServiceWatcher()
+
+    def _callback(self, event_type, obj):
+        name = None if event_type == "INITIAL" else obj["metadata"]["name"]
+        self.events.append((event_type, name))
+
+    def _list_results(self, *results):
+        self.watchers.api.custom_api.list_namespaced_custom_object.side_effect = [
+            {"items": items, "metadata": {"resourceVersion": resource_version}}
+            for items, resource_version in results
+        ]
+
+    def test_bookmarks_advance_the_resume_point_without_events(self):
+        self.stream.return_value = iter(
+            [{"type": "BOOKMARK", "object": {"metadata": {"resourceVersion": "20"}}}]
+        )
+
+        resource_version = self.watcher._stream(self.gvk, "ns", self._callback, "10")
+
+        self.assertEqual(resource_version, "20")
+        self.assertEqual(self.events, [])
+        kwargs = self.stream.call_args.kwargs
+        self.assertTrue(kwargs["allow_watch_bookmarks"])
+        self.assertEqual(kwargs["resource_version"], "10")
+
+    def test_expired_watch_sends_only_the_changes_of_a_relist(self):
+        self._list_results(
+            ([_isvc("x", "1"), _isvc("y", "2"), _isvc("z", "3")], "10"),
+            ([_isvc("x", "1"), _isvc("y", "12"), _isvc("w", "13")], "30"),
+        )
+        self.stream.return_value = iter(
+            [{"type": "ERROR", "object": {"code": 410, "message": "too old"}}]
+        )
+
+        initial_sent, resource_version = self.watcher._do_namespace_watch(
+            self.gvk, "ns", self._callback, False, None
+        )
+
+        self.assertTrue(initial_sent)
+        self.assertEqual(resource_version, "30")
+        self.assertEqual(
+            self.events,
+            [("INITIAL", None), ("MODIFIED", "y"), ("ADDED", "w"), ("DELETED", "z")],
+        )
+
+    def test_resumed_watch_relists_against_the_known_objects(self):
+        self._list_results(([_isvc("x", "12")], "30"))
+        self.stream.return_value = iter(
+            [{"type": "ERROR", "object": {"code": 410, "message": "too old"}}]
+        )
+        reactor = Mock()
+        watcher = self.watchers.InferenceServiceWatcher(reactor=reactor)
+
+        watcher.watch_namespace(
+            "ns", self._callback, "10", [_isvc("x", "1"), _isvc("y", "2")]
+        )
+        watcher._do_namespace_watch(self.gvk, "ns", self._callback, True, "10")
+
+        self.assertEqual(self.events, [("MODIFIED", "x"), ("DELETED", "y")])
+
+    def test_expired_api_exception_keeps_the_events_seen_since_the_list(self):
+        self._list_results(
+            ([_isvc("x", "1")], "10"),
+            ([_isvc("x", "11")], "30"),
+        )
+
+        def expire_after_modified(*args, **kwargs):
+            yield {"type": "MODIFIED", "object": _isvc("x", "11")}
+            raise ExpiredError("Gone")
+
+        self.stream.side_effect = expire_after_modified
+
+        self.watcher._do_namespace_watch(self.gvk, "ns", self._callback, False, None)
+
+        self.assertEqual(self.events, [("INITIAL", None), ("MODIFIED", "x")])
+
+    def test_namespace_watch_is_driven_by_the_reactor(self):
+        reactor = self.watchers.WatchReactor(max_streams=2)
+        watcher = self.watchers.InferenceServiceWatcher(reactor=reactor)
+        errored = threading.Event()
+        self.watchers.api.custom_api.list_namespaced_custom_object.side_effect = (
+            RuntimeError("unavailable")
+        )
+
+        def callback(event_type, obj):
+            self.events.append((event_type, obj["message"]))
+            errored.set()
+
+        watcher.watch_namespace("ns", callback)
+        self.assertTrue(errored.wait(5))
+        self.assertEqual(reactor.stats()["watches"][0]["name"], "inferenceservices/ns")
+
+        watcher.stop()
+
+        self.assertEqual(self.events, [("ERROR", "unavailable")])
+        self.assertEqual(reactor.stats()["streams"], 0)
+
+    def test_watch_timeouts_are_jittered(self):
+        timeouts = {self.watchers._watch_timeout() for _ in range(50)}
+
+        self.assertGreater(len(timeouts), 1)
+        self.assertTrue(all(240 <= timeout <= 360 for timeout in timeouts))
+
+
+class FakeTailers:
+    """A log tailer registry recording the subscriptions."""
+
+    def __init__(self):
+        self.callbacks = {}
+
+    def subscribe(self, namespace, pod, container, callback, *first_window):
+        self.callbacks[(pod, container)] = callback
+        return (pod, container)
+
+    def unsubscribe(self, namespace, pod, container, subscription):
+        del self.callbacks[subscription]
+
+
+class LogWatcherTest(unittest.TestCase):
+    def setUp(self):
+        self.watchers = _load_watchers_module()
+        self.tailers = FakeTailers()
+        self.watcher = self.watchers.LogWatcher(reactor=Mock(), tailers=self.tailers)
+        self.watcher._stop_event.wait = Mock()
+        self.watcher._namespace = "ns"
+        self.watcher._merger = self.watchers.LogMerger(delay=0)
+        self.events = []
+
+    def _callback(self, event_type, obj):
+        self.events.append((event_type, obj))
+
+    def _resolve(self):
+        self.watcher._resolve_step(
+            "ns", "model", ["predictor"], self._callback, (10, None)
+        )
+
+    def _appended(self):
+        self.watcher._send_merged(self._callback)
+        return [
+            (line["podName"], line["container"], line["line"])
+            for event_type, obj in self.events
+            if event_type == "APPEND"
+            for line in obj["lines"]
+        ]
+
+    def test_pods_are_resolved_from_the_watch_cache_before_the_api(self):
+        svc = {"metadata": {"name": "model"}}
+        sse = types.ModuleType("backend.apps.common.sse")
+        sse.sse_manager = Mock()
+        sse.sse_manager.cached_object.side_effect = [(svc, "7"), None]
+        self.watchers.api.custom_api = Mock()
+        self.watchers.api.custom_api.get_namespaced_custom_object.return_value = svc
+        self.watchers.utils.get_component_pods = Mock(
+            return_value={"predictor": ["pod-1"]}
+        )
+
+        with patch.dict(sys.modules, {"backend.apps.common.sse": sse}):
+            cached = self.watcher._component_pods("ns", "model", ["predictor"])
+            self.watchers.api.custom_api.get_namespaced_custom_object.assert_not_called()
+            missed = self.watcher._component_pods("ns", "model", ["predictor"])
+
+        self.assertEqual(cached, {"predictor": ["pod-1"]})
+        self.assertEqual(missed, cached)
+        sse.sse_manager.cached_object.assert_called_with("ns", "model")
+        self.watchers.api.custom_api.get_namespaced_custom_object.assert_called_once()
+        self.watchers.utils.get_component_pods.assert_called_with(svc, ["predictor"])
+
+    def test_watcher_follows_new_pods_and_drops_removed_ones(self):
+        self.watcher._component_pods = Mock(
+            side_effect=[{"predictor": ["pod-1"]}, {"predictor": ["pod-2"]}]
+        )
+
+        self._resolve()
+        self.tailers.callbacks[("pod-1", "kserve-container")](
+            [("2024-01-01T00:00:01Z", "hello")]
+        )
+        self.watcher._send_merged(self._callback)
+        self._resolve()
+
+        self.assertEqual(list(self.tailers.callbacks), [("pod-2", "kserve-container")])
+        self.assertEqual(
+            self.events,
+            [
+                ("PODS", {"pods": {"predictor": ["pod-1"]}}),
+                (
+                    "APPEND",
+                    {
+                        "lines": [
+                            {
+                                "component": "predictor",
+                                "podName": "pod-1",
+                                "container": "kserve-container",
+                                "timestamp": "2024-01-01T00:00:01Z",
+                                "line": "hello",
+                            }
+                        ]
+                    },
+                ),
+                ("PODS", {"pods": {"predictor": ["pod-2"]}}),
+            ],
+        )
+
+        self.watcher.stop()
+        self.assertEqual(self.tailers.callbacks, {})
+
+    def test_containers_are_merged_in_timestamp_order(self):
+        self.watcher._containers = {
+            None: ["kserve-container"],
+            "predictor": ["queue-proxy"],
+        }
+        self.watcher._component_pods = Mock(return_value={"predictor": ["pod-1"]})
+
+        self._resolve()
+        self.tailers.callbacks[("pod-1", "kserve-container")](
+            [("2024-01-01T00:00:01Z", "loading"), ("2024-01-01T00:00:03Z", "ready")]
+        )
+        self.tailers.callbacks[("pod-1", "queue-proxy")](
+            [("2024-01-01T00:00:02Z", "probe failed")]
+        )
+
+        self.assertEqual(
+            self._appended(),
+            [
+                ("pod-1", "kserve-container", "loading"),
+                ("pod-1", "queue-proxy", "probe failed"),
+                ("pod-1", "kserve-container", "ready"),
+            ],
+        )
+
+    def test_filtered_watcher_sends_only_matching_lines_of_each_container(self):
+        self.watcher._log_filter = self.watchers.LogFilter(level="ERROR")
+        self.watcher._component_pods = Mock(
+            return_value={"predictor": ["pod-1", "pod-2"]}
+        )
+
+        self._resolve()
+        self.tailers.callbacks[("pod-1", "kserve-container")](
+            [
+                ("2024-01-01T00:00:01Z", "ERROR: failed"),
+                ("2024-01-01T00:00:02Z", "  at predict()"),
+                ("2024-01-01T00:00:03Z", "INFO: ok"),
+            ]
+        )
+        self.tailers.callbacks[("pod-2", "kserve-container")](
+            [("2024-01-01T00:00:01Z", "  at predict()")]
+        )
+
+        self.assertEqual(
+            self._appended(),
+            [
+                ("pod-1", "kserve-container", "ERROR: failed"),
+                ("pod-1", "kserve-container", "  at predict()"),
+            ],
+        )
+
 
 if __name__ == "__main__":
     unittest.main()
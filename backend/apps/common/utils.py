@@ -1,16 +1,25 @@
 """Common utils for parsing and handling InferenceServices."""
 
+from functools import partial
 import os
 from typing import Dict, Union
 
-from kubeflow.kubeflow.crud_backend import api, helpers, logging
-from . import versions
+from kubeflow.kubeflow.crud_backend import api, authz, helpers, logging
+from . import coalescing, parallel, versions
 
 log = logging.getLogger(__name__)
 
 KNATIVE_REVISION_LABEL = "serving.knative.dev/revision"
 LATEST_CREATED_REVISION = "latestCreatedRevision"
+INFERENCE_SERVICE_COMPONENTS = ["predictor", "transformer", "explainer"]
 FILE_ABS_PATH = os.path.abspath(os.path.dirname(__file__))
+SERVING_RUNTIME = {
+    "group": "serving.kserve.io",
+    "version": "v1alpha1",
+    "kind": "servingruntimes",
+}
+# Seconds the lookups of the objects of a component share.
+OBJECT_LOOKUP_TIMEOUT_SECONDS = 10
 
 INFERENCESERVICE_TEMPLATE_YAML = os.path.join(
     FILE_ABS_PATH, "yaml", "inference_service_template.yaml"
@@ -29,6 +38,21 @@ def load_inference_service_template(**kwargs):
     return helpers.load_param_yaml(INFERENCESERVICE_TEMPLATE_YAML, **kwargs)
 
 
+def get_namespace_relations(namespace):
+    """
+    Return the relation index of a namespace, None to query the API instead.
+
+    The index is kept up to date by watches, so the lookups below become
+    dictionary reads once the namespace is warm.
+    """
+    from .sse.relations import get_relation_index
+
+    relation_index = get_relation_index()
+    if relation_index is None:
+        return None
+    return relation_index.namespace(namespace)
+
+
 # helper functions for accessing the logs of an InferenceService in raw
 # kubernetes mode
 
@@ -41,9 +65,14 @@ def get_standard_inference_service_pods(svc, components=[]):
     namespace = svc["metadata"]["namespace"]
     svc_name = svc["metadata"]["name"]
     label_selector = "serving.kubeflow.org/inferenceservice={}".format(svc_name)
-    pods = api.v1_core.list_namespaced_pod(
-        namespace, label_selector=label_selector
-    ).items
+    relations = get_namespace_relations(namespace)
+    if relations is not None:
+        # Pods are owned by the ReplicaSets of the Deployments of the service.
+        pods = relations.descendants(svc["metadata"].get("uid"), "pods")
+    else:
+        pods = api.v1_core.list_namespaced_pod(
+            namespace, label_selector=label_selector
+        ).items
     component_pods_dict = {}
     for pod in pods:
         component = pod.metadata.labels.get("component", "")
@@ -78,20 +107,14 @@ def get_inference_service_pods(svc, components=[]):
     if len(revisions_dict.keys()) == 0:
         return {}
 
-    pods = api.list_pods(namespace, auth=False).items
     component_pods_dict = {}
-    for pod in pods:
-        for revision in revisions_dict:
-            if KNATIVE_REVISION_LABEL not in pod.metadata.labels:
-                continue
-
-            if pod.metadata.labels[KNATIVE_REVISION_LABEL] != revision:
-                continue
+    for pod in get_revision_pods(namespace, revisions_dict):
+        revision = (pod.metadata.labels or {}).get(KNATIVE_REVISION_LABEL)
+        component = revisions_dict.get(revision)
+        if component is None:
+            continue
 
-            component = revisions_dict[revision]
-            curr_pod_names = component_pods_dict.get(component, [])
-            curr_pod_names.append(pod.metadata.name)
-            component_pods_dict[component] = curr_pod_names
+        component_pods_dict.setdefault(component, []).append(pod.metadata.name)
 
     if len(component_pods_dict.keys()) == 0:
         log.info("No pods are found for inference service: %s", svc["metadata"]["name"])
@@ -110,9 +133,15 @@ def get_modelmesh_pods(svc, components=[]):
 
     # Use label selector to find ModelMesh pods
     label_selector = "app.kubernetes.io/managed-by=modelmesh-controller"
-    pods = api.v1_core.list_namespaced_pod(
-        namespace, label_selector=label_selector
-    ).items
+    relations = get_namespace_relations(namespace)
+    if relations is not None:
+        pods = relations.select(
+            "pods", {"app.kubernetes.io/managed-by": "modelmesh-controller"}
+        )
+    else:
+        pods = api.v1_core.list_namespaced_pod(
+            namespace, label_selector=label_selector
+        ).items
 
     component_pods_dict = {}
 
@@ -133,6 +162,75 @@ def get_modelmesh_pods(svc, components=[]):
     return component_pods_dict
 
 
+def get_component_pods(svc, components=None):
+    """
+    Return the pod names of the components of an InferenceService.
+
+    The pods are resolved as the deployment mode of the service requires.
+    Without components, those in the spec of the service are used.
+    """
+    if components is None:
+        components = [
+            component
+            for component in INFERENCE_SERVICE_COMPONENTS
+            if component in svc.get("spec", {})
+        ]
+
+    deployment_mode = get_deployment_mode(svc)
+    if deployment_mode == "ModelMesh":
+        return get_modelmesh_pods(svc, components)
+    if deployment_mode == "Standard":
+        return get_standard_inference_service_pods(svc, components)
+    return get_inference_service_pods(svc, components)
+
+
+def get_revision_pods(namespace, revisions):
+    """
+    Return the pods of Knative revisions.
+
+    The pods are selected by their revision label, from the pod index of the
+    namespace when it is warm, with a label selector otherwise.
+    """
+    revisions = sorted(revisions)
+    if not revisions:
+        return []
+
+    relations = get_namespace_relations(namespace)
+    if relations is not None:
+        return [
+            pod
+            for revision in revisions
+            for pod in relations.select("pods", {KNATIVE_REVISION_LABEL: revision})
+        ]
+
+    label_selector = f"{KNATIVE_REVISION_LABEL} in ({','.join(revisions)})"
+    return api.v1_core.list_namespaced_pod(
+        namespace, label_selector=label_selector
+    ).items
+
+
+def get_pod(namespace, name):
+    """Return a pod from the relation index when warm, the API otherwise."""
+    relations = get_namespace_relations(namespace)
+    if relations is not None:
+        pod = relations.get("pods", name)
+        if pod is not None:
+            return pod
+    return api.v1_core.read_namespaced_pod(name, namespace)
+
+
+def get_inference_service_events(namespace, name):
+    """Return the events of an InferenceService."""
+    relations = get_namespace_relations(namespace)
+    if relations is not None:
+        # The index is read with the app's credentials, not the user's.
+        authz.ensure_authorized("list", "", "v1", "events", namespace)
+        return relations.events_for("InferenceService", name)
+
+    field_selector = api.events_field_selector("InferenceService", name)
+    return coalescing.list_events(namespace, field_selector)["items"]
+
+
 # FIXME(elikatsis,kimwnasptd): Change the logic of this function according to
 # https://github.com/arrikto/dev/issues/867
 def get_components_revisions_dict(components, svc):
@@ -240,36 +338,30 @@ def get_standard_deployment_objects(svc, component):
         "hpa": None,
     }
 
-    try:
-        # Get Deployment
-        deployment = api.get_custom_rsrc(
-            **versions.K8S_DEPLOYMENT, namespace=namespace, name=resource_name
-        )
-        objects["deployment"] = deployment
-        log.info(f"Found deployment {resource_name} for component {component}")
-    except Exception as e:
-        log.warning(f"Could not find deployment {resource_name}: {e}")
-
-    try:
-        # Get Service
-        service = api.get_custom_rsrc(
-            **versions.K8S_SERVICE, namespace=namespace, name=resource_name
-        )
-        objects["service"] = service
-        log.info(f"Found service {resource_name} for component {component}")
-    except Exception as e:
-        log.warning(f"Could not find service {resource_name}: {e}")
-
-    try:
-        # Get HPA (optional)
-        hpa = api.get_custom_rsrc(
-            **versions.K8S_HPA, namespace=namespace, name=resource_name
-        )
-        objects["hpa"] = hpa
-        log.info(f"Found HPA {resource_name} for component {component}")
-    except Exception as e:
-        log.debug(f"No HPA found for {resource_name}: {e}")
+    relations = get_namespace_relations(namespace)
+    if relations is not None:
+        for key, gvk, kind in (
+            ("deployment", versions.K8S_DEPLOYMENT, "deployments"),
+            ("service", versions.K8S_SERVICE, "services"),
+            ("hpa", versions.K8S_HPA, "horizontalpodautoscalers"),
+        ):
+            # The index is read with the app's credentials, not the user's.
+            authz.ensure_authorized(
+                "get", gvk["group"], gvk["version"], gvk["kind"], namespace
+            )
+            obj = relations.get(kind, resource_name)
+            objects[key] = api.serialize(obj) if obj is not None else None
+        return objects
 
+    found = _find_objects(
+        namespace,
+        {
+            "deployment": (versions.K8S_DEPLOYMENT, resource_name),
+            "service": (versions.K8S_SERVICE, resource_name),
+            "hpa": (versions.K8S_HPA, resource_name),
+        },
+    )
+    objects.update(found)
     return objects
 
 
@@ -295,29 +387,22 @@ def get_modelmesh_objects(svc, component):
         log.warning(f"Could not determine ServingRuntime for component {component}")
         return objects
 
-    # 3. Get the ServingRuntime object
-    objects["servingRuntime"] = _get_k8s_object(
-        namespace=namespace,
-        name=runtime_name,
-        group="serving.kserve.io",
-        version="v1alpha1",
-        kind="servingruntimes",
-    )
-
-    # 4. Determine the resource name using the standard convention
+    # 3. Determine the resource name using the standard convention
     # Pattern: {serviceName}-{runtimeName}
     service_name = _get_modelmesh_service_name()
     resource_name = f"{service_name}-{runtime_name}"
     log.info(f"Constructed ModelMesh resource name: {resource_name}")
 
-    # 5. Get the Deployment and Service by their specific names
-    objects["deployment"] = _get_k8s_object(
-        namespace=namespace, name=resource_name, **versions.K8S_DEPLOYMENT
-    )
-    objects["service"] = _get_k8s_object(
-        namespace=namespace, name=resource_name, **versions.K8S_SERVICE
+    # 4. Get the ServingRuntime, Deployment and Service by their names
+    found = _find_objects(
+        namespace,
+        {
+            "servingRuntime": (SERVING_RUNTIME, runtime_name),
+            "deployment": (versions.K8S_DEPLOYMENT, resource_name),
+            "service": (versions.K8S_SERVICE, resource_name),
+        },
     )
-
+    objects.update(found)
     return objects
 
 
@@ -340,21 +425,40 @@ def _get_modelmesh_service_name():
     return default_name
 
 
-def _get_k8s_object(namespace, name, group, version, kind):
-    """A generic helper to get any single Kubernetes resource by its name."""
-    try:
-        resource = api.get_custom_rsrc(
-            group=group,
-            version=version,
-            kind=kind,
-            namespace=namespace,
-            name=name,
-        )
-        log.info(f"Found {kind.rstrip('s')} '{name}' in namespace '{namespace}'")
-        return resource
-    except Exception as e:
-        log.debug(f"Could not find {kind.rstrip('s')} '{name}': {e}")
-        return None
+def _find_objects(namespace, lookups):
+    """
+    Look up objects by name concurrently.
+
+    Args:
+        namespace: The namespace of the objects
+        lookups: The gvk and name of each object by key
+
+    Returns:
+        The objects by key, None for the missing ones and the ones that could
+        not be read within OBJECT_LOOKUP_TIMEOUT_SECONDS
+    """
+    # Every read is bounded too, so that a timed out read frees its worker.
+    results = parallel.read_concurrently(
+        {
+            key: partial(
+                coalescing.find_custom_rsrc,
+                **gvk,
+                namespace=namespace,
+                name=name,
+                request_timeout=OBJECT_LOOKUP_TIMEOUT_SECONDS,
+            )
+            for key, (gvk, name) in lookups.items()
+        },
+        timeout=OBJECT_LOOKUP_TIMEOUT_SECONDS,
+    )
+
+    objects = {}
+    for key, (obj, error) in results.items():
+        if error is not None:
+            _, name = lookups[key]
+            log.warning(f"Could not read {key} '{name}' in '{namespace}': {error}")
+        objects[key] = obj
+    return objects
 
 
 def get_component_latest_pod(
@@ -372,16 +476,9 @@ def get_component_latest_pod(
     if latest_revision is None:
         return None
 
-    pods = api.list_pods(namespace, auth=False).items
-
-    for pod in pods:
-        if KNATIVE_REVISION_LABEL not in pod.metadata.labels:
-            continue
-
-        if pod.metadata.labels[KNATIVE_REVISION_LABEL] != latest_revision:
-            continue
-
-        return pod
+    pods = get_revision_pods(namespace, [latest_revision])
+    if pods:
+        return pods[0]
 
     log.info(f"No pods are found for inference service: {svc['metadata']['name']}")
     return None
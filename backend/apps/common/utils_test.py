@@ -0,0 +1,162 @@
+"""Unit tests for the InferenceService pod lookups.
+
+Run directly with:
+    python3 backend/apps/common/utils_test.py
+"""
+
+import importlib.util
+import logging as python_logging
+from pathlib import Path
+import sys
+import types
+import unittest
+from unittest.mock import Mock
+
+
+def _load_utils_module():
+    """Load utils.py with lightweight stubs for external dependencies."""
+    module_names = (
+        "backend",
+        "backend.apps",
+        "backend.apps.common",
+        "backend.apps.common.coalescing",
+        "backend.apps.common.parallel",
+        "backend.apps.common.versions",
+        "kubeflow",
+        "kubeflow.kubeflow",
+        "kubeflow.kubeflow.crud_backend",
+    )
+    original_modules = {name: sys.modules.get(name) for name in module_names}
+
+    backend = types.ModuleType("backend")
+    apps = types.ModuleType("backend.apps")
+    common = types.ModuleType("backend.apps.common")
+    coalescing = types.ModuleType("backend.apps.common.coalescing")
+    parallel = types.ModuleType("backend.apps.common.parallel")
+    versions = types.ModuleType("backend.apps.common.versions")
+    kubeflow = types.ModuleType("kubeflow")
+    kubeflow_kubeflow = types.ModuleType("kubeflow.kubeflow")
+    crud_backend = types.ModuleType("kubeflow.kubeflow.crud_backend")
+
+    backend.__path__ = []
+    apps.__path__ = []
+    common.__path__ = []
+    crud_backend.api = types.SimpleNamespace(
+        v1_core=Mock(), client=types.SimpleNamespace(V1Pod=object)
+    )
+    crud_backend.authz = types.SimpleNamespace(ensure_authorized=Mock())
+    crud_backend.helpers = types.SimpleNamespace()
+    crud_backend.logging = types.SimpleNamespace(
+        getLogger=lambda name: python_logging.getLogger(name)
+    )
+
+    try:
+        sys.modules["backend"] = backend
+        sys.modules["backend.apps"] = apps
+        sys.modules["backend.apps.common"] = common
+        sys.modules["backend.apps.common.coalescing"] = coalescing
+        sys.modules["backend.apps.common.parallel"] = parallel
+        sys.modules["backend.apps.common.versions"] = versions
+        sys.modules["kubeflow"] = kubeflow
+        sys.modules["kubeflow.kubeflow"] = kubeflow_kubeflow
+        sys.modules["kubeflow.kubeflow.crud_backend"] = crud_backend
+
+        module_path = Path(__file__).with_name("utils.py")
+        spec = importlib.util.spec_from_file_location(
+            "backend.apps.common.utils_under_test", module_path
+        )
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+        return module
+    finally:
+        for name, original_module in original_modules.items():
+            if original_module is None:
+                sys.modules.pop(name, None)
+            else:
+                sys.modules[name] = original_module
+
+
+utils = _load_utils_module()
+
+
+def _pod(name, revision):
+    return types.SimpleNamespace(
+        metadata=types.SimpleNamespace(
+            name=name, labels={utils.KNATIVE_REVISION_LABEL: revision}
+        )
+    )
+
+
+def _isvc(**revisions):
+    return {
+        "metadata": {"namespace": "ns", "name": "model"},
+        "status": {
+            "components": {
+                component: {
+                    "latestReadyRevision": revision,
+                    "latestCreatedRevision": revision,
+                }
+                for component, revision in revisions.items()
+            }
+        },
+    }
+
+
+class RevisionPodsTest(unittest.TestCase):
+    def setUp(self):
+        self.list_pods = utils.api.v1_core.list_namespaced_pod
+        self.list_pods.reset_mock(return_value=True, side_effect=True)
+        original_relations = utils.get_namespace_relations
+        utils.get_namespace_relations = Mock(return_value=None)
+        self.addCleanup(setattr, utils, "get_namespace_relations", original_relations)
+
+    def test_cold_namespace_selects_pods_by_revision_label(self):
+        self.list_pods.return_value = types.SimpleNamespace(
+            items=[
+                _pod("predictor-1", "model-predictor-00002"),
+                _pod("transformer-1", "model-transformer-00001"),
+                _pod("predictor-2", "model-predictor-00002"),
+            ]
+        )
+
+        pods = utils.get_inference_service_pods(
+            _isvc(
+                predictor="model-predictor-00002",
+                transformer="model-transformer-00001",
+            ),
+            ["predictor", "transformer"],
+        )
+
+        self.list_pods.assert_called_once_with(
+            "ns",
+            label_selector=(
+                "serving.knative.dev/revision in "
+                "(model-predictor-00002,model-transformer-00001)"
+            ),
+        )
+        self.assertEqual(
+            pods,
+            {
+                "predictor": ["predictor-1", "predictor-2"],
+                "transformer": ["transformer-1"],
+            },
+        )
+
+    def test_warm_namespace_reads_the_pod_index(self):
+        relations = Mock()
+        relations.select.return_value = [_pod("predictor-1", "model-predictor-00002")]
+        utils.get_namespace_relations.return_value = relations
+
+        pod = utils.get_component_latest_pod(
+            _isvc(predictor="model-predictor-00002"), "predictor"
+        )
+
+        self.assertEqual(pod.metadata.name, "predictor-1")
+        relations.select.assert_called_once_with(
+            "pods", {utils.KNATIVE_REVISION_LABEL: "model-predictor-00002"}
+        )
+        self.list_pods.assert_not_called()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -5,6 +5,7 @@ from flask import jsonify
 
 from kubeflow.kubeflow.crud_backend import api, logging
 
+from ...common import coalescing
 from . import bp
 
 log = logging.getLogger(__name__)
@@ -36,8 +37,8 @@ def get_config():
 def get_namespaces():
     """Handle retrieval of available namespaces with optional filtering."""
     try:
-        all_namespaces = api.list_namespaces()
-        all_namespace_names = [ns.metadata.name for ns in all_namespaces.items]
+        all_namespaces = coalescing.list_namespaces()
+        all_namespace_names = [ns["metadata"]["name"] for ns in all_namespaces["items"]]
 
         allowed_namespaces_env = os.environ.get("ALLOWED_NAMESPACES", "").strip()
 
@@ -249,6 +249,23 @@ describe('IndexComponent', () => {
     );
   });
 
+  it('should add unknown inference services from coalesced MODIFIED SSE events', () => {
+    sseEvents.next({
+      type: 'INITIAL',
+      items: [inferenceService('model-a')],
+    });
+
+    sseEvents.next({
+      type: 'MODIFIED',
+      object: inferenceService('model-b'),
+    });
+
+    expect(component.inferenceServices.map(svc => svc.metadata?.name)).toEqual([
+      'model-a',
+      'model-b',
+    ]);
+  });
+
   it('should remove matching inference services from DELETED SSE events', () => {
     sseEvents.next({
       type: 'INITIAL',
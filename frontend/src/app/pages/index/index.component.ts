@@ -160,18 +160,13 @@ export class IndexComponent implements OnInit, OnDestroy {
             if (event.type === 'INITIAL' && event.items) {
               this.inferenceServices = this.processIncomingData(event.items);
               this.cdr.detectChanges();
-            } else if (event.type === 'ADDED' && event.object) {
-              const processed = this.processIncomingData([event.object]);
-              this.inferenceServices = [
-                ...this.inferenceServices,
-                ...processed,
-              ];
-              this.cdr.detectChanges();
             } else if (
-              event.type === 'MODIFIED' &&
+              (event.type === 'ADDED' || event.type === 'MODIFIED') &&
               event.object &&
               event.object.metadata
             ) {
+              // Coalesced streams may skip intermediate states, so every
+              // ADDED or MODIFIED event is applied as an upsert.
               const processed = this.processIncomingData([event.object]);
               if (processed.length > 0) {
                 const index = this.inferenceServices.findIndex(
@@ -183,8 +178,13 @@ export class IndexComponent implements OnInit, OnDestroy {
                 if (index !== -1) {
                   this.inferenceServices[index] = processed[0];
                   this.inferenceServices = [...this.inferenceServices];
-                  this.cdr.detectChanges();
+                } else {
+                  this.inferenceServices = [
+                    ...this.inferenceServices,
+                    ...processed,
+                  ];
                 }
+                this.cdr.detectChanges();
               }
             } else if (
               event.type === 'DELETED' &&
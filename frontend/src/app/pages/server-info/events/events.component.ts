@@ -63,19 +63,21 @@ export class EventsComponent implements OnDestroy {
         event => {
           if (event.type === 'INITIAL' && event.items) {
             this.events = event.items;
-          } else if (event.type === 'ADDED' && event.object) {
-            this.events = [...this.events, event.object];
           } else if (
-            event.type === 'MODIFIED' &&
+            (event.type === 'ADDED' || event.type === 'MODIFIED') &&
             event.object &&
             event.object.metadata
           ) {
+            // Coalesced streams may skip intermediate states, so every
+            // ADDED or MODIFIED event is applied as an upsert.
             const index = this.events.findIndex(
               e => e.metadata?.uid === event.object?.metadata?.uid,
             );
             if (index !== -1) {
               this.events[index] = event.object;
               this.events = [...this.events];
+            } else {
+              this.events = [...this.events, event.object];
             }
           } else if (event.type === 'DELETED' && event.object?.metadata?.uid) {
             // Remove deleted event from the list
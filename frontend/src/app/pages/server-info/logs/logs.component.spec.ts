@@ -10,7 +10,10 @@ import {
   LoadingSpinnerModule,
   SnackBarService,
 } from 'kubeflow';
+import { Observable, of, Subject } from 'rxjs';
 import { MWABackendService } from 'src/app/services/backend.service';
+import { SSEService, WatchEvent } from 'src/app/services/sse.service';
+import { InferenceServiceK8s } from 'src/app/types/kfserving/v1beta1';
 
 import { LogsComponent } from './logs.component';
 
@@ -45,3 +48,102 @@ describe('LogsComponent', () => {
     expect(component).toBeTruthy();
   });
 });
+
+describe('LogsComponent log stream', () => {
+  let component: LogsComponent;
+  let sseEvents: Subject<WatchEvent<any>>;
+  let watchLogs: jest.Mock;
+
+  const inferenceService = {
+    metadata: { namespace: 'kubeflow-user', name: 'model' },
+    spec: { predictor: {} },
+  } as unknown as InferenceServiceK8s;
+
+  const line = (podName: string, text: string) => ({
+    component: 'predictor',
+    podName,
+    container: 'kserve-container',
+    timestamp: '2024-01-01T00:00:00Z',
+    line: text,
+  });
+
+  beforeEach(waitForAsync(() => {
+    sseEvents = new Subject<WatchEvent<any>>();
+    watchLogs = jest.fn(
+      () =>
+        new Observable<WatchEvent<any>>(observer =>
+          sseEvents.subscribe(observer),
+        ),
+    );
+
+    TestBed.configureTestingModule({
+      declarations: [LogsComponent],
+      providers: [
+        {
+          provide: MWABackendService,
+          useValue: {
+            getInferenceServiceContainers: () => of(['kserve-container']),
+            getInferenceServiceLogs: () => of([]),
+          },
+        },
+        { provide: SSEService, useValue: { watchLogs } },
+      ],
+      schemas: [NO_ERRORS_SCHEMA],
+    }).compileComponents();
+  }));
+
+  beforeEach(() => {
+    component = TestBed.createComponent(LogsComponent).componentInstance;
+    component.inferenceService = inferenceService;
+  });
+
+  it('should follow the logs of the current container', () => {
+    expect(watchLogs).toHaveBeenCalledWith(
+      'kubeflow-user',
+      'model',
+      ['predictor'],
+      ['kserve-container'],
+    );
+  });
+
+  it('should show the lines of a PODS and APPEND sequence', () => {
+    sseEvents.next({ type: 'PODS', pods: { predictor: ['model-1'] } });
+    expect(component.logsRequestCompleted).toBe(true);
+    expect(component.currLogs).toEqual([]);
+
+    sseEvents.next({
+      type: 'APPEND',
+      lines: [line('model-1', 'starting'), line('model-1', 'ready')],
+    });
+    sseEvents.next({ type: 'APPEND', lines: [line('model-1', 'request')] });
+
+    expect(component.currLogs).toEqual(['starting', 'ready', 'request']);
+  });
+
+  it('should tag the lines of several pods and drop those of removed pods', () => {
+    sseEvents.next({
+      type: 'PODS',
+      pods: { predictor: ['model-1', 'model-2'] },
+    });
+    sseEvents.next({
+      type: 'APPEND',
+      lines: [line('model-1', 'a'), line('model-2', 'b')],
+    });
+    expect(component.currLogs).toEqual(['[model-1] a', '[model-2] b']);
+
+    sseEvents.next({ type: 'PODS', pods: { predictor: ['model-2'] } });
+
+    expect(component.currLogs).toEqual(['b']);
+  });
+
+  it('should drop the lines when the stream reopens', () => {
+    sseEvents.next({ type: 'PODS', pods: { predictor: ['model-1'] } });
+    sseEvents.next({ type: 'APPEND', lines: [line('model-1', 'a')] });
+
+    sseEvents.next({ type: 'RESYNC' });
+    sseEvents.next({ type: 'PODS', pods: { predictor: ['model-1'] } });
+    sseEvents.next({ type: 'APPEND', lines: [line('model-1', 'a')] });
+
+    expect(component.currLogs).toEqual(['a']);
+  });
+});
@@ -1,9 +1,13 @@
 import { Component, Input, OnDestroy, ViewChild } from '@angular/core';
 import { MWABackendService } from 'src/app/services/backend.service';
+import { LogLine, SSEService, WatchEvent } from 'src/app/services/sse.service';
 import { ExponentialBackoff } from 'kubeflow';
 import { Subscription } from 'rxjs';
 import { InferenceServiceK8s } from 'src/app/types/kfserving/v1beta1';
 
+// Lines kept on display, as many as the first window of the stream.
+const MAX_LOG_LINES = 1000;
+
 enum IsvcComponent {
   predictor = 'predictor',
   transformer = 'transformer',
@@ -44,10 +48,6 @@ export class LogsComponent implements OnDestroy {
       return;
     }
 
-    if (this.pollingSub) {
-      this.pollingSub.unsubscribe();
-    }
-
     for (const component of Object.keys(IsvcComponent)) {
       if (!(component in this.svcPrv.spec)) {
         continue;
@@ -59,10 +59,12 @@ export class LogsComponent implements OnDestroy {
         .getInferenceServiceContainers(this.svcPrv, component)
         .subscribe(
           containers => {
+            // The stream is opened once, not on every InferenceService update.
             if (!this.hasLoadedContainers) {
               this.currentComponent = component;
               this.currentContainer = containers[0];
               this.hasLoadedContainers = true;
+              this.watchLogs();
             }
             this.isvcComponents[component].containers = containers;
           },
@@ -71,34 +73,12 @@ export class LogsComponent implements OnDestroy {
           },
         );
     }
-
-    this.pollingSub = this.poller.start().subscribe(() => {
-      if (!this.currentComponent || !this.currentContainer) {
-        return;
-      }
-
-      this.backend
-        .getInferenceServiceLogs(
-          this.svcPrv,
-          this.currentComponent,
-          this.currentContainer,
-        )
-        .subscribe(
-          logs => {
-            this.currLogs = logs;
-            this.logsRequestCompleted = true;
-            this.loadErrorMsg = '';
-          },
-          error => {
-            this.currLogs = [];
-            this.logsRequestCompleted = true;
-            this.loadErrorMsg = error;
-          },
-        );
-    });
   }
 
   private svcPrv: InferenceServiceK8s;
+  private lines: LogLine[] = [];
+  private pods: { [component: string]: string[] } = {};
+  private sseSub: Subscription;
   private pollingSub: Subscription;
   private poller = new ExponentialBackoff({
     interval: 5000,
@@ -106,11 +86,16 @@ export class LogsComponent implements OnDestroy {
     maxInterval: 5001,
   });
 
-  constructor(public backend: MWABackendService) {}
+  constructor(
+    public backend: MWABackendService,
+    private sseService: SSEService,
+  ) {}
 
   resetLogDisplay() {
     this.logsRequestCompleted = false;
     this.currLogs = [];
+    this.lines = [];
+    this.pods = {};
     this.loadErrorMsg = '';
     this.poller.reset();
   }
@@ -129,17 +114,107 @@ export class LogsComponent implements OnDestroy {
     }
 
     this.resetLogDisplay();
+    this.watchLogs();
   }
 
   containerTabChange(index: number) {
     this.currentContainer =
       this.isvcComponents[this.currentComponent].containers[index];
     this.resetLogDisplay();
+    this.watchLogs();
   }
 
   ngOnDestroy() {
+    this.stopWatching();
+  }
+
+  private stopWatching() {
+    if (this.sseSub) {
+      this.sseSub.unsubscribe();
+    }
     if (this.pollingSub) {
       this.pollingSub.unsubscribe();
     }
   }
+
+  // Follows the logs of the current container of every pod of the component.
+  private watchLogs() {
+    this.stopWatching();
+    if (!this.svcPrv || !this.currentComponent || !this.currentContainer) {
+      return;
+    }
+
+    this.sseSub = this.sseService
+      .watchLogs(
+        this.svcPrv.metadata.namespace,
+        this.svcPrv.metadata.name,
+        [this.currentComponent],
+        [this.currentContainer],
+      )
+      .subscribe(
+        event => {
+          if (event.type === 'ERROR') {
+            this.fallbackToPolling();
+            return;
+          }
+          this.applyLogEvent(event);
+        },
+        () => this.fallbackToPolling(),
+      );
+  }
+
+  private applyLogEvent(event: WatchEvent<any>) {
+    if (event.type === 'RESYNC') {
+      this.lines = [];
+    } else if (event.type === 'PODS') {
+      // The lines of the pods that went away are dropped with them.
+      this.pods = event.pods || {};
+      this.lines = this.lines.filter(line =>
+        (this.pods[line.component] || []).includes(line.podName),
+      );
+      this.logsRequestCompleted = true;
+      this.loadErrorMsg = '';
+    } else if (event.type === 'APPEND') {
+      this.lines = [...this.lines, ...(event.lines || [])].slice(
+        -MAX_LOG_LINES,
+      );
+    } else {
+      return;
+    }
+
+    // The pod is only shown when the lines of several pods are merged.
+    const multiplePods = (this.pods[this.currentComponent] || []).length > 1;
+    this.currLogs = this.lines.map(line =>
+      multiplePods ? `[${line.podName}] ${line.line}` : line.line,
+    );
+  }
+
+  private fallbackToPolling() {
+    this.stopWatching();
+
+    this.pollingSub = this.poller.start().subscribe(() => {
+      if (!this.currentComponent || !this.currentContainer) {
+        return;
+      }
+
+      this.backend
+        .getInferenceServiceLogs(
+          this.svcPrv,
+          this.currentComponent,
+          this.currentContainer,
+        )
+        .subscribe(
+          logs => {
+            this.currLogs = logs;
+            this.logsRequestCompleted = true;
+            this.loadErrorMsg = '';
+          },
+          error => {
+            this.currLogs = [];
+            this.logsRequestCompleted = true;
+            this.loadErrorMsg = error;
+          },
+        );
+    });
+  }
 }
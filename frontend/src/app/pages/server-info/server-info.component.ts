@@ -256,11 +256,14 @@ export class ServerInfoComponent implements OnInit, OnDestroy {
   }
 
   private getBackendObjects() {
-    this.backend
-      .getInferenceService(this.namespace, this.serverName)
-      .subscribe(inferenceService => {
-        this.updateInferenceService(inferenceService);
-        this.loadOwnedObjects(inferenceService);
+    this.ownedObjectsSubscription?.unsubscribe();
+    this.ownedObjectsSubscription = this.backend
+      .getServerInfo(this.namespace, this.serverName)
+      .subscribe(serverInfo => {
+        this.updateInferenceService(serverInfo.inferenceService);
+        this.ownedObjects = serverInfo.ownedObjects;
+        this.serverInfoLoaded = true;
+        this.cdr.detectChanges();
       });
   }
 
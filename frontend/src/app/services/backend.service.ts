@@ -9,6 +9,7 @@ import {
   MWABackendResponse,
   InferenceServiceLogs,
   ModelMeshObjects,
+  ServerInfo,
   StandardDeploymentObjects,
 } from '../types/backend';
 import { EventObject } from '../types/event';
@@ -38,6 +39,20 @@ export class MWABackendService extends BackendService {
     );
   }
 
+  public getServerInfo(
+    namespace: string,
+    name: string,
+  ): Observable<ServerInfo> {
+    const url = `api/namespaces/${namespace}/inferenceservices/${name}/serverinfo`;
+
+    return this.http.get<MWABackendResponse>(url).pipe(
+      catchError(error => this.handleError(error)),
+      map((resp: MWABackendResponse) => {
+        return resp.serverInfo;
+      }),
+    );
+  }
+
   private getInferenceServicesSingleNamespace(
     namespace: string,
   ): Observable<InferenceServiceK8s[]> {
@@ -209,11 +224,12 @@ export class MWABackendService extends BackendService {
     svc: InferenceServiceK8s,
     component: string,
     container: string,
+    tailLines = 1000,
   ): Observable<string[]> {
     const name = svc.metadata.name;
     const namespace = svc.metadata.namespace;
 
-    const url = `api/namespaces/${namespace}/inferenceservices/${name}/components/${component}/pods/containers/${container}/logs`;
+    const url = `api/namespaces/${namespace}/inferenceservices/${name}/components/${component}/pods/containers/${container}/logs?tailLines=${tailLines}`;
 
     return this.http.get<MWABackendResponse>(url).pipe(
       catchError(error => this.handleError(error, false)),
@@ -3,10 +3,12 @@ import { SSEService } from './sse.service';
 describe('SSEService', () => {
   const originalEventSource = global.EventSource;
   let openedUrls: string[];
+  let openedSources: any[];
   let close: jest.Mock;
 
   beforeEach(() => {
     openedUrls = [];
+    openedSources = [];
     close = jest.fn();
 
     (global as any).EventSource = class {
@@ -18,6 +20,7 @@ describe('SSEService', () => {
 
       constructor(url: string) {
         openedUrls.push(url);
+        openedSources.push(this);
       }
 
       close = close;
@@ -45,4 +48,56 @@ describe('SSEService', () => {
     subscription.unsubscribe();
     expect(close).toHaveBeenCalledTimes(1);
   });
+
+  it('should report a reopened log stream as a resync', () => {
+    const service = new SSEService();
+    const events = [];
+
+    const subscription = service
+      .watchLogs('kubeflow-user', 'model-a')
+      .subscribe(event => events.push(event));
+
+    openedSources[0].onopen();
+    openedSources[0].onmessage({
+      data: JSON.stringify({ type: 'PODS', pods: { predictor: ['pod-1'] } }),
+    } as MessageEvent);
+    openedSources[0].onmessage({
+      data: JSON.stringify({ type: 'RESYNC' }),
+    } as MessageEvent);
+    openedSources[1].onopen();
+
+    expect(events).toEqual([
+      { type: 'PODS', pods: { predictor: ['pod-1'] } },
+      { type: 'RESYNC' },
+    ]);
+
+    subscription.unsubscribe();
+  });
+
+  it('should reopen the stream when the backend requests a resync', () => {
+    const service = new SSEService();
+    const events = [];
+
+    const subscription = service
+      .watchInferenceServices('kubeflow-user')
+      .subscribe(event => events.push(event));
+
+    openedSources[0].onmessage({
+      data: JSON.stringify({ type: 'RESYNC' }),
+    } as MessageEvent);
+
+    expect(close).toHaveBeenCalledTimes(1);
+    expect(openedUrls).toEqual([
+      'api/sse/namespaces/kubeflow-user/inferenceservices',
+      'api/sse/namespaces/kubeflow-user/inferenceservices',
+    ]);
+    expect(events).toEqual([]);
+
+    openedSources[1].onmessage({
+      data: JSON.stringify({ type: 'INITIAL', items: [] }),
+    } as MessageEvent);
+    expect(events).toEqual([{ type: 'INITIAL', items: [] }]);
+
+    subscription.unsubscribe();
+  });
 });
@@ -1,12 +1,31 @@
 import { Injectable } from '@angular/core';
 import { Observable } from 'rxjs';
 
+export interface LogLine {
+  component: string;
+  podName: string;
+  container: string;
+  timestamp: string;
+  line: string;
+}
+
 export interface WatchEvent<T> {
-  type: 'INITIAL' | 'ADDED' | 'MODIFIED' | 'DELETED' | 'ERROR' | 'UPDATE';
+  type:
+    | 'INITIAL'
+    | 'ADDED'
+    | 'MODIFIED'
+    | 'DELETED'
+    | 'ERROR'
+    | 'UPDATE'
+    | 'RESYNC'
+    | 'PODS'
+    | 'APPEND';
   object?: T;
   items?: T[];
   logs?: any;
   message?: string;
+  pods?: { [component: string]: string[] };
+  lines?: LogLine[];
 }
 
 @Injectable({
@@ -38,64 +57,99 @@ export class SSEService {
     return this.createEventSource<T>(url);
   }
 
+  /**
+   * Follows the logs of the pods of an InferenceService. The stream starts
+   * with a PODS event, then APPEND events carry the new lines. The lines are
+   * sent again from the first window whenever the stream reopens, which is
+   * reported with a RESYNC event so that the subscriber drops its lines.
+   */
   public watchLogs(
     namespace: string,
     name: string,
     components?: string[],
+    containers?: string[],
   ): Observable<WatchEvent<any>> {
     let url = `api/sse/namespaces/${namespace}/inferenceservices/${name}/logs`;
 
-    if (components && components.length > 0) {
-      const params = new URLSearchParams();
-      components.forEach(component => params.append('component', component));
+    const params = new URLSearchParams();
+    (components || []).forEach(component =>
+      params.append('component', component),
+    );
+    (containers || []).forEach(container =>
+      params.append('container', container),
+    );
+    if (params.toString()) {
       url += `?${params.toString()}`;
     }
 
-    return this.createEventSource<any>(url);
+    return this.createEventSource<any>(url, true);
   }
 
-  private createEventSource<T>(url: string): Observable<WatchEvent<T>> {
+  private createEventSource<T>(
+    url: string,
+    notifyReopen = false,
+  ): Observable<WatchEvent<T>> {
     return new Observable(observer => {
       let reconnectAttempts = 0;
+      let opened = false;
       const maxReconnectAttempts = 3;
-      const eventSource = new EventSource(url);
+      let eventSource: EventSource;
 
-      eventSource.onmessage = (event: MessageEvent) => {
-        if (!event.data || event.data.trim() === '') {
-          return;
-        }
+      const open = () => {
+        eventSource = new EventSource(url);
 
-        try {
-          const data: WatchEvent<T> = JSON.parse(event.data);
-          observer.next(data);
-          reconnectAttempts = 0;
-        } catch (parseError) {
-          observer.error(parseError);
-          eventSource.close();
-        }
-      };
+        eventSource.onmessage = (event: MessageEvent) => {
+          if (!event.data || event.data.trim() === '') {
+            return;
+          }
+
+          try {
+            const data: WatchEvent<T> = JSON.parse(event.data);
+            reconnectAttempts = 0;
 
-      eventSource.onerror = (error: Event) => {
-        if (eventSource.readyState === EventSource.CONNECTING) {
-          reconnectAttempts++;
-          if (reconnectAttempts >= maxReconnectAttempts) {
-            observer.error(
-              new Error(
-                `SSE failed to reconnect after ${maxReconnectAttempts} attempts`,
-              ),
-            );
+            // The backend dropped pending events for this client, reconnect
+            // to receive a fresh snapshot.
+            if (data.type === 'RESYNC') {
+              eventSource.close();
+              open();
+              return;
+            }
+
+            observer.next(data);
+          } catch (parseError) {
+            observer.error(parseError);
             eventSource.close();
           }
-          return;
-        }
-        observer.error(error);
-        eventSource.close();
-      };
+        };
 
-      eventSource.onopen = () => {
-        reconnectAttempts = 0;
+        eventSource.onerror = (error: Event) => {
+          if (eventSource.readyState === EventSource.CONNECTING) {
+            reconnectAttempts++;
+            if (reconnectAttempts >= maxReconnectAttempts) {
+              observer.error(
+                new Error(
+                  `SSE failed to reconnect after ${maxReconnectAttempts} attempts`,
+                ),
+              );
+              eventSource.close();
+            }
+            return;
+          }
+          observer.error(error);
+          eventSource.close();
+        };
+
+        eventSource.onopen = () => {
+          reconnectAttempts = 0;
+          if (opened && notifyReopen) {
+            observer.next({ type: 'RESYNC' });
+          }
+          opened = true;
+        };
       };
 
+      open();
+
       return () => {
         if (eventSource) {
           eventSource.close();
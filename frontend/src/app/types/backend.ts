@@ -22,7 +22,9 @@ export interface MWABackendResponse extends BackendResponse {
   hpa?: K8sObject;
   standardDeploymentObjects?: StandardDeploymentObjects;
   modelmeshObjects?: ModelMeshObjects;
+  serverInfo?: ServerInfo;
   logs?: string[];
+  cursor?: string | null;
   containers?: string[];
 }
 
@@ -58,6 +60,14 @@ export interface ComponentOwnedObjects {
   servingRuntime?: K8sObject | null;
 }
 
+// InferenceService with the objects of its details page
+export interface ServerInfo {
+  inferenceService: InferenceServiceK8s;
+  ownedObjects: InferenceServiceOwnedObjects;
+  events: EventObject[];
+  errors: Record<string, { status: number; message: string }>;
+}
+
 // Standard mode types
 export interface StandardDeploymentObjects {
   deployment?: K8sObject | null;